@@ -40,6 +40,12 @@ if [ "${AUTO_MIGRATE:-1}" = "1" ]; then
   python manage.py migrate --noinput
 fi
 
+if [ "$MODE" = "worker" ]; then
+  export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:-config.settings.prod}"
+  echo "[backend-container] Iniciando worker de jobs..."
+  exec python manage.py run_worker
+fi
+
 if [ "$MODE" = "prod" ]; then
   export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:-config.settings.prod}"
   echo "[backend-container] Iniciando Gunicorn (modo producao)..."
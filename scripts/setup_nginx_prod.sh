@@ -16,6 +16,7 @@ ADMIN_PORT="${MRQ_ADMIN_PORT:-3002}"
 API_PORT="${MRQ_API_PORT:-8000}"
 PROJECT_ROOT="${MRQ_PROJECT_ROOT:-/home/ubuntu/mrquentinha}"
 API_STATIC_ROOT="${MRQ_API_STATIC_ROOT:-${PROJECT_ROOT}/workspaces/backend/staticfiles}"
+API_MEDIA_ROOT="${MRQ_API_MEDIA_ROOT:-${PROJECT_ROOT}/workspaces/backend/media}"
 
 NGINX_SITE_PATH="/etc/nginx/sites-available/mrquentinha.conf"
 NGINX_SITE_LINK="/etc/nginx/sites-enabled/mrquentinha.conf"
@@ -34,6 +35,18 @@ ensure_root() {
   sudo -v
 }
 
+protected_media_location() {
+  # Destino do X-Accel-Redirect (MEDIA_ACCEL_REDIRECT_ENABLED=True): o Django
+  # valida token/permissao e o nginx entrega o arquivo com Range e ETag.
+  cat <<EOF
+    location ^~ /_protected_media/ {
+        internal;
+        alias ${API_MEDIA_ROOT}/;
+        access_log off;
+    }
+EOF
+}
+
 build_mobile_api_server_names() {
   local names=()
   if [[ -n "${MOBILE_API_PUBLIC_IP:-}" ]]; then
@@ -80,6 +93,8 @@ server {
         proxy_pass http://127.0.0.1:${API_PORT};
     }
 
+$(protected_media_location)
+
     location / {
         return 404;
     }
@@ -158,6 +173,8 @@ server {
         proxy_pass http://127.0.0.1:${API_PORT};
     }
 
+$(protected_media_location)
+
     location / {
         proxy_http_version 1.1;
         proxy_set_header Upgrade \$http_upgrade;
@@ -196,6 +213,8 @@ server {
         proxy_pass http://127.0.0.1:${API_PORT};
     }
 
+$(protected_media_location)
+
     location / {
         proxy_http_version 1.1;
         proxy_set_header Upgrade \$http_upgrade;
@@ -234,6 +253,8 @@ server {
         proxy_pass http://127.0.0.1:${API_PORT};
     }
 
+$(protected_media_location)
+
     location / {
         proxy_http_version 1.1;
         proxy_set_header Upgrade \$http_upgrade;
@@ -250,6 +271,8 @@ server {
     listen 80;
     server_name ${API_DOMAIN};
 
+$(protected_media_location)
+
     location ^~ /static/ {
         alias ${API_STATIC_ROOT}/;
         access_log off;
@@ -313,6 +336,8 @@ server {
         proxy_pass http://127.0.0.1:${API_PORT};
     }
 
+$(protected_media_location)
+
     location / {
         proxy_http_version 1.1;
         proxy_set_header Upgrade \$http_upgrade;
@@ -357,6 +382,8 @@ server {
         proxy_pass http://127.0.0.1:${API_PORT};
     }
 
+$(protected_media_location)
+
     location / {
         proxy_http_version 1.1;
         proxy_set_header Upgrade \$http_upgrade;
@@ -401,6 +428,8 @@ server {
         proxy_pass http://127.0.0.1:${API_PORT};
     }
 
+$(protected_media_location)
+
     location / {
         proxy_http_version 1.1;
         proxy_set_header Upgrade \$http_upgrade;
@@ -423,6 +452,8 @@ server {
     add_header X-Frame-Options "DENY" always;
     add_header Referrer-Policy "strict-origin-when-cross-origin" always;
 
+$(protected_media_location)
+
     location ^~ /static/ {
         alias ${API_STATIC_ROOT}/;
         access_log off;
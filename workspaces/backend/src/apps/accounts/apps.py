@@ -6,6 +6,18 @@ class AccountsConfig(AppConfig):
     name = "apps.accounts"
 
     def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from apps.accounts.services import (
+            register_permission_cache_signals,
+            seed_default_access_catalog,
+        )
         from apps.shared.image_pipeline import register_image_pipeline_signals
 
         register_image_pipeline_signals()
+        register_permission_cache_signals()
+        post_migrate.connect(
+            seed_default_access_catalog,
+            sender=self,
+            dispatch_uid="mrq-accounts-seed-access-catalog",
+        )
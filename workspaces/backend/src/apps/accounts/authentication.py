@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .services import get_user_permission_version, get_user_role_codes
+
+ROLE_CODES_CLAIM = "roles"
+PERMISSION_VERSION_CLAIM = "perm_ver"
+
+
+def role_claims_enabled() -> bool:
+    return bool(getattr(settings, "AUTH_JWT_ROLE_CLAIMS_ENABLED", False))
+
+
+def apply_role_claims(token, user) -> None:
+    token[ROLE_CODES_CLAIM] = sorted(get_user_role_codes(user))
+    token[PERMISSION_VERSION_CLAIM] = get_user_permission_version(user)
+
+
+class RoleClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication que reaproveita os papeis embutidos no access token.
+
+    Os papeis do token so valem enquanto a versao de permissoes do usuario
+    (lida do cache) for a mesma da emissao; do contrario a resolucao volta
+    para o caminho normal.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if not role_claims_enabled():
+            return user
+
+        role_codes = validated_token.get(ROLE_CODES_CLAIM)
+        token_version = validated_token.get(PERMISSION_VERSION_CLAIM)
+        if (
+            isinstance(role_codes, list)
+            and token_version
+            and token_version == get_user_permission_version(user)
+        ):
+            user._rbac_claim_roles = frozenset(role_codes)
+        return user
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-import mimetypes
 import time
 from dataclasses import dataclass
 from urllib.parse import urlencode
 
 from django.core import signing
 from django.core.exceptions import ValidationError
-from django.http import FileResponse
+from django.http import Http404, HttpResponseBase
+
+from apps.shared.media_delivery import build_media_response
 
 from .models import UserProfile
 from .services import SystemRole, user_has_any_role
@@ -118,22 +119,20 @@ def resolve_signed_profile_media(
 
 def build_profile_media_response(
     *,
+    request,
     profile: UserProfile,
     field_name: str,
-) -> FileResponse:
+) -> HttpResponseBase:
     file_field = getattr(profile, field_name, None)
     if not file_field:
         raise ValidationError("Arquivo nao encontrado.")
 
     try:
-        file_handle = file_field.open("rb")
-    except OSError as exc:
+        return build_media_response(
+            request,
+            name=str(file_field.name),
+            cache_control="private, no-store",
+            storage=file_field.storage,
+        )
+    except Http404 as exc:
         raise ValidationError("Arquivo de midia indisponivel.") from exc
-
-    content_type, _encoding = mimetypes.guess_type(str(file_field.name))
-    response = FileResponse(
-        file_handle,
-        content_type=content_type or "application/octet-stream",
-    )
-    response["Cache-Control"] = "private, no-store"
-    return response
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:36
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0010_useradminmodulepermission"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    "full_name", "preferred_name", config="simple", weight="A"
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userprofile",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="accounts_profile_search_gin"
+            ),
+        ),
+    ]
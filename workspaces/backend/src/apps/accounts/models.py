@@ -1,6 +1,9 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
+from apps.common.search import build_search_vector_field
+
 from .fields import EncryptedTextField
 from .security import hash_sensitive_value
 from .validators import normalize_digits, normalize_phone_digits
@@ -244,9 +247,14 @@ class UserProfile(TimeStampedModel):
     email_verification_last_client_base_url = models.URLField(blank=True, default="")
     notes = models.TextField(blank=True)
     extra_data = models.JSONField(default=dict, blank=True)
+    # Nomes do cliente para a busca de pedidos no admin.
+    search_vector = build_search_vector_field(("A", ["full_name", "preferred_name"]))
 
     class Meta:
         ordering = ["user_id"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="accounts_profile_search_gin"),
+        ]
 
     def __str__(self) -> str:
         return f"profile:{self.user_id}"
@@ -1,7 +1,7 @@
 from django.db.models import QuerySet
 
 from .models import Role, UserRole, UserTask, UserTaskCategory
-from .services import ensure_default_roles, ensure_default_task_catalog
+from .services import ensure_default_roles, ensure_default_task_catalog_once
 
 
 def list_roles() -> QuerySet[Role]:
@@ -14,12 +14,12 @@ def list_user_roles(*, user_id: int) -> QuerySet[UserRole]:
 
 
 def list_task_categories() -> QuerySet[UserTaskCategory]:
-    ensure_default_task_catalog()
+    ensure_default_task_catalog_once()
     return UserTaskCategory.objects.order_by("code").prefetch_related("tasks")
 
 
 def list_tasks() -> QuerySet[UserTask]:
-    ensure_default_task_catalog()
+    ensure_default_task_catalog_once()
     return UserTask.objects.order_by("category__code", "code").select_related(
         "category"
     )
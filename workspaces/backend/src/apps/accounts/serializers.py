@@ -5,8 +5,14 @@ from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework_simplejwt.exceptions import AuthenticationFailed
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
+from .authentication import apply_role_claims, role_claims_enabled
 from .customer_services import (
     apply_customer_consents,
     ensure_customer_governance_profile,
@@ -288,6 +294,14 @@ class RegisterSerializer(serializers.Serializer):
 
 
 class TokenObtainPairEmailVerifiedSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        if role_claims_enabled():
+            # Copiadas para o access token derivado deste refresh.
+            apply_role_claims(token, user)
+        return token
+
     def validate(self, attrs):
         data = super().validate(attrs)
         user = self.user
@@ -327,6 +341,28 @@ class TokenObtainPairEmailVerifiedSerializer(TokenObtainPairSerializer):
         )
 
 
+class TokenRefreshRoleClaimsSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if not role_claims_enabled():
+            return data
+
+        # O access novo herdaria as claims do refresh; atualiza com a versao
+        # de permissoes vigente.
+        access = AccessToken(data["access"])
+        user = (
+            get_user_model()
+            .objects.filter(
+                **{api_settings.USER_ID_FIELD: access[api_settings.USER_ID_CLAIM]}
+            )
+            .first()
+        )
+        if user is not None:
+            apply_role_claims(access, user)
+            data["access"] = str(access)
+        return data
+
+
 class AssignRolesSerializer(serializers.Serializer):
     role_codes = serializers.ListField(
         child=serializers.ChoiceField(choices=SystemRole.ALL),
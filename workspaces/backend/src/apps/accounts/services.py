@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import hashlib
 import secrets
+import threading
 from datetime import timedelta
 from html import escape
 from urllib.parse import quote, urlparse, urlunparse
@@ -11,8 +12,16 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.mail import EmailMultiAlternatives
 from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 
+from apps.common.cache import (
+    cache_key,
+    get_cache,
+    get_cache_tag_versions,
+    invalidate_cache_tags,
+)
+
 from .models import (
     Role,
     UserAdminModulePermission,
@@ -235,6 +244,11 @@ DEFAULT_TASK_METADATA = {
     },
 }
 
+RBAC_CATALOG_CACHE_TAG = "rbac-catalog"
+RBAC_USER_CACHE_TAG_PREFIX = "rbac-user"
+_TASK_CATALOG_SEED_LOCK = threading.Lock()
+_task_catalog_seeded = False
+
 DEFAULT_CLIENT_BASE_URL = "http://127.0.0.1:3001"
 EMAIL_VERIFICATION_TOKEN_TTL_HOURS = 3
 
@@ -806,6 +820,28 @@ def ensure_default_task_catalog() -> (
     return categories, tasks
 
 
+def ensure_default_task_catalog_once() -> None:
+    """Semeia o catalogo de tarefas uma vez por processo.
+
+    O post_migrate ja semeia o catalogo; aqui fica apenas a garantia para
+    processos que sobem sem migrate (ex.: workers).
+    """
+    global _task_catalog_seeded
+    if _task_catalog_seeded:
+        return
+    with _TASK_CATALOG_SEED_LOCK:
+        if not _task_catalog_seeded:
+            ensure_default_task_catalog()
+            _task_catalog_seeded = True
+
+
+def seed_default_access_catalog(**kwargs) -> None:
+    global _task_catalog_seeded
+    ensure_default_roles()
+    ensure_default_task_catalog()
+    _task_catalog_seeded = True
+
+
 @transaction.atomic
 def assign_roles_to_user(
     *,
@@ -834,8 +870,7 @@ def assign_roles_to_user(
     for code in normalized_codes:
         UserRole.objects.get_or_create(user=user, role=roles[code])
 
-    if hasattr(user, "_rbac_role_codes"):
-        delattr(user, "_rbac_role_codes")
+    _clear_user_permission_cache(user)
 
     return normalized_codes
 
@@ -882,14 +917,99 @@ def assign_tasks_to_user(
                 defaults={"assigned_by": assigned_by},
             )
 
-    if hasattr(user, "_rbac_task_codes"):
-        delattr(user, "_rbac_task_codes")
-    if hasattr(user, "_rbac_task_category_codes"):
-        delattr(user, "_rbac_task_category_codes")
+    _clear_user_permission_cache(user)
 
     return normalized_codes
 
 
+def _build_user_permission_bundle(user) -> dict:
+    role_codes = sorted(
+        UserRole.objects.filter(user=user, role__is_active=True).values_list(
+            "role__code", flat=True
+        )
+    )
+    task_rows = list(
+        UserTaskAssignment.objects.filter(user=user, task__is_active=True).values_list(
+            "task__code", "task__category__code"
+        )
+    )
+    explicit_permissions = list(
+        UserAdminModulePermission.objects.filter(user=user).values(
+            "module_slug",
+            "access_level",
+        )
+    )
+    return {
+        "roles": role_codes,
+        "tasks": sorted({task_code for task_code, _ in task_rows}),
+        "task_categories": sorted({category for _, category in task_rows}),
+        "modules": _resolve_admin_module_access_map(
+            user,
+            role_codes=set(role_codes),
+            explicit_permissions=explicit_permissions,
+        ),
+    }
+
+
+def _permission_cache_tag(user_id: int) -> str:
+    return f"{RBAC_USER_CACHE_TAG_PREFIX}:{user_id}"
+
+
+def get_user_permission_version(user) -> str:
+    """Impressao digital das permissoes do usuario (muda a cada alteracao)."""
+    versions = get_cache_tag_versions(
+        [RBAC_CATALOG_CACHE_TAG, _permission_cache_tag(user.pk)]
+    )
+    digest = hashlib.sha256(
+        "|".join(
+            [
+                versions[RBAC_CATALOG_CACHE_TAG],
+                versions[_permission_cache_tag(user.pk)],
+                f"staff={int(bool(getattr(user, 'is_staff', False)))}",
+            ]
+        ).encode("utf-8")
+    ).hexdigest()
+    return digest[:16]
+
+
+def get_user_permission_bundle(user) -> dict:
+    """Papeis, tarefas e acesso a modulos do usuario em um unico pacote.
+
+    O pacote fica no objeto do usuario (escopo da requisicao) e no cache
+    compartilhado, sob a versao de permissoes do usuario.
+    """
+    cached_bundle = getattr(user, "_rbac_bundle", None)
+    if cached_bundle is not None:
+        return cached_bundle
+
+    version = get_user_permission_version(user)
+    key = cache_key("rbac-bundle", user.pk, version)
+    backend = get_cache()
+    bundle = backend.get(key)
+    if bundle is None:
+        bundle = _build_user_permission_bundle(user)
+        backend.set(
+            key,
+            bundle,
+            timeout=settings.RBAC_PERMISSION_CACHE_TIMEOUT_SECONDS,
+        )
+    bundle = {**bundle, "version": version}
+    user._rbac_bundle = bundle
+    return bundle
+
+
+def bump_user_permission_version(user_id: int) -> None:
+    invalidate_cache_tags(_permission_cache_tag(user_id))
+
+
+def _clear_user_permission_cache(user) -> None:
+    for attribute in ("_rbac_bundle", "_rbac_claim_roles"):
+        if hasattr(user, attribute):
+            delattr(user, attribute)
+    bump_user_permission_version(user.pk)
+    transaction.on_commit(lambda: bump_user_permission_version(user.pk))
+
+
 def get_user_role_codes(user) -> set[str]:
     if not user or not getattr(user, "is_authenticated", False):
         return set()
@@ -897,53 +1017,26 @@ def get_user_role_codes(user) -> set[str]:
     if getattr(user, "is_superuser", False):
         return {SystemRole.ADMIN}
 
-    cached_codes = getattr(user, "_rbac_role_codes", None)
-    if cached_codes is not None:
-        return cached_codes
+    # Papeis vindos de claims do JWT ja validados contra a versao atual.
+    claim_roles = getattr(user, "_rbac_claim_roles", None)
+    if claim_roles is not None:
+        return set(claim_roles)
 
-    role_codes = set(
-        UserRole.objects.filter(user=user, role__is_active=True).values_list(
-            "role__code", flat=True
-        )
-    )
-    user._rbac_role_codes = role_codes
-    return role_codes
+    return set(get_user_permission_bundle(user)["roles"])
 
 
 def get_user_task_codes(user) -> set[str]:
     if not user or not getattr(user, "is_authenticated", False):
         return set()
 
-    cached_codes = getattr(user, "_rbac_task_codes", None)
-    if cached_codes is not None:
-        return cached_codes
-
-    ensure_default_task_catalog()
-    task_codes = set(
-        UserTaskAssignment.objects.filter(user=user, task__is_active=True).values_list(
-            "task__code", flat=True
-        )
-    )
-    user._rbac_task_codes = task_codes
-    return task_codes
+    return set(get_user_permission_bundle(user)["tasks"])
 
 
 def get_user_task_category_codes(user) -> set[str]:
     if not user or not getattr(user, "is_authenticated", False):
         return set()
 
-    cached_codes = getattr(user, "_rbac_task_category_codes", None)
-    if cached_codes is not None:
-        return cached_codes
-
-    ensure_default_task_catalog()
-    category_codes = set(
-        UserTaskAssignment.objects.filter(user=user, task__is_active=True).values_list(
-            "task__category__code", flat=True
-        )
-    )
-    user._rbac_task_category_codes = category_codes
-    return category_codes
+    return set(get_user_permission_bundle(user)["task_categories"])
 
 
 def get_allowed_admin_module_slugs(user) -> list[str]:
@@ -960,24 +1053,15 @@ def _has_base_technical_admin_access(user) -> bool:
     return SystemRole.ADMIN in get_user_role_codes(user)
 
 
-def get_user_admin_module_access_map(user) -> dict[str, str]:
-    if not user or not getattr(user, "is_authenticated", False):
-        return {}
-
-    cached = getattr(user, "_rbac_admin_module_access_map", None)
-    if isinstance(cached, dict):
-        return cached
-
-    if _has_base_technical_admin_access(user):
-        full_access = {module_slug: "write" for module_slug in ADMIN_WEB_MODULE_SLUGS}
-        user._rbac_admin_module_access_map = full_access
-        return full_access
+def _resolve_admin_module_access_map(
+    user,
+    *,
+    role_codes: set[str],
+    explicit_permissions: list[dict],
+) -> dict[str, str]:
+    if getattr(user, "is_staff", False) or SystemRole.ADMIN in role_codes:
+        return {module_slug: "write" for module_slug in ADMIN_WEB_MODULE_SLUGS}
 
-    explicit_permissions_qs = UserAdminModulePermission.objects.filter(user=user).values(
-        "module_slug",
-        "access_level",
-    )
-    explicit_permissions = list(explicit_permissions_qs)
     if explicit_permissions:
         explicit_access: dict[str, str] = {}
         for permission in explicit_permissions:
@@ -988,21 +1072,27 @@ def get_user_admin_module_access_map(user) -> dict[str, str]:
             if module_slug in TECHNICAL_ADMIN_MODULE_SLUGS:
                 continue
             explicit_access[module_slug] = "write" if access_level == "write" else "read"
-        user._rbac_admin_module_access_map = explicit_access
         return explicit_access
 
-    role_codes = get_user_role_codes(user)
     role_access_map: dict[str, str] = {}
     for role_code in role_codes:
         for module_slug in ROLE_ADMIN_MODULE_ACCESS.get(role_code, set()):
             if module_slug in TECHNICAL_ADMIN_MODULE_SLUGS:
                 continue
             role_access_map[module_slug] = "write"
-
-    user._rbac_admin_module_access_map = role_access_map
     return role_access_map
 
 
+def get_user_admin_module_access_map(user) -> dict[str, str]:
+    if not user or not getattr(user, "is_authenticated", False):
+        return {}
+
+    if getattr(user, "is_superuser", False):
+        return {module_slug: "write" for module_slug in ADMIN_WEB_MODULE_SLUGS}
+
+    return dict(get_user_permission_bundle(user)["modules"])
+
+
 def get_user_admin_module_permissions(user) -> list[dict[str, str]]:
     access_map = get_user_admin_module_access_map(user)
     return [
@@ -1076,12 +1166,56 @@ def assign_admin_modules_to_user(
             module_slug__in=keep_modules
         ).delete()
 
-    if hasattr(user, "_rbac_admin_module_access_map"):
-        delattr(user, "_rbac_admin_module_access_map")
+    _clear_user_permission_cache(user)
 
     return get_user_admin_module_access_map(user)
 
 
+def _handle_user_permission_change(sender, instance, **kwargs) -> None:
+    user_id = instance.user_id
+    bump_user_permission_version(user_id)
+    transaction.on_commit(lambda: bump_user_permission_version(user_id))
+
+
+def _bump_permission_catalog_version() -> None:
+    invalidate_cache_tags(RBAC_CATALOG_CACHE_TAG)
+
+
+def _handle_permission_catalog_change(sender, **kwargs) -> None:
+    # Ativar/desativar papel ou tarefa muda o pacote de todos os usuarios.
+    _bump_permission_catalog_version()
+    transaction.on_commit(_bump_permission_catalog_version)
+
+
+def register_permission_cache_signals() -> None:
+    for models_group, handler, scope in (
+        (
+            (UserRole, UserTaskAssignment, UserAdminModulePermission),
+            _handle_user_permission_change,
+            "user",
+        ),
+        (
+            (Role, UserTask, UserTaskCategory),
+            _handle_permission_catalog_change,
+            "catalog",
+        ),
+    ):
+        for model in models_group:
+            for signal_name, model_signal in (
+                ("save", post_save),
+                ("delete", post_delete),
+            ):
+                model_signal.connect(
+                    handler,
+                    sender=model,
+                    weak=False,
+                    dispatch_uid=(
+                        f"mrq-rbac-{scope}-version:{signal_name}:"
+                        f"{model._meta.label_lower}"
+                    ),
+                )
+
+
 def user_can_access_technical_admin(user) -> bool:
     return _has_base_technical_admin_access(user)
 
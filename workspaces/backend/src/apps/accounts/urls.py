@@ -1,6 +1,5 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
 
 from .customer_views import (
     CustomerAdminViewSet,
@@ -18,6 +17,7 @@ from .views import (
     RegisterAPIView,
     RoleViewSet,
     TokenObtainPairEmailVerifiedView,
+    TokenRefreshRoleClaimsView,
     UserAdminViewSet,
     UserRoleAssignmentAPIView,
     UserTaskAssignmentAPIView,
@@ -58,7 +58,11 @@ urlpatterns = [
         name="accounts-email-verification-resend",
     ),
     path("token/", TokenObtainPairEmailVerifiedView.as_view(), name="accounts-token"),
-    path("token/refresh/", TokenRefreshView.as_view(), name="accounts-token-refresh"),
+    path(
+        "token/refresh/",
+        TokenRefreshRoleClaimsView.as_view(),
+        name="accounts-token-refresh",
+    ),
     path("me/", MeAPIView.as_view(), name="accounts-me"),
     path("me/profile/", MeProfileAPIView.as_view(), name="accounts-me-profile"),
     path(
@@ -8,7 +8,7 @@ from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from .address_lookup import (
     CepLookupNotFoundError,
@@ -36,6 +36,7 @@ from .serializers import (
     RegisterSerializer,
     RoleSerializer,
     TokenObtainPairEmailVerifiedSerializer,
+    TokenRefreshRoleClaimsSerializer,
     UserAdminSerializer,
     UserProfileSerializer,
     UserTaskCategorySerializer,
@@ -99,6 +100,10 @@ class TokenObtainPairEmailVerifiedView(TokenObtainPairView):
     serializer_class = TokenObtainPairEmailVerifiedSerializer
 
 
+class TokenRefreshRoleClaimsView(TokenRefreshView):
+    serializer_class = TokenRefreshRoleClaimsSerializer
+
+
 class MeAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -157,6 +162,7 @@ class ProfileMediaAccessAPIView(APIView):
                     token=token,
                 )
                 return build_profile_media_response(
+                    request=request,
                     profile=resolved.profile,
                     field_name=resolved.field_name,
                 )
@@ -177,7 +183,11 @@ class ProfileMediaAccessAPIView(APIView):
             )
 
         try:
-            return build_profile_media_response(profile=profile, field_name=field_name)
+            return build_profile_media_response(
+                request=request,
+                profile=profile,
+                field_name=field_name,
+            )
         except DjangoValidationError as exc:
             raise DRFValidationError(exc.messages) from exc
 
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AdminAuditConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.admin_audit"
+
+    def ready(self):
+        from apps.admin_audit.rollups import register_admin_audit_rollup_signals
+
+        register_admin_audit_rollup_signals()
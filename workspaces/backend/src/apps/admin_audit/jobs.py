@@ -0,0 +1,13 @@
+from django.utils.dateparse import parse_datetime
+
+from apps.jobs.services import register_job_handler
+
+from .rollups import REFRESH_ADMIN_ACTIVITY_ROLLUPS_JOB, refresh_admin_activity_rollups
+
+
+@register_job_handler(REFRESH_ADMIN_ACTIVITY_ROLLUPS_JOB)
+def refresh_admin_activity_rollups_job(payload: dict) -> dict:
+    refreshed = refresh_admin_activity_rollups(
+        parse_datetime(hour) for hour in payload.get("hours", [])
+    )
+    return {"refreshed_rollups": refreshed}
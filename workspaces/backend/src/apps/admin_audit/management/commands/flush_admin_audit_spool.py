@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.admin_audit.writer import get_admin_audit_writer
+
+
+class Command(BaseCommand):
+    help = (
+        "Grava no banco os segmentos pendentes do spool de auditoria admin "
+        "(inclusive os deixados por processos encerrados)."
+    )
+
+    def handle(self, *args, **options):
+        writer = get_admin_audit_writer()
+        written_count = writer.flush()
+        metrics = writer.get_metrics()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Flush concluido com sucesso. "
+                f"Registros gravados: {written_count}. "
+                f"Segmentos recuperados: {metrics['recovered_segments']}. "
+                f"Falhas: {metrics['flush_failures']}."
+            )
+        )
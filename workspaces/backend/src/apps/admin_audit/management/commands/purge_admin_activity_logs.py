@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.admin_audit.services import purge_admin_activity_logs
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove logs brutos de auditoria admin fora da retencao "
+        "(os rollups horarios sao mantidos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.ADMIN_AUDIT_RETENTION_DAYS,
+            help="Quantidade de dias para retencao dos logs brutos.",
+        )
+
+    def handle(self, *args, **options):
+        retention_days = options["days"]
+        if retention_days <= 0:
+            raise CommandError("--days deve ser maior que zero.")
+
+        deleted_count = purge_admin_activity_logs(older_than_days=retention_days)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Remocao concluida com sucesso. "
+                f"Registros removidos: {deleted_count}."
+            )
+        )
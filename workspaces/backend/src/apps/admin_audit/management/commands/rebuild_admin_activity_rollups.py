@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from apps.admin_audit.rollups import rebuild_admin_activity_rollups
+from apps.common.reports import parse_optional_period
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula os rollups horarios de auditoria admin a partir do log bruto "
+        "(horas ja removidas pela retencao nao sao alteradas)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="from_date",
+            help="Data inicial (YYYY-MM-DD). Sem valor, recalcula desde o inicio.",
+        )
+        parser.add_argument(
+            "--to",
+            dest="to_date",
+            help="Data final (YYYY-MM-DD). Sem valor, recalcula ate o fim.",
+        )
+
+    def handle(self, *args, **options):
+        from_date, to_date = parse_optional_period(
+            from_raw=options["from_date"],
+            to_raw=options["to_date"],
+        )
+
+        hours_count = rebuild_admin_activity_rollups(
+            from_date=from_date,
+            to_date=to_date,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rollups recalculados com sucesso. Horas processadas: {hours_count}."
+            )
+        )
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import ipaddress
 import json
 import time
+import uuid
 from typing import Any
 from urllib.parse import urlparse
 
 from django.db.utils import DatabaseError, OperationalError, ProgrammingError
+from django.utils import timezone
 
-from .models import AdminActivityLog
+from apps.accounts.services import SystemRole, user_has_any_role
+
+from .writer import submit_admin_activity_log
 
 SENSITIVE_KEYS = {
     "password",
@@ -74,35 +79,40 @@ class AdminActivityLogMiddleware:
         actor_username = ""
         actor_is_staff = False
         actor_is_superuser = False
-        actor = None
+        actor_id = None
         if user and getattr(user, "is_authenticated", False):
-            actor = user
+            actor_id = user.pk
             actor_username = str(getattr(user, "username", "") or "").strip()
             actor_is_staff = bool(getattr(user, "is_staff", False))
             actor_is_superuser = bool(getattr(user, "is_superuser", False))
 
-        AdminActivityLog.objects.create(
-            actor=actor,
-            actor_username=actor_username,
-            actor_is_staff=actor_is_staff,
-            actor_is_superuser=actor_is_superuser,
-            channel=channel,
-            method=method,
-            path=path[:255],
-            query_string=query_string,
-            action_group=action_group,
-            resource=resource,
-            http_status=status_code,
-            is_success=200 <= status_code < 400,
-            duration_ms=duration_ms,
-            ip_address=_extract_client_ip(request),
-            origin=str(request.headers.get("Origin", "") or "")[:255],
-            referer=str(request.headers.get("Referer", "") or "")[:2000],
-            user_agent=str(request.headers.get("User-Agent", "") or "")[:512],
-            metadata={
-                "query_params": query_params,
-                "request_payload": payload_summary,
-            },
+        # Registro serializavel: vai para o spool e e gravado em lote.
+        submit_admin_activity_log(
+            {
+                "request_id": str(uuid.uuid4()),
+                "created_at": timezone.now().isoformat(),
+                "actor_id": actor_id,
+                "actor_username": actor_username,
+                "actor_is_staff": actor_is_staff,
+                "actor_is_superuser": actor_is_superuser,
+                "channel": channel,
+                "method": method,
+                "path": path[:255],
+                "query_string": query_string,
+                "action_group": action_group,
+                "resource": resource,
+                "http_status": status_code,
+                "is_success": 200 <= status_code < 400,
+                "duration_ms": duration_ms,
+                "ip_address": _extract_client_ip(request),
+                "origin": str(request.headers.get("Origin", "") or "")[:255],
+                "referer": str(request.headers.get("Referer", "") or "")[:2000],
+                "user_agent": str(request.headers.get("User-Agent", "") or "")[:512],
+                "metadata": {
+                    "query_params": query_params,
+                    "request_payload": payload_summary,
+                },
+            }
         )
 
 
@@ -233,10 +243,8 @@ def _is_admin_actor(user) -> bool:
         return True
 
     try:
-        user_roles = getattr(user, "user_roles", None)
-        if user_roles is None:
-            return False
-        return user_roles.filter(role__code="ADMIN", role__is_active=True).exists()
+        # Usa o pacote RBAC em cache/claims, sem consulta extra por request.
+        return user_has_any_role(user, [SystemRole.ADMIN])
     except Exception:
         return False
 
@@ -292,15 +300,23 @@ def _resolve_action(path: str) -> tuple[str, str]:
     return action_group[:64], resource[:128]
 
 
+def _normalize_ip(value: str) -> str | None:
+    try:
+        return str(ipaddress.ip_address(value.strip()))
+    except ValueError:
+        return None
+
+
 def _extract_client_ip(request) -> str | None:
+    # X-Forwarded-For vem do cliente: valor invalido cai para REMOTE_ADDR.
     forwarded_for = str(request.META.get("HTTP_X_FORWARDED_FOR", "") or "").strip()
     if forwarded_for:
-        first = forwarded_for.split(",", maxsplit=1)[0].strip()
+        first = _normalize_ip(forwarded_for.split(",", maxsplit=1)[0])
         if first:
             return first
 
     remote_addr = str(request.META.get("REMOTE_ADDR", "") or "").strip()
     if remote_addr:
-        return remote_addr
+        return _normalize_ip(remote_addr)
 
     return None
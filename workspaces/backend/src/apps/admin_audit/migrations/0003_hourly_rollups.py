@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admin_audit", "0002_batched_writer_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AdminActivityHourlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField(db_index=True)),
+                ("channel", models.CharField(default="unknown", max_length=32)),
+                ("method", models.CharField(max_length=8)),
+                (
+                    "action_group",
+                    models.CharField(blank=True, default="", max_length=64),
+                ),
+                (
+                    "actor_username",
+                    models.CharField(blank=True, default="", max_length=150),
+                ),
+                ("events", models.PositiveIntegerField(default=0)),
+                ("success_count", models.PositiveIntegerField(default=0)),
+                ("client_error_count", models.PositiveIntegerField(default=0)),
+                ("server_error_count", models.PositiveIntegerField(default=0)),
+                ("unauthorized_count", models.PositiveIntegerField(default=0)),
+                ("forbidden_count", models.PositiveIntegerField(default=0)),
+                ("duration_sum_ms", models.BigIntegerField(default=0)),
+                ("duration_max_ms", models.PositiveIntegerField(default=0)),
+                ("duration_le_10ms", models.PositiveIntegerField(default=0)),
+                ("duration_le_25ms", models.PositiveIntegerField(default=0)),
+                ("duration_le_50ms", models.PositiveIntegerField(default=0)),
+                ("duration_le_100ms", models.PositiveIntegerField(default=0)),
+                ("duration_le_250ms", models.PositiveIntegerField(default=0)),
+                ("duration_le_500ms", models.PositiveIntegerField(default=0)),
+                ("duration_le_1000ms", models.PositiveIntegerField(default=0)),
+                ("duration_le_2500ms", models.PositiveIntegerField(default=0)),
+                ("duration_le_5000ms", models.PositiveIntegerField(default=0)),
+                ("duration_le_10000ms", models.PositiveIntegerField(default=0)),
+                ("duration_gt_10000ms", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": [
+                    "-hour",
+                    "channel",
+                    "method",
+                    "action_group",
+                    "actor_username",
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=(
+                            "hour",
+                            "channel",
+                            "method",
+                            "action_group",
+                            "actor_username",
+                        ),
+                        name="admin_audit_hourly_rollup_unique",
+                    )
+                ],
+            },
+        ),
+    ]
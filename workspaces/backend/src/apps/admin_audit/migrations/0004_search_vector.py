@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:36
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admin_audit", "0003_hourly_rollups"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="adminactivitylog",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.SearchVector(
+                            models.Func(
+                                models.F("path"),
+                                models.Value("/_-.@:"),
+                                models.Value("      "),
+                                function="translate",
+                            ),
+                            "actor_username",
+                            config="simple",
+                            weight="A",
+                        ),
+                        "||",
+                        django.contrib.postgres.search.SearchVector(
+                            models.Func(
+                                models.F("action_group"),
+                                models.Value("/_-.@:"),
+                                models.Value("      "),
+                                function="translate",
+                            ),
+                            models.Func(
+                                models.F("resource"),
+                                models.Value("/_-.@:"),
+                                models.Value("      "),
+                                function="translate",
+                            ),
+                            config="simple",
+                            weight="B",
+                        ),
+                        django.contrib.postgres.search.SearchConfig("simple"),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        django.db.models.functions.comparison.Cast(
+                            "metadata", models.TextField()
+                        ),
+                        config="simple",
+                        weight="D",
+                    ),
+                    django.contrib.postgres.search.SearchConfig("simple"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="adminactivitylog",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="admin_audit_search_gin"
+            ),
+        ),
+    ]
@@ -3,11 +3,16 @@ from __future__ import annotations
 import uuid
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from apps.common.search import build_search_vector_field, searchable_text
 
 
 class AdminActivityLog(models.Model):
-    request_id = models.UUIDField(default=uuid.uuid4, editable=False, db_index=True)
+    request_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     actor = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -40,11 +45,18 @@ class AdminActivityLog(models.Model):
     user_agent = models.CharField(max_length=512, blank=True, default="")
 
     metadata = models.JSONField(default=dict, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Horario do request (o writer em lote grava depois e preserva o valor).
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    search_vector = build_search_vector_field(
+        ("A", [searchable_text("path"), "actor_username"]),
+        ("B", [searchable_text("action_group"), searchable_text("resource")]),
+        ("D", [Cast("metadata", models.TextField())]),
+    )
 
     class Meta:
         ordering = ["-created_at", "-id"]
         indexes = [
+            GinIndex(fields=["search_vector"], name="admin_audit_search_gin"),
             models.Index(fields=["-created_at", "id"], name="admin_audit_created_idx"),
             models.Index(fields=["actor", "-created_at"], name="admin_audit_actor_idx"),
             models.Index(
@@ -64,3 +76,60 @@ class AdminActivityLog(models.Model):
             f"[{self.created_at.isoformat()}] {actor} "
             f"{self.method} {self.path} ({self.http_status})"
         )
+
+
+# Limites superiores (ms) do histograma de duracao dos rollups; o ultimo
+# bucket acumula o que passar do maior limite.
+DURATION_BUCKET_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+DURATION_BUCKET_FIELDS = (
+    *(f"duration_le_{bound}ms" for bound in DURATION_BUCKET_BOUNDS_MS),
+    f"duration_gt_{DURATION_BUCKET_BOUNDS_MS[-1]}ms",
+)
+
+
+class AdminActivityHourlyRollup(models.Model):
+    # Totais por hora recalculados a partir do log bruto a cada gravacao; o
+    # histograma de duracao permite estimar p50/p95/p99 somando horas.
+    hour = models.DateTimeField(db_index=True)
+    channel = models.CharField(max_length=32, default="unknown")
+    method = models.CharField(max_length=8)
+    action_group = models.CharField(max_length=64, blank=True, default="")
+    actor_username = models.CharField(max_length=150, blank=True, default="")
+
+    events = models.PositiveIntegerField(default=0)
+    success_count = models.PositiveIntegerField(default=0)
+    client_error_count = models.PositiveIntegerField(default=0)
+    server_error_count = models.PositiveIntegerField(default=0)
+    unauthorized_count = models.PositiveIntegerField(default=0)
+    forbidden_count = models.PositiveIntegerField(default=0)
+    duration_sum_ms = models.BigIntegerField(default=0)
+    duration_max_ms = models.PositiveIntegerField(default=0)
+
+    duration_le_10ms = models.PositiveIntegerField(default=0)
+    duration_le_25ms = models.PositiveIntegerField(default=0)
+    duration_le_50ms = models.PositiveIntegerField(default=0)
+    duration_le_100ms = models.PositiveIntegerField(default=0)
+    duration_le_250ms = models.PositiveIntegerField(default=0)
+    duration_le_500ms = models.PositiveIntegerField(default=0)
+    duration_le_1000ms = models.PositiveIntegerField(default=0)
+    duration_le_2500ms = models.PositiveIntegerField(default=0)
+    duration_le_5000ms = models.PositiveIntegerField(default=0)
+    duration_le_10000ms = models.PositiveIntegerField(default=0)
+    duration_gt_10000ms = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-hour", "channel", "method", "action_group", "actor_username"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hour", "channel", "method", "action_group", "actor_username"],
+                name="admin_audit_hourly_rollup_unique",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"AuditRollup-{self.hour:%Y-%m-%d %H:00} {self.method} "
+            f"{self.channel} ({self.events})"
+        )
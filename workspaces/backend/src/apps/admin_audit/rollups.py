@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Aggregate, Count, FloatField, Max, Q, Sum
+from django.db.models.functions import TruncHour
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from apps.jobs.services import enqueue
+
+from .models import (
+    DURATION_BUCKET_BOUNDS_MS,
+    DURATION_BUCKET_FIELDS,
+    AdminActivityHourlyRollup,
+    AdminActivityLog,
+)
+
+REFRESH_ADMIN_ACTIVITY_ROLLUPS_JOB = "admin_audit.refresh_hourly_rollups"
+# Primeira chave do pg_advisory_xact_lock(int, int); a segunda e a hora.
+_ROLLUP_LOCK_NAMESPACE = 0x41445254
+ROLLUP_DIMENSIONS = ("channel", "method", "action_group", "actor_username")
+ROLLUP_COUNTER_FIELDS = (
+    "events",
+    "success_count",
+    "client_error_count",
+    "server_error_count",
+    "unauthorized_count",
+    "forbidden_count",
+    "duration_sum_ms",
+    *DURATION_BUCKET_FIELDS,
+)
+
+
+class PercentileCont(Aggregate):
+    """`percentile_cont(p) WITHIN GROUP (ORDER BY expr)` do PostgreSQL."""
+
+    function = "PERCENTILE_CONT"
+    name = "PercentileCont"
+    template = "%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, percentile: float, **extra):
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+
+def _duration_bucket_aggregates() -> dict:
+    aggregates = {}
+    lower_bound = None
+    for field_name, upper_bound in zip(
+        DURATION_BUCKET_FIELDS,
+        (*DURATION_BUCKET_BOUNDS_MS, None),
+        strict=True,
+    ):
+        condition = Q()
+        if lower_bound is not None:
+            condition &= Q(duration_ms__gt=lower_bound)
+        if upper_bound is not None:
+            condition &= Q(duration_ms__lte=upper_bound)
+        aggregates[field_name] = Count("id", filter=condition)
+        lower_bound = upper_bound
+    return aggregates
+
+
+def truncate_to_hour(value: datetime) -> datetime:
+    return timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+
+
+def get_raw_log_retention_cutoff(retention_days: int | None = None) -> datetime:
+    """Primeira hora ainda mantida no log bruto (antes dela, so rollups)."""
+    if retention_days is None:
+        retention_days = settings.ADMIN_AUDIT_RETENTION_DAYS
+    return truncate_to_hour(timezone.now() - timedelta(days=retention_days))
+
+
+def _lock_rollup_hours(hours: list[datetime]) -> None:
+    # Ordem fixa das horas evita deadlock entre flushers concorrentes.
+    with connection.cursor() as cursor:
+        for hour in hours:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, %s)",
+                [_ROLLUP_LOCK_NAMESPACE, int(hour.timestamp()) // 3600],
+            )
+
+
+def estimate_duration_percentile(
+    histogram: list[int],
+    percentile: float,
+    *,
+    max_duration_ms: int,
+) -> float:
+    """Estima o percentil interpolando dentro do bucket do histograma."""
+    total = sum(histogram)
+    if not total:
+        return 0.0
+
+    target_rank = percentile * total
+    cumulative = 0
+    lower_bound = 0
+    upper_bounds = (*DURATION_BUCKET_BOUNDS_MS, max(max_duration_ms, 0))
+    for count, upper_bound in zip(histogram, upper_bounds, strict=True):
+        upper_bound = min(upper_bound, max_duration_ms)
+        if count and cumulative + count >= target_rank:
+            fraction = (target_rank - cumulative) / count
+            return round(lower_bound + (upper_bound - lower_bound) * fraction, 2)
+        cumulative += count
+        lower_bound = max(lower_bound, upper_bound)
+    return float(max_duration_ms)
+
+
+def refresh_admin_activity_rollups(hours: Iterable[datetime]) -> int:
+    """Recalcula, a partir do log bruto, os rollups das horas informadas.
+
+    Idempotente: reprocessar uma hora apenas reescreve suas linhas. Um lock
+    por hora serializa os recalculos e a leitura do log acontece ja com o
+    lock, entao o ultimo a gravar sempre parte do estado mais recente. Horas
+    anteriores a retencao do log bruto sao ignoradas para nao sobrescrever o
+    rollup preservado com um log incompleto (ex.: spool reprocessado tarde).
+    """
+    cutoff = get_raw_log_retention_cutoff()
+    unique_hours = sorted(
+        hour for hour in {truncate_to_hour(value) for value in hours} if hour >= cutoff
+    )
+    if not unique_hours:
+        return 0
+
+    window = Q()
+    for hour in unique_hours:
+        window |= Q(created_at__gte=hour, created_at__lt=hour + timedelta(hours=1))
+
+    with transaction.atomic():
+        _lock_rollup_hours(unique_hours)
+        rows = (
+            AdminActivityLog.objects.filter(window)
+            .annotate(hour=TruncHour("created_at"))
+            .values("hour", *ROLLUP_DIMENSIONS)
+            .annotate(
+                events=Count("id"),
+                success_count=Count(
+                    "id", filter=Q(http_status__gte=200, http_status__lt=400)
+                ),
+                client_error_count=Count(
+                    "id", filter=Q(http_status__gte=400, http_status__lt=500)
+                ),
+                server_error_count=Count("id", filter=Q(http_status__gte=500)),
+                unauthorized_count=Count("id", filter=Q(http_status=401)),
+                forbidden_count=Count("id", filter=Q(http_status=403)),
+                duration_sum_ms=Sum("duration_ms"),
+                duration_max_ms=Max("duration_ms"),
+                **_duration_bucket_aggregates(),
+            )
+            .order_by()
+        )
+        rollups = [
+            AdminActivityHourlyRollup(
+                hour=truncate_to_hour(row["hour"]),
+                **{dimension: row[dimension] for dimension in ROLLUP_DIMENSIONS},
+                **{field: row[field] or 0 for field in ROLLUP_COUNTER_FIELDS},
+                duration_max_ms=row["duration_max_ms"] or 0,
+            )
+            for row in rows
+        ]
+        current_keys = {
+            (rollup.hour, *(getattr(rollup, name) for name in ROLLUP_DIMENSIONS))
+            for rollup in rollups
+        }
+
+        stale_ids = [
+            row[0]
+            for row in AdminActivityHourlyRollup.objects.filter(
+                hour__in=unique_hours
+            ).values_list("id", "hour", *ROLLUP_DIMENSIONS)
+            if (truncate_to_hour(row[1]), *row[2:]) not in current_keys
+        ]
+        if stale_ids:
+            AdminActivityHourlyRollup.objects.filter(pk__in=stale_ids).delete()
+        AdminActivityHourlyRollup.objects.bulk_create(
+            rollups,
+            update_conflicts=True,
+            unique_fields=["hour", *ROLLUP_DIMENSIONS],
+            update_fields=[
+                *ROLLUP_COUNTER_FIELDS,
+                "duration_max_ms",
+                "updated_at",
+            ],
+        )
+    return len(rollups)
+
+
+def schedule_admin_activity_rollup_refresh(hours: Iterable[datetime]) -> None:
+    unique_hours = sorted({truncate_to_hour(hour) for hour in hours})
+    if unique_hours:
+        enqueue(
+            REFRESH_ADMIN_ACTIVITY_ROLLUPS_JOB,
+            {"hours": unique_hours},
+            queue="admin_audit",
+        )
+
+
+def rebuild_admin_activity_rollups(
+    *,
+    from_date=None,
+    to_date=None,
+) -> int:
+    """Recalcula os rollups de todas as horas com log bruto no periodo."""
+    queryset = AdminActivityLog.objects.all()
+    if from_date is not None:
+        queryset = queryset.filter(created_at__date__gte=from_date)
+    if to_date is not None:
+        queryset = queryset.filter(created_at__date__lte=to_date)
+
+    hours = list(
+        queryset.annotate(hour=TruncHour("created_at"))
+        .values_list("hour", flat=True)
+        .distinct()
+        .order_by("hour")
+    )
+    for index in range(0, len(hours), 24):
+        refresh_admin_activity_rollups(hours[index : index + 24])
+    return len(hours)
+
+
+def _handle_admin_activity_log_saved(sender, instance, **kwargs) -> None:
+    # Escritas em lote (writer, fora do request) chamam o refresh direto:
+    # bulk_create nao dispara sinais. Saves avulsos recalculam via job.
+    if kwargs.get("raw"):
+        return
+    schedule_admin_activity_rollup_refresh([instance.created_at])
+
+
+def register_admin_audit_rollup_signals() -> None:
+    post_save.connect(
+        _handle_admin_activity_log_saved,
+        sender=AdminActivityLog,
+        weak=False,
+        dispatch_uid="mrq-admin-audit-hourly-rollup:save",
+    )
@@ -1,21 +1,59 @@
 from __future__ import annotations
 
-import math
 from datetime import datetime, time, timedelta
 
-from django.db.models import Avg, Count, Q, QuerySet
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Q, QuerySet, Sum
 from django.db.models.functions import TruncHour
 from django.utils import timezone
 
-from .models import AdminActivityLog
+from apps.common.search import (
+    SEARCH_DEFAULT_LIMIT,
+    SearchCursor,
+    build_search_query,
+    paginate_ranked_search,
+    rank_search_results,
+)
+
+from .models import (
+    DURATION_BUCKET_FIELDS,
+    AdminActivityHourlyRollup,
+    AdminActivityLog,
+)
+from .rollups import (
+    ROLLUP_COUNTER_FIELDS,
+    PercentileCont,
+    estimate_duration_percentile,
+    truncate_to_hour,
+)
 
 
 def list_admin_activity_logs() -> QuerySet[AdminActivityLog]:
-    return AdminActivityLog.objects.select_related("actor").order_by(
-        "-created_at", "-id"
+    return (
+        AdminActivityLog.objects.select_related("actor")
+        .defer("search_vector")
+        .order_by("-created_at", "-id")
     )
 
 
+def search_admin_activity_logs(
+    *,
+    term: str,
+    cursor: SearchCursor | None = None,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+) -> tuple[list[AdminActivityLog], str | None]:
+    """Busca textual ranqueada (caminho, ator, acao, metadados) via GIN."""
+    query = build_search_query(term)
+    if query is None:
+        return [], None
+    queryset = rank_search_results(
+        list_admin_activity_logs(),
+        vector_field="search_vector",
+        query=query,
+    )
+    return paginate_ranked_search(queryset, cursor=cursor, limit=limit)
+
+
 def filter_admin_activity_logs(
     *,
     search: str = "",
@@ -28,14 +66,9 @@ def filter_admin_activity_logs(
 ) -> QuerySet[AdminActivityLog]:
     queryset = list_admin_activity_logs()
 
-    normalized_search = str(search or "").strip()
-    if normalized_search:
-        queryset = queryset.filter(
-            Q(actor_username__icontains=normalized_search)
-            | Q(path__icontains=normalized_search)
-            | Q(action_group__icontains=normalized_search)
-            | Q(resource__icontains=normalized_search)
-        )
+    search_query = build_search_query(search)
+    if search_query is not None:
+        queryset = queryset.filter(search_vector=search_query)
 
     normalized_actor = str(actor or "").strip()
     if normalized_actor:
@@ -99,14 +132,27 @@ def build_admin_activity_overview(
         date_from=date_from,
         date_to=date_to,
     )
+
+    # Sem filtros por linha (busca, ator, status) e com periodo em horas
+    # cheias, o painel sai dos rollups horarios.
+    rollup_window = _resolve_rollup_window(date_from=date_from, date_to=date_to)
+    has_row_filters = any(str(value or "").strip() for value in (search, actor, status))
+    if rollup_window is not None and not has_row_filters:
+        hour_from, hour_to = rollup_window
+        return summarize_admin_activity_rollups(
+            queryset=queryset,
+            channel=channel,
+            method=method,
+            hour_from=hour_from,
+            hour_to=hour_to,
+        )
     return summarize_admin_activity_logs(queryset=queryset)
 
 
 def summarize_admin_activity_logs(*, queryset: QuerySet[AdminActivityLog]) -> dict:
-    total_events = queryset.count()
     now = timezone.now()
-
     aggregated = queryset.aggregate(
+        events=Count("id"),
         success_count=Count(
             "id",
             filter=Q(http_status__gte=200, http_status__lt=400),
@@ -120,6 +166,10 @@ def summarize_admin_activity_logs(*, queryset: QuerySet[AdminActivityLog]) -> di
         forbidden_count=Count("id", filter=Q(http_status=403)),
         anonymous_count=Count("id", filter=Q(actor_username="")),
         avg_duration_ms=Avg("duration_ms"),
+        p50_duration_ms=PercentileCont("duration_ms", 0.5),
+        p95_duration_ms=PercentileCont("duration_ms", 0.95),
+        p99_duration_ms=PercentileCont("duration_ms", 0.99),
+        max_duration_ms=Max("duration_ms"),
         unique_actors=Count(
             "actor_username",
             distinct=True,
@@ -132,52 +182,7 @@ def summarize_admin_activity_logs(*, queryset: QuerySet[AdminActivityLog]) -> di
         ),
     )
 
-    durations = list(
-        queryset.order_by("duration_ms").values_list("duration_ms", flat=True)
-    )
-    p95_duration_ms = 0
-    max_duration_ms = 0
-    if durations:
-        max_duration_ms = int(durations[-1])
-        p95_index = max(
-            0,
-            min(
-                len(durations) - 1,
-                math.ceil(len(durations) * 0.95) - 1,
-            ),
-        )
-        p95_duration_ms = int(durations[p95_index])
-
-    by_method_rows = (
-        queryset.values("method")
-        .annotate(count=Count("id"))
-        .order_by("-count", "method")[:8]
-    )
-    by_channel_rows = (
-        queryset.values("channel")
-        .annotate(count=Count("id"))
-        .order_by("-count", "channel")[:8]
-    )
-    by_action_rows = (
-        queryset.exclude(action_group="")
-        .values("action_group")
-        .annotate(count=Count("id"))
-        .order_by("-count", "action_group")[:8]
-    )
-    top_actor_rows = (
-        queryset.exclude(actor_username="")
-        .values("actor_username")
-        .annotate(count=Count("id"))
-        .order_by("-count", "actor_username")[:10]
-    )
-    top_path_rows = (
-        queryset.values("path")
-        .annotate(count=Count("id"))
-        .order_by("-count", "path")[:10]
-    )
-
-    current_hour = timezone.localtime(now).replace(minute=0, second=0, microsecond=0)
-    start_hour = current_hour - timedelta(hours=23)
+    start_hour = _get_hourly_series_start(now)
     hourly_rows = (
         queryset.filter(created_at__gte=start_hour)
         .annotate(hour=TruncHour("created_at"))
@@ -186,39 +191,229 @@ def summarize_admin_activity_logs(*, queryset: QuerySet[AdminActivityLog]) -> di
             events=Count("id"),
             successes=Count("id", filter=Q(http_status__gte=200, http_status__lt=400)),
             errors=Count("id", filter=Q(http_status__gte=400)),
+            p95_duration_ms=PercentileCont("duration_ms", 0.95),
+        )
+        .order_by("hour")
+    )
+
+    return _build_overview_payload(
+        now=now,
+        source="raw",
+        aggregated=aggregated,
+        breakdowns={
+            "by_method": _count_top_keys(queryset, "method", Count("id"), limit=8),
+            "by_channel": _count_top_keys(queryset, "channel", Count("id"), limit=8),
+            "by_action_group": _count_top_keys(
+                queryset, "action_group", Count("id"), limit=8, skip_blank=True
+            ),
+            "top_actors": _count_top_keys(
+                queryset, "actor_username", Count("id"), limit=10, skip_blank=True
+            ),
+            "top_paths": _count_top_keys(queryset, "path", Count("id"), limit=10),
+        },
+        hourly_series=_build_hourly_series(start_hour, hourly_rows),
+        failed_events=_list_failed_events(queryset),
+    )
+
+
+def summarize_admin_activity_rollups(
+    *,
+    queryset: QuerySet[AdminActivityLog],
+    channel: str = "",
+    method: str = "",
+    hour_from: datetime | None = None,
+    hour_to: datetime | None = None,
+) -> dict:
+    """Resumo a partir de `AdminActivityHourlyRollup`.
+
+    Percentis sao estimados pelo histograma somado das horas. IPs unicos,
+    caminhos mais acessados e falhas recentes vem do log bruto (`queryset`),
+    limitado as ultimas `ADMIN_AUDIT_OVERVIEW_RAW_HOURS` horas do periodo
+    para o custo nao crescer com o tamanho do log.
+    """
+    now = timezone.now()
+    raw_until = now if hour_to is None else min(now, hour_to + timedelta(hours=1))
+    raw_since = raw_until - timedelta(hours=settings.ADMIN_AUDIT_OVERVIEW_RAW_HOURS)
+    if hour_from is not None:
+        raw_since = max(raw_since, hour_from)
+    detail_queryset = queryset.filter(created_at__gte=raw_since)
+    rollups = AdminActivityHourlyRollup.objects.all()
+    normalized_channel = str(channel or "").strip().lower()
+    if normalized_channel:
+        rollups = rollups.filter(channel=normalized_channel)
+    normalized_method = str(method or "").strip().upper()
+    if normalized_method:
+        rollups = rollups.filter(method=normalized_method)
+    if hour_from is not None:
+        rollups = rollups.filter(hour__gte=hour_from)
+    if hour_to is not None:
+        rollups = rollups.filter(hour__lte=hour_to)
+
+    # Aliases com prefixo: o ORM nao aceita alias igual ao nome do campo.
+    totals = rollups.aggregate(
+        **{f"total_{field}": Sum(field) for field in ROLLUP_COUNTER_FIELDS},
+        anonymous_count=Sum("events", filter=Q(actor_username="")),
+        max_duration_ms=Max("duration_max_ms"),
+        unique_actors=Count(
+            "actor_username",
+            distinct=True,
+            filter=~Q(actor_username=""),
+        ),
+    )
+    aggregated = {
+        **{field: totals[f"total_{field}"] for field in ROLLUP_COUNTER_FIELDS},
+        "anonymous_count": totals["anonymous_count"],
+        "max_duration_ms": totals["max_duration_ms"],
+        "unique_actors": totals["unique_actors"],
+    }
+    events = int(aggregated["events"] or 0)
+    max_duration_ms = int(aggregated["max_duration_ms"] or 0)
+    histogram = [int(aggregated[field] or 0) for field in DURATION_BUCKET_FIELDS]
+    aggregated.update(
+        {
+            "avg_duration_ms": (
+                int(aggregated["duration_sum_ms"] or 0) / events if events else 0.0
+            ),
+            "unique_ips": detail_queryset.filter(ip_address__isnull=False)
+            .values("ip_address")
+            .distinct()
+            .count(),
+            **{
+                f"p{label}_duration_ms": estimate_duration_percentile(
+                    histogram, percentile, max_duration_ms=max_duration_ms
+                )
+                for label, percentile in (("50", 0.5), ("95", 0.95), ("99", 0.99))
+            },
+        }
+    )
+
+    start_hour = _get_hourly_series_start(now)
+    hourly_rows = []
+    for row in (
+        rollups.filter(hour__gte=start_hour)
+        .values("hour")
+        .annotate(
+            total_events=Sum("events"),
+            total_successes=Sum("success_count"),
+            total_errors=Sum("client_error_count") + Sum("server_error_count"),
+            max_duration_ms=Max("duration_max_ms"),
+            **{f"total_{field}": Sum(field) for field in DURATION_BUCKET_FIELDS},
         )
         .order_by("hour")
+    ):
+        histogram = [
+            int(row[f"total_{field}"] or 0) for field in DURATION_BUCKET_FIELDS
+        ]
+        hourly_rows.append(
+            {
+                "hour": row["hour"],
+                "events": row["total_events"],
+                "successes": row["total_successes"],
+                "errors": row["total_errors"],
+                "p95_duration_ms": estimate_duration_percentile(
+                    histogram,
+                    0.95,
+                    max_duration_ms=int(row["max_duration_ms"] or 0),
+                ),
+            }
+        )
+
+    events_sum = Sum("events")
+    return _build_overview_payload(
+        now=now,
+        source="rollup",
+        aggregated=aggregated,
+        breakdowns={
+            "by_method": _count_top_keys(rollups, "method", events_sum, limit=8),
+            "by_channel": _count_top_keys(rollups, "channel", events_sum, limit=8),
+            "by_action_group": _count_top_keys(
+                rollups, "action_group", events_sum, limit=8, skip_blank=True
+            ),
+            "top_actors": _count_top_keys(
+                rollups, "actor_username", events_sum, limit=10, skip_blank=True
+            ),
+            "top_paths": _count_top_keys(
+                detail_queryset, "path", Count("id"), limit=10
+            ),
+        },
+        hourly_series=_build_hourly_series(start_hour, hourly_rows),
+        failed_events=_list_failed_events(detail_queryset),
     )
+
+
+def _resolve_rollup_window(
+    *,
+    date_from: str,
+    date_to: str,
+) -> tuple[datetime | None, datetime | None] | None:
+    # Rollups so atendem periodos que comecam e terminam em hora cheia.
+    hour_from = None
+    normalized_date_from = str(date_from or "").strip()
+    if normalized_date_from:
+        hour_from = _parse_date_start(normalized_date_from)
+        if hour_from is not None and hour_from != truncate_to_hour(hour_from):
+            return None
+
+    hour_to = None
+    normalized_date_to = str(date_to or "").strip()
+    if normalized_date_to:
+        parsed_to = _parse_date_end(normalized_date_to)
+        if parsed_to is not None:
+            hour_to = truncate_to_hour(parsed_to)
+            if parsed_to != hour_to + timedelta(hours=1, microseconds=-1):
+                return None
+    return hour_from, hour_to
+
+
+def _get_hourly_series_start(now: datetime) -> datetime:
+    return truncate_to_hour(now) - timedelta(hours=23)
+
+
+def _count_top_keys(
+    queryset: QuerySet,
+    field_name: str,
+    count_expression,
+    *,
+    limit: int,
+    skip_blank: bool = False,
+) -> list[dict]:
+    if skip_blank:
+        queryset = queryset.exclude(**{field_name: ""})
+    rows = (
+        queryset.values(field_name)
+        .annotate(count=count_expression)
+        .order_by("-count", field_name)[:limit]
+    )
+    return [
+        {"key": str(row[field_name]), "count": int(row["count"] or 0)} for row in rows
+    ]
+
+
+def _build_hourly_series(start_hour: datetime, hourly_rows) -> list[dict]:
     hourly_map: dict[str, dict] = {}
     for row in hourly_rows:
         hour = row.get("hour")
         if hour is None:
             continue
-        hour_key = (
-            timezone.localtime(hour)
-            .replace(minute=0, second=0, microsecond=0)
-            .isoformat()
-        )
-        hourly_map[hour_key] = {
+        hourly_map[truncate_to_hour(hour).isoformat()] = {
             "events": int(row.get("events", 0) or 0),
             "successes": int(row.get("successes", 0) or 0),
             "errors": int(row.get("errors", 0) or 0),
+            "p95_duration_ms": round(float(row.get("p95_duration_ms") or 0.0), 2),
         }
 
     hourly_series: list[dict] = []
     for index in range(24):
-        bucket = start_hour + timedelta(hours=index)
-        bucket_key = bucket.isoformat()
-        values = hourly_map.get(bucket_key, {"events": 0, "successes": 0, "errors": 0})
-        hourly_series.append(
-            {
-                "hour": bucket_key,
-                "events": values["events"],
-                "successes": values["successes"],
-                "errors": values["errors"],
-            }
+        bucket_key = (start_hour + timedelta(hours=index)).isoformat()
+        values = hourly_map.get(
+            bucket_key,
+            {"events": 0, "successes": 0, "errors": 0, "p95_duration_ms": 0.0},
         )
+        hourly_series.append({"hour": bucket_key, **values})
+    return hourly_series
+
 
+def _list_failed_events(queryset: QuerySet[AdminActivityLog]) -> list[dict]:
     failed_rows = list(
         queryset.filter(http_status__gte=400)
         .values(
@@ -236,7 +431,7 @@ def summarize_admin_activity_logs(*, queryset: QuerySet[AdminActivityLog]) -> di
         )
         .order_by("-created_at", "-id")[:12]
     )
-    failed_events = [
+    return [
         {
             "id": int(item["id"]),
             "request_id": str(item["request_id"]),
@@ -253,6 +448,17 @@ def summarize_admin_activity_logs(*, queryset: QuerySet[AdminActivityLog]) -> di
         for item in failed_rows
     ]
 
+
+def _build_overview_payload(
+    *,
+    now: datetime,
+    source: str,
+    aggregated: dict,
+    breakdowns: dict[str, list[dict]],
+    hourly_series: list[dict],
+    failed_events: list[dict],
+) -> dict:
+    total_events = int(aggregated.get("events") or 0)
     success_count = int(aggregated.get("success_count") or 0)
     client_error_count = int(aggregated.get("client_error_count") or 0)
     server_error_count = int(aggregated.get("server_error_count") or 0)
@@ -266,8 +472,9 @@ def summarize_admin_activity_logs(*, queryset: QuerySet[AdminActivityLog]) -> di
 
     return {
         "generated_at": timezone.localtime(now).isoformat(),
+        "source": source,
         "totals": {
-            "events": int(total_events),
+            "events": total_events,
             "success_count": success_count,
             "error_count": error_count,
             "client_error_count": client_error_count,
@@ -275,8 +482,16 @@ def summarize_admin_activity_logs(*, queryset: QuerySet[AdminActivityLog]) -> di
             "success_rate_percent": success_rate_percent,
             "error_rate_percent": error_rate_percent,
             "avg_duration_ms": float(aggregated.get("avg_duration_ms") or 0.0),
-            "p95_duration_ms": p95_duration_ms,
-            "max_duration_ms": max_duration_ms,
+            "p50_duration_ms": round(
+                float(aggregated.get("p50_duration_ms") or 0.0), 2
+            ),
+            "p95_duration_ms": round(
+                float(aggregated.get("p95_duration_ms") or 0.0), 2
+            ),
+            "p99_duration_ms": round(
+                float(aggregated.get("p99_duration_ms") or 0.0), 2
+            ),
+            "max_duration_ms": int(aggregated.get("max_duration_ms") or 0),
             "unique_actors": int(aggregated.get("unique_actors") or 0),
             "unique_ips": int(aggregated.get("unique_ips") or 0),
         },
@@ -286,26 +501,7 @@ def summarize_admin_activity_logs(*, queryset: QuerySet[AdminActivityLog]) -> di
             "anonymous_count": int(aggregated.get("anonymous_count") or 0),
             "failed_events": failed_events,
         },
-        "by_method": [
-            {"key": str(row["method"]), "count": int(row["count"])}
-            for row in by_method_rows
-        ],
-        "by_channel": [
-            {"key": str(row["channel"]), "count": int(row["count"])}
-            for row in by_channel_rows
-        ],
-        "by_action_group": [
-            {"key": str(row["action_group"]), "count": int(row["count"])}
-            for row in by_action_rows
-        ],
-        "top_actors": [
-            {"key": str(row["actor_username"]), "count": int(row["count"])}
-            for row in top_actor_rows
-        ],
-        "top_paths": [
-            {"key": str(row["path"]), "count": int(row["count"])}
-            for row in top_path_rows
-        ],
+        **breakdowns,
         "hourly_series_last_24h": hourly_series,
     }
 
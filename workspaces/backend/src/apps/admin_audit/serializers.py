@@ -35,3 +35,10 @@ class AdminActivityLogSerializer(serializers.ModelSerializer):
             "user_agent",
             "metadata",
         ]
+
+
+class AdminActivityLogSearchSerializer(AdminActivityLogSerializer):
+    search_rank = serializers.FloatField(read_only=True)
+
+    class Meta(AdminActivityLogSerializer.Meta):
+        fields = [*AdminActivityLogSerializer.Meta.fields, "search_rank"]
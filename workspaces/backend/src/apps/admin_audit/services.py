@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from .models import AdminActivityLog
+from .rollups import get_raw_log_retention_cutoff
+
+
+def purge_admin_activity_logs(
+    *,
+    older_than_days: int | None = None,
+    batch_size: int = 5000,
+) -> int:
+    """Remove logs brutos fora da retencao, em lotes curtos.
+
+    O corte cai em hora cheia: uma hora fica inteira no log bruto ou sai
+    inteira, e os rollups horarios (mantidos) continuam consistentes.
+    """
+    retention_days = (
+        settings.ADMIN_AUDIT_RETENTION_DAYS
+        if older_than_days is None
+        else older_than_days
+    )
+    if retention_days <= 0:
+        raise ValidationError("older_than_days deve ser maior que zero.")
+
+    cutoff = get_raw_log_retention_cutoff(retention_days)
+    expired = AdminActivityLog.objects.filter(created_at__lt=cutoff)
+    deleted_count = 0
+    while True:
+        batch_ids = list(
+            expired.order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        if not batch_ids:
+            return deleted_count
+        deleted, _ = AdminActivityLog.objects.filter(pk__in=batch_ids).delete()
+        deleted_count += deleted
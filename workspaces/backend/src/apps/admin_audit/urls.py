@@ -1,6 +1,10 @@
 from django.urls import path
 
-from .views import AdminActivityLogListAPIView, AdminActivityOverviewAPIView
+from .views import (
+    AdminActivityLogListAPIView,
+    AdminActivityLogSearchAPIView,
+    AdminActivityOverviewAPIView,
+)
 
 urlpatterns = [
     path(
@@ -8,6 +12,11 @@ urlpatterns = [
         AdminActivityOverviewAPIView.as_view(),
         name="admin-audit-admin-activity-overview",
     ),
+    path(
+        "admin-activity/search/",
+        AdminActivityLogSearchAPIView.as_view(),
+        name="admin-audit-admin-activity-search",
+    ),
     path(
         "admin-activity/",
         AdminActivityLogListAPIView.as_view(),
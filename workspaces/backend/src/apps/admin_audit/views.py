@@ -5,9 +5,15 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.accounts.services import SystemRole, user_has_any_role
+from apps.common.search import decode_search_cursor, parse_search_limit
 
-from .selectors import build_admin_activity_overview, filter_admin_activity_logs
-from .serializers import AdminActivityLogSerializer
+from .selectors import (
+    build_admin_activity_overview,
+    filter_admin_activity_logs,
+    search_admin_activity_logs,
+)
+from .serializers import AdminActivityLogSearchSerializer, AdminActivityLogSerializer
+from .writer import get_admin_audit_writer_metrics
 
 
 class AdminAuditPermission(permissions.BasePermission):
@@ -69,6 +75,23 @@ class AdminActivityLogListAPIView(APIView):
         )
 
 
+class AdminActivityLogSearchAPIView(APIView):
+    permission_classes = [permissions.IsAuthenticated, AdminAuditPermission]
+
+    def get(self, request):
+        query = request.query_params
+        records, next_cursor = search_admin_activity_logs(
+            term=str(query.get("q", "") or ""),
+            cursor=decode_search_cursor(query.get("cursor")),
+            limit=parse_search_limit(query.get("limit")),
+        )
+        serializer = AdminActivityLogSearchSerializer(records, many=True)
+        return Response(
+            {"next_cursor": next_cursor, "results": serializer.data},
+            status=status.HTTP_200_OK,
+        )
+
+
 class AdminActivityOverviewAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated, AdminAuditPermission]
 
@@ -83,4 +106,6 @@ class AdminActivityOverviewAPIView(APIView):
             date_from=str(query.get("date_from", "") or ""),
             date_to=str(query.get("date_to", "") or ""),
         )
+        # Metricas do writer sao do processo que atendeu o request.
+        payload["writer"] = get_admin_audit_writer_metrics()
         return Response(payload, status=status.HTTP_200_OK)
@@ -0,0 +1,497 @@
+from __future__ import annotations
+
+import atexit
+import fcntl
+import ipaddress
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AdminActivityLog
+from .rollups import (
+    refresh_admin_activity_rollups,
+    schedule_admin_activity_rollup_refresh,
+)
+
+logger = logging.getLogger(__name__)
+
+# Estados do segmento de spool: `.init` esta sendo criado, `.open` recebe
+# linhas do processo dono, `.ready` foi rotacionado e `.flushing` esta sendo
+# gravado no banco. O dono mantem flock no arquivo enquanto o usa: segmento
+# que aceita o lock nao tem mais dono vivo (PID nao serve, ele se repete
+# apos reiniciar o container).
+SEGMENT_INIT = "init"
+SEGMENT_OPEN = "open"
+SEGMENT_READY = "ready"
+SEGMENT_FLUSHING = "flushing"
+SEGMENT_STATES = {SEGMENT_INIT, SEGMENT_OPEN, SEGMENT_READY, SEGMENT_FLUSHING}
+# Registros que o banco recusou mesmo gravados um a um.
+DEAD_LETTER_PREFIX = "dead-letter-"
+
+_RECORD_FIELDS = {
+    field.attname
+    for field in AdminActivityLog._meta.concrete_fields
+    if not field.primary_key
+}
+_CHAR_FIELD_LIMITS = {
+    field.attname: field.max_length
+    for field in AdminActivityLog._meta.concrete_fields
+    if isinstance(field, models.CharField) and field.max_length
+}
+
+
+def clean_admin_activity_record(record: dict) -> dict:
+    """Normaliza um registro antes do spool: IP invalido vira nulo e textos
+    sao cortados no tamanho da coluna (o IP vem de X-Forwarded-For, que o
+    cliente controla)."""
+    cleaned = {key: value for key, value in record.items() if key in _RECORD_FIELDS}
+    ip_address = cleaned.get("ip_address")
+    if ip_address:
+        try:
+            cleaned["ip_address"] = str(ipaddress.ip_address(str(ip_address)))
+        except ValueError:
+            cleaned["ip_address"] = None
+    for field_name, max_length in _CHAR_FIELD_LIMITS.items():
+        value = cleaned.get(field_name)
+        if isinstance(value, str) and len(value) > max_length:
+            cleaned[field_name] = value[:max_length]
+    return cleaned
+
+
+def _build_log_instance(record: dict) -> AdminActivityLog:
+    values = {key: value for key, value in record.items() if key in _RECORD_FIELDS}
+    created_at = values.get("created_at")
+    if isinstance(created_at, str):
+        values["created_at"] = parse_datetime(created_at) or timezone.now()
+    request_id = values.get("request_id")
+    if isinstance(request_id, str):
+        values["request_id"] = uuid.UUID(request_id)
+    return AdminActivityLog(**values)
+
+
+def _insert_log_instances(
+    instances: list[AdminActivityLog],
+    *,
+    batch_size: int,
+) -> tuple[list[AdminActivityLog], list[int]]:
+    try:
+        AdminActivityLog.objects.bulk_create(
+            instances,
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        return instances, []
+    except Exception as exc:
+        logger.warning("Lote de auditoria recusado; gravando um a um: %s", exc)
+
+    # Um registro ruim nao pode travar o lote inteiro.
+    written, rejected_indexes = [], []
+    for index, instance in enumerate(instances):
+        try:
+            with transaction.atomic():
+                AdminActivityLog.objects.bulk_create([instance], ignore_conflicts=True)
+        except Exception:
+            rejected_indexes.append(index)
+            continue
+        written.append(instance)
+    return written, rejected_indexes
+
+
+def write_admin_activity_logs(
+    records: list[dict],
+    *,
+    batch_size: int = 500,
+    rejected: list[dict] | None = None,
+    refresh_inline: bool = True,
+) -> int:
+    """Grava registros de auditoria com `bulk_create`.
+
+    Reenvios do mesmo `request_id` (spool reprocessado apos queda) sao
+    ignorados pela constraint unica. Atores removidos viram anonimos, como no
+    SET_NULL da FK. Se o lote falhar, grava um a um; registros recusados vao
+    para `rejected` (ou sao descartados com log). Fora da thread de flush
+    (`refresh_inline=False`) os rollups sao recalculados por job, sem
+    disputar o lock da hora no request.
+    """
+    if not records:
+        return 0
+
+    records = [clean_admin_activity_record(record) for record in records]
+    actor_ids = {record["actor_id"] for record in records if record.get("actor_id")}
+    existing_actor_ids = set(
+        get_user_model().objects.filter(pk__in=actor_ids).values_list("pk", flat=True)
+    )
+    instances, built_records, invalid_records = [], [], []
+    for record in records:
+        try:
+            instance = _build_log_instance(record)
+        except (TypeError, ValueError):
+            invalid_records.append(record)
+            continue
+        if instance.actor_id not in existing_actor_ids:
+            instance.actor_id = None
+        instances.append(instance)
+        built_records.append(record)
+
+    written, rejected_indexes = (
+        _insert_log_instances(instances, batch_size=batch_size)
+        if instances
+        else ([], [])
+    )
+    invalid_records.extend(built_records[index] for index in rejected_indexes)
+    if invalid_records:
+        logger.warning(
+            "%s registro(s) de auditoria recusado(s).",
+            len(invalid_records),
+        )
+        if rejected is not None:
+            rejected.extend(invalid_records)
+    written_hours = [instance.created_at for instance in written]
+    if refresh_inline:
+        refresh_admin_activity_rollups(written_hours)
+    else:
+        schedule_admin_activity_rollup_refresh(written_hours)
+    return len(written)
+
+
+def _try_lock(handle) -> bool:
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _parse_segment_name(path: Path) -> tuple[int, str, str] | None:
+    owner, _, rest = path.name.partition("-")
+    token, _, state = rest.partition(".")
+    if not owner.isdigit() or not token or not state:
+        return None
+    return int(owner), token, state
+
+
+class AdminAuditWriter:
+    """Fila de auditoria apoiada em spool append-only por processo.
+
+    `submit` apenas acrescenta uma linha JSON ao segmento aberto; uma thread
+    em segundo plano rotaciona o segmento por tempo ou volume e grava os
+    registros em lote. Segmentos sobrevivem a quedas do processo e sao
+    reprocessados pelo proximo flush de qualquer worker.
+    """
+
+    def __init__(
+        self,
+        *,
+        spool_dir: str | Path,
+        batch_size: int,
+        flush_interval_seconds: float,
+        max_pending: int,
+    ) -> None:
+        self.spool_dir = Path(spool_dir)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = max(0.05, flush_interval_seconds)
+        self.max_pending = max(self.batch_size, max_pending)
+        self._metrics: Counter = Counter()
+        self._last_flush_at = None
+        self._last_error = ""
+        self._reset_process_state()
+
+    def _reset_process_state(self) -> None:
+        # Chamado tambem apos fork: locks, thread e segmento nao sao herdados.
+        # Handles herdados sao fechados para o flock ficar so com o pai.
+        for handle in (
+            getattr(self, "_segment", None),
+            *getattr(self, "_ready_handles", {}).values(),
+        ):
+            if handle is not None:
+                handle.close()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._segment = None
+        self._segment_token = ""
+        self._segment_records = 0
+        self._segment_counts: dict[str, int] = {}
+        self._ready_handles: dict[str, object] = {}
+        self._pending = 0
+        self._dropping = False
+
+    def _segment_path(self, token: str, state: str) -> Path:
+        return self.spool_dir / f"{self._pid}-{token}.{state}"
+
+    def submit(self, record: dict) -> bool:
+        if self._pid != os.getpid():
+            self._reset_process_state()
+
+        line = (
+            json.dumps(
+                clean_admin_activity_record(record),
+                ensure_ascii=False,
+                default=str,
+            )
+            + "\n"
+        )
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._metrics["dropped"] += 1
+                if not self._dropping:
+                    self._dropping = True
+                    logger.warning(
+                        "Spool de auditoria cheio (%s pendentes); descartando.",
+                        self._pending,
+                    )
+                return False
+
+            if self._segment is None:
+                self._open_segment()
+            # flush() entrega a linha ao SO: sobrevive a queda do processo.
+            self._segment.write(line)
+            self._segment.flush()
+            self._segment_records += 1
+            self._pending += 1
+            self._metrics["submitted"] += 1
+            should_wake = self._segment_records >= self.batch_size
+
+        self._ensure_flusher()
+        if should_wake:
+            self._wakeup.set()
+        return True
+
+    def _open_segment(self) -> None:
+        # Lock antes do nome `.open`: ninguem ve o segmento sem dono.
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        token = uuid.uuid4().hex[:12]
+        init_path = self._segment_path(token, SEGMENT_INIT)
+        segment = open(init_path, "a", encoding="utf-8")  # noqa: SIM115
+        fcntl.flock(segment.fileno(), fcntl.LOCK_EX)
+        os.replace(init_path, self._segment_path(token, SEGMENT_OPEN))
+        self._segment = segment
+        self._segment_token = token
+        self._segment_records = 0
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name="admin-audit-writer",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval_seconds)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Falha inesperada no flush da auditoria.")
+            finally:
+                close_old_connections()
+
+    def _rotate_segment(self) -> None:
+        with self._lock:
+            if self._segment is None:
+                return
+            # O lock continua com o dono ate o flush: segmento `.ready` de
+            # processo vivo nao e reivindicado por outro.
+            os.replace(
+                self._segment_path(self._segment_token, SEGMENT_OPEN),
+                self._segment_path(self._segment_token, SEGMENT_READY),
+            )
+            self._ready_handles[self._segment_token] = self._segment
+            self._segment_counts[self._segment_token] = self._segment_records
+            self._segment = None
+            self._segment_records = 0
+
+    def _claim_segments(self) -> list[tuple[Path, object]]:
+        """Reivindica segmentos sem dono vivo; devolve caminho e handle com
+        o lock, mantido ate o fim da gravacao."""
+        if not self.spool_dir.is_dir():
+            return []
+
+        claimed = []
+        for path in sorted(self.spool_dir.iterdir()):
+            parsed = _parse_segment_name(path)
+            if parsed is None or parsed[2] not in SEGMENT_STATES:
+                continue
+            token = parsed[1]
+            handle = self._ready_handles.pop(token, None)
+            if handle is None:
+                try:
+                    handle = path.open("rb")
+                except FileNotFoundError:
+                    continue
+                if not _try_lock(handle):
+                    # Segmento de processo vivo (aberto, pronto ou gravando).
+                    handle.close()
+                    continue
+                if token not in self._segment_counts:
+                    self._metrics["recovered_segments"] += 1
+
+            target = self._segment_path(token, SEGMENT_FLUSHING)
+            try:
+                os.replace(path, target)
+            except FileNotFoundError:
+                # Outro worker reivindicou o segmento primeiro.
+                handle.close()
+                continue
+            claimed.append((target, handle))
+        return claimed
+
+    def _write_dead_letter(self, token: str, records: list[dict]) -> None:
+        path = self.spool_dir / f"{DEAD_LETTER_PREFIX}{token}.jsonl"
+        with path.open("a", encoding="utf-8") as dead_letter:
+            for record in records:
+                dead_letter.write(
+                    json.dumps(record, ensure_ascii=False, default=str) + "\n"
+                )
+        self._metrics["dead_lettered"] += len(records)
+
+    def _read_segment(self, path: Path) -> list[dict]:
+        records = []
+        with path.open(encoding="utf-8") as segment:
+            for line in segment:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Ultima linha truncada por queda no meio da escrita.
+                    self._metrics["corrupt_lines"] += 1
+        return records
+
+    def flush(self) -> int:
+        """Grava todos os segmentos disponiveis; retorna registros gravados."""
+        if self._pid != os.getpid():
+            self._reset_process_state()
+
+        with self._flush_lock:
+            self._rotate_segment()
+            written = 0
+            for path, handle in self._claim_segments():
+                _, token, _ = _parse_segment_name(path)
+                started_at = time.perf_counter()
+                rejected: list[dict] = []
+                try:
+                    written += write_admin_activity_logs(
+                        self._read_segment(path),
+                        batch_size=self.batch_size,
+                        rejected=rejected,
+                    )
+                    if rejected:
+                        self._write_dead_letter(token, rejected)
+                except Exception as exc:
+                    # Segmento fica como `.flushing` e volta no proximo ciclo
+                    # (falha do banco, nao de um registro).
+                    self._metrics["flush_failures"] += 1
+                    self._last_error = f"{type(exc).__name__}: {exc}"
+                    logger.warning("Falha ao gravar spool de auditoria: %s", exc)
+                    handle.close()
+                    continue
+
+                path.unlink(missing_ok=True)
+                handle.close()
+                self._metrics["flush_ms"] += int(
+                    (time.perf_counter() - started_at) * 1000
+                )
+                with self._lock:
+                    self._pending = max(
+                        0, self._pending - self._segment_counts.pop(token, 0)
+                    )
+                    if self._pending < self.max_pending:
+                        self._dropping = False
+
+            if written:
+                self._metrics["flushed"] += written
+                self._metrics["flushes"] += 1
+                self._last_flush_at = timezone.now()
+            return written
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "submitted": self._metrics["submitted"],
+                "flushed": self._metrics["flushed"],
+                "dropped": self._metrics["dropped"],
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "flushes": self._metrics["flushes"],
+                "flush_failures": self._metrics["flush_failures"],
+                "flush_ms_total": self._metrics["flush_ms"],
+                "recovered_segments": self._metrics["recovered_segments"],
+                "corrupt_lines": self._metrics["corrupt_lines"],
+                "dead_lettered": self._metrics["dead_lettered"],
+                "last_flush_at": (
+                    self._last_flush_at.isoformat() if self._last_flush_at else None
+                ),
+                "last_error": self._last_error,
+            }
+
+
+_writer: AdminAuditWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_admin_audit_writer() -> AdminAuditWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AdminAuditWriter(
+                    spool_dir=settings.ADMIN_AUDIT_SPOOL_DIR,
+                    batch_size=settings.ADMIN_AUDIT_BATCH_SIZE,
+                    flush_interval_seconds=(
+                        settings.ADMIN_AUDIT_FLUSH_INTERVAL_SECONDS
+                    ),
+                    max_pending=settings.ADMIN_AUDIT_MAX_PENDING,
+                )
+                atexit.register(_flush_on_exit)
+    return _writer
+
+
+def _flush_on_exit() -> None:
+    if _writer is None:
+        return
+    try:
+        _writer.flush()
+    except Exception:
+        # O spool permanece em disco e e reprocessado no proximo start.
+        pass
+
+
+def submit_admin_activity_log(record: dict) -> None:
+    if settings.ADMIN_AUDIT_WRITE_EAGERLY:
+        write_admin_activity_logs([record], refresh_inline=False)
+        return
+
+    try:
+        get_admin_audit_writer().submit(record)
+    except OSError as exc:
+        # Spool indisponivel: grava direto para nao perder o registro.
+        logger.warning("Spool de auditoria indisponivel: %s", exc)
+        write_admin_activity_logs([record], refresh_inline=False)
+
+
+def get_admin_audit_writer_metrics() -> dict:
+    if _writer is None:
+        return {"mode": "eager" if settings.ADMIN_AUDIT_WRITE_EAGERLY else "spool"}
+    return {"mode": "spool", **_writer.get_metrics()}
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CatalogConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.catalog"
+
+    def ready(self):
+        from apps.catalog.image_variants import register_catalog_image_variant_signals
+        from apps.catalog.public_menu import register_public_menu_cache_signals
+
+        register_catalog_image_variant_signals()
+        register_public_menu_cache_signals()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from django.apps import apps
+from django.db.models import Q
+from django.db.models.signals import post_save
+
+from apps.jobs.services import enqueue
+from apps.shared.image_derivatives import (
+    generate_image_derivatives,
+    resolve_derivative_spec,
+)
+
+from .models import Dish, Ingredient
+from .public_menu import invalidate_public_menu_cache
+
+GENERATE_IMAGE_VARIANTS_JOB = "catalog.generate_image_variants"
+IMAGE_VARIANT_MODELS = (Dish, Ingredient)
+IMAGE_VARIANTS_QUEUE = "media"
+
+
+def schedule_image_variants(instance) -> None:
+    enqueue(
+        GENERATE_IMAGE_VARIANTS_JOB,
+        {"model": instance._meta.label_lower, "pk": instance.pk},
+        queue=IMAGE_VARIANTS_QUEUE,
+    )
+
+
+def refresh_image_variants(*, model_label: str, pk: int) -> dict | None:
+    """Regera as variantes da imagem atual e grava o manifesto.
+
+    Roda fora da requisicao (job). Variantes sao compartilhadas entre linhas
+    com a mesma imagem (endereco por conteudo); as que perdem a ultima
+    referencia sao removidas pelo comando `collect_orphan_media`.
+    """
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).only("id", "image", "image_variants").first()
+    if instance is None:
+        return None
+
+    manifest = {}
+    if instance.image:
+        spec = resolve_derivative_spec(
+            model_label_lower=model_label,
+            field_name="image",
+        )
+        if spec is None:
+            return None
+        manifest = generate_image_derivatives(field_file=instance.image, spec=spec)
+
+    current_image = (
+        Q(image=instance.image.name)
+        if instance.image
+        else Q(image__isnull=True) | Q(image="")
+    )
+    updated = model.objects.filter(current_image, pk=pk).update(image_variants=manifest)
+    if not updated:
+        # Imagem trocada durante a geracao: o job da nova imagem assume.
+        return None
+    # Update direto nao dispara sinais; `image_sources` do cardapio muda.
+    invalidate_public_menu_cache()
+    return manifest
+
+
+def _handle_catalog_image_saved(sender, instance, **kwargs) -> None:
+    if kwargs.get("raw"):
+        return
+
+    update_fields = kwargs.get("update_fields")
+    image_name = instance.image.name if instance.image else ""
+    manifest_source = (instance.image_variants or {}).get("source", "")
+    if update_fields is not None and "image" in update_fields:
+        # Reprocessamento no lugar (mesmo nome) tambem troca o conteudo.
+        changed = bool(image_name or manifest_source)
+    else:
+        changed = image_name != manifest_source
+    if changed:
+        schedule_image_variants(instance)
+
+
+def register_catalog_image_variant_signals() -> None:
+    for model in IMAGE_VARIANT_MODELS:
+        post_save.connect(
+            _handle_catalog_image_saved,
+            sender=model,
+            weak=False,
+            dispatch_uid=f"mrq-catalog-image-variants:{model._meta.label_lower}",
+        )
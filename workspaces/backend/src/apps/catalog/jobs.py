@@ -0,0 +1,14 @@
+from apps.jobs.services import register_job_handler
+from apps.shared.image_derivatives import list_manifest_names
+
+from .image_variants import GENERATE_IMAGE_VARIANTS_JOB, refresh_image_variants
+
+
+# Sem transacao envolvendo o job: a codificacao AVIF/WebP e lenta.
+@register_job_handler(GENERATE_IMAGE_VARIANTS_JOB, atomic=False)
+def generate_image_variants_job(payload: dict) -> dict:
+    manifest = refresh_image_variants(
+        model_label=payload["model"],
+        pk=int(payload["pk"]),
+    )
+    return {"variants": len(list_manifest_names(manifest))}
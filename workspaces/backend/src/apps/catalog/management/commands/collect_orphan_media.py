@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shared.content_storage import DEFAULT_GC_MIN_AGE, collect_orphan_media
+from apps.shared.image_pipeline import list_content_addressed_fields
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove arquivos de midia enderecados por conteudo (e suas variantes) "
+        "que nao sao mais referenciados por nenhum registro."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=DEFAULT_GC_MIN_AGE.total_seconds() / 3600,
+            help="Preserva arquivos mais novos que este numero de horas.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Lista os orfaos sem remover arquivos.",
+        )
+
+    def handle(self, *args, **options):
+        min_age_hours = float(options["min_age_hours"])
+        if min_age_hours < 0:
+            raise CommandError("--min-age-hours deve ser maior ou igual a zero.")
+        dry_run = bool(options["dry_run"])
+
+        report = collect_orphan_media(
+            list_content_addressed_fields(),
+            min_age=timedelta(hours=min_age_hours),
+            dry_run=dry_run,
+        )
+        for name in report.deleted_names:
+            prefix = "[dry-run]" if dry_run else "[delete]"
+            self.stdout.write(f"{prefix} {name}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Coleta de midia orfa concluida. "
+                f"Arquivos verificados: {report.scanned}. "
+                f"Orfaos: {report.deleted} ({report.freed_bytes} bytes). "
+                f"Recentes preservados: {report.kept_recent}."
+            )
+        )
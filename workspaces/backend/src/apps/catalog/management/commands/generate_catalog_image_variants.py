@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from apps.catalog.image_variants import IMAGE_VARIANT_MODELS, schedule_image_variants
+
+
+class Command(BaseCommand):
+    help = (
+        "Enfileira a geracao de variantes responsivas (WebP/AVIF) das imagens "
+        "do catalogo que ainda nao tem manifesto atualizado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regera as variantes mesmo com manifesto atualizado.",
+        )
+
+    def handle(self, *args, **options):
+        force = bool(options["force"])
+        scheduled = 0
+        for model in IMAGE_VARIANT_MODELS:
+            queryset = (
+                model.objects.exclude(image="")
+                .exclude(image__isnull=True)
+                .only("id", "image", "image_variants")
+                .order_by("id")
+            )
+            for instance in queryset.iterator():
+                manifest_source = (instance.image_variants or {}).get("source")
+                if not force and manifest_source == instance.image.name:
+                    continue
+                schedule_image_variants(instance)
+                scheduled += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Variantes enfileiradas com sucesso. Imagens: {scheduled}."
+            )
+        )
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import json
 import mimetypes
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from html import escape
+from pathlib import Path
 from typing import Any
 from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode
@@ -14,9 +16,19 @@ from django.core.management.base import BaseCommand, CommandError
 from django.utils.text import slugify
 
 from apps.catalog.models import Dish, Ingredient
+from apps.catalog.photo_sync import (
+    HostRateLimiter,
+    PhotoSyncCache,
+    PhotoSyncCheckpoint,
+    index_local_images,
+    match_local_image,
+)
 
 COMMONS_API_URL = "https://commons.wikimedia.org/w/api.php"
 DEFAULT_TIMEOUT_SECONDS = 20
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_REQUESTS_PER_HOST = 5.0
+CHECKPOINT_DONE_STATUS = "updated"
 HTTP_USER_AGENT = "MrQuentinhaBot/1.0 (catalog-photo-sync)"
 PLACEHOLDER_COLORS = {
     "dish": ("#FF6A00", "#111827"),
@@ -107,10 +119,18 @@ class ImageCandidate:
     mime: str
 
 
+@dataclass
+class PhotoResolution:
+    image_bytes: bytes | None = None
+    extension: str = ""
+    # (estilo, prefixo, texto) impressos pela thread principal.
+    messages: list[tuple[str, str, str]] = field(default_factory=list)
+
+
 class Command(BaseCommand):
     help = (
         "Sincroniza fotos de pratos e insumos no banco, buscando imagens no "
-        "Wikimedia Commons e salvando em MEDIA_ROOT."
+        "Wikimedia Commons (ou em uma pasta local) e salvando em MEDIA_ROOT."
     )
 
     def add_arguments(self, parser):
@@ -145,6 +165,44 @@ class Command(BaseCommand):
             default=DEFAULT_TIMEOUT_SECONDS,
             help="Timeout de rede em segundos para busca/download das imagens.",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS,
+            help="Quantidade de buscas/downloads simultaneos.",
+        )
+        parser.add_argument(
+            "--max-requests-per-host",
+            type=float,
+            default=DEFAULT_MAX_REQUESTS_PER_HOST,
+            help="Requisicoes por segundo para o mesmo host (0 = sem limite).",
+        )
+        parser.add_argument(
+            "--cache-dir",
+            default="",
+            help="Diretorio de cache em disco para buscas e imagens baixadas.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default="",
+            help=(
+                "Arquivo de checkpoint: itens concluidos em execucoes anteriores "
+                "sao pulados (retomada)."
+            ),
+        )
+        parser.add_argument(
+            "--reset-checkpoint",
+            action="store_true",
+            help="Descarta o checkpoint informado antes de iniciar.",
+        )
+        parser.add_argument(
+            "--from-directory",
+            default="",
+            help=(
+                "Modo offline: usa imagens de uma pasta local (arquivo com o "
+                "nome do item ou da busca), sem acessar a rede."
+            ),
+        )
 
     def handle(self, *args, **options):
         only = str(options["only"])
@@ -152,204 +210,275 @@ class Command(BaseCommand):
         force = bool(options["force"])
         dry_run = bool(options["dry_run"])
         timeout = int(options["timeout"])
+        workers = int(options["workers"])
+        max_requests_per_host = float(options["max_requests_per_host"])
 
         if limit < 0:
             raise CommandError("--limit nao pode ser negativo.")
         if timeout <= 0:
             raise CommandError("--timeout precisa ser maior que zero.")
+        if workers <= 0:
+            raise CommandError("--workers precisa ser maior que zero.")
+        if max_requests_per_host < 0:
+            raise CommandError("--max-requests-per-host nao pode ser negativo.")
+
+        self._timeout = timeout
+        self._rate_limiter = HostRateLimiter(requests_per_second=max_requests_per_host)
+        cache_dir = str(options["cache_dir"]).strip()
+        self._cache = PhotoSyncCache(cache_dir) if cache_dir else None
+        self._checkpoint = self._load_checkpoint(
+            path=str(options["checkpoint"]).strip(),
+            reset=bool(options["reset_checkpoint"]),
+        )
+        self._local_index = None
+        from_directory = str(options["from_directory"]).strip()
+        if from_directory:
+            if not Path(from_directory).is_dir():
+                raise CommandError(f"Pasta nao encontrada: {from_directory}")
+            self._local_index = index_local_images(from_directory)
 
         self.stdout.write(
             self.style.NOTICE(
                 "Iniciando sincronizacao de fotos do catalogo "
                 f"(only={only}, limit={limit or 'sem limite'}, "
-                f"force={force}, dry_run={dry_run})..."
+                f"force={force}, dry_run={dry_run}, workers={workers}, "
+                f"origem={'pasta local' if from_directory else 'commons'})..."
             )
         )
 
+        groups = []
         if only in {"all", "ingredients"}:
-            ingredient_stats = self._sync_ingredients(
-                force=force,
-                dry_run=dry_run,
-                timeout=timeout,
-                limit=limit,
+            groups.append(
+                ("Ingredientes", "ingredient", Ingredient, INGREDIENT_QUERY_HINTS)
             )
-            self.stdout.write(
-                self.style.SUCCESS(
-                    "Ingredientes -> "
-                    f"atualizados={ingredient_stats['updated']} "
-                    f"ignorados={ingredient_stats['skipped']} "
-                    f"falhas={ingredient_stats['failed']}"
-                )
-            )
-
         if only in {"all", "dishes"}:
-            dish_stats = self._sync_dishes(
+            groups.append(("Pratos", "dish", Dish, DISH_QUERY_HINTS))
+
+        for label, kind, model, query_hints in groups:
+            queryset = model.objects.all().order_by("name")
+            if limit > 0:
+                queryset = queryset[:limit]
+            stats = self._sync_group(
+                entities=list(queryset),
+                kind=kind,
+                query_hints=query_hints,
                 force=force,
                 dry_run=dry_run,
-                timeout=timeout,
-                limit=limit,
+                workers=workers,
             )
             self.stdout.write(
                 self.style.SUCCESS(
-                    "Pratos -> "
-                    f"atualizados={dish_stats['updated']} "
-                    f"ignorados={dish_stats['skipped']} "
-                    f"falhas={dish_stats['failed']}"
+                    f"{label} -> "
+                    f"atualizados={stats['updated']} "
+                    f"ignorados={stats['skipped']} "
+                    f"falhas={stats['failed']}"
                 )
             )
 
         self.stdout.write(self.style.SUCCESS("Sincronizacao de fotos finalizada."))
 
-    def _sync_ingredients(
+    def _load_checkpoint(self, *, path: str, reset: bool) -> PhotoSyncCheckpoint | None:
+        if not path:
+            if reset:
+                raise CommandError("--reset-checkpoint exige --checkpoint.")
+            return None
+        try:
+            checkpoint = PhotoSyncCheckpoint(path)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Checkpoint invalido ({path}): {exc}") from exc
+        if reset:
+            checkpoint.reset()
+        return checkpoint
+
+    def _sync_group(
         self,
         *,
+        entities: list[Ingredient | Dish],
+        kind: str,
+        query_hints: dict[str, str],
         force: bool,
         dry_run: bool,
-        timeout: int,
-        limit: int,
+        workers: int,
     ) -> dict[str, int]:
-        queryset = Ingredient.objects.all().order_by("name")
-        if limit > 0:
-            queryset = queryset[:limit]
-
         stats = {"updated": 0, "skipped": 0, "failed": 0}
-        for ingredient in queryset:
-            updated = self._sync_entity_image(
-                entity=ingredient,
-                kind="ingredient",
-                query_hints=INGREDIENT_QUERY_HINTS,
-                force=force,
-                dry_run=dry_run,
-                timeout=timeout,
-            )
-            if updated is True:
-                stats["updated"] += 1
-            elif updated is None:
+        pending = []
+        for entity in entities:
+            if entity.image and not force:
+                self.stdout.write(
+                    f"[skip] {kind}#{entity.id} {entity.name}: imagem ja existe."
+                )
                 stats["skipped"] += 1
-            else:
-                stats["failed"] += 1
-        return stats
-
-    def _sync_dishes(
-        self,
-        *,
-        force: bool,
-        dry_run: bool,
-        timeout: int,
-        limit: int,
-    ) -> dict[str, int]:
-        queryset = Dish.objects.all().order_by("name")
-        if limit > 0:
-            queryset = queryset[:limit]
-
-        stats = {"updated": 0, "skipped": 0, "failed": 0}
-        for dish in queryset:
-            updated = self._sync_entity_image(
-                entity=dish,
-                kind="dish",
-                query_hints=DISH_QUERY_HINTS,
-                force=force,
-                dry_run=dry_run,
-                timeout=timeout,
-            )
-            if updated is True:
-                stats["updated"] += 1
-            elif updated is None:
+                continue
+            checkpoint_key = PhotoSyncCheckpoint.build_key(kind, entity.id)
+            if (
+                self._checkpoint
+                and self._checkpoint.get(checkpoint_key) == CHECKPOINT_DONE_STATUS
+            ):
+                self.stdout.write(
+                    f"[skip] {kind}#{entity.id} {entity.name}: "
+                    "concluido em execucao anterior (checkpoint)."
+                )
                 stats["skipped"] += 1
-            else:
-                stats["failed"] += 1
+                continue
+            pending.append(entity)
+
+        if not pending:
+            return stats
+
+        # Threads so fazem rede/disco; banco e saida ficam na thread principal.
+        with ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="catalog-photo-sync",
+        ) as executor:
+            futures = {
+                executor.submit(
+                    self._resolve_entity_image,
+                    name=entity.name,
+                    kind=kind,
+                    query_hints=query_hints,
+                ): entity
+                for entity in pending
+            }
+            for future in as_completed(futures):
+                entity = futures[future]
+                try:
+                    resolution = future.result()
+                    applied = self._apply_resolution(
+                        entity=entity,
+                        kind=kind,
+                        resolution=resolution,
+                        dry_run=dry_run,
+                    )
+                except Exception as exc:
+                    self.stdout.write(
+                        self.style.ERROR(
+                            f"[fail] {kind}#{entity.id} {entity.name}: {exc}"
+                        )
+                    )
+                    stats["failed"] += 1
+                    continue
+                stats["updated" if applied else "failed"] += 1
         return stats
 
-    def _sync_entity_image(
+    def _resolve_entity_image(
         self,
         *,
-        entity: Ingredient | Dish,
+        name: str,
         kind: str,
         query_hints: dict[str, str],
-        force: bool,
-        dry_run: bool,
-        timeout: int,
-    ) -> bool | None:
-        if entity.image and not force:
-            self.stdout.write(
-                f"[skip] {kind}#{entity.id} {entity.name}: imagem ja existe."
+    ) -> PhotoResolution:
+        search_query = self._build_search_query(name, query_hints, kind=kind)
+        if self._local_index is not None:
+            return self._resolve_local_image(
+                name=name,
+                kind=kind,
+                search_query=search_query,
             )
-            return None
 
-        search_query = self._build_search_query(entity.name, query_hints, kind=kind)
+        resolution = PhotoResolution()
         try:
             candidates = self._search_commons_candidates(
                 query=search_query,
-                timeout=timeout,
+                timeout=self._timeout,
             )
         except CommandError as exc:
-            self.stdout.write(
-                self.style.ERROR(
-                    f"[fail] {kind}#{entity.id} {entity.name}: erro de busca ({exc})."
-                )
-            )
+            resolution.messages.append(("ERROR", "fail", f"erro de busca ({exc})."))
             candidates = []
 
-        fallback_url = self._resolve_fallback_image_url(name=entity.name, kind=kind)
+        fallback_url = self._resolve_fallback_image_url(name=name, kind=kind)
         if fallback_url:
             candidates.append(ImageCandidate(url=fallback_url, mime="image/jpeg"))
 
         if not candidates:
-            self.stdout.write(
-                self.style.WARNING(
-                    f"[warn] {kind}#{entity.id} {entity.name}: sem candidatos de busca."
-                )
-            )
+            resolution.messages.append(("WARNING", "warn", "sem candidatos de busca."))
 
         for candidate in candidates:
             try:
-                image_bytes, extension = self._download_image(
+                resolution.image_bytes, resolution.extension = self._download_image(
                     image_url=candidate.url,
                     mime=candidate.mime,
-                    timeout=timeout,
+                    timeout=self._timeout,
                 )
             except CommandError:
                 continue
+            return resolution
 
-            if dry_run:
-                self.stdout.write(
-                    self.style.NOTICE(
-                        f"[dry-run] {kind}#{entity.id} "
-                        f"{entity.name}: imagem encontrada."
-                    )
-                )
-                return True
+        resolution.image_bytes = None
+        resolution.extension = "svg"
+        return resolution
 
-            base_slug = slugify(entity.name) or f"{kind}-{entity.id}"
-            filename = f"catalog/{kind}s/sync/{base_slug}-{entity.id}.{extension}"
-            entity.image.save(filename, ContentFile(image_bytes), save=False)
-            entity.save(update_fields=["image", "updated_at"])
+    def _resolve_local_image(
+        self,
+        *,
+        name: str,
+        kind: str,
+        search_query: str,
+    ) -> PhotoResolution:
+        path = match_local_image(
+            self._local_index,
+            kind=kind,
+            names=[name, search_query],
+        )
+        if path is None:
+            return PhotoResolution(
+                messages=[
+                    ("WARNING", "warn", "sem arquivo correspondente na pasta local.")
+                ]
+            )
+        extension = path.suffix.lower().lstrip(".")
+        return PhotoResolution(
+            image_bytes=path.read_bytes(),
+            extension="jpg" if extension == "jpeg" else extension,
+        )
+
+    def _apply_resolution(
+        self,
+        *,
+        entity: Ingredient | Dish,
+        kind: str,
+        resolution: PhotoResolution,
+        dry_run: bool,
+    ) -> bool:
+        label = f"{kind}#{entity.id} {entity.name}"
+        for style_name, prefix, message in resolution.messages:
             self.stdout.write(
-                self.style.SUCCESS(
-                    f"[ok] {kind}#{entity.id} {entity.name}: imagem sincronizada."
-                )
+                getattr(self.style, style_name)(f"[{prefix}] {label}: {message}")
             )
-            return True
+
+        use_placeholder = resolution.image_bytes is None
+        if use_placeholder and self._local_index is not None:
+            # Offline nao aplica placeholder: a pasta pode ser parcial.
+            return False
 
         if dry_run:
-            self.stdout.write(
-                self.style.NOTICE(
-                    f"[dry-run] {kind}#{entity.id} "
-                    f"{entity.name}: usaria placeholder local."
-                )
+            outcome = (
+                "usaria placeholder local" if use_placeholder else ("imagem encontrada")
             )
+            self.stdout.write(self.style.NOTICE(f"[dry-run] {label}: {outcome}."))
             return True
 
-        placeholder_bytes = self._build_placeholder_svg(name=entity.name, kind=kind)
+        content = resolution.image_bytes
+        if use_placeholder:
+            content = self._build_placeholder_svg(name=entity.name, kind=kind)
         base_slug = slugify(entity.name) or f"{kind}-{entity.id}"
-        filename = f"catalog/{kind}s/sync/{base_slug}-{entity.id}.svg"
-        entity.image.save(filename, ContentFile(placeholder_bytes), save=False)
+        filename = (
+            f"catalog/{kind}s/sync/{base_slug}-{entity.id}.{resolution.extension}"
+        )
+        # Atribuicao sem gravar: o pipeline grava direto no endereco por
+        # conteudo (foto repetida vira referencia ao arquivo existente).
+        entity.image = ContentFile(content, name=filename)
         entity.save(update_fields=["image", "updated_at"])
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"[ok] {kind}#{entity.id} {entity.name}: " "placeholder local aplicado."
+        if self._checkpoint and not use_placeholder:
+            # Placeholder nao conta como concluido: a retomada tenta de novo.
+            self._checkpoint.mark(
+                PhotoSyncCheckpoint.build_key(kind, entity.id),
+                CHECKPOINT_DONE_STATUS,
             )
+
+        outcome = (
+            "placeholder local aplicado" if use_placeholder else ("imagem sincronizada")
         )
+        self.stdout.write(self.style.SUCCESS(f"[ok] {label}: {outcome}."))
         return True
 
     def _resolve_fallback_image_url(self, *, name: str, kind: str) -> str:
@@ -380,6 +509,11 @@ class Command(BaseCommand):
         query: str,
         timeout: int,
     ) -> list[ImageCandidate]:
+        if self._cache is not None:
+            cached = self._cache.get_search(query)
+            if cached is not None:
+                return [ImageCandidate(**item) for item in cached]
+
         params = {
             "action": "query",
             "format": "json",
@@ -408,6 +542,11 @@ class Command(BaseCommand):
 
             candidates.append(ImageCandidate(url=image_url, mime=mime))
 
+        if self._cache is not None:
+            self._cache.set_search(
+                query,
+                [{"url": item.url, "mime": item.mime} for item in candidates],
+            )
         return candidates
 
     def _download_image(
@@ -417,12 +556,18 @@ class Command(BaseCommand):
         mime: str,
         timeout: int,
     ) -> tuple[bytes, str]:
+        if self._cache is not None:
+            cached = self._cache.get_blob(image_url)
+            if cached is not None:
+                return cached
+
         request = Request(
             image_url,
             headers={
                 "User-Agent": HTTP_USER_AGENT,
             },
         )
+        self._rate_limiter.wait(image_url)
         try:
             with urlopen(request, timeout=timeout) as response:
                 image_bytes = response.read()
@@ -438,6 +583,8 @@ class Command(BaseCommand):
             image_url=image_url,
             fallback_mime=mime,
         )
+        if self._cache is not None:
+            self._cache.set_blob(image_url, image_bytes, resolved_extension)
         return image_bytes, resolved_extension
 
     def _resolve_extension(
@@ -466,6 +613,7 @@ class Command(BaseCommand):
                 "Accept": "application/json",
             },
         )
+        self._rate_limiter.wait(url)
         try:
             with urlopen(request, timeout=timeout) as response:
                 body = response.read().decode("utf-8")
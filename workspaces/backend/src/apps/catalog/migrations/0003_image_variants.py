@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0002_dish_image_ingredient_image_nutritionfact"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dish",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="ingredient",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -40,6 +40,8 @@ class Ingredient(TimeStampedModel):
         null=True,
         blank=True,
     )
+    # Manifesto das variantes responsivas (ver apps.catalog.image_variants).
+    image_variants = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ["name"]
@@ -189,6 +191,7 @@ class Dish(TimeStampedModel):
         null=True,
         blank=True,
     )
+    image_variants = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ["name"]
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.utils.text import slugify
+
+LOCAL_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".svg"}
+CHECKPOINT_VERSION = 1
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(
+        f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+class HostRateLimiter:
+    """Intervalo minimo entre requisicoes ao mesmo host, compartilhado entre
+    as threads do pool (hosts diferentes nao se bloqueiam)."""
+
+    def __init__(self, *, requests_per_second: float) -> None:
+        self.min_interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._lock = threading.Lock()
+        self._next_slot: dict[str, float] = {}
+
+    def wait(self, url: str) -> None:
+        if not self.min_interval:
+            return
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class PhotoSyncCache:
+    """Cache em disco de buscas e downloads, chaveado pelo sha256 da
+    consulta/URL. Escritas atomicas: threads e execucoes paralelas nunca
+    leem arquivo parcial."""
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def _path(self, namespace: str, key: str, suffix: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / namespace / digest[:2] / f"{digest}{suffix}"
+
+    def get_search(self, query: str) -> list[dict] | None:
+        path = self._path("search", query, ".json")
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def set_search(self, query: str, candidates: list[dict]) -> None:
+        _write_atomic(
+            self._path("search", query, ".json"),
+            json.dumps(candidates).encode("utf-8"),
+        )
+
+    def get_blob(self, url: str) -> tuple[bytes, str] | None:
+        meta_path = self._path("blobs", url, ".json")
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            content = self._path("blobs", url, ".bin").read_bytes()
+        except (OSError, ValueError):
+            return None
+        return content, str(meta.get("extension", ""))
+
+    def set_blob(self, url: str, content: bytes, extension: str) -> None:
+        # Conteudo antes dos metadados: metadado presente implica blob completo.
+        _write_atomic(self._path("blobs", url, ".bin"), content)
+        _write_atomic(
+            self._path("blobs", url, ".json"),
+            json.dumps({"url": url, "extension": extension}).encode("utf-8"),
+        )
+
+
+class PhotoSyncCheckpoint:
+    """Registro dos itens ja concluidos, regravado a cada item, para retomar
+    uma sincronizacao interrompida. Falhas e placeholders nao sao
+    registrados."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: dict[str, str] = {}
+        if self.path.exists():
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+            if payload.get("version") != CHECKPOINT_VERSION:
+                raise ValueError("versao de checkpoint nao suportada.")
+            self._entries = dict(payload.get("entries", {}))
+
+    @staticmethod
+    def build_key(kind: str, entity_id: int) -> str:
+        return f"{kind}:{entity_id}"
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def mark(self, key: str, status: str) -> None:
+        with self._lock:
+            self._entries[key] = status
+            payload = {"version": CHECKPOINT_VERSION, "entries": self._entries}
+            _write_atomic(
+                self.path,
+                json.dumps(payload, sort_keys=True).encode("utf-8"),
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self.path.unlink(missing_ok=True)
+
+
+def index_local_images(directory: str | Path) -> dict[str, Path]:
+    """Indexa imagens por slug do nome do arquivo.
+
+    Arquivos em `dishes/` ou `ingredients/` tambem entram como
+    `<grupo>/<slug>`, com prioridade sobre a raiz na busca.
+    """
+    root = Path(directory)
+    index: dict[str, Path] = {}
+    for path in sorted(root.rglob("*")):
+        if not path.is_file() or path.suffix.lower() not in LOCAL_IMAGE_EXTENSIONS:
+            continue
+        slug = slugify(path.stem)
+        if not slug:
+            continue
+        index.setdefault(slug, path)
+        group = path.parent.name.lower()
+        if path.parent != root and group in {"dishes", "ingredients"}:
+            index[f"{group}/{slug}"] = path
+    return index
+
+
+def match_local_image(
+    index: dict[str, Path],
+    *,
+    kind: str,
+    names: list[str],
+) -> Path | None:
+    for name in names:
+        slug = slugify(name)
+        if not slug:
+            continue
+        for key in (f"{kind}s/{slug}", slug):
+            if key in index:
+                return index[key]
+    return None
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Callable
+from datetime import date
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import quote_etag
+
+from apps.common.cache import build_tagged_cache_key, get_cache, invalidate_cache_tags
+
+from .models import Dish, DishIngredient, Ingredient, MenuDay, MenuItem
+from .selectors import get_menu_by_date
+
+# Namespace tambem e tag: invalidar o namespace descarta todas as datas.
+PUBLIC_MENU_CACHE_NAMESPACE = "catalog-public-menu"
+_MISSING = object()
+
+
+def _menu_date_tag(menu_date: date) -> str:
+    return f"{PUBLIC_MENU_CACHE_NAMESPACE}:{menu_date.isoformat()}"
+
+
+def _bump_public_menu_tags(menu_dates: tuple[date, ...]) -> None:
+    if menu_dates:
+        invalidate_cache_tags(*(_menu_date_tag(value) for value in menu_dates))
+    else:
+        invalidate_cache_tags(PUBLIC_MENU_CACHE_NAMESPACE)
+
+
+def invalidate_public_menu_cache(*menu_dates: date) -> None:
+    """Descarta o cardapio publico das datas informadas (sem datas: todas).
+
+    Segundo bump apos commit descarta documentos montados por outros
+    workers antes da escrita ficar visivel.
+    """
+    menu_dates = tuple(dict.fromkeys(value for value in menu_dates if value))
+    _bump_public_menu_tags(menu_dates)
+    transaction.on_commit(lambda: _bump_public_menu_tags(menu_dates))
+
+
+def _build_menu_document(menu: MenuDay | None, data: dict | None) -> dict:
+    if menu is None:
+        return {"data": None, "etag": None, "last_modified": None}
+
+    timestamps = [menu.updated_at]
+    timestamps.extend(item.dish.updated_at for item in menu.items.all())
+    content = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    return {
+        "data": data,
+        "etag": hashlib.sha256(content).hexdigest(),
+        "last_modified": int(max(timestamps).timestamp()),
+    }
+
+
+def get_cached_public_menu(
+    menu_date: date,
+    *,
+    base_url: str,
+    serialize: Callable[[MenuDay], dict],
+) -> dict:
+    """Cardapio publico serializado da data, com digest e Last-Modified.
+
+    `base_url` entra na chave porque as URLs de imagem sao absolutas.
+    Dentro de transacao a leitura pode refletir escritas nao confirmadas,
+    entao o cache so e usado/gravado fora de atomic. Datas sem cardapio
+    tambem ficam em cache (`data=None`).
+    """
+    cache_key = None
+    if not transaction.get_connection().in_atomic_block:
+        cache_key = build_tagged_cache_key(
+            PUBLIC_MENU_CACHE_NAMESPACE,
+            menu_date,
+            base_url,
+            tags=[_menu_date_tag(menu_date)],
+        )
+        document = get_cache().get(cache_key, _MISSING)
+        if document is not _MISSING:
+            return document
+
+    menu = get_menu_by_date(menu_date)
+    document = _build_menu_document(
+        menu,
+        dict(serialize(menu)) if menu is not None else None,
+    )
+    if cache_key is not None:
+        get_cache().set(
+            cache_key,
+            document,
+            timeout=settings.CATALOG_PUBLIC_MENU_CACHE_TIMEOUT_SECONDS,
+        )
+    return document
+
+
+def build_remaining_capacity_overlay(menu_data: dict) -> dict[str, int]:
+    """Saldo atual por item limitado, consultado a cada requisicao.
+
+    Muda a cada pedido, entao fica fora do documento em cache (uma
+    agregacao leve sobre os shards de capacidade).
+    """
+    from apps.orders.selectors import get_menu_day_capacity
+
+    visible_item_ids = {item["id"] for item in menu_data.get("menu_items", [])}
+    return {
+        str(row["menu_item_id"]): row["remaining_qty"]
+        for row in get_menu_day_capacity(menu_data["id"])
+        if row["menu_item_id"] in visible_item_ids and row["remaining_qty"] is not None
+    }
+
+
+def build_public_menu_etag(document: dict, overlay: dict[str, int]) -> str:
+    if not overlay:
+        return quote_etag(document["etag"])
+    overlay_content = json.dumps(overlay, sort_keys=True)
+    digest = hashlib.sha256(f"{document['etag']}:{overlay_content}".encode())
+    return quote_etag(digest.hexdigest())
+
+
+def _handle_menu_day_change(sender, instance, **kwargs) -> None:
+    if kwargs.get("raw"):
+        return
+    invalidate_public_menu_cache(instance.menu_date)
+
+
+def _handle_menu_item_change(sender, instance, **kwargs) -> None:
+    if kwargs.get("raw"):
+        return
+    menu_date = (
+        MenuDay.objects.filter(pk=instance.menu_day_id)
+        .values_list("menu_date", flat=True)
+        .first()
+    )
+    if menu_date is not None:
+        # MenuDay removido: o handler do proprio MenuDay invalida a data.
+        invalidate_public_menu_cache(menu_date)
+
+
+def _handle_dish_change(sender, **kwargs) -> None:
+    if kwargs.get("raw"):
+        return
+    # Prato/insumo pode estar em qualquer data: invalida todas.
+    invalidate_public_menu_cache()
+
+
+def register_public_menu_cache_signals() -> None:
+    handlers = (
+        (MenuDay, _handle_menu_day_change),
+        (MenuItem, _handle_menu_item_change),
+        (Dish, _handle_dish_change),
+        (DishIngredient, _handle_dish_change),
+        (Ingredient, _handle_dish_change),
+    )
+    for model, handler in handlers:
+        for signal_name, model_signal in (
+            ("save", post_save),
+            ("delete", post_delete),
+        ):
+            model_signal.connect(
+                handler,
+                sender=model,
+                weak=False,
+                dispatch_uid=(
+                    f"mrq-catalog-public-menu:{signal_name}:"
+                    f"{model._meta.label_lower}"
+                ),
+            )
@@ -2,6 +2,8 @@ from decimal import Decimal
 
 from rest_framework import serializers
 
+from apps.shared.image_derivatives import DERIVATIVE_FORMATS
+
 from .models import (
     Dish,
     DishIngredient,
@@ -23,6 +25,36 @@ def build_media_url(*, request, file_field) -> str | None:
     return request.build_absolute_uri(file_field.url)
 
 
+def build_image_sources(*, request, file_field, manifest: dict | None) -> list[dict]:
+    """Fontes `<picture>` (srcset por formato) a partir do manifesto.
+
+    Manifesto de outra imagem (variantes ainda sendo geradas) e ignorado; o
+    cliente usa `image_url` ate o job terminar.
+    """
+    if not file_field or (manifest or {}).get("source") != file_field.name:
+        return []
+
+    sources = []
+    for format_name, variants in manifest.get("formats", {}).items():
+        if not variants or format_name not in DERIVATIVE_FORMATS:
+            continue
+        candidates = []
+        for variant in variants:
+            url = file_field.storage.url(variant["name"])
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            candidates.append(f"{url} {variant['width']}w")
+        sources.append(
+            {
+                "format": format_name,
+                "type": DERIVATIVE_FORMATS[format_name]["mime"],
+                "srcset": ", ".join(candidates),
+                "widths": [variant["width"] for variant in variants],
+            }
+        )
+    return sources
+
+
 class NutritionFactSerializer(serializers.ModelSerializer):
     class Meta:
         model = NutritionFact
@@ -52,6 +84,7 @@ class NutritionFactSerializer(serializers.ModelSerializer):
 
 class IngredientSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_sources = serializers.SerializerMethodField()
     nutrition_fact = NutritionFactSerializer(read_only=True)
 
     class Meta:
@@ -63,11 +96,18 @@ class IngredientSerializer(serializers.ModelSerializer):
             "is_active",
             "image",
             "image_url",
+            "image_sources",
             "nutrition_fact",
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["id", "image_url", "created_at", "updated_at"]
+        read_only_fields = [
+            "id",
+            "image_url",
+            "image_sources",
+            "created_at",
+            "updated_at",
+        ]
 
     def validate_name(self, value: str) -> str:
         normalized = normalize_catalog_name(value)
@@ -84,6 +124,13 @@ class IngredientSerializer(serializers.ModelSerializer):
             request=self.context.get("request"), file_field=obj.image
         )
 
+    def get_image_sources(self, obj: Ingredient) -> list[dict]:
+        return build_image_sources(
+            request=self.context.get("request"),
+            file_field=obj.image,
+            manifest=obj.image_variants,
+        )
+
 
 class DishIngredientReadSerializer(serializers.ModelSerializer):
     ingredient = IngredientSerializer(read_only=True)
@@ -107,6 +154,7 @@ class DishIngredientWriteSerializer(serializers.Serializer):
 
 class DishSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_sources = serializers.SerializerMethodField()
     ingredients = DishIngredientWriteSerializer(
         many=True, write_only=True, required=False
     )
@@ -125,6 +173,7 @@ class DishSerializer(serializers.ModelSerializer):
             "yield_portions",
             "image",
             "image_url",
+            "image_sources",
             "created_at",
             "updated_at",
             "ingredients",
@@ -133,6 +182,7 @@ class DishSerializer(serializers.ModelSerializer):
         read_only_fields = [
             "id",
             "image_url",
+            "image_sources",
             "created_at",
             "updated_at",
             "composition",
@@ -159,9 +209,17 @@ class DishSerializer(serializers.ModelSerializer):
             request=self.context.get("request"), file_field=obj.image
         )
 
+    def get_image_sources(self, obj: Dish) -> list[dict]:
+        return build_image_sources(
+            request=self.context.get("request"),
+            file_field=obj.image,
+            manifest=obj.image_variants,
+        )
+
 
 class DishSummarySerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_sources = serializers.SerializerMethodField()
     composition = DishIngredientReadSerializer(
         source="dish_ingredients",
         many=True,
@@ -170,13 +228,27 @@ class DishSummarySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Dish
-        fields = ["id", "name", "yield_portions", "image_url", "composition"]
+        fields = [
+            "id",
+            "name",
+            "yield_portions",
+            "image_url",
+            "image_sources",
+            "composition",
+        ]
 
     def get_image_url(self, obj: Dish) -> str | None:
         return build_media_url(
             request=self.context.get("request"), file_field=obj.image
         )
 
+    def get_image_sources(self, obj: Dish) -> list[dict]:
+        return build_image_sources(
+            request=self.context.get("request"),
+            file_field=obj.image,
+            manifest=obj.image_variants,
+        )
+
 
 class MenuItemReadSerializer(serializers.ModelSerializer):
     dish = DishSummarySerializer(read_only=True)
@@ -5,6 +5,7 @@ from django.core.exceptions import ValidationError
 from django.db import transaction
 
 from .models import Dish, DishIngredient, MenuDay, MenuItem
+from .public_menu import invalidate_public_menu_cache
 
 
 def _assert_unique_ingredients_payload(ingredients_payload: list[dict]) -> None:
@@ -37,6 +38,7 @@ def _replace_dish_ingredients(dish: Dish, ingredients_payload: list[dict]) -> No
             for item in ingredients_payload
         ]
     )
+    invalidate_public_menu_cache()
 
 
 @transaction.atomic
@@ -81,6 +83,8 @@ def _replace_menu_items(menu_day: MenuDay, items_payload: list[dict]) -> None:
             for item in items_payload
         ]
     )
+    # bulk_create/delete nao disparam sinais de MenuItem.
+    invalidate_public_menu_cache(menu_day.menu_date)
 
 
 @transaction.atomic
@@ -97,6 +101,9 @@ def set_menu_for_day(
             menu_date=menu_date,
             defaults={"title": title, "created_by": created_by},
         )
+    elif menu_day.menu_date != menu_date:
+        # O save invalida a data nova; a antiga tambem deixa de ter cardapio.
+        invalidate_public_menu_cache(menu_day.menu_date)
 
     menu_day.menu_date = menu_date
     menu_day.title = title
@@ -1,5 +1,10 @@
+from datetime import date
+
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError as DRFValidationError
@@ -15,7 +20,12 @@ from apps.accounts.permissions import (
 )
 
 from .models import Dish, Ingredient, MenuDay
-from .selectors import get_menu_by_date, list_active_ingredients
+from .public_menu import (
+    build_public_menu_etag,
+    build_remaining_capacity_overlay,
+    get_cached_public_menu,
+)
+from .selectors import list_active_ingredients
 from .serializers import DishSerializer, IngredientSerializer, MenuDaySerializer
 from .services import (
     create_dish_with_ingredients,
@@ -216,20 +226,46 @@ class MenuDayViewSet(viewsets.ModelViewSet):
         methods=["get"],
         url_path=r"by-date/(?P<menu_date>\d{4}-\d{2}-\d{2})",
     )
-    def by_date(self, _request, menu_date: str):
+    def by_date(self, request, menu_date: str):
         try:
-            menu = get_menu_by_date(menu_date)
+            parsed_date = date.fromisoformat(menu_date)
         except ValueError as exc:
             raise DRFValidationError(["Data de cardapio invalida."]) from exc
 
-        if menu is None:
+        document = get_cached_public_menu(
+            parsed_date,
+            base_url=request.build_absolute_uri("/"),
+            serialize=lambda menu: self.get_serializer(menu).data,
+        )
+        if document["data"] is None:
             return Response(
                 {"detail": "Cardapio nao encontrado para a data informada."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        output = self.get_serializer(menu)
-        return Response(output.data)
+        remaining_capacity = build_remaining_capacity_overlay(document["data"])
+        etag = build_public_menu_etag(document, remaining_capacity)
+        # Saldo nao tem data de alteracao: com itens limitados so o ETag valida.
+        last_modified = None if remaining_capacity else document["last_modified"]
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        if response is None:
+            response = Response(
+                {**document["data"], "remaining_capacity": remaining_capacity}
+            )
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.CATALOG_PUBLIC_MENU_CACHE_MAX_AGE_SECONDS,
+            stale_while_revalidate=settings.CATALOG_PUBLIC_MENU_CACHE_STALE_SECONDS,
+        )
+        return response
 
     @action(
         detail=False,
@@ -0,0 +1,150 @@
+import hashlib
+import re
+import uuid
+from collections.abc import Callable, Iterable
+from datetime import date, datetime
+from functools import wraps
+from typing import Any
+
+from django.core.cache import caches
+
+CACHE_KEY_MAX_LENGTH = 200
+CACHE_TAG_NAMESPACE = "tag"
+_SAFE_KEY_PART_RE = re.compile(r"^[A-Za-z0-9._-]*$")
+_MISSING = object()
+
+
+def get_cache(alias: str = "default"):
+    return caches[alias]
+
+
+def _stringify_key_part(value: object) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], str):
+        return f"{value[0]}={_stringify_key_part(value[1])}"
+    meta = getattr(value, "_meta", None)
+    if meta is not None and hasattr(value, "pk"):
+        return f"{meta.label_lower}#{value.pk}"
+    return str(value)
+
+
+def cache_key(namespace: str, *parts: object) -> str:
+    """Monta chave estavel `<namespace>:<partes>`; partes longas viram sha256."""
+    normalized_namespace = str(namespace).strip().strip(":")
+    if not normalized_namespace:
+        raise ValueError("namespace de cache e obrigatorio.")
+
+    string_parts = [_stringify_key_part(part) for part in parts]
+    readable_key = ":".join([normalized_namespace, *string_parts])
+    if len(readable_key) <= CACHE_KEY_MAX_LENGTH and all(
+        _SAFE_KEY_PART_RE.match(part) for part in string_parts
+    ):
+        return readable_key
+
+    digest = hashlib.sha256("\x1f".join(string_parts).encode("utf-8")).hexdigest()
+    return f"{normalized_namespace}:h:{digest}"
+
+
+def _tag_key(tag: str) -> str:
+    return cache_key(CACHE_TAG_NAMESPACE, tag)
+
+
+def get_cache_tag_versions(
+    tags: Iterable[str],
+    *,
+    alias: str = "default",
+) -> dict[str, str]:
+    backend = get_cache(alias)
+    tag_list = list(dict.fromkeys(str(tag) for tag in tags))
+    if not tag_list:
+        return {}
+
+    keys_by_tag = {tag: _tag_key(tag) for tag in tag_list}
+    stored = backend.get_many(list(keys_by_tag.values()))
+
+    versions: dict[str, str] = {}
+    for tag, key in keys_by_tag.items():
+        version = stored.get(key)
+        if version is None:
+            # `add` preserva a versao criada em paralelo por outro worker.
+            backend.add(key, uuid.uuid4().hex, timeout=None)
+            version = backend.get(key)
+        versions[tag] = str(version)
+    return versions
+
+
+def get_cache_tag_version(tag: str, *, alias: str = "default") -> str:
+    return get_cache_tag_versions([tag], alias=alias)[str(tag)]
+
+
+def invalidate_cache_tags(*tags: str, alias: str = "default") -> dict[str, str]:
+    """Troca a versao das tags; entradas antigas ficam inalcancaveis e expiram."""
+    backend = get_cache(alias)
+    versions = {str(tag): uuid.uuid4().hex for tag in tags}
+    if versions:
+        backend.set_many(
+            {_tag_key(tag): version for tag, version in versions.items()},
+            timeout=None,
+        )
+    return versions
+
+
+def build_tagged_cache_key(
+    namespace: str,
+    *parts: object,
+    tags: Iterable[str] = (),
+    alias: str = "default",
+) -> str:
+    tag_versions = get_cache_tag_versions([namespace, *tags], alias=alias)
+    return cache_key(
+        namespace,
+        *parts,
+        *(f"{tag}@{version}" for tag, version in sorted(tag_versions.items())),
+    )
+
+
+def cached_selector(
+    namespace: str,
+    *,
+    timeout: int | None = 300,
+    tags: Iterable[str] = (),
+    alias: str = "default",
+) -> Callable:
+    """Decorator read-through para selectors puros.
+
+    A chave combina argumentos e versoes das tags (o proprio namespace e
+    sempre uma tag), entao `invalidate_cache_tags(namespace)` descarta todas
+    as entradas do selector em todos os workers que compartilham o cache.
+    """
+    selector_tags = tuple(tags)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any):
+            key = build_tagged_cache_key(
+                namespace,
+                *args,
+                *sorted(kwargs.items()),
+                tags=selector_tags,
+                alias=alias,
+            )
+            backend = get_cache(alias)
+            cached_value = backend.get(key, _MISSING)
+            if cached_value is not _MISSING:
+                return cached_value
+
+            value = func(*args, **kwargs)
+            backend.set(key, value, timeout=timeout)
+            return value
+
+        def invalidate() -> None:
+            invalidate_cache_tags(namespace, alias=alias)
+
+        wrapper.invalidate = invalidate
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
@@ -0,0 +1,414 @@
+import http.client
+import json
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+# Erros de conexao reaproveitada que o servidor fechou por inatividade.
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+LATENCY_WINDOW_SIZE = 200
+
+
+class HttpClientError(Exception):
+    pass
+
+
+class HttpConnectionError(HttpClientError):
+    pass
+
+
+class HttpStatusError(HttpClientError):
+    def __init__(self, *, status: int, reason: str, body: str) -> None:
+        super().__init__(f"HTTP {status}: {body or reason}")
+        self.status = status
+        self.reason = reason
+        self.body = body
+
+
+class HttpResponseDecodeError(HttpClientError):
+    pass
+
+
+class CircuitOpenError(HttpClientError):
+    pass
+
+
+class CircuitState:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Breaker por chave: abre apos N falhas seguidas e libera uma unica
+    requisicao de prova (half-open) depois de `reset_seconds`."""
+
+    def __init__(self, *, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = reset_seconds
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    return False
+                self.state = CircuitState.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if (
+                self.state == CircuitState.HALF_OPEN
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = CircuitState.OPEN
+                self.opened_at = time.monotonic()
+
+
+@dataclass
+class HttpClientMetrics:
+    """Contadores por chave; o lock evita perder incrementos entre threads."""
+
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    short_circuited: int = 0
+    latencies_ms: deque = field(
+        default_factory=lambda: deque(maxlen=LATENCY_WINDOW_SIZE)
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock,
+        repr=False,
+        compare=False,
+    )
+
+    def record_attempt(self, *, retry: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            if retry:
+                self.retries += 1
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def record_short_circuit(self) -> None:
+        with self._lock:
+            self.short_circuited += 1
+
+    def record_latency(self, latency_ms: float) -> None:
+        with self._lock:
+            self.latencies_ms.append(latency_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            ordered = sorted(self.latencies_ms)
+            counters = {
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "short_circuited": self.short_circuited,
+            }
+        p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] if ordered else 0
+        return {
+            **counters,
+            "latency_avg_ms": round(sum(ordered) / len(ordered), 2) if ordered else 0,
+            "latency_p95_ms": round(p95, 2),
+        }
+
+
+_RETRY_STATE = threading.local()
+
+
+@contextmanager
+def disable_http_retries():
+    """Desliga retries nesta thread, mesmo com `X-Idempotency-Key`.
+
+    Para chamadas feitas com lock de banco seguro: cada retry (com backoff)
+    estenderia o tempo em que a linha fica travada.
+    """
+    previous = getattr(_RETRY_STATE, "disabled", False)
+    _RETRY_STATE.disabled = True
+    try:
+        yield
+    finally:
+        _RETRY_STATE.disabled = previous
+
+
+class HostConnectionPool:
+    """Pool LIFO de conexoes keep-alive por (scheme, host, port)."""
+
+    def __init__(self, *, maxsize: int) -> None:
+        self.maxsize = max(maxsize, 1)
+        self._idle: dict[tuple[str, str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def acquire(
+        self,
+        *,
+        scheme: str,
+        host: str,
+        port: int,
+        timeout: float,
+        reuse: bool = True,
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        key = (scheme, host, port)
+        connection = None
+        if reuse:
+            with self._lock:
+                idle = self._idle.get(key)
+                connection = idle.pop() if idle else None
+
+        if connection is not None:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            return connection, True
+
+        connection_cls = (
+            http.client.HTTPSConnection
+            if scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return connection_cls(host, port, timeout=timeout), False
+
+    def release(self, *, scheme: str, host: str, port: int, connection) -> None:
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            connections = [conn for idle in self._idle.values() for conn in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+
+class PooledHttpClient:
+    def __init__(
+        self,
+        *,
+        timeout_seconds: float,
+        max_retries: int,
+        retry_backoff_seconds: float,
+        pool_maxsize: int,
+        failure_threshold: int,
+        reset_seconds: float,
+    ) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max(max_retries, 0)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.pool = HostConnectionPool(maxsize=pool_maxsize)
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._metrics: dict[str, HttpClientMetrics] = {}
+        self._registry_lock = threading.Lock()
+
+    def get_breaker(self, key: str) -> CircuitBreaker:
+        with self._registry_lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    failure_threshold=self.failure_threshold,
+                    reset_seconds=self.reset_seconds,
+                )
+                self._breakers[key] = breaker
+            return breaker
+
+    def _get_metrics(self, key: str) -> HttpClientMetrics:
+        with self._registry_lock:
+            return self._metrics.setdefault(key, HttpClientMetrics())
+
+    def get_metrics(self) -> dict[str, dict]:
+        with self._registry_lock:
+            keys = sorted(set(self._metrics) | set(self._breakers))
+        return {
+            key: {
+                **self._get_metrics(key).snapshot(),
+                "circuit_state": self.get_breaker(key).state,
+            }
+            for key in keys
+        }
+
+    def _send_once(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes | None,
+        timeout: float,
+        idempotent: bool,
+    ) -> tuple[int, str, bytes]:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        for fresh_attempt in (False, True):
+            connection, reused = self.pool.acquire(
+                scheme=scheme,
+                host=host,
+                port=port,
+                timeout=timeout,
+                reuse=not fresh_attempt,
+            )
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                payload = response.read()
+            except STALE_CONNECTION_ERRORS as exc:
+                connection.close()
+                # Reenvio em conexao nova so para chamadas idempotentes: um
+                # POST pode ter chegado ao servidor antes da conexao cair.
+                if reused and not fresh_attempt and idempotent:
+                    continue
+                raise HttpConnectionError(str(exc)) from exc
+            except (OSError, http.client.HTTPException) as exc:
+                connection.close()
+                raise HttpConnectionError(str(exc)) from exc
+
+            if response.will_close:
+                connection.close()
+            else:
+                self.pool.release(
+                    scheme=scheme,
+                    host=host,
+                    port=port,
+                    connection=connection,
+                )
+            return response.status, response.reason, payload
+
+        raise HttpConnectionError("Conexao encerrada pelo servidor.")
+
+    def _compute_backoff(self, attempt: int) -> float:
+        ceiling = self.retry_backoff_seconds * (2**attempt)
+        return random.uniform(0, ceiling)
+
+    def request_json(
+        self,
+        *,
+        key: str,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None = None,
+        payload: dict | None = None,
+        timeout_seconds: float | None = None,
+        idempotent: bool | None = None,
+    ) -> dict:
+        """Requisicao JSON com pool, retries limitados e circuit breaker.
+
+        Retries (com jitter) so acontecem para chamadas idempotentes: metodos
+        seguros ou requisicoes com `X-Idempotency-Key`.
+        """
+        normalized_method = method.upper()
+        request_headers = dict(headers or {})
+        body: bytes | None = None
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            request_headers["Content-Type"] = "application/json"
+        request_headers.setdefault("Connection", "keep-alive")
+
+        if idempotent is None:
+            idempotent = normalized_method in IDEMPOTENT_METHODS or any(
+                header.lower() == "x-idempotency-key" for header in request_headers
+            )
+        retries_enabled = idempotent and not getattr(_RETRY_STATE, "disabled", False)
+        max_attempts = 1 + (self.max_retries if retries_enabled else 0)
+        timeout = timeout_seconds or self.timeout_seconds
+        breaker = self.get_breaker(key)
+        metrics = self._get_metrics(key)
+
+        # Breaker conta uma falha por chamada logica, nao por tentativa.
+        if not breaker.allow_request():
+            metrics.record_short_circuit()
+            raise CircuitOpenError(f"Circuit breaker aberto para {key}.")
+
+        provider_failed = True
+        try:
+            for attempt in range(max_attempts):
+                metrics.record_attempt(retry=bool(attempt))
+                started_at = time.monotonic()
+                try:
+                    status, reason, raw_body = self._send_once(
+                        method=normalized_method,
+                        url=url,
+                        headers=request_headers,
+                        body=body,
+                        timeout=timeout,
+                        idempotent=idempotent,
+                    )
+                except HttpConnectionError:
+                    metrics.record_error()
+                    if attempt + 1 >= max_attempts:
+                        raise
+                    time.sleep(self._compute_backoff(attempt))
+                    continue
+                finally:
+                    metrics.record_latency((time.monotonic() - started_at) * 1000)
+
+                if status >= 500 or status == 429:
+                    metrics.record_error()
+                    if status in RETRYABLE_STATUS_CODES and attempt + 1 < max_attempts:
+                        time.sleep(self._compute_backoff(attempt))
+                        continue
+                else:
+                    # 4xx e erro do cliente, nao indisponibilidade do provider.
+                    provider_failed = False
+
+                text_body = raw_body.decode("utf-8", errors="replace").strip()
+                if status >= 400:
+                    raise HttpStatusError(status=status, reason=reason, body=text_body)
+                if not text_body:
+                    return {}
+                try:
+                    return json.loads(text_body)
+                except json.JSONDecodeError as exc:
+                    raise HttpResponseDecodeError(text_body[:200]) from exc
+
+            raise HttpConnectionError(f"Falha ao contatar {key}.")
+        finally:
+            if provider_failed:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
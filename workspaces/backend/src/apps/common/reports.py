@@ -1,5 +1,6 @@
 from datetime import date
 
+from django.core.management.base import CommandError
 from rest_framework.exceptions import ValidationError as DRFValidationError
 
 
@@ -27,3 +28,25 @@ def parse_period(*, from_raw: str | None, to_raw: str | None) -> tuple[date, dat
         )
 
     return from_date, to_date
+
+
+def parse_optional_period(
+    *,
+    from_raw: str | None,
+    to_raw: str | None,
+) -> tuple[date | None, date | None]:
+    """Periodo opcional de `--from`/`--to` dos comandos de recalculo."""
+    from_date = _parse_date_option(from_raw, option_name="--from")
+    to_date = _parse_date_option(to_raw, option_name="--to")
+    if from_date and to_date and from_date > to_date:
+        raise CommandError("--from deve ser menor ou igual a --to.")
+    return from_date, to_date
+
+
+def _parse_date_option(value: str | None, *, option_name: str) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise CommandError(f"{option_name} deve estar no formato YYYY-MM-DD.") from exc
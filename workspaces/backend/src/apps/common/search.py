@@ -0,0 +1,168 @@
+import base64
+import binascii
+import json
+import re
+from dataclasses import dataclass
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+from django.db.models import (
+    Case,
+    F,
+    FloatField,
+    Func,
+    GeneratedField,
+    Q,
+    QuerySet,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce
+from rest_framework.exceptions import ValidationError as DRFValidationError
+
+# Configuracao "simple": sem stemming nem stopwords, adequada a nomes,
+# caminhos e identificadores (e imutavel, exigencia de coluna gerada).
+SEARCH_CONFIG = "simple"
+SEARCH_MAX_TERMS = 8
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+_SEARCH_TERM_RE = re.compile(r"\w+", re.UNICODE)
+# Separadores de caminho/identificador viram espaco antes de indexar, para
+# que "/api/v1/orders/" gere os lexemas "api", "v1" e "orders".
+_SEPARATOR_CHARS = "/_-.@:"
+
+
+def searchable_text(field_name: str) -> Func:
+    return Func(
+        F(field_name),
+        Value(_SEPARATOR_CHARS),
+        Value(" " * len(_SEPARATOR_CHARS)),
+        function="translate",
+    )
+
+
+def build_search_vector_field(*weighted_expressions) -> GeneratedField:
+    """Coluna tsvector gerada pelo PostgreSQL a partir de (peso, expressoes)."""
+    vector = None
+    for weight, expressions in weighted_expressions:
+        part = SearchVector(*expressions, config=SEARCH_CONFIG, weight=weight)
+        vector = part if vector is None else vector + part
+    return GeneratedField(
+        expression=vector,
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+
+def build_search_query(raw_term: str) -> SearchQuery | None:
+    """Converte o termo digitado em tsquery de prefixos (`orde` acha `orders`).
+
+    Apenas caracteres de palavra chegam ao tsquery, entao operadores do
+    usuario nao quebram a consulta.
+    """
+    terms = _SEARCH_TERM_RE.findall(
+        str(raw_term or "").translate(
+            str.maketrans(_SEPARATOR_CHARS, " " * len(_SEPARATOR_CHARS))
+        )
+    )[:SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    return SearchQuery(
+        " & ".join(f"{term.lower()}:*" for term in terms),
+        config=SEARCH_CONFIG,
+        search_type="raw",
+    )
+
+
+def rank_search_results(
+    queryset: QuerySet,
+    *,
+    vector_field: str,
+    query: SearchQuery,
+    extra_match: Q | None = None,
+) -> QuerySet:
+    """Filtra pelo tsquery e anota `search_rank`.
+
+    `extra_match` (ex.: id exato) tambem seleciona a linha e a coloca acima
+    de qualquer resultado apenas textual.
+    """
+    match = Q(**{vector_field: query})
+    # ts_rank devolve real; em double precision o valor lido pelo Python volta
+    # identico no cursor e a comparacao do keyset e exata.
+    rank = Cast(
+        Coalesce(
+            SearchRank(F(vector_field), query, normalization=Value(1)),
+            Value(0.0),
+        ),
+        FloatField(),
+    )
+    if extra_match is not None:
+        match |= extra_match
+        rank = rank + Case(
+            When(extra_match, then=Value(1.0)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    return queryset.filter(match).annotate(search_rank=rank)
+
+
+@dataclass(frozen=True)
+class SearchCursor:
+    rank: float
+    pk: int
+
+
+def encode_search_cursor(cursor: SearchCursor) -> str:
+    raw = json.dumps([cursor.rank, cursor.pk], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(raw_cursor: str | None) -> SearchCursor | None:
+    if not raw_cursor:
+        return None
+    padded = raw_cursor + "=" * (-len(raw_cursor) % 4)
+    try:
+        rank, pk = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return SearchCursor(rank=float(rank), pk=int(pk))
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as exc:
+        raise DRFValidationError({"detail": "Parametro 'cursor' invalido."}) from exc
+
+
+def parse_search_limit(raw_limit) -> int:
+    try:
+        limit = int(raw_limit or SEARCH_DEFAULT_LIMIT)
+    except (TypeError, ValueError):
+        limit = SEARCH_DEFAULT_LIMIT
+    return max(1, min(limit, SEARCH_MAX_LIMIT))
+
+
+def paginate_ranked_search(
+    queryset: QuerySet,
+    *,
+    cursor: SearchCursor | None,
+    limit: int,
+) -> tuple[list, str | None]:
+    """Pagina por (search_rank desc, pk desc) sem OFFSET.
+
+    O queryset precisa da anotacao `search_rank` (ver `rank_search_results`).
+    """
+    queryset = queryset.order_by("-search_rank", "-pk")
+    if cursor is not None:
+        queryset = queryset.filter(
+            Q(search_rank__lt=cursor.rank)
+            | Q(search_rank=cursor.rank, pk__lt=cursor.pk)
+        )
+
+    rows = list(queryset[: limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_search_cursor(
+            SearchCursor(rank=float(last.search_rank), pk=last.pk)
+        )
+    return rows, next_cursor
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class FinanceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.finance"
+
+    def ready(self):
+        from apps.finance.costing import register_costing_signals
+        from apps.finance.rollups import register_finance_rollup_signals
+
+        register_costing_signals()
+        register_finance_rollup_signals()
@@ -0,0 +1,301 @@
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+
+from apps.catalog.models import DishIngredient, Ingredient, MenuDay, MenuItem
+from apps.common.cache import (
+    cache_key,
+    get_cache,
+    get_cache_tag_version,
+    invalidate_cache_tags,
+)
+from apps.orders.models import OrderItem
+from apps.procurement.models import Purchase, PurchaseItem
+
+logger = logging.getLogger(__name__)
+
+MONEY_DECIMAL_PLACES = Decimal("0.01")
+ZERO_MONEY = Decimal("0.00")
+# Versao trocada a cada escrita em compras: funciona como marca d'agua do
+# historico de compras nas chaves de custo em cache.
+INGREDIENT_COST_CACHE_TAG = "finance-ingredient-cost"
+_COST_AMOUNT_FIELD = DecimalField(max_digits=20, decimal_places=6)
+
+
+def _quantize_money(value: Decimal) -> Decimal:
+    return value.quantize(MONEY_DECIMAL_PLACES, rounding=ROUND_HALF_UP)
+
+
+def _ensure_unit_compatible(
+    *,
+    context: str,
+    expected_unit: str,
+    received_unit: str,
+) -> None:
+    if expected_unit != received_unit:
+        raise ValidationError(
+            f"Unidade incompativel em {context}: esperado "
+            f"'{expected_unit}', recebido '{received_unit}'. "
+            "TODO: implementar conversao de unidades."
+        )
+
+
+def bump_ingredient_cost_version() -> str:
+    return invalidate_cache_tags(INGREDIENT_COST_CACHE_TAG)[INGREDIENT_COST_CACHE_TAG]
+
+
+def _ingredient_cost_cache_key(
+    *,
+    version: str,
+    ingredient_id: int,
+    until_date: date | None,
+) -> str:
+    return cache_key("finance-ingredient-cost", version, ingredient_id, until_date)
+
+
+def _compute_ingredient_weighted_costs(
+    ingredient_ids: list[int],
+    until_date: date | None,
+) -> dict[int, Decimal]:
+    purchase_items = PurchaseItem.objects.filter(ingredient_id__in=ingredient_ids)
+    if until_date is not None:
+        purchase_items = purchase_items.filter(purchase__purchase_date__lte=until_date)
+
+    rows = (
+        purchase_items.values("ingredient_id")
+        .annotate(
+            total_cost=Sum(
+                F("qty") * F("unit_price")
+                + Coalesce("tax_amount", Value(Decimal("0"))),
+                output_field=_COST_AMOUNT_FIELD,
+            ),
+            total_qty=Sum("qty"),
+            incompatible_units=Count("id", filter=~Q(unit=F("ingredient__unit"))),
+        )
+        .order_by()
+    )
+
+    costs = dict.fromkeys(ingredient_ids, ZERO_MONEY)
+    for row in rows:
+        if row["incompatible_units"]:
+            item = (
+                purchase_items.filter(ingredient_id=row["ingredient_id"])
+                .exclude(unit=F("ingredient__unit"))
+                .select_related("ingredient")
+                .first()
+            )
+            _ensure_unit_compatible(
+                context=f"compra do ingrediente '{item.ingredient.name}'",
+                expected_unit=item.ingredient.unit,
+                received_unit=item.unit,
+            )
+        if row["total_qty"] and row["total_qty"] > 0:
+            costs[row["ingredient_id"]] = _quantize_money(
+                row["total_cost"] / row["total_qty"]
+            )
+    return costs
+
+
+def get_ingredient_weighted_costs(
+    ingredient_ids: Iterable[int],
+    until_date: date | None = None,
+) -> dict[int, Decimal]:
+    """Custo medio ponderado de varios ingredientes com uma consulta agrupada.
+
+    Resultados ficam em cache por ingrediente e data de corte; a chave inclui
+    a versao do historico de compras, trocada a cada escrita de compra.
+    """
+    unique_ids = sorted(set(ingredient_ids))
+    if not unique_ids:
+        return {}
+
+    backend = get_cache()
+    version = get_cache_tag_version(INGREDIENT_COST_CACHE_TAG)
+    keys = {
+        ingredient_id: _ingredient_cost_cache_key(
+            version=version,
+            ingredient_id=ingredient_id,
+            until_date=until_date,
+        )
+        for ingredient_id in unique_ids
+    }
+    cached = backend.get_many(list(keys.values()))
+    costs = {
+        ingredient_id: cached[key]
+        for ingredient_id, key in keys.items()
+        if key in cached
+    }
+
+    missing_ids = [
+        ingredient_id for ingredient_id in unique_ids if ingredient_id not in costs
+    ]
+    if missing_ids:
+        computed = _compute_ingredient_weighted_costs(missing_ids, until_date)
+        backend.set_many(
+            {keys[ingredient_id]: cost for ingredient_id, cost in computed.items()},
+            timeout=settings.FINANCE_COST_CACHE_TIMEOUT_SECONDS,
+        )
+        costs.update(computed)
+    return costs
+
+
+def get_dish_costs(
+    dish_ids: Iterable[int],
+    on_date: date | None = None,
+) -> dict[int, Decimal]:
+    unique_ids = sorted(set(dish_ids))
+    dish_ingredients = list(
+        DishIngredient.objects.filter(dish_id__in=unique_ids).select_related(
+            "dish", "ingredient"
+        )
+    )
+    for dish_ingredient in dish_ingredients:
+        _ensure_unit_compatible(
+            context=(
+                f"receita do prato '{dish_ingredient.dish.name}' com "
+                f"ingrediente '{dish_ingredient.ingredient.name}'"
+            ),
+            expected_unit=dish_ingredient.ingredient.unit,
+            received_unit=dish_ingredient.unit or dish_ingredient.ingredient.unit,
+        )
+
+    ingredient_costs = get_ingredient_weighted_costs(
+        (dish_ingredient.ingredient_id for dish_ingredient in dish_ingredients),
+        until_date=on_date,
+    )
+    totals: dict[int, Decimal] = defaultdict(lambda: Decimal("0"))
+    for dish_ingredient in dish_ingredients:
+        totals[dish_ingredient.dish_id] += (
+            dish_ingredient.quantity * ingredient_costs[dish_ingredient.ingredient_id]
+        )
+    return {dish_id: _quantize_money(totals[dish_id]) for dish_id in unique_ids}
+
+
+def _get_portion_costs(menu_items: list[MenuItem]) -> dict[int, Decimal]:
+    items_by_date: dict[date, list[MenuItem]] = defaultdict(list)
+    for menu_item in menu_items:
+        if menu_item.dish.yield_portions <= 0:
+            raise ValidationError(
+                "yield_portions do prato deve ser maior que zero para calcular custo."
+            )
+        items_by_date[menu_item.menu_day.menu_date].append(menu_item)
+
+    costs: dict[int, Decimal] = {}
+    for menu_date, day_items in items_by_date.items():
+        dish_costs = get_dish_costs(
+            (menu_item.dish_id for menu_item in day_items),
+            on_date=menu_date,
+        )
+        for menu_item in day_items:
+            costs[menu_item.id] = _quantize_money(
+                dish_costs[menu_item.dish_id] / Decimal(menu_item.dish.yield_portions)
+            )
+    return costs
+
+
+def get_menu_item_costs(menu_item_ids: Iterable[int]) -> dict[int, Decimal]:
+    """Custo por porcao de varios itens de cardapio, agrupados por data."""
+    menu_items = list(
+        MenuItem.objects.filter(pk__in=set(menu_item_ids)).select_related(
+            "dish", "menu_day"
+        )
+    )
+    return _get_portion_costs(menu_items)
+
+
+def get_menu_costs(menu_day: MenuDay) -> dict[int, Decimal]:
+    """Custo por porcao de todos os itens do cardapio do dia (por item id)."""
+    menu_items = list(
+        MenuItem.objects.filter(menu_day=menu_day).select_related("dish", "menu_day")
+    )
+    return _get_portion_costs(menu_items)
+
+
+def _get_capturable_menu_item_costs(menu_item_ids: set[int]) -> dict[int, Decimal]:
+    try:
+        return get_menu_item_costs(menu_item_ids)
+    except ValidationError:
+        pass
+
+    # Um prato com receita invalida nao deve impedir o snapshot dos demais.
+    costs: dict[int, Decimal] = {}
+    for menu_item_id in menu_item_ids:
+        try:
+            costs.update(get_menu_item_costs([menu_item_id]))
+        except ValidationError as exc:
+            logger.warning(
+                "Custo do item de cardapio %s nao capturado: %s",
+                menu_item_id,
+                "; ".join(exc.messages),
+            )
+    return costs
+
+
+def capture_order_item_costs(
+    queryset=None,
+    *,
+    overwrite: bool = False,
+    batch_size: int = 500,
+) -> int:
+    """Grava `estimated_unit_cost` nos itens de pedido do queryset.
+
+    Sem `overwrite`, apenas itens ainda sem snapshot sao preenchidos. Itens
+    cujo custo nao pode ser calculado ficam nulos (a DRE recalcula ao vivo).
+    """
+    items = OrderItem.objects.all() if queryset is None else queryset
+    if not overwrite:
+        items = items.filter(estimated_unit_cost__isnull=True)
+
+    captured = 0
+    last_id = 0
+    while True:
+        batch = list(
+            items.filter(pk__gt=last_id)
+            .order_by("pk")
+            .only("id", "menu_item_id")[:batch_size]
+        )
+        if not batch:
+            return captured
+        last_id = batch[-1].id
+
+        costs = _get_capturable_menu_item_costs({item.menu_item_id for item in batch})
+        to_update = []
+        for item in batch:
+            if item.menu_item_id in costs:
+                item.estimated_unit_cost = costs[item.menu_item_id]
+                to_update.append(item)
+        OrderItem.objects.bulk_update(to_update, ["estimated_unit_cost"])
+        captured += len(to_update)
+
+
+def _handle_cost_source_change(sender, **kwargs) -> None:
+    bump_ingredient_cost_version()
+    transaction.on_commit(bump_ingredient_cost_version)
+
+
+def register_costing_signals() -> None:
+    # Purchase: data de compra muda o corte; Ingredient: unidade muda a
+    # validacao de compatibilidade.
+    for model in (PurchaseItem, Purchase, Ingredient):
+        for signal_name, model_signal in (
+            ("save", post_save),
+            ("delete", post_delete),
+        ):
+            model_signal.connect(
+                _handle_cost_source_change,
+                sender=model,
+                weak=False,
+                dispatch_uid=(
+                    f"mrq-finance-cost-version:{signal_name}:"
+                    f"{model._meta.label_lower}"
+                ),
+            )
@@ -0,0 +1,15 @@
+from datetime import date
+
+from apps.jobs.services import register_job_handler
+
+from .rollups import REFRESH_DRE_ROLLUPS_JOB, refresh_dre_rollups
+
+
+@register_job_handler(REFRESH_DRE_ROLLUPS_JOB)
+def refresh_dre_rollups_job(payload: dict) -> dict:
+    from_date = payload.get("from_date")
+    refreshed = refresh_dre_rollups(
+        days=[date.fromisoformat(day) for day in payload.get("days", [])],
+        from_date=date.fromisoformat(from_date) if from_date else None,
+    )
+    return {"refreshed_days": refreshed}
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.common.reports import parse_optional_period
+from apps.finance.costing import capture_order_item_costs
+from apps.finance.rollups import refresh_dre_rollups
+from apps.orders.models import OrderItem, OrderStatus
+
+
+class Command(BaseCommand):
+    help = "Preenche o custo estimado (CMV) congelado nos itens de pedido."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="from_date",
+            help="Data de entrega inicial (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--to",
+            dest="to_date",
+            help="Data de entrega final (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--recompute",
+            action="store_true",
+            help="Recalcula tambem itens que ja possuem custo congelado.",
+        )
+
+    def handle(self, *args, **options):
+        from_date, to_date = parse_optional_period(
+            from_raw=options["from_date"],
+            to_raw=options["to_date"],
+        )
+
+        order_items = OrderItem.objects.exclude(order__status=OrderStatus.CANCELED)
+        if from_date is not None:
+            order_items = order_items.filter(order__delivery_date__gte=from_date)
+        if to_date is not None:
+            order_items = order_items.filter(order__delivery_date__lte=to_date)
+
+        with transaction.atomic():
+            captured = capture_order_item_costs(
+                order_items,
+                overwrite=options["recompute"],
+            )
+            # bulk_update nao dispara sinais: os dias da DRE sao atualizados aqui.
+            refreshed_days = refresh_dre_rollups(
+                days=list(
+                    order_items.filter(order__status=OrderStatus.DELIVERED)
+                    .values_list("order__delivery_date", flat=True)
+                    .distinct()
+                )
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Custos congelados com sucesso. "
+                f"Itens atualizados: {captured}. Dias de DRE: {refreshed_days}."
+            )
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from apps.common.reports import parse_optional_period
+from apps.finance.rollups import rebuild_cashflow_rollups, rebuild_dre_rollups
+
+
+class Command(BaseCommand):
+    help = "Recalcula os rollups diarios de fluxo de caixa e DRE a partir da origem."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="from_date",
+            help="Data inicial (YYYY-MM-DD). Sem valor, recalcula desde o inicio.",
+        )
+        parser.add_argument(
+            "--to",
+            dest="to_date",
+            help="Data final (YYYY-MM-DD). Sem valor, recalcula ate o fim.",
+        )
+
+    def handle(self, *args, **options):
+        from_date, to_date = parse_optional_period(
+            from_raw=options["from_date"],
+            to_raw=options["to_date"],
+        )
+
+        cash_rows = rebuild_cashflow_rollups(from_date=from_date, to_date=to_date)
+        dre_days = rebuild_dre_rollups(from_date=from_date, to_date=to_date)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Rollups recalculados com sucesso. "
+                f"Linhas de caixa: {cash_rows}. Dias de DRE: {dre_days}."
+            )
+        )
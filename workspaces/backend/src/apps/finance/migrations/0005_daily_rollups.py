@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:56
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0004_financialclose"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DreDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(unique=True)),
+                ("orders_delivered", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue_total",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+                (
+                    "expenses_total",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+                (
+                    "cmv_total",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["day"],
+            },
+        ),
+        migrations.CreateModel(
+            name="CashflowDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "direction",
+                    models.CharField(
+                        choices=[("IN", "IN"), ("OUT", "OUT")], max_length=8
+                    ),
+                ),
+                ("category", models.CharField(blank=True, default="", max_length=32)),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+                ("movements_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cashflow_rollups",
+                        to="finance.account",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["day", "account_id", "direction", "category"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "account", "direction", "category"),
+                        name="finance_cashflow_rollup_day_account_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -286,3 +286,61 @@ class LedgerEntry(models.Model):
 
     def __str__(self) -> str:
         return f"Ledger-{self.id} ({self.entry_type})"
+
+
+class CashflowDailyRollup(models.Model):
+    # Totais diarios de caixa mantidos a cada escrita de CashMovement.
+    day = models.DateField()
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.CASCADE,
+        related_name="cashflow_rollups",
+    )
+    direction = models.CharField(max_length=8, choices=CashDirection.choices)
+    category = models.CharField(max_length=32, blank=True, default="")
+    total_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+    )
+    movements_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["day", "account_id", "direction", "category"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "account", "direction", "category"],
+                name="finance_cashflow_rollup_day_account_unique",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"CashRollup-{self.day} {self.direction} ({self.total_amount})"
+
+
+class DreDailyRollup(models.Model):
+    day = models.DateField(unique=True)
+    orders_delivered = models.PositiveIntegerField(default=0)
+    revenue_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+    )
+    expenses_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+    )
+    cmv_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["day"]
+
+    def __str__(self) -> str:
+        return f"DreRollup-{self.day}"
@@ -1,35 +1,28 @@
 from datetime import date
-from decimal import ROUND_HALF_UP, Decimal
+from decimal import Decimal
 
 from django.core.exceptions import ValidationError
-from django.db.models import Sum
+from django.db.models import DecimalField, F, Q, Sum
+from django.db.models.functions import TruncDate
 
-from apps.catalog.models import Dish, MenuItem
+from apps.catalog.models import Dish
 from apps.orders.models import Order, OrderItem, OrderStatus
-from apps.procurement.models import PurchaseItem
 
-from .models import APBill, APBillStatus, CashDirection, CashMovement
-
-MONEY_DECIMAL_PLACES = Decimal("0.01")
-ZERO_MONEY = Decimal("0.00")
-
-
-def _quantize_money(value: Decimal) -> Decimal:
-    return value.quantize(MONEY_DECIMAL_PLACES, rounding=ROUND_HALF_UP)
-
-
-def _ensure_unit_compatible(
-    *,
-    context: str,
-    expected_unit: str,
-    received_unit: str,
-) -> None:
-    if expected_unit != received_unit:
-        raise ValidationError(
-            f"Unidade incompativel em {context}: esperado "
-            f"'{expected_unit}', recebido '{received_unit}'. "
-            "TODO: implementar conversao de unidades."
-        )
+from .costing import (
+    ZERO_MONEY,
+    _quantize_money,
+    get_dish_costs,
+    get_ingredient_weighted_costs,
+    get_menu_item_costs,
+)
+from .models import (
+    APBill,
+    APBillStatus,
+    CashDirection,
+    CashflowDailyRollup,
+    CashMovement,
+    DreDailyRollup,
+)
 
 
 def _sum_or_zero(value: Decimal | None) -> Decimal:
@@ -38,42 +31,59 @@ def _sum_or_zero(value: Decimal | None) -> Decimal:
     return _quantize_money(value)
 
 
-def get_cashflow(from_date: date, to_date: date) -> list[dict]:
-    movements = CashMovement.objects.filter(
-        movement_date__date__gte=from_date,
-        movement_date__date__lte=to_date,
-    ).order_by("movement_date", "id")
+def _get_live_cashflow_rows(from_date: date, to_date: date, rollup_days) -> list:
+    # Dias com movimento e sem rollup (ex.: historico anterior as tabelas de
+    # rollup, antes do rebuild_finance_rollups) saem do calculo ao vivo.
+    return list(
+        CashMovement.objects.filter(
+            movement_date__date__gte=from_date,
+            movement_date__date__lte=to_date,
+        )
+        .annotate(day=TruncDate("movement_date"))
+        .exclude(day__in=rollup_days)
+        .values("day")
+        .annotate(
+            total_in=Sum("amount", filter=Q(direction=CashDirection.IN)),
+            total_out=Sum("amount", filter=Q(direction=CashDirection.OUT)),
+        )
+        .order_by("day")
+    )
 
-    daily_totals: dict[date, dict[str, Decimal]] = {}
 
-    for movement in movements:
-        movement_day = movement.movement_date.date()
-        totals = daily_totals.setdefault(
-            movement_day,
-            {
-                "total_in": Decimal("0.00"),
-                "total_out": Decimal("0.00"),
-            },
+def get_cashflow(from_date: date, to_date: date) -> list[dict]:
+    # Le os totais diarios ja materializados: custo proporcional aos dias do
+    # periodo, nao ao volume de movimentos.
+    rollups = CashflowDailyRollup.objects.filter(day__gte=from_date, day__lte=to_date)
+    daily_rows = list(
+        rollups.filter(movements_count__gt=0)
+        .values("day")
+        .annotate(
+            total_in=Sum("total_amount", filter=Q(direction=CashDirection.IN)),
+            total_out=Sum("total_amount", filter=Q(direction=CashDirection.OUT)),
         )
-
-        if movement.direction == CashDirection.IN:
-            totals["total_in"] += movement.amount
-        elif movement.direction == CashDirection.OUT:
-            totals["total_out"] += movement.amount
+        .order_by("day")
+    )
+    daily_rows.extend(
+        _get_live_cashflow_rows(
+            from_date,
+            to_date,
+            rollups.values("day"),
+        )
+    )
+    daily_rows.sort(key=lambda row: row["day"])
 
     running_balance = Decimal("0.00")
     items: list[dict] = []
 
-    for movement_day in sorted(daily_totals):
-        totals = daily_totals[movement_day]
-        total_in = _quantize_money(totals["total_in"])
-        total_out = _quantize_money(totals["total_out"])
+    for row in daily_rows:
+        total_in = _sum_or_zero(row["total_in"])
+        total_out = _sum_or_zero(row["total_out"])
         net = _quantize_money(total_in - total_out)
         running_balance = _quantize_money(running_balance + net)
 
         items.append(
             {
-                "date": movement_day,
+                "date": row["day"],
                 "total_in": total_in,
                 "total_out": total_out,
                 "net": net,
@@ -88,138 +98,169 @@ def get_ingredient_weighted_cost(
     ingredient_id: int,
     until_date: date | None = None,
 ) -> Decimal:
-    purchase_items_qs = PurchaseItem.objects.filter(
-        ingredient_id=ingredient_id,
-    ).select_related("ingredient", "purchase")
-
-    if until_date is not None:
-        purchase_items_qs = purchase_items_qs.filter(
-            purchase__purchase_date__lte=until_date
-        )
-
-    purchase_items = list(purchase_items_qs)
-    if not purchase_items:
-        return ZERO_MONEY
-
-    total_cost = Decimal("0")
-    total_qty = Decimal("0")
-
-    for item in purchase_items:
-        _ensure_unit_compatible(
-            context=f"compra do ingrediente '{item.ingredient.name}'",
-            expected_unit=item.ingredient.unit,
-            received_unit=item.unit,
-        )
-
-        tax_amount = item.tax_amount or Decimal("0")
-        total_cost += item.qty * item.unit_price + tax_amount
-        total_qty += item.qty
-
-    if total_qty <= 0:
-        return ZERO_MONEY
-
-    return _quantize_money(total_cost / total_qty)
+    return get_ingredient_weighted_costs([ingredient_id], until_date=until_date)[
+        ingredient_id
+    ]
 
 
 def get_dish_cost(dish_id: int, on_date: date | None = None) -> Decimal:
-    dish = (
-        Dish.objects.prefetch_related("dish_ingredients__ingredient")
-        .filter(pk=dish_id)
-        .first()
-    )
-    if dish is None:
+    if not Dish.objects.filter(pk=dish_id).exists():
         raise ValidationError("Prato nao encontrado para calculo de custo.")
 
-    total_cost = Decimal("0")
-
-    for dish_ingredient in dish.dish_ingredients.all():
-        recipe_unit = dish_ingredient.unit or dish_ingredient.ingredient.unit
-        _ensure_unit_compatible(
-            context=(
-                f"receita do prato '{dish.name}' com "
-                f"ingrediente '{dish_ingredient.ingredient.name}'"
-            ),
-            expected_unit=dish_ingredient.ingredient.unit,
-            received_unit=recipe_unit,
-        )
-
-        ingredient_cost = get_ingredient_weighted_cost(
-            dish_ingredient.ingredient_id,
-            until_date=on_date,
-        )
-        total_cost += dish_ingredient.quantity * ingredient_cost
-
-    return _quantize_money(total_cost)
+    return get_dish_costs([dish_id], on_date=on_date)[dish_id]
 
 
 def get_menu_item_cost(menu_item_id: int) -> Decimal:
-    menu_item = (
-        MenuItem.objects.select_related("dish", "menu_day")
-        .filter(pk=menu_item_id)
-        .first()
-    )
-    if menu_item is None:
+    menu_item_cost = get_menu_item_costs([menu_item_id]).get(menu_item_id)
+    if menu_item_cost is None:
         raise ValidationError("Menu item nao encontrado para calculo de custo.")
 
-    if menu_item.dish.yield_portions <= 0:
-        raise ValidationError(
-            "yield_portions do prato deve ser maior que zero para calcular custo."
-        )
-
-    dish_cost = get_dish_cost(
-        menu_item.dish_id,
-        on_date=menu_item.menu_day.menu_date,
-    )
-
-    return _quantize_money(dish_cost / Decimal(menu_item.dish.yield_portions))
+    return menu_item_cost
 
 
-def _get_revenue_total(from_date: date, to_date: date) -> Decimal:
+def _get_revenue_total(
+    from_date: date,
+    to_date: date,
+    *,
+    days: set[date] | None = None,
+) -> Decimal:
     # MVP: receita por pedidos entregues no periodo.
-    value = Order.objects.filter(
+    orders = Order.objects.filter(
         status=OrderStatus.DELIVERED,
         delivery_date__gte=from_date,
         delivery_date__lte=to_date,
-    ).aggregate(total=Sum("total_amount"))["total"]
-    return _sum_or_zero(value)
+    )
+    if days is not None:
+        orders = orders.filter(delivery_date__in=days)
+    return _sum_or_zero(orders.aggregate(total=Sum("total_amount"))["total"])
 
 
-def _get_paid_expenses_total(from_date: date, to_date: date) -> Decimal:
-    value = APBill.objects.filter(
+def _get_paid_expenses_total(
+    from_date: date,
+    to_date: date,
+    *,
+    days: set[date] | None = None,
+) -> Decimal:
+    bills = APBill.objects.filter(
         status=APBillStatus.PAID,
         paid_at__date__gte=from_date,
         paid_at__date__lte=to_date,
-    ).aggregate(total=Sum("amount"))["total"]
-    return _sum_or_zero(value)
+    )
+    if days is not None:
+        bills = bills.filter(paid_at__date__in=days)
+    return _sum_or_zero(bills.aggregate(total=Sum("amount"))["total"])
 
 
-def _get_estimated_cmv(from_date: date, to_date: date) -> Decimal:
+def _get_estimated_cmv(
+    from_date: date,
+    to_date: date,
+    *,
+    days: set[date] | None = None,
+) -> Decimal:
     order_items = OrderItem.objects.filter(
         order__status=OrderStatus.DELIVERED,
         order__delivery_date__gte=from_date,
         order__delivery_date__lte=to_date,
     )
+    if days is not None:
+        order_items = order_items.filter(order__delivery_date__in=days)
+    snapshot_total = order_items.filter(estimated_unit_cost__isnull=False).aggregate(
+        total=Sum(
+            F("qty") * F("estimated_unit_cost"),
+            output_field=DecimalField(max_digits=20, decimal_places=2),
+        )
+    )["total"] or Decimal("0")
+
+    # Itens sem snapshot (legado ou custo nao capturado) sao custeados ao vivo.
+    qty_by_menu_item = dict(
+        order_items.filter(estimated_unit_cost__isnull=True)
+        .values("menu_item_id")
+        .annotate(total_qty=Sum("qty"))
+        .order_by()
+        .values_list("menu_item_id", "total_qty")
+    )
+    menu_item_costs = get_menu_item_costs(qty_by_menu_item)
+
+    total_cmv = sum(
+        (
+            Decimal(total_qty) * menu_item_costs[menu_item_id]
+            for menu_item_id, total_qty in qty_by_menu_item.items()
+        ),
+        snapshot_total,
+    )
+    return _quantize_money(total_cmv)
 
-    total_cmv = Decimal("0")
-    menu_item_cost_cache: dict[int, Decimal] = {}
-
-    for order_item in order_items:
-        if order_item.menu_item_id not in menu_item_cost_cache:
-            menu_item_cost_cache[order_item.menu_item_id] = get_menu_item_cost(
-                order_item.menu_item_id
-            )
 
-        total_cmv += (
-            Decimal(order_item.qty) * menu_item_cost_cache[order_item.menu_item_id]
+def _get_days_missing_dre_rollup(from_date: date, to_date: date) -> set[date]:
+    # Dias com pedido entregue ou conta paga que ainda nao tem rollup (ex.:
+    # historico anterior a tabela, antes do rebuild_finance_rollups).
+    rollup_days = DreDailyRollup.objects.filter(
+        day__gte=from_date,
+        day__lte=to_date,
+    ).values("day")
+    days = set(
+        Order.objects.filter(
+            status=OrderStatus.DELIVERED,
+            delivery_date__gte=from_date,
+            delivery_date__lte=to_date,
         )
+        .exclude(delivery_date__in=rollup_days)
+        .values_list("delivery_date", flat=True)
+        .distinct()
+    )
+    days.update(
+        APBill.objects.filter(
+            status=APBillStatus.PAID,
+            paid_at__date__gte=from_date,
+            paid_at__date__lte=to_date,
+        )
+        .annotate(day=TruncDate("paid_at"))
+        .exclude(day__in=rollup_days)
+        .values_list("day", flat=True)
+        .distinct()
+    )
+    return days
+
+
+def _get_dre_rollup_totals(from_date: date, to_date: date) -> dict:
+    totals = DreDailyRollup.objects.filter(
+        day__gte=from_date,
+        day__lte=to_date,
+    ).aggregate(
+        pedidos=Sum("orders_delivered"),
+        receita_total=Sum("revenue_total"),
+        despesas_total=Sum("expenses_total"),
+        cmv_estimado=Sum("cmv_total"),
+    )
+    result = {
+        "pedidos": totals["pedidos"] or 0,
+        "receita_total": _sum_or_zero(totals["receita_total"]),
+        "despesas_total": _sum_or_zero(totals["despesas_total"]),
+        "cmv_estimado": _sum_or_zero(totals["cmv_estimado"]),
+    }
 
-    return _quantize_money(total_cmv)
+    missing_days = _get_days_missing_dre_rollup(from_date, to_date)
+    if missing_days:
+        result["pedidos"] += Order.objects.filter(
+            status=OrderStatus.DELIVERED,
+            delivery_date__in=missing_days,
+        ).count()
+        for key, live_total in (
+            ("receita_total", _get_revenue_total),
+            ("despesas_total", _get_paid_expenses_total),
+            ("cmv_estimado", _get_estimated_cmv),
+        ):
+            result[key] = _quantize_money(
+                result[key] + live_total(from_date, to_date, days=missing_days)
+            )
+    return result
 
 
 def get_dre(from_date: date, to_date: date) -> dict[str, Decimal]:
-    receita_total = _get_revenue_total(from_date, to_date)
-    despesas_total = _get_paid_expenses_total(from_date, to_date)
-    cmv_estimado = _get_estimated_cmv(from_date, to_date)
+    totals = _get_dre_rollup_totals(from_date, to_date)
+    receita_total = totals["receita_total"]
+    despesas_total = totals["despesas_total"]
+    cmv_estimado = totals["cmv_estimado"]
     lucro_bruto = _quantize_money(receita_total - cmv_estimado)
     resultado = _quantize_money(lucro_bruto - despesas_total)
 
@@ -233,15 +274,11 @@ def get_dre(from_date: date, to_date: date) -> dict[str, Decimal]:
 
 
 def get_kpis(from_date: date, to_date: date) -> dict[str, int | Decimal]:
-    pedidos = Order.objects.filter(
-        status=OrderStatus.DELIVERED,
-        delivery_date__gte=from_date,
-        delivery_date__lte=to_date,
-    ).count()
-
-    receita_total = _get_revenue_total(from_date, to_date)
-    despesas_total = _get_paid_expenses_total(from_date, to_date)
-    cmv_estimado = _get_estimated_cmv(from_date, to_date)
+    totals = _get_dre_rollup_totals(from_date, to_date)
+    pedidos = totals["pedidos"]
+    receita_total = totals["receita_total"]
+    despesas_total = totals["despesas_total"]
+    cmv_estimado = totals["cmv_estimado"]
     lucro_bruto = _quantize_money(receita_total - cmv_estimado)
 
     if pedidos > 0:
@@ -0,0 +1,433 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from apps.catalog.models import DishIngredient
+from apps.jobs.models import Job, JobStatus
+from apps.jobs.services import enqueue
+from apps.orders.models import Order, OrderItem, OrderStatus
+from apps.procurement.models import PurchaseItem
+
+from .models import (
+    APBill,
+    APBillStatus,
+    CashflowDailyRollup,
+    CashMovement,
+    DreDailyRollup,
+)
+from .reports import (
+    _get_estimated_cmv,
+    _get_paid_expenses_total,
+    _get_revenue_total,
+)
+
+REFRESH_DRE_ROLLUPS_JOB = "finance.refresh_dre_rollups"
+_ORDER_DRE_FIELDS = {"status", "delivery_date", "total_amount"}
+_AP_DRE_FIELDS = {"status", "paid_at", "amount"}
+_CASH_ROLLUP_FIELDS = {
+    "movement_date",
+    "account",
+    "account_id",
+    "direction",
+    "reference_type",
+    "amount",
+}
+
+
+def _to_local_date(value: datetime | None) -> date | None:
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        return timezone.localdate(value)
+    return value.date()
+
+
+def _apply_cash_rollup_delta(
+    *,
+    day: date,
+    account_id: int,
+    direction: str,
+    category: str,
+    amount: Decimal,
+    count: int,
+) -> None:
+    filters = {
+        "day": day,
+        "account_id": account_id,
+        "direction": direction,
+        "category": category,
+    }
+    changes = {
+        "total_amount": F("total_amount") + amount,
+        "movements_count": F("movements_count") + count,
+        "updated_at": timezone.now(),
+    }
+    if CashflowDailyRollup.objects.filter(**filters).update(**changes):
+        return
+
+    try:
+        with transaction.atomic():
+            CashflowDailyRollup.objects.create(
+                **filters,
+                total_amount=amount,
+                movements_count=count,
+            )
+    except IntegrityError:
+        # Outra transacao criou a linha do dia primeiro.
+        CashflowDailyRollup.objects.filter(**filters).update(**changes)
+
+
+def _cash_rollup_key(values: dict) -> dict:
+    return {
+        "day": _to_local_date(values["movement_date"]),
+        "account_id": values["account_id"],
+        "direction": values["direction"],
+        "category": values["reference_type"] or "",
+    }
+
+
+def _cash_movement_values(movement: CashMovement) -> dict:
+    return {
+        "movement_date": movement.movement_date,
+        "account_id": movement.account_id,
+        "direction": movement.direction,
+        "reference_type": movement.reference_type,
+        "amount": movement.amount,
+    }
+
+
+def _handle_cash_movement_pre_save(sender, instance, **kwargs) -> None:
+    instance._rollup_previous = None
+    if (
+        instance.pk is None
+        or kwargs.get("raw")
+        or not _tracked_fields_changed(kwargs, _CASH_ROLLUP_FIELDS)
+    ):
+        return
+    instance._rollup_previous = (
+        CashMovement.objects.filter(pk=instance.pk)
+        .values("movement_date", "account_id", "direction", "reference_type", "amount")
+        .first()
+    )
+
+
+def _handle_cash_movement_save(sender, instance, **kwargs) -> None:
+    if kwargs.get("raw") or not _tracked_fields_changed(kwargs, _CASH_ROLLUP_FIELDS):
+        return
+    previous = getattr(instance, "_rollup_previous", None)
+    current = _cash_movement_values(instance)
+    if previous is not None:
+        if previous == current:
+            return
+        _apply_cash_rollup_delta(
+            **_cash_rollup_key(previous),
+            amount=-Decimal(previous["amount"]),
+            count=-1,
+        )
+    _apply_cash_rollup_delta(
+        **_cash_rollup_key(current),
+        amount=Decimal(current["amount"]),
+        count=1,
+    )
+
+
+def _handle_cash_movement_delete(sender, instance, **kwargs) -> None:
+    values = _cash_movement_values(instance)
+    _apply_cash_rollup_delta(
+        **_cash_rollup_key(values),
+        amount=-Decimal(values["amount"]),
+        count=-1,
+    )
+
+
+def refresh_dre_rollup_day(day: date) -> DreDailyRollup:
+    # Lock na linha do dia serializa recalculos concorrentes do mesmo dia.
+    DreDailyRollup.objects.get_or_create(day=day)
+    rollup = DreDailyRollup.objects.select_for_update().get(day=day)
+    rollup.orders_delivered = Order.objects.filter(
+        status=OrderStatus.DELIVERED,
+        delivery_date=day,
+    ).count()
+    rollup.revenue_total = _get_revenue_total(day, day)
+    rollup.expenses_total = _get_paid_expenses_total(day, day)
+    rollup.cmv_total = _get_estimated_cmv(day, day)
+    rollup.save()
+    return rollup
+
+
+@transaction.atomic
+def refresh_dre_rollups(
+    *,
+    days: list[date] | None = None,
+    from_date: date | None = None,
+) -> int:
+    """Recalcula os dias informados ou, com `from_date`, todos os dias ja
+    materializados a partir dela (usado quando custos retroativos mudam)."""
+    target_days = set(days or [])
+    if from_date is not None:
+        target_days.update(
+            DreDailyRollup.objects.filter(day__gte=from_date).values_list(
+                "day", flat=True
+            )
+        )
+    for day in sorted(target_days):
+        refresh_dre_rollup_day(day)
+    return len(target_days)
+
+
+@transaction.atomic
+def _merge_into_queued_dre_refresh(days: list[date], from_date: date | None) -> bool:
+    # Job ainda na fila (inclusive o criado nesta transacao) absorve os dias;
+    # skip_locked evita disputar com o worker que esta assumindo o job.
+    job = (
+        Job.objects.select_for_update(skip_locked=True)
+        .filter(name=REFRESH_DRE_ROLLUPS_JOB, status=JobStatus.QUEUED, attempts=0)
+        .order_by("id")
+        .first()
+    )
+    if job is None:
+        return False
+
+    queued_days = {date.fromisoformat(day) for day in job.payload.get("days", [])}
+    queued_from = job.payload.get("from_date")
+    from_dates = [date.fromisoformat(queued_from)] if queued_from else []
+    if from_date is not None:
+        from_dates.append(from_date)
+    merged_from = min(from_dates, default=None)
+    job.payload = {
+        "days": [day.isoformat() for day in sorted(queued_days.union(days))],
+        "from_date": merged_from.isoformat() if merged_from else None,
+    }
+    job.save(update_fields=["payload", "updated_at"])
+    return True
+
+
+def schedule_dre_rollup_refresh(
+    *,
+    days: set[date] | None = None,
+    from_date: date | None = None,
+) -> None:
+    """Agenda o recalculo da DRE, reaproveitando o job que ainda esta na fila.
+
+    Varias escritas seguidas (ex.: N itens de uma compra) viram um unico job
+    com a uniao dos dias e a menor `from_date`.
+    """
+    valid_days = sorted(day for day in days or () if day is not None)
+    if (
+        from_date is not None
+        and not DreDailyRollup.objects.filter(day__gte=from_date).exists()
+    ):
+        from_date = None
+    if not valid_days and from_date is None:
+        return
+    if _merge_into_queued_dre_refresh(valid_days, from_date):
+        return
+    enqueue(
+        REFRESH_DRE_ROLLUPS_JOB,
+        {"days": valid_days, "from_date": from_date},
+        queue="finance",
+    )
+
+
+def _tracked_fields_changed(kwargs: dict, fields: set[str]) -> bool:
+    update_fields = kwargs.get("update_fields")
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+def _remember_previous(instance, *, fields: tuple[str, ...]) -> None:
+    instance._rollup_previous = None
+    if instance.pk is not None:
+        instance._rollup_previous = (
+            type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+        )
+
+
+def _handle_order_pre_save(sender, instance, **kwargs) -> None:
+    if kwargs.get("raw") or not _tracked_fields_changed(kwargs, _ORDER_DRE_FIELDS):
+        return
+    _remember_previous(instance, fields=("status", "delivery_date"))
+
+
+def _handle_order_change(sender, instance, **kwargs) -> None:
+    if kwargs.get("raw") or not _tracked_fields_changed(kwargs, _ORDER_DRE_FIELDS):
+        return
+    previous = getattr(instance, "_rollup_previous", None) or {}
+    # So pedidos entregues (agora ou antes da alteracao) entram na DRE.
+    was_delivered = previous.get("status") == OrderStatus.DELIVERED
+    if instance.status != OrderStatus.DELIVERED and not was_delivered:
+        return
+    schedule_dre_rollup_refresh(
+        days={instance.delivery_date, previous.get("delivery_date")}
+    )
+
+
+def _handle_order_item_change(sender, instance, **kwargs) -> None:
+    if kwargs.get("raw"):
+        return
+    delivery_date = (
+        Order.objects.filter(pk=instance.order_id, status=OrderStatus.DELIVERED)
+        .values_list("delivery_date", flat=True)
+        .first()
+    )
+    schedule_dre_rollup_refresh(days={delivery_date})
+
+
+def _handle_ap_bill_pre_save(sender, instance, **kwargs) -> None:
+    if kwargs.get("raw") or not _tracked_fields_changed(kwargs, _AP_DRE_FIELDS):
+        return
+    _remember_previous(instance, fields=("status", "paid_at"))
+
+
+def _handle_ap_bill_change(sender, instance, **kwargs) -> None:
+    if kwargs.get("raw") or not _tracked_fields_changed(kwargs, _AP_DRE_FIELDS):
+        return
+    previous = getattr(instance, "_rollup_previous", None) or {}
+    was_paid = previous.get("status") == APBillStatus.PAID
+    if instance.status != APBillStatus.PAID and not was_paid:
+        return
+    schedule_dre_rollup_refresh(
+        days={
+            _to_local_date(instance.paid_at),
+            _to_local_date(previous.get("paid_at")),
+        }
+    )
+
+
+def _handle_purchase_item_change(sender, instance, **kwargs) -> None:
+    if kwargs.get("raw"):
+        return
+    # Custo medio e calculado ate a data do cardapio: compras retroativas
+    # alteram o CMV de todos os dias seguintes.
+    schedule_dre_rollup_refresh(from_date=instance.purchase.purchase_date)
+
+
+def _handle_dish_ingredient_change(sender, instance, **kwargs) -> None:
+    if kwargs.get("raw"):
+        return
+    # Ficha tecnica so altera o CMV dos dias em que o prato foi vendido sem
+    # snapshot de custo (itens com snapshot ja tem o custo congelado).
+    sold_days = set(
+        OrderItem.objects.filter(
+            menu_item__dish_id=instance.dish_id,
+            estimated_unit_cost__isnull=True,
+            order__status=OrderStatus.DELIVERED,
+        )
+        .values_list("order__delivery_date", flat=True)
+        .distinct()
+    )
+    schedule_dre_rollup_refresh(days=sold_days)
+
+
+@transaction.atomic
+def rebuild_cashflow_rollups(
+    *,
+    from_date: date | None = None,
+    to_date: date | None = None,
+) -> int:
+    rollups = CashflowDailyRollup.objects.all()
+    movements = CashMovement.objects.all()
+    if from_date is not None:
+        rollups = rollups.filter(day__gte=from_date)
+        movements = movements.filter(movement_date__date__gte=from_date)
+    if to_date is not None:
+        rollups = rollups.filter(day__lte=to_date)
+        movements = movements.filter(movement_date__date__lte=to_date)
+
+    rollups.delete()
+    rows = (
+        movements.annotate(day=TruncDate("movement_date"))
+        .values("day", "account_id", "direction", "reference_type")
+        .annotate(total_amount=Sum("amount"), movements_count=Count("id"))
+        .order_by()
+    )
+    created = CashflowDailyRollup.objects.bulk_create(
+        [
+            CashflowDailyRollup(
+                day=row["day"],
+                account_id=row["account_id"],
+                direction=row["direction"],
+                category=row["reference_type"] or "",
+                total_amount=row["total_amount"],
+                movements_count=row["movements_count"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+    return len(created)
+
+
+@transaction.atomic
+def rebuild_dre_rollups(
+    *,
+    from_date: date | None = None,
+    to_date: date | None = None,
+) -> int:
+    def _in_range(queryset, field_name: str):
+        if from_date is not None:
+            queryset = queryset.filter(**{f"{field_name}__gte": from_date})
+        if to_date is not None:
+            queryset = queryset.filter(**{f"{field_name}__lte": to_date})
+        return queryset
+
+    days = set(
+        _in_range(
+            Order.objects.filter(status=OrderStatus.DELIVERED),
+            "delivery_date",
+        ).values_list("delivery_date", flat=True)
+    )
+    days.update(
+        _in_range(
+            APBill.objects.filter(status=APBillStatus.PAID, paid_at__isnull=False),
+            "paid_at__date",
+        )
+        .annotate(day=TruncDate("paid_at"))
+        .values_list("day", flat=True)
+    )
+
+    _in_range(DreDailyRollup.objects.all(), "day").exclude(day__in=days).delete()
+    for day in sorted(days):
+        refresh_dre_rollup_day(day)
+    return len(days)
+
+
+def register_finance_rollup_signals() -> None:
+    handlers = (
+        (pre_save, CashMovement, _handle_cash_movement_pre_save, "cash:pre_save"),
+        (post_save, CashMovement, _handle_cash_movement_save, "cash:save"),
+        (post_delete, CashMovement, _handle_cash_movement_delete, "cash:delete"),
+        (pre_save, Order, _handle_order_pre_save, "order:pre_save"),
+        (post_save, Order, _handle_order_change, "order:save"),
+        (post_delete, Order, _handle_order_change, "order:delete"),
+        (post_save, OrderItem, _handle_order_item_change, "order_item:save"),
+        (post_delete, OrderItem, _handle_order_item_change, "order_item:delete"),
+        (pre_save, APBill, _handle_ap_bill_pre_save, "ap:pre_save"),
+        (post_save, APBill, _handle_ap_bill_change, "ap:save"),
+        (post_delete, APBill, _handle_ap_bill_change, "ap:delete"),
+        (post_save, PurchaseItem, _handle_purchase_item_change, "purchase:save"),
+        (post_delete, PurchaseItem, _handle_purchase_item_change, "purchase:delete"),
+        (
+            post_save,
+            DishIngredient,
+            _handle_dish_ingredient_change,
+            "dish_ingredient:save",
+        ),
+        (
+            post_delete,
+            DishIngredient,
+            _handle_dish_ingredient_change,
+            "dish_ingredient:delete",
+        ),
+    )
+    for model_signal, sender, handler, uid in handlers:
+        model_signal.connect(
+            handler,
+            sender=sender,
+            weak=False,
+            dispatch_uid=f"mrq-finance-rollup:{uid}",
+        )
@@ -14,7 +14,11 @@ from apps.accounts.permissions import (
     FINANCE_WRITE_ROLES,
     RoleMatrixPermission,
 )
-from apps.common.csv_export import build_csv_response
+from apps.common.exports import (
+    ExportColumn,
+    build_export_response,
+    parse_export_options,
+)
 from apps.common.reports import parse_period
 
 from .models import APBillStatus, ARReceivableStatus
@@ -488,6 +492,29 @@ class KpisReportAPIView(PeriodReportMixin, APIView):
         )
 
 
+CASHFLOW_EXPORT_COLUMNS = (
+    ExportColumn("data", lambda item: item["date"].isoformat()),
+    ExportColumn("total_entradas", lambda item: _format_money(item["total_in"])),
+    ExportColumn("total_saidas", lambda item: _format_money(item["total_out"])),
+    ExportColumn("saldo_dia", lambda item: _format_money(item["net"])),
+    ExportColumn(
+        "saldo_acumulado",
+        lambda item: _format_money(item["running_balance"]),
+    ),
+)
+DRE_EXPORT_INDICATORS = (
+    "receita_total",
+    "despesas_total",
+    "cmv_estimado",
+    "lucro_bruto",
+    "resultado",
+)
+DRE_EXPORT_COLUMNS = (
+    ExportColumn("indicador", lambda row: row[0]),
+    ExportColumn("valor", lambda row: _format_money(row[1])),
+)
+
+
 class CashflowExportAPIView(APIView):
     permission_classes = [RoleMatrixPermission]
     required_roles_by_method = {"GET": FINANCE_READ_ROLES}
@@ -497,28 +524,16 @@ class CashflowExportAPIView(APIView):
             from_raw=request.query_params.get("from"),
             to_raw=request.query_params.get("to"),
         )
+        export_options = parse_export_options(request.query_params)
         cashflow_items = get_cashflow(from_date=from_date, to_date=to_date)
 
-        header = [
-            "data",
-            "total_entradas",
-            "total_saidas",
-            "saldo_dia",
-            "saldo_acumulado",
-        ]
-        rows = [
-            [
-                item["date"].isoformat(),
-                _format_money(item["total_in"]),
-                _format_money(item["total_out"]),
-                _format_money(item["net"]),
-                _format_money(item["running_balance"]),
-            ]
-            for item in cashflow_items
-        ]
-
-        filename = f"fluxo_caixa_{from_date.isoformat()}_{to_date.isoformat()}.csv"
-        return build_csv_response(filename=filename, header=header, rows=rows)
+        return build_export_response(
+            filename=f"fluxo_caixa_{from_date.isoformat()}_{to_date.isoformat()}",
+            columns=CASHFLOW_EXPORT_COLUMNS,
+            rows=cashflow_items,
+            options=export_options,
+            sheet_title="fluxo_caixa",
+        )
 
 
 class DreExportAPIView(APIView):
@@ -530,19 +545,16 @@ class DreExportAPIView(APIView):
             from_raw=request.query_params.get("from"),
             to_raw=request.query_params.get("to"),
         )
+        export_options = parse_export_options(request.query_params)
         dre = get_dre(from_date=from_date, to_date=to_date)
 
-        header = ["indicador", "valor"]
-        rows = [
-            ["receita_total", _format_money(dre["receita_total"])],
-            ["despesas_total", _format_money(dre["despesas_total"])],
-            ["cmv_estimado", _format_money(dre["cmv_estimado"])],
-            ["lucro_bruto", _format_money(dre["lucro_bruto"])],
-            ["resultado", _format_money(dre["resultado"])],
-        ]
-
-        filename = f"dre_{from_date.isoformat()}_{to_date.isoformat()}.csv"
-        return build_csv_response(filename=filename, header=header, rows=rows)
+        return build_export_response(
+            filename=f"dre_{from_date.isoformat()}_{to_date.isoformat()}",
+            columns=DRE_EXPORT_COLUMNS,
+            rows=[(indicator, dre[indicator]) for indicator in DRE_EXPORT_INDICATORS],
+            options=export_options,
+            sheet_title="dre",
+        )
 
 
 class IsClosedAPIView(APIView):
@@ -0,0 +1,35 @@
+from django.contrib import admin, messages
+
+from .models import Job
+from .services import requeue_job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "name",
+        "queue",
+        "status",
+        "priority",
+        "attempts",
+        "max_attempts",
+        "run_at",
+        "finished_at",
+    )
+    list_filter = ("status", "queue", "name")
+    search_fields = ("id", "name", "last_error")
+    readonly_fields = ("locked_by", "locked_at", "result", "last_error")
+    actions = ["requeue_selected"]
+
+    @admin.action(description="Reenfileirar jobs selecionados")
+    def requeue_selected(self, request, queryset):
+        requeued = 0
+        for job in queryset:
+            requeue_job(job)
+            requeued += 1
+        self.message_user(
+            request,
+            f"{requeued} job(s) reenfileirado(s).",
+            level=messages.SUCCESS,
+        )
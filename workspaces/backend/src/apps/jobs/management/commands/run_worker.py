@@ -0,0 +1,151 @@
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+
+from apps.jobs.services import build_worker_id, requeue_stale_jobs, run_next_job
+
+
+class Command(BaseCommand):
+    help = "Processa jobs da fila no banco (SELECT ... FOR UPDATE SKIP LOCKED)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="queues",
+            default=[],
+            help="Fila a consumir (pode repetir). Padrao: todas.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Processa os jobs disponiveis e encerra.",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=0,
+            help="Encerra apos processar N jobs (0 = sem limite).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=None,
+            help="Intervalo de polling em segundos quando a fila esta vazia.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=None,
+            help="Quantidade de processos worker (padrao: JOBS_WORKER_PROCESSES).",
+        )
+        parser.add_argument(
+            "--worker-id",
+            default="",
+            help="Identificador gravado em locked_by.",
+        )
+
+    def handle(self, *args, **options):
+        max_jobs = options["max_jobs"]
+        if max_jobs < 0:
+            raise CommandError("--max-jobs deve ser maior ou igual a zero.")
+
+        processes = options["processes"]
+        if processes is None:
+            processes = settings.JOBS_WORKER_PROCESSES
+        if processes < 1:
+            raise CommandError("--processes deve ser maior ou igual a 1.")
+
+        poll_seconds = options["sleep"]
+        if poll_seconds is None:
+            poll_seconds = settings.JOBS_POLL_INTERVAL_SECONDS
+        worker_id = options["worker_id"] or build_worker_id()
+        loop_options = {
+            "queues": options["queues"] or None,
+            "once": options["once"],
+            "max_jobs": max_jobs,
+            "poll_seconds": poll_seconds,
+        }
+
+        if processes == 1:
+            processed = self._run_loop(worker_id=worker_id, **loop_options)
+            self.stdout.write(
+                self.style.SUCCESS(f"Worker {worker_id} encerrado. Jobs: {processed}.")
+            )
+            return
+
+        self._run_pool(processes=processes, worker_id=worker_id, **loop_options)
+
+    def _run_pool(self, *, processes: int, worker_id: str, **loop_options):
+        # Conexoes abertas nao podem ser herdadas pelos processos filhos.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        children = [
+            context.Process(
+                target=self._run_loop,
+                kwargs={"worker_id": f"{worker_id}/{index}", **loop_options},
+                name=f"mrq-worker-{index}",
+            )
+            for index in range(processes)
+        ]
+        for child in children:
+            child.start()
+
+        def _forward_stop(*_args):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, _forward_stop)
+        signal.signal(signal.SIGINT, _forward_stop)
+        for child in children:
+            child.join()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Pool {worker_id} encerrado ({processes} processos).")
+        )
+
+    def _run_loop(
+        self,
+        *,
+        worker_id: str,
+        queues: list[str] | None,
+        once: bool,
+        max_jobs: int,
+        poll_seconds: float,
+    ) -> int:
+        self._stop_requested = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        processed = 0
+        next_stale_check = 0.0
+        while not self._stop_requested:
+            now = time.monotonic()
+            if now >= next_stale_check:
+                requeue_stale_jobs()
+                next_stale_check = now + settings.JOBS_LOCK_TIMEOUT_SECONDS / 2
+
+            job = run_next_job(worker_id=worker_id, queues=queues)
+            if job is None:
+                if once:
+                    break
+                time.sleep(poll_seconds)
+                # Fila ociosa: descarta conexoes quebradas ou vencidas.
+                close_old_connections()
+                continue
+
+            processed += 1
+            self.stdout.write(
+                f"Job {job.id} ({job.name}) finalizado com status {job.status}."
+            )
+            if max_jobs and processed >= max_jobs:
+                break
+        return processed
+
+    def _request_stop(self, *_args):
+        self._stop_requested = True
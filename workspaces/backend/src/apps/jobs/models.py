@@ -0,0 +1,53 @@
+from django.db import models
+from django.utils import timezone
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = "QUEUED", "QUEUED"
+    RUNNING = "RUNNING", "RUNNING"
+    SUCCEEDED = "SUCCEEDED", "SUCCEEDED"
+    DEAD = "DEAD", "DEAD"
+
+
+class JobPriority(models.IntegerChoices):
+    LOW = 0, "LOW"
+    NORMAL = 50, "NORMAL"
+    HIGH = 100, "HIGH"
+
+
+class Job(models.Model):
+    name = models.CharField(max_length=120)
+    queue = models.CharField(max_length=40, default="default")
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=16,
+        choices=JobStatus.choices,
+        default=JobStatus.QUEUED,
+    )
+    priority = models.SmallIntegerField(
+        choices=JobPriority.choices,
+        default=JobPriority.NORMAL,
+    )
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    locked_by = models.CharField(max_length=120, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(
+                fields=["status", "queue", "-priority", "run_at"],
+                name="jobs_job_dequeue_idx",
+            ),
+            models.Index(fields=["name", "status"], name="jobs_job_name_status_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Job-{self.id} ({self.name}/{self.status})"
@@ -0,0 +1,333 @@
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import Job, JobPriority, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict], dict | None]
+_JOB_HANDLERS: dict[str, JobHandler] = {}
+_NON_ATOMIC_JOB_HANDLERS: set[str] = set()
+_JOB_DEAD_HANDLERS: dict[str, JobHandler] = {}
+
+
+def register_job_handler(
+    name: str,
+    *,
+    atomic: bool = True,
+    on_dead: JobHandler | None = None,
+) -> Callable[[JobHandler], JobHandler]:
+    """Registra o handler de um job.
+
+    Entrega e "pelo menos uma vez": o lock e renovado enquanto o handler
+    roda, mas um worker que morre (ou perde o banco) tem o job devolvido a
+    fila apos `JOBS_LOCK_TIMEOUT_SECONDS` e o handler roda de novo. Handlers
+    precisam ser idempotentes. `on_dead` recebe o payload quando o job
+    esgota as tentativas (ex.: marcar a entidade de dominio como falha).
+    """
+    normalized_name = str(name).strip()
+    if not normalized_name:
+        raise ValueError("Nome do job e obrigatorio.")
+
+    def decorator(func: JobHandler) -> JobHandler:
+        registered = _JOB_HANDLERS.get(normalized_name)
+        if registered is not None and registered is not func:
+            raise ValueError(f"Handler de job duplicado: {normalized_name}.")
+        _JOB_HANDLERS[normalized_name] = func
+        if on_dead is None:
+            _JOB_DEAD_HANDLERS.pop(normalized_name, None)
+        else:
+            _JOB_DEAD_HANDLERS[normalized_name] = on_dead
+        if atomic:
+            _NON_ATOMIC_JOB_HANDLERS.discard(normalized_name)
+        else:
+            # Handlers longos controlam as proprias transacoes para expor
+            # estados intermediarios (ex.: PROCESSING) enquanto rodam.
+            _NON_ATOMIC_JOB_HANDLERS.add(normalized_name)
+        return func
+
+    return decorator
+
+
+def get_job_handler(name: str) -> JobHandler | None:
+    return _JOB_HANDLERS.get(name)
+
+
+def build_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _to_json_value(value: object) -> object:
+    return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+
+
+def enqueue(
+    name: str,
+    payload: dict | None = None,
+    *,
+    queue: str = "default",
+    priority: int = JobPriority.NORMAL,
+    run_at: datetime | None = None,
+    max_attempts: int | None = None,
+) -> Job:
+    """Registra um job na fila do banco.
+
+    Por ser uma linha comum, o job so fica visivel para os workers quando a
+    transacao de quem enfileirou confirma. Com `JOBS_RUN_EAGERLY` o handler
+    roda no proprio processo (modo usado em dev/testes sem worker).
+    """
+    if get_job_handler(name) is None:
+        raise ValidationError(f"Job sem handler registrado: {name}.")
+
+    job = Job.objects.create(
+        name=name,
+        queue=queue,
+        payload=_to_json_value(payload or {}),
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOBS_DEFAULT_MAX_ATTEMPTS,
+    )
+
+    if settings.JOBS_RUN_EAGERLY and run_at is None:
+        job.status = JobStatus.RUNNING
+        job.attempts = 1
+        job.locked_by = "eager"
+        job.locked_at = timezone.now()
+        job.save(update_fields=["status", "attempts", "locked_by", "locked_at"])
+        execute_job(job)
+
+    return job
+
+
+def claim_next_job(
+    *,
+    worker_id: str,
+    queues: list[str] | None = None,
+) -> Job | None:
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = Job.objects.select_for_update(skip_locked=True).filter(
+            status=JobStatus.QUEUED,
+            run_at__lte=now,
+        )
+        if queues:
+            queryset = queryset.filter(queue__in=queues)
+
+        job = queryset.order_by("-priority", "run_at", "id").first()
+        if job is None:
+            return None
+
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_at = now
+        job.save(
+            update_fields=[
+                "status",
+                "attempts",
+                "locked_by",
+                "locked_at",
+                "updated_at",
+            ]
+        )
+    return job
+
+
+def compute_retry_delay(attempts: int) -> timedelta:
+    base_seconds = float(settings.JOBS_RETRY_BACKOFF_SECONDS)
+    max_seconds = float(settings.JOBS_RETRY_BACKOFF_MAX_SECONDS)
+    delay = min(max_seconds, base_seconds * (2 ** max(attempts - 1, 0)))
+    # Metade fixa + metade aleatoria evita retries sincronizados.
+    return timedelta(seconds=delay / 2 + random.uniform(0, delay / 2))
+
+
+def _run_dead_handler(job: Job) -> None:
+    on_dead = _JOB_DEAD_HANDLERS.get(job.name)
+    if on_dead is None:
+        return
+    try:
+        with transaction.atomic():
+            on_dead(job.payload)
+    except Exception:
+        logger.exception("Falha no on_dead do job %s (%s).", job.id, job.name)
+
+
+def _mark_job_failed(job: Job, *, error: str) -> None:
+    job.last_error = error
+    job.locked_by = ""
+    job.locked_at = None
+    if job.attempts >= job.max_attempts:
+        job.status = JobStatus.DEAD
+        job.finished_at = timezone.now()
+        _run_dead_handler(job)
+    else:
+        job.status = JobStatus.QUEUED
+        job.run_at = timezone.now() + compute_retry_delay(job.attempts)
+
+    job.save(
+        update_fields=[
+            "status",
+            "run_at",
+            "last_error",
+            "locked_by",
+            "locked_at",
+            "finished_at",
+            "updated_at",
+        ]
+    )
+
+
+class _JobLockHeartbeat:
+    """Renova `locked_at` em thread propria enquanto o handler roda.
+
+    Sem isso um job mais longo que `JOBS_LOCK_TIMEOUT_SECONDS` seria tratado
+    como abandonado por `requeue_stale_jobs` e executado em paralelo.
+    """
+
+    def __init__(self, job: Job) -> None:
+        self.job_id = job.id
+        self.locked_by = job.locked_by
+        self.interval = float(settings.JOBS_HEARTBEAT_INTERVAL_SECONDS)
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self):
+        # Modo eager roda dentro da requisicao; nao ha requeue a evitar.
+        if self.interval > 0 and self.locked_by and self.locked_by != "eager":
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"mrq-job-heartbeat-{self.job_id}",
+                daemon=True,
+            )
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        return False
+
+    def _run(self) -> None:
+        try:
+            while not self._stopped.wait(self.interval):
+                try:
+                    Job.objects.filter(
+                        pk=self.job_id,
+                        status=JobStatus.RUNNING,
+                        locked_by=self.locked_by,
+                    ).update(locked_at=timezone.now())
+                except Exception:
+                    logger.exception("Falha ao renovar lock do job %s.", self.job_id)
+        finally:
+            # Conexao propria da thread (conexoes do Django sao por thread).
+            connections.close_all()
+
+
+def execute_job(job: Job) -> Job:
+    handler = get_job_handler(job.name)
+    if handler is None:
+        job.attempts = max(job.attempts, job.max_attempts)
+        _mark_job_failed(job, error=f"Job sem handler registrado: {job.name}.")
+        return job
+
+    # Savepoint proprio: erro de banco no handler nao invalida a transacao
+    # externa (modo eager) e as escritas do job sao atomicas.
+    use_atomic = (
+        job.name not in _NON_ATOMIC_JOB_HANDLERS
+        or transaction.get_connection().in_atomic_block
+    )
+    try:
+        with _JobLockHeartbeat(job):
+            if use_atomic:
+                with transaction.atomic():
+                    result = handler(job.payload)
+            else:
+                result = handler(job.payload)
+    except Exception:
+        logger.exception("Falha ao executar job %s (%s).", job.id, job.name)
+        _mark_job_failed(job, error=traceback.format_exc())
+        return job
+
+    job.status = JobStatus.SUCCEEDED
+    job.result = _to_json_value(result) if result is not None else None
+    job.last_error = ""
+    job.locked_by = ""
+    job.locked_at = None
+    job.finished_at = timezone.now()
+    job.save(
+        update_fields=[
+            "status",
+            "result",
+            "last_error",
+            "locked_by",
+            "locked_at",
+            "finished_at",
+            "updated_at",
+        ]
+    )
+    return job
+
+
+def run_next_job(
+    *,
+    worker_id: str,
+    queues: list[str] | None = None,
+) -> Job | None:
+    job = claim_next_job(worker_id=worker_id, queues=queues)
+    if job is None:
+        return None
+    return execute_job(job)
+
+
+def requeue_stale_jobs(*, timeout_seconds: int | None = None) -> int:
+    """Devolve para a fila jobs presos em RUNNING por worker que morreu."""
+    timeout = timeout_seconds or settings.JOBS_LOCK_TIMEOUT_SECONDS
+    stale_before = timezone.now() - timedelta(seconds=timeout)
+    requeued = 0
+    with transaction.atomic():
+        stale_jobs = Job.objects.select_for_update(skip_locked=True).filter(
+            status=JobStatus.RUNNING,
+            locked_at__lt=stale_before,
+        )
+        for job in stale_jobs:
+            _mark_job_failed(
+                job,
+                error=f"Lock expirado do worker {job.locked_by or '-'}.",
+            )
+            requeued += 1
+    return requeued
+
+
+def requeue_job(job: Job) -> Job:
+    job.status = JobStatus.QUEUED
+    job.run_at = timezone.now()
+    job.attempts = 0
+    job.locked_by = ""
+    job.locked_at = None
+    job.finished_at = None
+    job.save(
+        update_fields=[
+            "status",
+            "run_at",
+            "attempts",
+            "locked_by",
+            "locked_at",
+            "finished_at",
+            "updated_at",
+        ]
+    )
+    return job
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class OcrAiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.ocr_ai"
+
+    def ready(self):
+        from .matching import register_ingredient_match_signals
+
+        register_ingredient_match_signals()
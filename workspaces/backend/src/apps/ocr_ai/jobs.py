@@ -0,0 +1,19 @@
+from apps.jobs.services import register_job_handler
+
+from .services import PROCESS_OCR_JOB_NAME, fail_abandoned_ocr_job, run_ocr_job
+
+
+def _fail_abandoned_ocr_job(payload: dict) -> None:
+    fail_abandoned_ocr_job(int(payload["ocr_job_id"]))
+
+
+@register_job_handler(
+    PROCESS_OCR_JOB_NAME,
+    atomic=False,
+    on_dead=_fail_abandoned_ocr_job,
+)
+def process_ocr_job_handler(payload: dict) -> dict | None:
+    job = run_ocr_job(int(payload["ocr_job_id"]))
+    if job is None:
+        return None
+    return {"ocr_job_id": job.id, "status": job.status}
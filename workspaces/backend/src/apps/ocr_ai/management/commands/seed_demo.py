@@ -525,7 +525,7 @@ class Command(BaseCommand):
                         "Imagem sintetica para ambiente de desenvolvimento.",
                     ],
                 )
-                ingredient.image.save(image.name, image, save=False)
+                ingredient.image = image
                 updated_fields.append("image")
 
             if updated_fields:
@@ -597,7 +597,8 @@ class Command(BaseCommand):
                         dish.description or "",
                     ],
                 )
-                dish.image.save(image.name, image, save=True)
+                dish.image = image
+                dish.save(update_fields=["image", "updated_at"])
 
             dishes[dish.name.lower()] = dish
 
@@ -402,7 +402,7 @@ class Command(BaseCommand):
                         "Imagem sintetica para ambiente de producao local.",
                     ],
                 )
-                ingredient.image.save(image.name, image, save=False)
+                ingredient.image = image
                 updated_fields.append("image")
 
             if updated_fields:
@@ -460,7 +460,8 @@ class Command(BaseCommand):
                         f"Descricao: {dish.description}",
                     ],
                 )
-                dish.image.save(image.name, image, save=True)
+                dish.image = image
+                dish.save(update_fields=["image", "updated_at"])
 
             dishes_by_weekday[int(spec["weekday"])] = dish
 
@@ -0,0 +1,220 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from apps.catalog.models import Ingredient
+from apps.common.cache import get_cache_tag_version, invalidate_cache_tags
+
+INGREDIENT_MATCH_INDEX_CACHE_TAG = "ingredient-match-index"
+INGREDIENT_MATCH_MIN_SCORE = 0.62
+INGREDIENT_MATCH_IN_TEXT_SCORE = 0.78
+# Candidatos pre-selecionados pelas postings antes do rescore com difflib.
+INGREDIENT_MATCH_SHORTLIST_SIZE = 40
+
+_INDEX_LOCK = threading.Lock()
+_INDEX_SNAPSHOT: dict = {"version": None, "expires_at": 0.0, "index": None}
+
+
+def normalize_lookup_text(value: str) -> str:
+    normalized = unicodedata.normalize("NFKD", value or "")
+    ascii_value = normalized.encode("ascii", "ignore").decode("ascii")
+    lowered = ascii_value.lower().strip()
+    return re.sub(r"[^a-z0-9]+", " ", lowered).strip()
+
+
+def build_trigrams(normalized_value: str) -> set[str]:
+    padded = f"  {normalized_value} "
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class IngredientMatchEntry:
+    ingredient_id: int
+    name: str
+    normalized: str
+    tokens: frozenset[str]
+    trigrams: frozenset[str]
+
+
+@dataclass
+class IngredientMatchIndex:
+    entries: list[IngredientMatchEntry] = field(default_factory=list)
+    exact: dict[str, int] = field(default_factory=dict)
+    trigram_postings: dict[str, list[int]] = field(default_factory=dict)
+    first_token_postings: dict[str, list[int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, rows) -> "IngredientMatchIndex":
+        index = cls()
+        for ingredient_id, name in rows:
+            normalized = normalize_lookup_text(name)
+            if not normalized:
+                continue
+
+            tokens = normalized.split()
+            position = len(index.entries)
+            entry = IngredientMatchEntry(
+                ingredient_id=ingredient_id,
+                name=name,
+                normalized=normalized,
+                tokens=frozenset(tokens),
+                trigrams=frozenset(build_trigrams(normalized)),
+            )
+            index.entries.append(entry)
+            index.exact.setdefault(normalized, position)
+            index.first_token_postings.setdefault(tokens[0], []).append(position)
+            for trigram in entry.trigrams:
+                index.trigram_postings.setdefault(trigram, []).append(position)
+        return index
+
+    def _shortlist(self, normalized_query: str) -> list[int]:
+        query_trigrams = build_trigrams(normalized_query)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.trigram_postings.get(trigram, ()))
+
+        # Dice sobre trigramas ordena os candidatos sem varrer o catalogo.
+        def dice(item: tuple[int, int]) -> float:
+            position, shared_count = item
+            total = len(query_trigrams) + len(self.entries[position].trigrams)
+            return 2 * shared_count / total
+
+        ranked = sorted(shared.items(), key=dice, reverse=True)
+        return [position for position, _ in ranked[:INGREDIENT_MATCH_SHORTLIST_SIZE]]
+
+    def _mentioned_in_text(self, raw_normalized: str) -> set[int]:
+        raw_tokens = set(raw_normalized.split())
+        padded_raw = f" {raw_normalized} "
+        return {
+            position
+            for token in raw_tokens
+            for position in self.first_token_postings.get(token, ())
+            if f" {self.entries[position].normalized} " in padded_raw
+        }
+
+    def search(
+        self,
+        query: str,
+        *,
+        raw_text: str = "",
+        limit: int = 5,
+        min_score: float = INGREDIENT_MATCH_MIN_SCORE,
+    ) -> list[dict]:
+        normalized_query = normalize_lookup_text(query)
+        if not normalized_query:
+            return []
+
+        exact_position = self.exact.get(normalized_query)
+        if exact_position is not None:
+            entry = self.entries[exact_position]
+            return [
+                {
+                    "ingredient_id": entry.ingredient_id,
+                    "ingredient_name": entry.name,
+                    "confidence": 1.0,
+                    "match_type": "exact",
+                }
+            ]
+
+        mentioned = self._mentioned_in_text(normalize_lookup_text(raw_text))
+        query_tokens = set(normalized_query.split())
+        scored: list[tuple[float, IngredientMatchEntry]] = []
+        for position in {*self._shortlist(normalized_query), *mentioned}:
+            entry = self.entries[position]
+            sequence_score = SequenceMatcher(
+                None, normalized_query, entry.normalized
+            ).ratio()
+            union = query_tokens | entry.tokens
+            token_score = len(query_tokens & entry.tokens) / len(union) if union else 0
+            in_text_score = (
+                INGREDIENT_MATCH_IN_TEXT_SCORE if position in mentioned else 0
+            )
+            score = max(sequence_score, token_score, in_text_score)
+            if score >= min_score:
+                scored.append((score, entry))
+
+        scored.sort(key=lambda item: (-item[0], item[1].name))
+        return [
+            {
+                "ingredient_id": entry.ingredient_id,
+                "ingredient_name": entry.name,
+                "confidence": round(float(score), 3),
+                "match_type": "fuzzy",
+            }
+            for score, entry in scored[:limit]
+        ]
+
+
+def get_ingredient_match_index_version() -> str:
+    return get_cache_tag_version(INGREDIENT_MATCH_INDEX_CACHE_TAG)
+
+
+def bump_ingredient_match_index_version() -> str:
+    return invalidate_cache_tags(INGREDIENT_MATCH_INDEX_CACHE_TAG)[
+        INGREDIENT_MATCH_INDEX_CACHE_TAG
+    ]
+
+
+def reset_ingredient_match_index() -> None:
+    with _INDEX_LOCK:
+        _INDEX_SNAPSHOT.update(version=None, expires_at=0.0, index=None)
+
+
+def get_ingredient_match_index() -> IngredientMatchIndex:
+    """Indice em memoria por processo, reconstruido quando a versao muda.
+
+    O TTL limita o tempo de vida de um indice montado dentro de uma
+    transacao que depois sofreu rollback.
+    """
+    version = get_ingredient_match_index_version()
+    now = time.monotonic()
+    with _INDEX_LOCK:
+        if (
+            _INDEX_SNAPSHOT["index"] is not None
+            and _INDEX_SNAPSHOT["version"] == version
+            and _INDEX_SNAPSHOT["expires_at"] > now
+        ):
+            return _INDEX_SNAPSHOT["index"]
+
+    index = IngredientMatchIndex.build(
+        Ingredient.objects.order_by("id").values_list("id", "name")
+    )
+    with _INDEX_LOCK:
+        _INDEX_SNAPSHOT.update(
+            version=version,
+            expires_at=now + settings.OCR_INGREDIENT_INDEX_TTL_SECONDS,
+            index=index,
+        )
+    return index
+
+
+def search_ingredient_candidates(
+    query: str,
+    *,
+    raw_text: str = "",
+    limit: int = 5,
+) -> list[dict]:
+    return get_ingredient_match_index().search(query, raw_text=raw_text, limit=limit)
+
+
+def _handle_ingredient_change(sender, **kwargs) -> None:
+    bump_ingredient_match_index_version()
+    transaction.on_commit(bump_ingredient_match_index_version)
+
+
+def register_ingredient_match_signals() -> None:
+    for signal_name, model_signal in (("save", post_save), ("delete", post_delete)):
+        model_signal.connect(
+            _handle_ingredient_change,
+            sender=Ingredient,
+            weak=False,
+            dispatch_uid=f"mrq-ingredient-match-index:{signal_name}",
+        )
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ocr_ai", "0002_alter_ocrjob_kind"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ocrjob",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PENDING", "PENDING"),
+                    ("PROCESSING", "PROCESSING"),
+                    ("PROCESSED", "PROCESSED"),
+                    ("APPLIED", "APPLIED"),
+                    ("FAILED", "FAILED"),
+                ],
+                default="PENDING",
+                max_length=16,
+            ),
+        ),
+    ]
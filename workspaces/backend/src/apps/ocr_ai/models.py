@@ -11,6 +11,7 @@ class OCRKind(models.TextChoices):
 
 class OCRJobStatus(models.TextChoices):
     PENDING = "PENDING", "PENDING"
+    PROCESSING = "PROCESSING", "PROCESSING"
     PROCESSED = "PROCESSED", "PROCESSED"
     APPLIED = "APPLIED", "APPLIED"
     FAILED = "FAILED", "FAILED"
@@ -3,9 +3,20 @@ from django.db.models import QuerySet
 from .models import OCRJob
 
 
-def list_ocr_jobs() -> QuerySet[OCRJob]:
-    return OCRJob.objects.order_by("-created_at", "-id")
+def list_ocr_jobs(*, job_ids: list[int] | None = None) -> QuerySet[OCRJob]:
+    queryset = OCRJob.objects.order_by("-created_at", "-id")
+    if job_ids:
+        queryset = queryset.filter(pk__in=job_ids)
+    return queryset
 
 
 def get_ocr_job(job_id: int) -> OCRJob | None:
     return OCRJob.objects.filter(pk=job_id).first()
+
+
+def get_ocr_job_status(job_id: int) -> OCRJob | None:
+    return (
+        OCRJob.objects.filter(pk=job_id)
+        .only("id", "kind", "status", "error_message", "updated_at")
+        .first()
+    )
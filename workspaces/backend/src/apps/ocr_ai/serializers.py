@@ -1,7 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
 
-from .models import OCRJob
-from .services import apply_ocr_job, create_ocr_job
+from .models import OCRJob, OCRKind
+from .services import apply_ocr_job, create_ocr_job, create_ocr_jobs_batch
 
 
 class OCRJobSerializer(serializers.ModelSerializer):
@@ -49,6 +50,35 @@ class OCRJobSerializer(serializers.ModelSerializer):
         return request.build_absolute_uri(obj.image.url)
 
 
+class OCRJobBatchCreateSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=OCRKind.choices)
+    images = serializers.ListField(
+        child=serializers.ImageField(),
+        allow_empty=False,
+    )
+
+    def validate_images(self, value):
+        max_files = settings.OCR_BATCH_MAX_FILES
+        if len(value) > max_files:
+            raise serializers.ValidationError(
+                f"Envie no maximo {max_files} imagens por lote."
+            )
+        return value
+
+    def create(self, validated_data):
+        return create_ocr_jobs_batch(
+            kind=validated_data["kind"],
+            images=validated_data["images"],
+        )
+
+
+class OCRJobStatusSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OCRJob
+        fields = ["id", "kind", "status", "error_message", "updated_at"]
+        read_only_fields = fields
+
+
 class OCRJobApplySerializer(serializers.Serializer):
     target_type = serializers.ChoiceField(
         choices=["INGREDIENT", "PURCHASE_ITEM", "PURCHASE"]
@@ -1,19 +1,28 @@
+import logging
 import re
-import unicodedata
 from decimal import Decimal, InvalidOperation
-from difflib import SequenceMatcher
 from pathlib import Path
 
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
 from django.db import transaction
+from django.utils import timezone
 from django.utils.text import slugify
 
 from apps.catalog.models import Ingredient, NutritionFact, NutritionSource
+from apps.jobs.services import enqueue
 from apps.procurement.models import Purchase, PurchaseItem
 
+from .matching import search_ingredient_candidates
 from .models import OCRJob, OCRJobStatus, OCRKind
 
+logger = logging.getLogger(__name__)
+
+OCR_JOB_QUEUE = "ocr"
+PROCESS_OCR_JOB_NAME = "ocr_ai.process_ocr_job"
+OCR_ACTIVE_STATUSES = (OCRJobStatus.PENDING, OCRJobStatus.PROCESSING)
+OCR_INGREDIENT_CANDIDATES_LIMIT = 5
+
 
 def _to_decimal(raw_value: str | int | float | Decimal | None) -> Decimal | None:
     if raw_value is None:
@@ -86,13 +95,6 @@ def _extract_nutrient_value(text: str, aliases: list[str]) -> str | None:
     return None
 
 
-def _normalize_lookup_text(value: str) -> str:
-    normalized = unicodedata.normalize("NFKD", value or "")
-    ascii_value = normalized.encode("ascii", "ignore").decode("ascii")
-    lowered = ascii_value.lower().strip()
-    return re.sub(r"[^a-z0-9]+", " ", lowered).strip()
-
-
 def _extract_product_name_from_text(raw_text: str) -> str | None:
     product_name = _find_first_match(
         raw_text,
@@ -117,55 +119,15 @@ def _resolve_recognized_ingredient(
     if not product_name:
         return None
 
-    normalized_product = _normalize_lookup_text(product_name)
-    if not normalized_product:
+    candidates = search_ingredient_candidates(
+        product_name,
+        raw_text=raw_text,
+        limit=OCR_INGREDIENT_CANDIDATES_LIMIT,
+    )
+    if not candidates:
         return None
 
-    raw_normalized = _normalize_lookup_text(raw_text)
-    ingredients = Ingredient.objects.all().only("id", "name")
-
-    best_match = None
-    best_score = 0.0
-    product_tokens = set(normalized_product.split())
-    for ingredient in ingredients:
-        normalized_candidate = _normalize_lookup_text(ingredient.name)
-        if not normalized_candidate:
-            continue
-
-        if normalized_candidate == normalized_product:
-            return {
-                "ingredient_id": ingredient.id,
-                "ingredient_name": ingredient.name,
-                "confidence": 1.0,
-                "match_type": "exact",
-            }
-
-        sequence_score = SequenceMatcher(
-            None, normalized_product, normalized_candidate
-        ).ratio()
-        token_set = set(normalized_candidate.split())
-        union = product_tokens | token_set
-        token_score = (len(product_tokens & token_set) / len(union)) if union else 0
-
-        in_text_score = (
-            0.78
-            if re.search(rf"\b{re.escape(normalized_candidate)}\b", raw_normalized)
-            else 0
-        )
-        score = max(sequence_score, token_score, in_text_score)
-        if score > best_score:
-            best_score = score
-            best_match = ingredient
-
-    if best_match is None or best_score < 0.62:
-        return None
-
-    return {
-        "ingredient_id": best_match.id,
-        "ingredient_name": best_match.name,
-        "confidence": round(float(best_score), 3),
-        "match_type": "fuzzy",
-    }
+    return {**candidates[0], "candidates": candidates}
 
 
 def parse_label_text(raw_text: str) -> dict:
@@ -372,20 +334,77 @@ def process_ocr_job(job: OCRJob, *, raw_text_override: str | None = None) -> OCR
     return job
 
 
-@transaction.atomic
-def create_ocr_job(*, kind: str, image, raw_text: str | None = None) -> OCRJob:
-    job = OCRJob.objects.create(kind=kind, image=image, raw_text=raw_text)
+def _mark_ocr_job_failed(job: OCRJob, *, error_message: str) -> OCRJob:
+    job.status = OCRJobStatus.FAILED
+    job.error_message = error_message
+    job.save(update_fields=["status", "error_message", "updated_at"])
+    return job
+
+
+def run_ocr_job(job_id: int) -> OCRJob | None:
+    """Executa o OCR fora do request: PENDING -> PROCESSING -> PROCESSED/FAILED.
 
+    A troca para PROCESSING e confirmada antes do Tesseract rodar, para que o
+    endpoint de status reflita o andamento. Jobs ja finalizados sao ignorados,
+    o que torna a reentrega pela fila idempotente.
+    """
+    claimed = OCRJob.objects.filter(pk=job_id, status__in=OCR_ACTIVE_STATUSES).update(
+        status=OCRJobStatus.PROCESSING
+    )
+    if not claimed:
+        return None
+
+    job = OCRJob.objects.get(pk=job_id)
     try:
-        process_ocr_job(job, raw_text_override=raw_text)
+        with transaction.atomic():
+            process_ocr_job(job)
     except ValidationError as exc:
-        job.status = OCRJobStatus.FAILED
-        job.error_message = " ".join(exc.messages)
-        job.save(update_fields=["status", "error_message", "updated_at"])
+        _mark_ocr_job_failed(job, error_message=" ".join(exc.messages))
+    except Exception as exc:
+        logger.exception("Falha inesperada no OCR job %s.", job_id)
+        _mark_ocr_job_failed(job, error_message=f"Falha ao processar OCR: {exc}")
+    return job
+
 
+def fail_abandoned_ocr_job(job_id: int) -> int:
+    """Marca como FAILED o OCRJob cujo job da fila esgotou as tentativas."""
+    return OCRJob.objects.filter(pk=job_id, status__in=OCR_ACTIVE_STATUSES).update(
+        status=OCRJobStatus.FAILED,
+        error_message="Processamento interrompido; envie o arquivo novamente.",
+        updated_at=timezone.now(),
+    )
+
+
+def _enqueue_ocr_job(job: OCRJob) -> None:
+    enqueue(
+        PROCESS_OCR_JOB_NAME,
+        {"ocr_job_id": job.id},
+        queue=OCR_JOB_QUEUE,
+        # Falhas de OCR viram FAILED no proprio OCRJob e o handler conclui;
+        # a segunda tentativa cobre worker que morreu no meio do job.
+        max_attempts=2,
+    )
+
+
+@transaction.atomic
+def create_ocr_job(*, kind: str, image, raw_text: str | None = None) -> OCRJob:
+    job = OCRJob.objects.create(kind=kind, image=image, raw_text=raw_text)
+    _enqueue_ocr_job(job)
+    # Em modo eager o handler ja atualizou a linha no banco.
+    job.refresh_from_db()
     return job
 
 
+@transaction.atomic
+def create_ocr_jobs_batch(*, kind: str, images: list) -> list[OCRJob]:
+    jobs = [OCRJob.objects.create(kind=kind, image=image) for image in images]
+    for job in jobs:
+        _enqueue_ocr_job(job)
+    for job in jobs:
+        job.refresh_from_db()
+    return jobs
+
+
 def _update_nutrition_fact_field(
     *, nutrition_fact: NutritionFact, field_name: str, value: Decimal | None, mode: str
 ) -> None:
@@ -646,8 +665,9 @@ def apply_ocr_job(
     if mode not in {"overwrite", "merge"}:
         raise ValidationError("Modo invalido. Use overwrite ou merge.")
 
-    if job.status == OCRJobStatus.PENDING:
-        process_ocr_job(job)
+    # PENDING ja esta na fila: processar aqui rodaria o OCR duas vezes.
+    if job.status in OCR_ACTIVE_STATUSES:
+        raise ValidationError("OCR job ainda esta em processamento.")
 
     if job.status == OCRJobStatus.FAILED:
         raise ValidationError("OCR job esta em estado FAILED e nao pode ser aplicado.")
@@ -1,4 +1,8 @@
+import time
+
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError as DRFValidationError
@@ -11,12 +15,39 @@ from apps.accounts.permissions import (
     RoleMatrixPermission,
 )
 
-from .selectors import list_ocr_jobs
+from .selectors import get_ocr_job_status, list_ocr_jobs
 from .serializers import (
     OCRJobApplyResultSerializer,
     OCRJobApplyServiceSerializer,
+    OCRJobBatchCreateSerializer,
     OCRJobSerializer,
+    OCRJobStatusSerializer,
 )
+from .services import OCR_ACTIVE_STATUSES
+
+
+def _parse_job_ids(raw_value: str | None) -> list[int] | None:
+    if not raw_value:
+        return None
+
+    try:
+        return [int(part) for part in raw_value.split(",") if part.strip()]
+    except ValueError as exc:
+        raise DRFValidationError(
+            {"ids": "Informe ids numericos separados por virgula."}
+        ) from exc
+
+
+def _parse_wait_seconds(raw_value: str | None) -> float:
+    if not raw_value:
+        return 0.0
+
+    try:
+        wait_seconds = float(raw_value)
+    except ValueError as exc:
+        raise DRFValidationError({"wait": "Informe o tempo em segundos."}) from exc
+
+    return max(0.0, min(wait_seconds, settings.OCR_STATUS_LONG_POLL_MAX_SECONDS))
 
 
 class OCRJobViewSet(
@@ -32,11 +63,58 @@ class OCRJobViewSet(
         "read": OCR_READ_ROLES,
         "write": OCR_WRITE_ROLES,
         "apply": OCR_WRITE_ROLES,
+        "batch": OCR_WRITE_ROLES,
     }
 
     def get_queryset(self):
+        if self.action == "list":
+            return list_ocr_jobs(
+                job_ids=_parse_job_ids(self.request.query_params.get("ids"))
+            )
         return list_ocr_jobs()
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="batch",
+        parser_classes=[MultiPartParser, FormParser],
+    )
+    def batch(self, request):
+        input_serializer = OCRJobBatchCreateSerializer(
+            data={
+                "kind": request.data.get("kind"),
+                "images": request.FILES.getlist("images"),
+            }
+        )
+        input_serializer.is_valid(raise_exception=True)
+        jobs = input_serializer.save()
+
+        output_serializer = OCRJobSerializer(
+            jobs,
+            many=True,
+            context=self.get_serializer_context(),
+        )
+        return Response(output_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=["get"], url_path="status")
+    def job_status(self, request, pk=None):
+        """Status enxuto do job; `?wait=N` segura a resposta ate sair de
+        PENDING/PROCESSING ou ate N segundos (long-poll)."""
+        if not str(pk).isdigit():
+            raise Http404
+        wait_seconds = _parse_wait_seconds(request.query_params.get("wait"))
+        deadline = time.monotonic() + wait_seconds
+
+        while True:
+            job = get_ocr_job_status(int(pk))
+            if job is None:
+                raise Http404
+            if job.status not in OCR_ACTIVE_STATUSES or time.monotonic() >= deadline:
+                break
+            time.sleep(settings.OCR_STATUS_LONG_POLL_INTERVAL_SECONDS)
+
+        return Response(OCRJobStatusSerializer(job).data)
+
     @action(detail=True, methods=["post"], url_path="apply")
     def apply(self, request, pk=None):
         input_serializer = OCRJobApplyServiceSerializer(data=request.data)
@@ -1,6 +1,15 @@
 from django.contrib import admin
 
-from .models import Order, OrderItem, Payment, PaymentIntent, PaymentWebhookEvent
+from .models import (
+    Order,
+    OrderItem,
+    OrderReservation,
+    Payment,
+    PaymentIntent,
+    PaymentProviderCustomer,
+    PaymentWebhookEvent,
+)
+from .webhooks import replay_payment_webhook_event
 
 
 class OrderItemInline(admin.TabularInline):
@@ -13,6 +22,12 @@ class PaymentInline(admin.TabularInline):
     extra = 0
 
 
+class OrderReservationInline(admin.TabularInline):
+    model = OrderReservation
+    extra = 0
+    readonly_fields = ["menu_item", "shard", "qty", "status", "expires_at"]
+
+
 class PaymentIntentInline(admin.TabularInline):
     model = PaymentIntent
     extra = 0
@@ -30,7 +45,7 @@ class OrderAdmin(admin.ModelAdmin):
     ]
     list_filter = ["status", "delivery_date"]
     search_fields = ["id", "customer__username", "customer__email"]
-    inlines = [OrderItemInline, PaymentInline]
+    inlines = [OrderItemInline, PaymentInline, OrderReservationInline]
 
 
 @admin.register(Payment)
@@ -66,7 +81,31 @@ class PaymentWebhookEventAdmin(admin.ModelAdmin):
         "intent",
         "intent_status",
         "payment_status",
+        "inbox_status",
+        "attempts",
         "processed_at",
     ]
-    list_filter = ["provider", "intent_status", "payment_status"]
-    search_fields = ["event_id", "payment__id", "intent__id"]
+    list_filter = ["provider", "inbox_status", "intent_status", "payment_status"]
+    search_fields = ["event_id", "provider_intent_ref", "payment__id", "intent__id"]
+    actions = ["replay_events"]
+
+    @admin.action(description="Reprocessar eventos selecionados")
+    def replay_events(self, request, queryset):
+        events = list(queryset)
+        for webhook_event in events:
+            replay_payment_webhook_event(webhook_event)
+        self.message_user(request, f"{len(events)} evento(s) reenfileirado(s).")
+
+
+@admin.register(PaymentProviderCustomer)
+class PaymentProviderCustomerAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "provider",
+        "customer",
+        "provider_customer_id",
+        "account_ref",
+        "updated_at",
+    ]
+    list_filter = ["provider"]
+    search_fields = ["provider_customer_id", "customer__username", "email"]
@@ -0,0 +1,36 @@
+from django.utils.dateparse import parse_datetime
+
+from apps.jobs.services import register_job_handler
+
+from .monitoring import (
+    MATERIALIZE_PAYMENT_MONITOR_ROLLUPS_JOB,
+    materialize_payment_monitor_rollups,
+)
+from .reservations import EXPIRE_ORDER_RESERVATIONS_JOB, release_expired_reservations
+from .webhooks import PROCESS_PAYMENT_WEBHOOKS_JOB, process_payment_webhook_inbox
+
+
+@register_job_handler(EXPIRE_ORDER_RESERVATIONS_JOB)
+def expire_order_reservations_job(payload: dict) -> dict:
+    released = release_expired_reservations(order_id=payload.get("order_id"))
+    return {"released": released}
+
+
+@register_job_handler(MATERIALIZE_PAYMENT_MONITOR_ROLLUPS_JOB)
+def materialize_payment_monitor_rollups_job(payload: dict) -> dict:
+    minutes = [parse_datetime(value) for value in payload.get("minutes", [])]
+    created = materialize_payment_monitor_rollups(
+        [minute for minute in minutes if minute is not None],
+        now=parse_datetime(payload.get("now") or ""),
+    )
+    return {"minutes": created}
+
+
+# Nao atomico: a consulta ao provider roda fora da transacao que trava o
+# inbox; o proprio processamento abre a transacao da aplicacao.
+@register_job_handler(PROCESS_PAYMENT_WEBHOOKS_JOB, atomic=False)
+def process_payment_webhooks_job(payload: dict) -> dict:
+    return process_payment_webhook_inbox(
+        provider=payload["provider"],
+        provider_intent_ref=payload["provider_intent_ref"],
+    )
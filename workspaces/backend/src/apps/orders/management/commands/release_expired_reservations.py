@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.reservations import release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = "Libera reservas de capacidade cujo hold de pagamento expirou."
+
+    def handle(self, *args, **options):
+        released_count = release_expired_reservations()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Liberacao concluida com sucesso. "
+                f"Reservas liberadas: {released_count}."
+            )
+        )
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0004_alter_order_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PaymentMonitorMinuteRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("minute", models.DateTimeField(unique=True)),
+                ("orders_created", models.PositiveIntegerField(default=0)),
+                ("payments_paid", models.PositiveIntegerField(default=0)),
+                ("webhooks_received", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-minute"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="paymentwebhookevent",
+            index=models.Index(
+                fields=["provider", "created_at"], name="orders_webhook_prov_created"
+            ),
+        ),
+    ]
@@ -0,0 +1,112 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:33
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0002_dish_image_ingredient_image_nutritionfact"),
+        ("orders", "0005_payment_monitor_rollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MenuItemCapacityShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("shard", models.PositiveSmallIntegerField()),
+                ("capacity", models.PositiveIntegerField(default=0)),
+                ("reserved_qty", models.PositiveIntegerField(default=0)),
+                (
+                    "menu_item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="capacity_shards",
+                        to="catalog.menuitem",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["menu_item_id", "shard"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("menu_item", "shard"),
+                        name="orders_capacity_shard_menu_item_shard_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="OrderReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("shard", models.PositiveSmallIntegerField()),
+                (
+                    "qty",
+                    models.PositiveIntegerField(
+                        validators=[django.core.validators.MinValueValidator(1)]
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("HELD", "HELD"),
+                            ("CONFIRMED", "CONFIRMED"),
+                            ("RELEASED", "RELEASED"),
+                        ],
+                        default="HELD",
+                        max_length=16,
+                    ),
+                ),
+                ("expires_at", models.DateTimeField(blank=True, null=True)),
+                ("released_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "menu_item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="order_reservations",
+                        to="catalog.menuitem",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="orders.order",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["order_id", "menu_item_id", "shard"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "expires_at"],
+                        name="orders_reservation_exp_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:45
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def mark_legacy_webhooks_processed(apps, schema_editor):
+    # Eventos anteriores ao inbox foram processados de forma sincrona.
+    webhook_model = apps.get_model("orders", "PaymentWebhookEvent")
+    intent_model = apps.get_model("orders", "PaymentIntent")
+    webhook_model.objects.filter(processed_at__isnull=False).update(
+        inbox_status="PROCESSED",
+        provider_intent_ref=Coalesce(
+            Subquery(
+                intent_model.objects.filter(pk=OuterRef("intent_id")).values(
+                    "provider_intent_ref"
+                )[:1]
+            ),
+            Value(""),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0007_payment_provider_customer"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paymentwebhookevent",
+            name="attempts",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="paymentwebhookevent",
+            name="inbox_status",
+            field=models.CharField(
+                choices=[
+                    ("RECEIVED", "RECEIVED"),
+                    ("PROCESSED", "PROCESSED"),
+                    ("FAILED", "FAILED"),
+                    ("DEAD", "DEAD"),
+                ],
+                default="RECEIVED",
+                max_length=16,
+            ),
+        ),
+        migrations.AddField(
+            model_name="paymentwebhookevent",
+            name="last_error",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="paymentwebhookevent",
+            name="normalized",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="paymentwebhookevent",
+            name="provider_intent_ref",
+            field=models.CharField(blank=True, default="", max_length=180),
+        ),
+        migrations.AddIndex(
+            model_name="paymentwebhookevent",
+            index=models.Index(
+                fields=["provider", "provider_intent_ref", "inbox_status"],
+                name="orders_webhook_inbox_idx",
+            ),
+        ),
+        migrations.RunPython(
+            mark_legacy_webhooks_processed,
+            migrations.RunPython.noop,
+        ),
+    ]
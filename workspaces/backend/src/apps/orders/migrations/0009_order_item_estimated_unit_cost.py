@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0008_payment_webhook_inbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderitem",
+            name="estimated_unit_cost",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=12, null=True
+            ),
+        ),
+    ]
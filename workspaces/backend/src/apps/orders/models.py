@@ -39,6 +39,19 @@ class PaymentStatus(models.TextChoices):
     REFUNDED = "REFUNDED", "REFUNDED"
 
 
+class OrderReservationStatus(models.TextChoices):
+    HELD = "HELD", "HELD"
+    CONFIRMED = "CONFIRMED", "CONFIRMED"
+    RELEASED = "RELEASED", "RELEASED"
+
+
+class PaymentWebhookInboxStatus(models.TextChoices):
+    RECEIVED = "RECEIVED", "RECEIVED"
+    PROCESSED = "PROCESSED", "PROCESSED"
+    FAILED = "FAILED", "FAILED"
+    DEAD = "DEAD", "DEAD"
+
+
 class PaymentIntentStatus(models.TextChoices):
     REQUIRES_ACTION = "REQUIRES_ACTION", "REQUIRES_ACTION"
     PROCESSING = "PROCESSING", "PROCESSING"
@@ -101,6 +114,13 @@ class OrderItem(models.Model):
         decimal_places=2,
         validators=[MinValueValidator(Decimal("0"))],
     )
+    # Custo estimado por porcao congelado na confirmacao do pedido (CMV).
+    estimated_unit_cost = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+    )
 
     class Meta:
         constraints = [
@@ -203,6 +223,16 @@ class PaymentWebhookEvent(TimeStampedModel):
     )
     payload = models.JSONField(default=dict, blank=True)
     processed_at = models.DateTimeField(null=True, blank=True)
+    # Inbox: o evento e gravado cru na chegada e processado pelo worker.
+    provider_intent_ref = models.CharField(max_length=180, blank=True, default="")
+    normalized = models.JSONField(default=dict, blank=True)
+    inbox_status = models.CharField(
+        max_length=16,
+        choices=PaymentWebhookInboxStatus.choices,
+        default=PaymentWebhookInboxStatus.RECEIVED,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
 
     class Meta:
         ordering = ["-created_at", "-id"]
@@ -212,6 +242,124 @@ class PaymentWebhookEvent(TimeStampedModel):
                 name="orders_paymentwebhookevent_provider_event_unique",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["provider", "created_at"],
+                name="orders_webhook_prov_created",
+            ),
+            models.Index(
+                fields=["provider", "provider_intent_ref", "inbox_status"],
+                name="orders_webhook_inbox_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Webhook-{self.id} ({self.provider}:{self.event_id})"
+
+
+class PaymentMonitorMinuteRollup(models.Model):
+    minute = models.DateTimeField(unique=True)
+    orders_created = models.PositiveIntegerField(default=0)
+    payments_paid = models.PositiveIntegerField(default=0)
+    webhooks_received = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-minute"]
+
+    def __str__(self) -> str:
+        return f"MonitorRollup-{self.minute:%Y-%m-%d %H:%M}"
+
+
+class MenuItemCapacityShard(models.Model):
+    # A capacidade de cada item e dividida em shards para que pedidos
+    # simultaneos disputem linhas diferentes em vez de um contador unico.
+    menu_item = models.ForeignKey(
+        MenuItem,
+        on_delete=models.CASCADE,
+        related_name="capacity_shards",
+    )
+    shard = models.PositiveSmallIntegerField()
+    capacity = models.PositiveIntegerField(default=0)
+    reserved_qty = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["menu_item_id", "shard"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["menu_item", "shard"],
+                name="orders_capacity_shard_menu_item_shard_unique",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"Capacidade item-{self.menu_item_id}#{self.shard} "
+            f"({self.reserved_qty}/{self.capacity})"
+        )
+
+
+class OrderReservation(TimeStampedModel):
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name="reservations",
+    )
+    menu_item = models.ForeignKey(
+        MenuItem,
+        on_delete=models.CASCADE,
+        related_name="order_reservations",
+    )
+    shard = models.PositiveSmallIntegerField()
+    qty = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    status = models.CharField(
+        max_length=16,
+        choices=OrderReservationStatus.choices,
+        default=OrderReservationStatus.HELD,
+    )
+    expires_at = models.DateTimeField(null=True, blank=True)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["order_id", "menu_item_id", "shard"]
+        indexes = [
+            models.Index(
+                fields=["status", "expires_at"],
+                name="orders_reservation_exp_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"Reserva pedido-{self.order_id} item-{self.menu_item_id} "
+            f"x{self.qty} ({self.status})"
+        )
+
+
+class PaymentProviderCustomer(TimeStampedModel):
+    # Vinculo local cliente -> id do cliente no provider, evitando busca e
+    # cadastro remotos a cada checkout.
+    provider = models.CharField(max_length=40)
+    account_ref = models.CharField(max_length=255)
+    customer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="payment_provider_links",
+    )
+    provider_customer_id = models.CharField(max_length=120)
+    email = models.EmailField(blank=True)
+
+    class Meta:
+        ordering = ["provider", "customer_id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["provider", "account_ref", "customer"],
+                name="orders_providercustomer_provider_account_customer_unique",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.provider}:{self.provider_customer_id} "
+            f"(cliente-{self.customer_id})"
+        )
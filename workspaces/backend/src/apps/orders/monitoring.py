@@ -0,0 +1,350 @@
+from datetime import UTC, datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+
+from apps.jobs.models import Job, JobStatus
+from apps.jobs.services import enqueue
+
+from .models import (
+    Order,
+    OrderStatus,
+    Payment,
+    PaymentIntent,
+    PaymentIntentStatus,
+    PaymentMonitorMinuteRollup,
+    PaymentStatus,
+    PaymentWebhookEvent,
+)
+from .payment_providers import get_payment_http_metrics
+
+PAYMENT_MONITOR_PROVIDERS = ("mercadopago", "efi", "asaas", "mock")
+PAYMENT_MONITOR_SERIES_MINUTES = 15
+MATERIALIZE_PAYMENT_MONITOR_ROLLUPS_JOB = "orders.materialize_payment_monitor_rollups"
+_SERIES_COUNTER_FIELDS = ("orders_created", "payments_paid", "webhooks_received")
+_ORDER_LIFECYCLE_STATUSES = {
+    "created": OrderStatus.CREATED,
+    "confirmed": OrderStatus.CONFIRMED,
+    "in_progress": OrderStatus.IN_PROGRESS,
+    "out_for_delivery": OrderStatus.OUT_FOR_DELIVERY,
+    "delivered": OrderStatus.DELIVERED,
+    "received": OrderStatus.RECEIVED,
+    "canceled": OrderStatus.CANCELED,
+}
+
+
+def _count_by_minute(queryset, *, field_name: str) -> dict[datetime, int]:
+    rows = (
+        queryset.annotate(minute=TruncMinute(field_name, tzinfo=UTC))
+        .values("minute")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    return {row["minute"]: row["total"] for row in rows}
+
+
+def _aggregate_minute_counts(
+    *,
+    start: datetime,
+    end: datetime,
+) -> dict[datetime, dict[str, int]]:
+    per_field = {
+        "orders_created": _count_by_minute(
+            Order.objects.filter(created_at__gte=start, created_at__lt=end),
+            field_name="created_at",
+        ),
+        "payments_paid": _count_by_minute(
+            Payment.objects.filter(
+                status=PaymentStatus.PAID,
+                paid_at__gte=start,
+                paid_at__lt=end,
+            ),
+            field_name="paid_at",
+        ),
+        "webhooks_received": _count_by_minute(
+            PaymentWebhookEvent.objects.filter(
+                created_at__gte=start,
+                created_at__lt=end,
+            ),
+            field_name="created_at",
+        ),
+    }
+
+    counts: dict[datetime, dict[str, int]] = {}
+    for field_name, rows in per_field.items():
+        for minute, total in rows.items():
+            counts.setdefault(minute, dict.fromkeys(_SERIES_COUNTER_FIELDS, 0))
+            counts[minute][field_name] = total
+    return counts
+
+
+def schedule_payment_monitor_rollups(
+    minutes: list[datetime],
+    *,
+    now: datetime,
+) -> None:
+    """Agenda a gravacao dos minutos assentados fora do request de leitura.
+
+    Enquanto houver um job na fila ele cobre os minutos pendentes; a serie
+    segue usando a agregacao ao vivo ate a tabela ser preenchida.
+    """
+    if Job.objects.filter(
+        name=MATERIALIZE_PAYMENT_MONITOR_ROLLUPS_JOB,
+        status=JobStatus.QUEUED,
+    ).exists():
+        return
+    enqueue(
+        MATERIALIZE_PAYMENT_MONITOR_ROLLUPS_JOB,
+        {"minutes": sorted(minutes), "now": now},
+        queue="orders",
+    )
+
+
+def materialize_payment_monitor_rollups(
+    minutes: list[datetime],
+    *,
+    now: datetime | None = None,
+) -> int:
+    """Grava os rollups dos minutos informados e poda os fora da retencao."""
+    now = (now or timezone.now()).astimezone(UTC)
+    settled_before = (
+        now - timedelta(seconds=settings.PAYMENT_MONITOR_ROLLUP_GRACE_SECONDS)
+    ).replace(second=0, microsecond=0)
+    settled = sorted(
+        {
+            minute.astimezone(UTC).replace(second=0, microsecond=0)
+            for minute in minutes
+            if minute < settled_before
+        }
+    )
+    if settled:
+        counts = _aggregate_minute_counts(
+            start=settled[0],
+            end=settled[-1] + timedelta(minutes=1),
+        )
+        PaymentMonitorMinuteRollup.objects.bulk_create(
+            [
+                PaymentMonitorMinuteRollup(
+                    minute=minute,
+                    **counts.get(minute, dict.fromkeys(_SERIES_COUNTER_FIELDS, 0)),
+                )
+                for minute in settled
+            ],
+            ignore_conflicts=True,
+        )
+
+    retention = timedelta(minutes=settings.PAYMENT_MONITOR_ROLLUP_RETENTION_MINUTES)
+    PaymentMonitorMinuteRollup.objects.filter(
+        minute__lt=now.replace(second=0, microsecond=0) - retention
+    ).delete()
+    return len(settled)
+
+
+def build_payment_minute_series(*, now: datetime | None = None) -> list[dict]:
+    """Serie por minuto dos ultimos 15 minutos, apoiada na tabela de rollup.
+
+    Minutos ja assentados (fora da janela de carencia) sao lidos da tabela;
+    apenas os minutos recentes ou ausentes sao agregados com TruncMinute. Os
+    assentados ausentes sao gravados por job, nunca no GET do painel.
+    """
+    now = (now or timezone.now()).astimezone(UTC)
+    current_minute = now.replace(second=0, microsecond=0)
+    minutes = [
+        current_minute - timedelta(minutes=offset)
+        for offset in range(PAYMENT_MONITOR_SERIES_MINUTES - 1, -1, -1)
+    ]
+    settled_before = (
+        now - timedelta(seconds=settings.PAYMENT_MONITOR_ROLLUP_GRACE_SECONDS)
+    ).replace(second=0, microsecond=0)
+
+    stored = {
+        row["minute"]: row
+        for row in PaymentMonitorMinuteRollup.objects.filter(
+            minute__gte=minutes[0],
+            minute__lte=current_minute,
+        ).values("minute", *_SERIES_COUNTER_FIELDS)
+    }
+    pending = [
+        minute for minute in minutes if minute >= settled_before or minute not in stored
+    ]
+
+    live_counts: dict[datetime, dict[str, int]] = {}
+    if pending:
+        live_counts = _aggregate_minute_counts(
+            start=pending[0],
+            end=current_minute + timedelta(minutes=1),
+        )
+        unsettled = [minute for minute in pending if minute < settled_before]
+        if unsettled:
+            schedule_payment_monitor_rollups(unsettled, now=now)
+
+    series: list[dict] = []
+    for minute in minutes:
+        if minute in stored and minute < settled_before:
+            row = stored[minute]
+        else:
+            row = live_counts.get(minute, {})
+        series.append(
+            {
+                "minute": minute.strftime("%H:%M"),
+                **{field: row.get(field, 0) for field in _SERIES_COUNTER_FIELDS},
+            }
+        )
+    return series
+
+
+def _get_last_webhook_event_at() -> dict[str, datetime]:
+    # Um LIMIT 1 por provider, unidos numa consulta: cada ramo desce o indice
+    # (provider, created_at) em vez de agregar o historico inteiro.
+    branches = [
+        PaymentWebhookEvent.objects.filter(provider=provider_name)
+        .order_by("-created_at")
+        .values_list("provider", "created_at")[:1]
+        for provider_name in PAYMENT_MONITOR_PROVIDERS
+    ]
+    return dict(branches[0].union(*branches[1:], all=True))
+
+
+def _resolve_provider_sync_status(
+    *,
+    enabled: bool,
+    configured: bool,
+    failed_24h: int,
+) -> str:
+    if enabled and configured:
+        return "ok" if failed_24h == 0 else "warning"
+    if enabled and not configured:
+        return "danger"
+    return "neutral"
+
+
+def build_payment_monitor_payload(
+    *,
+    payment_config_public: dict,
+    now: datetime | None = None,
+) -> dict:
+    now = now or timezone.now()
+    last_24h = now - timedelta(hours=24)
+    last_15m = now - timedelta(minutes=15)
+
+    lifecycle_counts = Order.objects.aggregate(
+        **{
+            key: Count("id", filter=Q(status=order_status))
+            for key, order_status in _ORDER_LIFECYCLE_STATUSES.items()
+        }
+    )
+    payment_counts = Payment.objects.aggregate(
+        payments_pending=Count("id", filter=Q(status=PaymentStatus.PENDING)),
+        payments_paid=Count("id", filter=Q(status=PaymentStatus.PAID)),
+        payments_failed=Count("id", filter=Q(status=PaymentStatus.FAILED)),
+    )
+    intent_counts = PaymentIntent.objects.aggregate(
+        intents_active=Count(
+            "id",
+            filter=Q(status=PaymentIntentStatus.REQUIRES_ACTION),
+        ),
+        intents_processing=Count(
+            "id",
+            filter=Q(status=PaymentIntentStatus.PROCESSING),
+        ),
+        **{
+            f"intents_24h_{provider_name}": Count(
+                "id",
+                filter=Q(provider=provider_name, created_at__gte=last_24h),
+            )
+            for provider_name in PAYMENT_MONITOR_PROVIDERS
+        },
+    )
+    webhook_rows = {
+        row["provider"]: row
+        for row in PaymentWebhookEvent.objects.filter(created_at__gte=last_24h)
+        .values("provider")
+        .annotate(
+            webhooks_24h=Count("id", filter=Q(created_at__gte=last_24h)),
+            succeeded_24h=Count(
+                "id",
+                filter=Q(
+                    created_at__gte=last_24h,
+                    intent_status=PaymentIntentStatus.SUCCEEDED,
+                ),
+            ),
+            failed_24h=Count(
+                "id",
+                filter=Q(
+                    created_at__gte=last_24h,
+                    intent_status=PaymentIntentStatus.FAILED,
+                ),
+            ),
+            webhooks_15m=Count("id", filter=Q(created_at__gte=last_15m)),
+        )
+        .order_by()
+    }
+    last_event_by_provider = _get_last_webhook_event_at()
+
+    http_metrics = get_payment_http_metrics()
+    provider_rows: list[dict] = []
+    for provider_name in PAYMENT_MONITOR_PROVIDERS:
+        provider_cfg = payment_config_public.get(provider_name, {})
+        webhook_row = webhook_rows.get(provider_name, {})
+        webhooks_24h = webhook_row.get("webhooks_24h", 0)
+        succeeded_24h = webhook_row.get("succeeded_24h", 0)
+        failed_24h = webhook_row.get("failed_24h", 0)
+        last_event = last_event_by_provider.get(provider_name)
+
+        success_rate = (
+            (succeeded_24h / webhooks_24h * 100.0) if webhooks_24h > 0 else 0.0
+        )
+        enabled = (
+            bool(provider_cfg.get("enabled"))
+            if isinstance(provider_cfg, dict)
+            else False
+        )
+        configured = (
+            bool(provider_cfg.get("configured"))
+            if isinstance(provider_cfg, dict)
+            else (provider_name == "mock")
+        )
+
+        provider_rows.append(
+            {
+                "provider": provider_name,
+                "enabled": enabled,
+                "configured": configured,
+                "sync_status": _resolve_provider_sync_status(
+                    enabled=enabled,
+                    configured=configured,
+                    failed_24h=failed_24h,
+                ),
+                "intents_24h": intent_counts[f"intents_24h_{provider_name}"],
+                "webhooks_24h": webhooks_24h,
+                "webhooks_failed_24h": failed_24h,
+                "success_rate_24h": round(success_rate, 2),
+                "last_event_at": last_event.isoformat() if last_event else None,
+                "http_client": http_metrics.get(provider_name),
+            }
+        )
+
+    return {
+        "communication_channel": {
+            "transport": "HTTPS",
+            "auth": "JWT",
+            "encryption": "TLS",
+        },
+        "frontend_provider": payment_config_public.get(
+            "frontend_provider",
+            {"web": "mock", "mobile": "mock"},
+        ),
+        "summary": {
+            **payment_counts,
+            "intents_active": intent_counts["intents_active"],
+            "intents_processing": intent_counts["intents_processing"],
+            "webhooks_last_15m": sum(
+                row["webhooks_15m"] for row in webhook_rows.values()
+            ),
+        },
+        "providers": provider_rows,
+        "order_lifecycle": lifecycle_counts,
+        "series_last_15_minutes": build_payment_minute_series(now=now),
+    }
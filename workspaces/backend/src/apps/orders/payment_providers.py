@@ -1,24 +1,132 @@
 from __future__ import annotations
 
 import base64
-import json
+import hashlib
+import threading
+import time
+from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from decimal import Decimal
-from urllib import error as urllib_error
-from urllib import request as urllib_request
 from uuid import uuid4
 
+from django.conf import settings as django_settings
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
-from .models import Payment, PaymentIntentStatus, PaymentMethod
+from apps.common.http_client import (
+    CircuitOpenError,
+    HttpConnectionError,
+    HttpResponseDecodeError,
+    HttpStatusError,
+    PooledHttpClient,
+)
+
+from .models import (
+    Payment,
+    PaymentIntentStatus,
+    PaymentMethod,
+    PaymentProviderCustomer,
+)
 from .provider_config import (
     build_provider_webhook_url,
     get_provider_settings,
     resolve_provider_for_method,
 )
 
+_PAYMENT_HTTP_CLIENT: PooledHttpClient | None = None
+_PAYMENT_HTTP_CLIENT_LOCK = threading.Lock()
+# Tokens OAuth por (provider, conta), com lock por chave para single-flight.
+_PROVIDER_TOKEN_CACHE: dict[str, tuple[str, float]] = {}
+_PROVIDER_TOKEN_LOCKS: dict[str, threading.Lock] = {}
+_PROVIDER_TOKEN_REGISTRY_LOCK = threading.Lock()
+
+
+def get_payment_http_client() -> PooledHttpClient:
+    global _PAYMENT_HTTP_CLIENT
+    with _PAYMENT_HTTP_CLIENT_LOCK:
+        if _PAYMENT_HTTP_CLIENT is None:
+            _PAYMENT_HTTP_CLIENT = PooledHttpClient(
+                timeout_seconds=django_settings.PAYMENTS_HTTP_TIMEOUT_SECONDS,
+                max_retries=django_settings.PAYMENTS_HTTP_MAX_RETRIES,
+                retry_backoff_seconds=(
+                    django_settings.PAYMENTS_HTTP_RETRY_BACKOFF_SECONDS
+                ),
+                pool_maxsize=django_settings.PAYMENTS_HTTP_POOL_MAXSIZE,
+                failure_threshold=(django_settings.PAYMENTS_CIRCUIT_FAILURE_THRESHOLD),
+                reset_seconds=django_settings.PAYMENTS_CIRCUIT_RESET_SECONDS,
+            )
+        return _PAYMENT_HTTP_CLIENT
+
+
+def reset_payment_http_client() -> None:
+    global _PAYMENT_HTTP_CLIENT
+    with _PAYMENT_HTTP_CLIENT_LOCK:
+        if _PAYMENT_HTTP_CLIENT is not None:
+            _PAYMENT_HTTP_CLIENT.pool.clear()
+        _PAYMENT_HTTP_CLIENT = None
+
+
+def get_payment_http_metrics() -> dict[str, dict]:
+    """Metricas do processo atual (latencia, erros, estado do breaker)."""
+    return get_payment_http_client().get_metrics()
+
+
+def build_provider_token_key(
+    *,
+    provider_name: str,
+    account_ref: str,
+    secret: str,
+) -> str:
+    digest = hashlib.sha256(f"{account_ref}|{secret}".encode()).hexdigest()[:24]
+    return f"{provider_name}:{digest}"
+
+
+def _get_provider_token_lock(token_key: str) -> threading.Lock:
+    with _PROVIDER_TOKEN_REGISTRY_LOCK:
+        return _PROVIDER_TOKEN_LOCKS.setdefault(token_key, threading.Lock())
+
+
+def _read_cached_provider_token(token_key: str) -> str | None:
+    cached = _PROVIDER_TOKEN_CACHE.get(token_key)
+    if cached is None or cached[1] <= time.monotonic():
+        return None
+    return cached[0]
+
+
+def get_cached_provider_token(
+    token_key: str,
+    fetch_token: Callable[[], tuple[str, int]],
+) -> str:
+    """Token em cache ate `expires_in - margem`; so uma thread renova por vez.
+
+    `fetch_token` devolve `(token, expires_in_segundos)`.
+    """
+    token = _read_cached_provider_token(token_key)
+    if token:
+        return token
+
+    with _get_provider_token_lock(token_key):
+        token = _read_cached_provider_token(token_key)
+        if token:
+            return token
+
+        token, expires_in = fetch_token()
+        ttl = float(expires_in or 0) - float(
+            django_settings.PAYMENTS_TOKEN_REFRESH_MARGIN_SECONDS
+        )
+        if ttl > 0:
+            _PROVIDER_TOKEN_CACHE[token_key] = (token, time.monotonic() + ttl)
+        return token
+
+
+def invalidate_provider_token(token_key: str) -> None:
+    _PROVIDER_TOKEN_CACHE.pop(token_key, None)
+
+
+def reset_provider_token_cache() -> None:
+    _PROVIDER_TOKEN_CACHE.clear()
+
 
 @dataclass(slots=True)
 class ProviderIntentResult:
@@ -72,39 +180,34 @@ class BasePaymentProvider:
         url: str,
         headers: dict[str, str],
         payload: dict | None = None,
-        timeout_seconds: int = 20,
+        timeout_seconds: float | None = None,
+        provider_name: str = "base",
     ) -> dict:
-        body: bytes | None = None
-        request_headers = headers.copy()
-        if payload is not None:
-            body = json.dumps(payload).encode("utf-8")
-            request_headers["Content-Type"] = "application/json"
-
-        req = urllib_request.Request(
-            url=url,
-            data=body,
-            headers=request_headers,
-            method=method.upper(),
-        )
-
         try:
-            with urllib_request.urlopen(req, timeout=timeout_seconds) as response:
-                raw_body = response.read().decode("utf-8").strip()
-                if not raw_body:
-                    return {}
-                return json.loads(raw_body)
-        except urllib_error.HTTPError as exc:
-            detail = exc.read().decode("utf-8").strip() if exc.fp is not None else ""
+            return get_payment_http_client().request_json(
+                key=provider_name,
+                method=method,
+                url=url,
+                headers=headers,
+                payload=payload,
+                timeout_seconds=timeout_seconds,
+            )
+        except CircuitOpenError as exc:
+            raise ValidationError(
+                f"Provider de pagamento {provider_name} temporariamente "
+                "indisponivel. Tente novamente em instantes."
+            ) from exc
+        except HttpStatusError as exc:
             message = (
-                f"Falha HTTP {exc.code} em integracao de pagamento: "
-                f"{detail or exc.reason}"
+                f"Falha HTTP {exc.status} em integracao de pagamento: "
+                f"{exc.body or exc.reason}"
             )
             raise ValidationError(message) from exc
-        except urllib_error.URLError as exc:
+        except HttpConnectionError as exc:
             raise ValidationError(
                 "Falha de conexao com provider de pagamento."
             ) from exc
-        except json.JSONDecodeError as exc:
+        except HttpResponseDecodeError as exc:
             raise ValidationError(
                 "Resposta invalida do provider de pagamento."
             ) from exc
@@ -201,6 +304,7 @@ class MercadoPagoPaymentProvider(BasePaymentProvider):
             }
 
             response_payload = self._request_json(
+                provider_name=self.provider_name,
                 method="POST",
                 url=f"{api_base_url}/v1/payments",
                 headers={
@@ -257,6 +361,7 @@ class MercadoPagoPaymentProvider(BasePaymentProvider):
             }
 
             response_payload = self._request_json(
+                provider_name=self.provider_name,
                 method="POST",
                 url=f"{api_base_url}/checkout/preferences",
                 headers={
@@ -313,27 +418,37 @@ class AsaasPaymentProvider(BasePaymentProvider):
             api_key=api_key,
             payment=payment,
         )
-        billing_type = "PIX" if payment.method == PaymentMethod.PIX else "UNDEFINED"
-
-        create_payload = {
-            "customer": asaas_customer_id,
-            "billingType": billing_type,
-            "value": self._to_brl_float(payment.amount),
-            "dueDate": timezone.localdate().isoformat(),
-            "description": f"Pedido #{payment.order_id}",
-            "externalReference": f"order-{payment.order_id}-payment-{payment.id}",
-        }
-
-        payment_payload = self._request_json(
-            method="POST",
-            url=f"{api_base_url}/payments",
-            headers={
-                "access_token": api_key,
-                "User-Agent": "MrQuentinha/Backend",
-                "X-Idempotency-Key": idempotency_key,
-            },
-            payload=create_payload,
-        )
+        try:
+            payment_payload = self._create_payment(
+                api_base_url=api_base_url,
+                api_key=api_key,
+                payment=payment,
+                customer_id=asaas_customer_id,
+                idempotency_key=idempotency_key,
+            )
+        except ValidationError as exc:
+            # Cliente removido no Asaas (ou de outra conta): refaz o vinculo
+            # uma vez. A cobranca anterior foi recusada, entao a nova chave de
+            # idempotencia nao duplica pagamento.
+            if not self._is_missing_customer_error(exc):
+                raise
+            self._forget_customer(
+                api_base_url=api_base_url,
+                api_key=api_key,
+                payment=payment,
+            )
+            asaas_customer_id = self._ensure_customer(
+                api_base_url=api_base_url,
+                api_key=api_key,
+                payment=payment,
+            )
+            payment_payload = self._create_payment(
+                api_base_url=api_base_url,
+                api_key=api_key,
+                payment=payment,
+                customer_id=asaas_customer_id,
+                idempotency_key=f"{idempotency_key}:{asaas_customer_id}",
+            )
 
         provider_ref = str(payment_payload.get("id", "")).strip()
         if not provider_ref:
@@ -347,6 +462,7 @@ class AsaasPaymentProvider(BasePaymentProvider):
 
         if payment.method == PaymentMethod.PIX:
             pix_payload = self._request_json(
+                provider_name=self.provider_name,
                 method="GET",
                 url=f"{api_base_url}/payments/{provider_ref}/pixQrCode",
                 headers={
@@ -368,15 +484,128 @@ class AsaasPaymentProvider(BasePaymentProvider):
             expires_at=timezone.now() + timedelta(minutes=30),
         )
 
+    def _create_payment(
+        self,
+        *,
+        api_base_url: str,
+        api_key: str,
+        payment: Payment,
+        customer_id: str,
+        idempotency_key: str,
+    ) -> dict:
+        billing_type = "PIX" if payment.method == PaymentMethod.PIX else "UNDEFINED"
+        create_payload = {
+            "customer": customer_id,
+            "billingType": billing_type,
+            "value": self._to_brl_float(payment.amount),
+            "dueDate": timezone.localdate().isoformat(),
+            "description": f"Pedido #{payment.order_id}",
+            "externalReference": f"order-{payment.order_id}-payment-{payment.id}",
+        }
+        return self._request_json(
+            provider_name=self.provider_name,
+            method="POST",
+            url=f"{api_base_url}/payments",
+            headers={
+                "access_token": api_key,
+                "User-Agent": "MrQuentinha/Backend",
+                "X-Idempotency-Key": idempotency_key,
+            },
+            payload=create_payload,
+        )
+
+    @staticmethod
+    def _is_missing_customer_error(exc: ValidationError) -> bool:
+        cause = exc.__cause__
+        if not isinstance(cause, HttpStatusError):
+            return False
+        return cause.status == 404 or (
+            cause.status == 400 and "invalid_customer" in (cause.body or "")
+        )
+
+    @staticmethod
+    def _build_account_ref(*, api_base_url: str, api_key: str) -> str:
+        # Clientes pertencem a conta da chave: trocar a api_key (outra conta
+        # no mesmo endpoint) nao pode reaproveitar o vinculo antigo.
+        key_fingerprint = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+        return f"{api_base_url}|{key_fingerprint}"
+
+    def _forget_customer(
+        self,
+        *,
+        api_base_url: str,
+        api_key: str,
+        payment: Payment,
+    ) -> None:
+        customer = getattr(payment.order, "customer", None)
+        if customer is None:
+            return
+        PaymentProviderCustomer.objects.filter(
+            provider=self.provider_name,
+            account_ref=self._build_account_ref(
+                api_base_url=api_base_url,
+                api_key=api_key,
+            ),
+            customer=customer,
+        ).delete()
+
     def _ensure_customer(
         self,
         *,
         api_base_url: str,
         api_key: str,
         payment: Payment,
+    ) -> str:
+        customer = getattr(payment.order, "customer", None)
+        if customer is None:
+            return self._find_or_create_customer(
+                api_base_url=api_base_url,
+                api_key=api_key,
+                payment=payment,
+            )
+
+        account_ref = self._build_account_ref(
+            api_base_url=api_base_url,
+            api_key=api_key,
+        )
+        linked_customer_id = (
+            PaymentProviderCustomer.objects.filter(
+                provider=self.provider_name,
+                account_ref=account_ref,
+                customer=customer,
+            )
+            .values_list("provider_customer_id", flat=True)
+            .first()
+        )
+        if linked_customer_id:
+            return linked_customer_id
+
+        customer_id = self._find_or_create_customer(
+            api_base_url=api_base_url,
+            api_key=api_key,
+            payment=payment,
+        )
+        PaymentProviderCustomer.objects.update_or_create(
+            provider=self.provider_name,
+            account_ref=account_ref,
+            customer=customer,
+            defaults={
+                "provider_customer_id": customer_id,
+                "email": self._resolve_customer_email(payment),
+            },
+        )
+        return customer_id
+
+    def _find_or_create_customer(
+        self,
+        *,
+        api_base_url: str,
+        api_key: str,
+        payment: Payment,
     ) -> str:
         email = self._resolve_customer_email(payment)
         list_payload = self._request_json(
+            provider_name=self.provider_name,
             method="GET",
             url=f"{api_base_url}/customers?email={email}",
             headers={
@@ -395,6 +624,7 @@ class AsaasPaymentProvider(BasePaymentProvider):
             "email": email,
         }
         create_result = self._request_json(
+            provider_name=self.provider_name,
             method="POST",
             url=f"{api_base_url}/customers",
             headers={
@@ -428,10 +658,18 @@ class EfiPaymentProvider(BasePaymentProvider):
         if not client_id or not client_secret:
             raise ValidationError("Efi nao configurado (client_id/client_secret).")
 
-        token = self._fetch_access_token(
-            api_base_url=api_base_url,
-            client_id=client_id,
-            client_secret=client_secret,
+        token_key = build_provider_token_key(
+            provider_name=self.provider_name,
+            account_ref=f"{api_base_url}|{client_id}",
+            secret=client_secret,
+        )
+        token = get_cached_provider_token(
+            token_key,
+            lambda: self._fetch_access_token_with_expiry(
+                api_base_url=api_base_url,
+                client_id=client_id,
+                client_secret=client_secret,
+            ),
         )
         cents_value = int((payment.amount * Decimal("100")).quantize(Decimal("1")))
         payload = {
@@ -451,15 +689,23 @@ class EfiPaymentProvider(BasePaymentProvider):
                 "expire_time": 1800,
             },
         }
-        response_payload = self._request_json(
-            method="POST",
-            url=f"{api_base_url}/v1/charge/one-step/link",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "X-Idempotency-Key": idempotency_key,
-            },
-            payload=payload,
-        )
+        try:
+            response_payload = self._request_json(
+                provider_name=self.provider_name,
+                method="POST",
+                url=f"{api_base_url}/v1/charge/one-step/link",
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "X-Idempotency-Key": idempotency_key,
+                },
+                payload=payload,
+            )
+        except ValidationError as exc:
+            # Token revogado antes do prazo: descarta para a proxima tentativa.
+            cause = exc.__cause__
+            if isinstance(cause, HttpStatusError) and cause.status == 401:
+                invalidate_provider_token(token_key)
+            raise
 
         data = response_payload.get("data", {})
         if not isinstance(data, dict):
@@ -495,10 +741,25 @@ class EfiPaymentProvider(BasePaymentProvider):
         client_id: str,
         client_secret: str,
     ) -> str:
+        token, _ = self._fetch_access_token_with_expiry(
+            api_base_url=api_base_url,
+            client_id=client_id,
+            client_secret=client_secret,
+        )
+        return token
+
+    def _fetch_access_token_with_expiry(
+        self,
+        *,
+        api_base_url: str,
+        client_id: str,
+        client_secret: str,
+    ) -> tuple[str, int]:
         basic_token = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode(
             "utf-8"
         )
         token_payload = self._request_json(
+            provider_name=self.provider_name,
             method="POST",
             url=f"{api_base_url}/v1/authorize",
             headers={
@@ -511,7 +772,11 @@ class EfiPaymentProvider(BasePaymentProvider):
         token = str(token_payload.get("access_token", "")).strip()
         if not token:
             raise ValidationError("Efi nao retornou access_token.")
-        return token
+        try:
+            expires_in = int(token_payload.get("expires_in") or 0)
+        except (TypeError, ValueError):
+            expires_in = 0
+        return token, expires_in
 
 
 def map_mercadopago_status_to_intent(raw_status: str) -> str:
@@ -583,6 +848,7 @@ def test_payment_provider_connection(provider_name: str) -> dict:
         if not token:
             raise ValidationError("Mercado Pago nao configurado (access_token).")
         BasePaymentProvider._request_json(
+            provider_name=MercadoPagoPaymentProvider.provider_name,
             method="GET",
             url=f"{api_base_url}/v1/payment_methods",
             headers={"Authorization": f"Bearer {token}"},
@@ -602,6 +868,7 @@ def test_payment_provider_connection(provider_name: str) -> dict:
         if not api_key:
             raise ValidationError("Asaas nao configurado (api_key).")
         BasePaymentProvider._request_json(
+            provider_name=AsaasPaymentProvider.provider_name,
             method="GET",
             url=f"{api_base_url}/myAccount",
             headers={
@@ -652,6 +919,7 @@ def fetch_mercadopago_payment_details(payment_id: str) -> dict:
         raise ValidationError("payment_id do Mercado Pago obrigatorio.")
 
     return BasePaymentProvider._request_json(
+        provider_name=MercadoPagoPaymentProvider.provider_name,
         method="GET",
         url=f"{api_base_url}/v1/payments/{normalized_payment_id}",
         headers={"Authorization": f"Bearer {access_token}"},
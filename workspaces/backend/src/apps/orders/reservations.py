@@ -0,0 +1,357 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from apps.catalog.models import MenuItem
+from apps.jobs.services import enqueue
+
+from .models import (
+    MenuItemCapacityShard,
+    Order,
+    OrderReservation,
+    OrderReservationStatus,
+    OrderStatus,
+    PaymentStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+EXPIRE_ORDER_RESERVATIONS_JOB = "orders.expire_order_reservations"
+ACTIVE_RESERVATION_STATUSES = (
+    OrderReservationStatus.HELD,
+    OrderReservationStatus.CONFIRMED,
+)
+
+
+def _resolve_shard_count() -> int:
+    return max(int(settings.ORDERS_CAPACITY_SHARDS), 1)
+
+
+def split_capacity(total: int, shard_count: int) -> list[int]:
+    base, remainder = divmod(max(total, 0), shard_count)
+    return [base + (1 if index < remainder else 0) for index in range(shard_count)]
+
+
+@transaction.atomic
+def _rebalance_item_shards(menu_item: MenuItem, shard_count: int) -> None:
+    shards = list(
+        MenuItemCapacityShard.objects.select_for_update()
+        .filter(menu_item_id=menu_item.id)
+        .order_by("shard")
+    )
+    free_qty = max(
+        menu_item.available_qty - sum(shard.reserved_qty for shard in shards), 0
+    )
+    free_split = split_capacity(free_qty, shard_count)
+    for shard in shards:
+        # Cada shard cobre o que ja reservou mais sua fatia do saldo livre:
+        # reduzir a capacidade nao deixa sobra de um shard liberar outro.
+        free_share = free_split[shard.shard] if shard.shard < shard_count else 0
+        capacity = shard.reserved_qty + free_share
+        if shard.capacity != capacity:
+            MenuItemCapacityShard.objects.filter(pk=shard.pk).update(capacity=capacity)
+
+
+def sync_capacity_shards(menu_items: list[MenuItem]) -> None:
+    """Garante shards coerentes com `available_qty` dos itens informados.
+
+    Itens com `available_qty` nulo nao tem limite e ficam sem shards. Quando
+    a capacidade muda, o saldo livre (`available_qty` menos o total
+    reservado) e redistribuido sobre o `reserved_qty` de cada shard, entao a
+    soma do que os shards aceitam nunca passa da capacidade do item.
+    """
+    limited_items = [item for item in menu_items if item.available_qty is not None]
+    if not limited_items:
+        return
+
+    shard_count = _resolve_shard_count()
+    current: dict[int, dict[int, int]] = defaultdict(dict)
+    for menu_item_id, shard, capacity in MenuItemCapacityShard.objects.filter(
+        menu_item_id__in=[item.id for item in limited_items]
+    ).values_list("menu_item_id", "shard", "capacity"):
+        current[menu_item_id][shard] = capacity
+
+    missing_shards: list[MenuItemCapacityShard] = []
+    stale_items: list[MenuItem] = []
+    for item in limited_items:
+        shards = current[item.id]
+        if (
+            set(range(shard_count)) <= set(shards)
+            and sum(shards.values()) == item.available_qty
+        ):
+            continue
+        stale_items.append(item)
+        missing_shards.extend(
+            MenuItemCapacityShard(menu_item_id=item.id, shard=shard)
+            for shard in range(shard_count)
+            if shard not in shards
+        )
+
+    if missing_shards:
+        MenuItemCapacityShard.objects.bulk_create(
+            missing_shards,
+            ignore_conflicts=True,
+        )
+    for item in stale_items:
+        _rebalance_item_shards(item, shard_count)
+
+
+def _reserve_from_single_shard(
+    *,
+    menu_item_id: int,
+    qty: int,
+    preferred_shard: int,
+    shard_count: int,
+) -> int | None:
+    for offset in range(shard_count):
+        shard = (preferred_shard + offset) % shard_count
+        # UPDATE condicional: so trava a linha quando ha saldo no shard.
+        updated = MenuItemCapacityShard.objects.filter(
+            menu_item_id=menu_item_id,
+            shard=shard,
+            reserved_qty__lte=F("capacity") - qty,
+        ).update(reserved_qty=F("reserved_qty") + qty)
+        if updated:
+            return shard
+    return None
+
+
+def _reserve_across_shards(*, menu_item_id: int, qty: int) -> list[tuple[int, int]]:
+    shards = list(
+        MenuItemCapacityShard.objects.select_for_update()
+        .filter(menu_item_id=menu_item_id)
+        .order_by("shard")
+    )
+    free_qty = sum(max(shard.capacity - shard.reserved_qty, 0) for shard in shards)
+    if free_qty < qty:
+        return []
+
+    allocations: list[tuple[int, int]] = []
+    pending_qty = qty
+    for shard in shards:
+        taken = min(max(shard.capacity - shard.reserved_qty, 0), pending_qty)
+        if taken <= 0:
+            continue
+        MenuItemCapacityShard.objects.filter(pk=shard.pk).update(
+            reserved_qty=F("reserved_qty") + taken
+        )
+        allocations.append((shard.shard, taken))
+        pending_qty -= taken
+        if pending_qty == 0:
+            break
+    return allocations
+
+
+def _remaining_capacity(menu_item_id: int) -> int:
+    totals = MenuItemCapacityShard.objects.filter(menu_item_id=menu_item_id).aggregate(
+        capacity=Coalesce(Sum("capacity"), 0),
+        reserved=Coalesce(Sum("reserved_qty"), 0),
+    )
+    return max(totals["capacity"] - totals["reserved"], 0)
+
+
+@transaction.atomic
+def reserve_order_capacity(
+    *,
+    order: Order,
+    items: list[tuple[MenuItem, int]],
+    expires_at: datetime | None = None,
+) -> list[OrderReservation]:
+    """Reserva capacidade dos itens do pedido com decrementos condicionais.
+
+    Itens sao processados em ordem crescente de id (ordem de lock estavel) e
+    cada pedido comeca por um shard diferente, espalhando a contencao.
+    """
+    limited_items = sorted(
+        (
+            (menu_item, qty)
+            for menu_item, qty in items
+            if menu_item.available_qty is not None
+        ),
+        key=lambda item: item[0].id,
+    )
+    if not limited_items:
+        return []
+
+    sync_capacity_shards([menu_item for menu_item, _ in limited_items])
+    shard_count = _resolve_shard_count()
+
+    reservations: list[OrderReservation] = []
+    for menu_item, qty in limited_items:
+        shard = _reserve_from_single_shard(
+            menu_item_id=menu_item.id,
+            qty=qty,
+            preferred_shard=order.id % shard_count,
+            shard_count=shard_count,
+        )
+        allocations = (
+            [(shard, qty)]
+            if shard is not None
+            else _reserve_across_shards(menu_item_id=menu_item.id, qty=qty)
+        )
+        if not allocations:
+            remaining = _remaining_capacity(menu_item.id)
+            raise ValidationError(
+                f"Quantidade indisponivel para {menu_item.dish.name}. "
+                f"Restam {remaining} unidade(s)."
+            )
+
+        reservations.extend(
+            OrderReservation(
+                order=order,
+                menu_item=menu_item,
+                shard=allocated_shard,
+                qty=allocated_qty,
+                status=OrderReservationStatus.HELD,
+                expires_at=expires_at,
+            )
+            for allocated_shard, allocated_qty in allocations
+        )
+
+    return OrderReservation.objects.bulk_create(reservations)
+
+
+def _release_reservations(reservations: list[OrderReservation]) -> int:
+    released_ids: list[int] = []
+    for reservation in sorted(reservations, key=lambda r: (r.menu_item_id, r.shard)):
+        MenuItemCapacityShard.objects.filter(
+            menu_item_id=reservation.menu_item_id,
+            shard=reservation.shard,
+        ).update(reserved_qty=Greatest(F("reserved_qty") - reservation.qty, Value(0)))
+        released_ids.append(reservation.id)
+
+    if released_ids:
+        now = timezone.now()
+        OrderReservation.objects.filter(pk__in=released_ids).update(
+            status=OrderReservationStatus.RELEASED,
+            released_at=now,
+            updated_at=now,
+        )
+    return len(released_ids)
+
+
+@transaction.atomic
+def release_order_reservations(*, order_id: int) -> int:
+    reservations = list(
+        OrderReservation.objects.select_for_update().filter(
+            order_id=order_id,
+            status__in=ACTIVE_RESERVATION_STATUSES,
+        )
+    )
+    return _release_reservations(reservations)
+
+
+@transaction.atomic
+def confirm_order_reservations(*, order_id: int) -> int:
+    now = timezone.now()
+    confirmed = OrderReservation.objects.filter(
+        order_id=order_id,
+        status=OrderReservationStatus.HELD,
+    ).update(
+        status=OrderReservationStatus.CONFIRMED,
+        expires_at=None,
+        updated_at=now,
+    )
+    if confirmed:
+        return confirmed
+
+    order = (
+        Order.objects.filter(pk=order_id)
+        .prefetch_related("items__menu_item__dish")
+        .first()
+    )
+    has_active = OrderReservation.objects.filter(
+        order_id=order_id,
+        status__in=ACTIVE_RESERVATION_STATUSES,
+    ).exists()
+    if order is None or has_active or order.status == OrderStatus.CANCELED:
+        return 0
+
+    # Hold expirou antes do pagamento: tenta reservar de novo sem bloquear
+    # a confirmacao do pagamento, que ja aconteceu no provedor.
+    try:
+        with transaction.atomic():
+            reservations = reserve_order_capacity(
+                order=order,
+                items=[(item.menu_item, item.qty) for item in order.items.all()],
+            )
+    except ValidationError:
+        logger.warning(
+            "Pedido %s pago apos expirar a reserva e sem capacidade disponivel.",
+            order_id,
+        )
+        return 0
+
+    OrderReservation.objects.filter(pk__in=[r.pk for r in reservations]).update(
+        status=OrderReservationStatus.CONFIRMED,
+        updated_at=now,
+    )
+    return len(reservations)
+
+
+def build_reservation_hold_expiry(*, not_before: datetime | None = None) -> datetime:
+    hold_until = timezone.now() + timedelta(
+        minutes=settings.ORDERS_RESERVATION_HOLD_MINUTES
+    )
+    if not_before is not None and not_before > hold_until:
+        return not_before
+    return hold_until
+
+
+def schedule_reservation_expiry(*, order_id: int, expires_at: datetime) -> None:
+    enqueue(
+        EXPIRE_ORDER_RESERVATIONS_JOB,
+        {"order_id": order_id},
+        queue="orders",
+        run_at=expires_at,
+    )
+
+
+@transaction.atomic
+def extend_order_reservation_hold(*, order_id: int, expires_at: datetime) -> int:
+    extended = OrderReservation.objects.filter(
+        order_id=order_id,
+        status=OrderReservationStatus.HELD,
+        expires_at__lt=expires_at,
+    ).update(expires_at=expires_at, updated_at=timezone.now())
+    if extended:
+        schedule_reservation_expiry(order_id=order_id, expires_at=expires_at)
+    return extended
+
+
+@transaction.atomic
+def release_expired_reservations(
+    *,
+    order_id: int | None = None,
+    now: datetime | None = None,
+) -> int:
+    now = now or timezone.now()
+    queryset = OrderReservation.objects.select_for_update(
+        skip_locked=True,
+        of=("self",),
+    ).filter(
+        status=OrderReservationStatus.HELD,
+        expires_at__lte=now,
+    )
+    if order_id is not None:
+        queryset = queryset.filter(order_id=order_id)
+
+    # Pedido pago entre o vencimento e a limpeza mantem a reserva.
+    expired = [
+        reservation
+        for reservation in queryset.select_related("order").prefetch_related(
+            "order__payments"
+        )
+        if not any(
+            payment.status == PaymentStatus.PAID
+            for payment in reservation.order.payments.all()
+        )
+    ]
+    return _release_reservations(expired)
@@ -1,8 +1,16 @@
 from datetime import date
 
-from django.db.models import QuerySet
+from django.db.models import Q, QuerySet, Sum
+from django.db.models.functions import Coalesce
 
-from apps.catalog.models import MenuDay
+from apps.catalog.models import MenuDay, MenuItem
+from apps.common.search import (
+    SEARCH_DEFAULT_LIMIT,
+    SearchCursor,
+    build_search_query,
+    paginate_ranked_search,
+    rank_search_results,
+)
 
 from .models import Order, Payment
 
@@ -23,6 +31,38 @@ def list_orders() -> QuerySet[Order]:
     )
 
 
+def search_orders(
+    *,
+    term: str,
+    queryset: QuerySet[Order] | None = None,
+    cursor: SearchCursor | None = None,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+) -> tuple[list[Order], str | None]:
+    """Busca ranqueada por nome do cliente (GIN do perfil), id, usuario ou email.
+
+    Correspondencia exata de id/usuario/email fica acima das textuais.
+    """
+    query = build_search_query(term)
+    if query is None:
+        return [], None
+
+    normalized_term = str(term or "").strip()
+    exact_match = Q(customer__username__iexact=normalized_term) | Q(
+        customer__email__iexact=normalized_term
+    )
+    order_id = normalized_term.lstrip("#")
+    if order_id.isdigit():
+        exact_match |= Q(pk=int(order_id))
+
+    ranked = rank_search_results(
+        list_orders() if queryset is None else queryset,
+        vector_field="customer__profile__search_vector",
+        query=query,
+        extra_match=exact_match,
+    )
+    return paginate_ranked_search(ranked, cursor=cursor, limit=limit)
+
+
 def list_orders_by_period(*, from_date: date, to_date: date) -> QuerySet[Order]:
     return list_orders().filter(delivery_date__range=(from_date, to_date))
 
@@ -35,3 +75,27 @@ def list_payments() -> QuerySet[Payment]:
     return Payment.objects.select_related("order", "order__customer").order_by(
         "-created_at", "-id"
     )
+
+
+def get_menu_day_capacity(menu_day_id: int) -> list[dict]:
+    rows = (
+        MenuItem.objects.filter(menu_day_id=menu_day_id)
+        .annotate(reserved_qty=Coalesce(Sum("capacity_shards__reserved_qty"), 0))
+        .values("id", "dish__name", "available_qty", "reserved_qty", "is_active")
+        .order_by("id")
+    )
+    return [
+        {
+            "menu_item_id": row["id"],
+            "dish_name": row["dish__name"],
+            "is_active": row["is_active"],
+            "available_qty": row["available_qty"],
+            "reserved_qty": row["reserved_qty"],
+            "remaining_qty": (
+                None
+                if row["available_qty"] is None
+                else max(row["available_qty"] - row["reserved_qty"], 0)
+            ),
+        }
+        for row in rows
+    ]
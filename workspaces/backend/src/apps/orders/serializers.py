@@ -80,6 +80,13 @@ class OrderSerializer(serializers.ModelSerializer):
         return value
 
 
+class OrderSearchSerializer(OrderSerializer):
+    search_rank = serializers.FloatField(read_only=True)
+
+    class Meta(OrderSerializer.Meta):
+        fields = [*OrderSerializer.Meta.fields, "search_rank"]
+
+
 class OrderStatusUpdateSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=OrderStatus.choices)
 
@@ -170,6 +177,7 @@ class PaymentWebhookEventSerializer(serializers.ModelSerializer):
             "intent_id",
             "intent_status",
             "payment_status",
+            "inbox_status",
             "processed_at",
             "created_at",
             "updated_at",
@@ -8,6 +8,8 @@ from django.utils import timezone
 
 from apps.accounts.customer_services import assert_customer_checkout_eligible
 from apps.accounts.services import SystemRole, user_has_any_role
+from apps.common.http_client import disable_http_retries
+from apps.finance.costing import capture_order_item_costs
 from apps.finance.services import create_ar_from_order, record_cash_in_from_ar
 
 from .models import (
@@ -20,8 +22,17 @@ from .models import (
     PaymentMethod,
     PaymentStatus,
     PaymentWebhookEvent,
+    PaymentWebhookInboxStatus,
 )
 from .payment_providers import get_payment_provider
+from .reservations import (
+    build_reservation_hold_expiry,
+    confirm_order_reservations,
+    extend_order_reservation_hold,
+    release_order_reservations,
+    reserve_order_capacity,
+    schedule_reservation_expiry,
+)
 from .selectors import get_menu_day_for_delivery
 
 MONEY_DECIMAL_PLACES = Decimal("0.01")
@@ -201,6 +212,20 @@ def create_order(
         ]
     )
 
+    # Pagamento online segura a capacidade so ate o hold expirar.
+    hold_expires_at = (
+        build_reservation_hold_expiry()
+        if payment_method in ONLINE_INTENT_METHODS
+        else None
+    )
+    reservations = reserve_order_capacity(
+        order=order,
+        items=[(item["menu_item"], item["qty"]) for item in items_payload],
+        expires_at=hold_expires_at,
+    )
+    if reservations and hold_expires_at is not None:
+        schedule_reservation_expiry(order_id=order.id, expires_at=hold_expires_at)
+
     Payment.objects.create(
         order=order,
         method=payment_method,
@@ -279,6 +304,10 @@ def update_order_status(*, order_id: int, new_status: str, actor_user=None) -> O
     if order.status != new_status:
         order.status = new_status
         order.save(update_fields=["status", "updated_at"])
+        if new_status == OrderStatus.CONFIRMED:
+            capture_order_item_costs(OrderItem.objects.filter(order_id=order.id))
+        if new_status == OrderStatus.CANCELED:
+            release_order_reservations(order_id=order.id)
 
     return order
 
@@ -330,6 +359,7 @@ def update_payment_status(
             status=PaymentIntentStatus.SUCCEEDED,
             updated_at=timezone.now(),
         )
+        confirm_order_reservations(order_id=payment.order_id)
         _sync_paid_payment_cash_flow(payment=payment)
 
     return payment
@@ -387,10 +417,13 @@ def create_or_get_payment_intent(
         payment_method=payment.method,
         channel=source_channel,
     )
-    provider_result = provider.create_intent(
-        payment=payment,
-        idempotency_key=normalized_key,
-    )
+    # A linha do pagamento fica travada durante a chamada ao provider: sem
+    # retries aqui, o cliente repete a requisicao com a mesma chave.
+    with disable_http_retries():
+        provider_result = provider.create_intent(
+            payment=payment,
+            idempotency_key=normalized_key,
+        )
 
     intent = PaymentIntent.objects.create(
         payment=payment,
@@ -401,6 +434,11 @@ def create_or_get_payment_intent(
         client_payload=provider_result.client_payload,
         expires_at=provider_result.expires_at,
     )
+    if intent.expires_at is not None:
+        extend_order_reservation_hold(
+            order_id=payment.order_id,
+            expires_at=build_reservation_hold_expiry(not_before=intent.expires_at),
+        )
 
     return intent, True
 
@@ -432,51 +470,31 @@ def _resolve_webhook_payment_status(intent_status: str) -> str | None:
     return None
 
 
-@transaction.atomic
-def process_payment_webhook(
-    *,
-    provider: str | None,
-    event_id: str,
-    provider_intent_ref: str,
-    intent_status: str,
-    provider_ref: str | None = None,
-    paid_at=None,
-    raw_payload: dict | None = None,
-) -> tuple[PaymentWebhookEvent, bool]:
-    normalized_provider = (
-        (provider or get_payment_provider().provider_name).strip().lower()
-    )
-    normalized_event_id = normalize_webhook_event_id(event_id)
-    normalized_intent_ref = (provider_intent_ref or "").strip()
+def validate_webhook_intent_status(intent_status: str) -> str:
     normalized_intent_status = (intent_status or "").strip().upper()
-
-    if not normalized_provider:
-        raise ValidationError("Campo provider obrigatorio.")
-
-    if not normalized_intent_ref:
-        raise ValidationError("Campo provider_intent_ref obrigatorio.")
-
     intent_choices = {choice for choice, _ in PaymentIntentStatus.choices}
     if normalized_intent_status not in intent_choices:
         raise ValidationError("Status de intent invalido.")
+    return normalized_intent_status
 
-    (
-        webhook_event,
-        created,
-    ) = PaymentWebhookEvent.objects.select_for_update().get_or_create(
-        provider=normalized_provider,
-        event_id=normalized_event_id,
-        defaults={"payload": raw_payload or {}},
-    )
-    if not created:
-        return webhook_event, False
+
+@transaction.atomic
+def apply_payment_webhook_event(
+    *,
+    webhook_event: PaymentWebhookEvent,
+    intent_status: str,
+    provider_ref: str | None = None,
+    paid_at=None,
+) -> PaymentWebhookEvent:
+    """Aplica um evento do inbox ao intent/pagamento correspondente."""
+    normalized_intent_status = validate_webhook_intent_status(intent_status)
 
     intent = (
         PaymentIntent.objects.select_for_update()
         .select_related("payment")
         .filter(
-            provider=normalized_provider,
-            provider_intent_ref=normalized_intent_ref,
+            provider=webhook_event.provider,
+            provider_intent_ref=webhook_event.provider_intent_ref,
         )
         .order_by("-created_at", "-id")
         .first()
@@ -511,7 +529,8 @@ def process_payment_webhook(
     webhook_event.intent = intent
     webhook_event.intent_status = intent.status
     webhook_event.payment_status = payment.status
-    webhook_event.payload = raw_payload or {}
+    webhook_event.inbox_status = PaymentWebhookInboxStatus.PROCESSED
+    webhook_event.last_error = ""
     webhook_event.processed_at = timezone.now()
     webhook_event.save(
         update_fields=[
@@ -519,10 +538,11 @@ def process_payment_webhook(
             "intent",
             "intent_status",
             "payment_status",
-            "payload",
+            "inbox_status",
+            "last_error",
             "processed_at",
             "updated_at",
         ]
     )
 
-    return webhook_event, True
+    return webhook_event
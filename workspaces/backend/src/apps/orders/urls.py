@@ -5,6 +5,7 @@ from .views import (
     AsaasWebhookAPIView,
     EcosystemOpsRealtimeAPIView,
     EfiWebhookAPIView,
+    MenuDayCapacityAPIView,
     MercadoPagoWebhookAPIView,
     OrdersExportAPIView,
     OrdersOpsDashboardAPIView,
@@ -43,6 +44,11 @@ urlpatterns = [
         OrdersExportAPIView.as_view(),
         name="orders-export",
     ),
+    path(
+        "menu-days/<int:menu_day_id>/capacity/",
+        MenuDayCapacityAPIView.as_view(),
+        name="orders-menu-day-capacity",
+    ),
     path(
         "ops/dashboard/",
         OrdersOpsDashboardAPIView.as_view(),
@@ -29,8 +29,14 @@ from apps.accounts.permissions import (
 )
 from apps.accounts.services import SystemRole
 from apps.catalog.models import MenuDay
-from apps.common.csv_export import build_csv_response
+from apps.common.exports import (
+    ExportColumn,
+    build_export_response,
+    iter_queryset,
+    parse_export_options,
+)
 from apps.common.reports import parse_period
+from apps.common.search import decode_search_cursor, parse_search_limit
 from apps.portal.services import get_payment_providers_config
 from apps.procurement.models import Purchase, PurchaseRequest, PurchaseRequestStatus
 from apps.production.models import ProductionBatch, ProductionBatchStatus
@@ -39,18 +45,20 @@ from .models import (
     Order,
     OrderStatus,
     Payment,
-    PaymentIntent,
-    PaymentIntentStatus,
     PaymentStatus,
-    PaymentWebhookEvent,
+    PaymentWebhookInboxStatus,
 )
-from .payment_providers import (
-    fetch_mercadopago_payment_details,
-    map_asaas_status_to_intent,
-    map_mercadopago_status_to_intent,
+from .monitoring import build_payment_monitor_payload
+from .payment_providers import map_asaas_status_to_intent
+from .selectors import (
+    get_menu_day_capacity,
+    list_orders,
+    list_orders_by_period,
+    list_payments,
+    search_orders,
 )
-from .selectors import list_orders, list_orders_by_period, list_payments
 from .serializers import (
+    OrderSearchSerializer,
     OrderSerializer,
     OrderStatusUpdateSerializer,
     PaymentIntentSerializer,
@@ -66,11 +74,11 @@ from .services import (
     get_latest_payment_intent,
     has_global_order_access,
     normalize_idempotency_key,
-    process_payment_webhook,
     update_order_status,
     update_payment_status,
 )
 from .throttling import PaymentsWebhookRateThrottle
+from .webhooks import receive_payment_webhook
 
 
 class _WebhookTokenProtectedAPIView(APIView):
@@ -90,6 +98,24 @@ class _WebhookTokenProtectedAPIView(APIView):
             )
         return None
 
+    @staticmethod
+    def _receive(**kwargs) -> Response:
+        try:
+            webhook_event, created = receive_payment_webhook(**kwargs)
+        except DjangoValidationError as exc:
+            raise DRFValidationError(exc.messages) from exc
+
+        output_payload = PaymentWebhookEventSerializer(webhook_event).data
+        output_payload["idempotent_replay"] = not created
+        if not created:
+            response_status = status.HTTP_200_OK
+        elif webhook_event.inbox_status == PaymentWebhookInboxStatus.PROCESSED:
+            response_status = status.HTTP_201_CREATED
+        else:
+            # Evento aceito no inbox; o worker aplica em seguida.
+            response_status = status.HTTP_202_ACCEPTED
+        return Response(output_payload, status=response_status)
+
 
 class PaymentWebhookAPIView(_WebhookTokenProtectedAPIView):
     def post(self, request):
@@ -99,35 +125,20 @@ class PaymentWebhookAPIView(_WebhookTokenProtectedAPIView):
 
         input_serializer = PaymentWebhookInputSerializer(data=request.data)
         input_serializer.is_valid(raise_exception=True)
-
-        try:
-            webhook_event, created = process_payment_webhook(
-                provider=input_serializer.validated_data.get("provider"),
-                event_id=input_serializer.validated_data["event_id"],
-                provider_intent_ref=input_serializer.validated_data[
-                    "provider_intent_ref"
-                ],
-                intent_status=input_serializer.validated_data["intent_status"],
-                provider_ref=input_serializer.validated_data.get("provider_ref"),
-                paid_at=input_serializer.validated_data.get("paid_at"),
-                raw_payload=dict(request.data),
-            )
-        except DjangoValidationError as exc:
-            detail = exc.messages[0] if exc.messages else str(exc)
-            if "nao encontrado" in detail.lower():
-                return Response(
-                    {"detail": detail},
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-
-            raise DRFValidationError(exc.messages) from exc
-
-        output_payload = PaymentWebhookEventSerializer(webhook_event).data
-        output_payload["idempotent_replay"] = not created
-
-        return Response(
-            output_payload,
-            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        validated_data = input_serializer.validated_data
+
+        normalized = {"intent_status": validated_data["intent_status"]}
+        if "provider_ref" in validated_data:
+            normalized["provider_ref"] = validated_data["provider_ref"]
+        if validated_data.get("paid_at") is not None:
+            normalized["paid_at"] = validated_data["paid_at"]
+
+        return self._receive(
+            provider=validated_data.get("provider"),
+            event_id=validated_data["event_id"],
+            provider_intent_ref=validated_data["provider_intent_ref"],
+            normalized=normalized,
+            raw_payload=dict(request.data),
         )
 
 
@@ -169,29 +180,14 @@ class MercadoPagoWebhookAPIView(_WebhookTokenProtectedAPIView):
         if not payment_id:
             raise DRFValidationError(["Campo data.id (payment id) obrigatorio."])
 
-        details = fetch_mercadopago_payment_details(payment_id)
+        # Status real e consultado no Mercado Pago pelo worker do inbox.
         event_id = str(payload.get("id", "")).strip() or f"mp-{payment_id}"
-        provider_ref = str(details.get("id", "")).strip() or payment_id
-        paid_at_raw = str(details.get("date_approved", "")).strip()
-        paid_at = parse_datetime(paid_at_raw) if paid_at_raw else None
-
-        webhook_event, created = process_payment_webhook(
+        return self._receive(
             provider="mercadopago",
             event_id=event_id,
             provider_intent_ref=payment_id,
-            intent_status=map_mercadopago_status_to_intent(
-                str(details.get("status", "pending"))
-            ),
-            provider_ref=provider_ref,
-            paid_at=paid_at,
             raw_payload=payload,
         )
-        output_payload = PaymentWebhookEventSerializer(webhook_event).data
-        output_payload["idempotent_replay"] = not created
-        return Response(
-            output_payload,
-            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
-        )
 
 
 class AsaasWebhookAPIView(_WebhookTokenProtectedAPIView):
@@ -224,21 +220,17 @@ class AsaasWebhookAPIView(_WebhookTokenProtectedAPIView):
         if paid_at is not None and timezone.is_naive(paid_at):
             paid_at = timezone.make_aware(paid_at, timezone.get_current_timezone())
 
-        webhook_event, created = process_payment_webhook(
+        return self._receive(
             provider="asaas",
             event_id=event_id,
             provider_intent_ref=payment_id,
-            intent_status=map_asaas_status_to_intent(payment_status),
-            provider_ref=provider_ref,
-            paid_at=paid_at,
+            normalized={
+                "intent_status": map_asaas_status_to_intent(payment_status),
+                "provider_ref": provider_ref,
+                "paid_at": paid_at,
+            },
             raw_payload=payload,
         )
-        output_payload = PaymentWebhookEventSerializer(webhook_event).data
-        output_payload["idempotent_replay"] = not created
-        return Response(
-            output_payload,
-            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
-        )
 
 
 class EfiWebhookAPIView(_WebhookTokenProtectedAPIView):
@@ -264,20 +256,16 @@ class EfiWebhookAPIView(_WebhookTokenProtectedAPIView):
             )
             raise DRFValidationError([required_fields_message])
 
-        webhook_event, created = process_payment_webhook(
+        return self._receive(
             provider="efi",
             event_id=event_id,
             provider_intent_ref=provider_intent_ref,
-            intent_status=_resolve_intent_status_from_generic(status_raw),
-            provider_ref=provider_ref,
+            normalized={
+                "intent_status": _resolve_intent_status_from_generic(status_raw),
+                "provider_ref": provider_ref,
+            },
             raw_payload=payload,
         )
-        output_payload = PaymentWebhookEventSerializer(webhook_event).data
-        output_payload["idempotent_replay"] = not created
-        return Response(
-            output_payload,
-            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
-        )
 
 
 class OrderViewSet(
@@ -292,6 +280,7 @@ class OrderViewSet(
         "create": ORDER_CREATE_ROLES,
         "list": ORDER_READ_ROLES,
         "retrieve": ORDER_READ_ROLES,
+        "search": ORDER_READ_ROLES,
         "status": (*ORDER_STATUS_UPDATE_ROLES, SystemRole.CLIENTE),
         "confirm_receipt": (*ORDER_STATUS_UPDATE_ROLES, SystemRole.CLIENTE),
     }
@@ -325,6 +314,21 @@ class OrderViewSet(
         output = self.get_serializer(order)
         return Response(output.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        query = request.query_params
+        orders, next_cursor = search_orders(
+            term=str(query.get("q", "") or ""),
+            queryset=self.get_queryset(),
+            cursor=decode_search_cursor(query.get("cursor")),
+            limit=parse_search_limit(query.get("limit")),
+        )
+        serializer = OrderSearchSerializer(orders, many=True)
+        return Response(
+            {"next_cursor": next_cursor, "results": serializer.data},
+            status=status.HTTP_200_OK,
+        )
+
     @action(detail=True, methods=["patch"], url_path="status")
     def status(self, request, pk=None):
         order = self.get_object()
@@ -470,6 +474,43 @@ class PaymentViewSet(
         return Response(payload.data, status=status.HTTP_200_OK)
 
 
+def _export_customer_name(order: Order) -> str:
+    customer = order.customer
+    if not customer:
+        return ""
+    full_name = f"{customer.first_name} {customer.last_name}".strip()
+    return full_name or customer.username
+
+
+def _export_paid_total(order: Order) -> str:
+    paid_total = sum(
+        (
+            payment.amount
+            for payment in order.payments.all()
+            if payment.status == PaymentStatus.PAID
+        ),
+        Decimal("0"),
+    )
+    return f"{paid_total:.2f}"
+
+
+ORDER_EXPORT_COLUMNS = (
+    ExportColumn("pedido_id", lambda order: order.id),
+    ExportColumn("data_entrega", lambda order: order.delivery_date.isoformat()),
+    ExportColumn("status", lambda order: order.status),
+    ExportColumn("valor_total", lambda order: f"{order.total_amount:.2f}"),
+    ExportColumn("cliente_id", lambda order: order.customer_id or ""),
+    ExportColumn("cliente_nome", _export_customer_name),
+    ExportColumn(
+        "metodos_pagamento",
+        lambda order: ";".join(
+            sorted({payment.method for payment in order.payments.all()})
+        ),
+    ),
+    ExportColumn("total_pago", _export_paid_total),
+)
+
+
 class OrdersExportAPIView(APIView):
     permission_classes = [RoleMatrixPermission]
     required_roles_by_method = {"GET": MANAGEMENT_ROLES}
@@ -479,54 +520,16 @@ class OrdersExportAPIView(APIView):
             from_raw=request.query_params.get("from"),
             to_raw=request.query_params.get("to"),
         )
+        export_options = parse_export_options(request.query_params)
         orders = list_orders_by_period(from_date=from_date, to_date=to_date)
 
-        header = [
-            "pedido_id",
-            "data_entrega",
-            "status",
-            "valor_total",
-            "cliente_id",
-            "cliente_nome",
-            "metodos_pagamento",
-            "total_pago",
-        ]
-
-        rows = []
-        for order in orders:
-            customer = order.customer
-            customer_name = ""
-            if customer:
-                full_name = f"{customer.first_name} {customer.last_name}".strip()
-                customer_name = full_name or customer.username
-
-            payment_methods = sorted(
-                {payment.method for payment in order.payments.all()}
-            )
-            paid_total = sum(
-                (
-                    payment.amount
-                    for payment in order.payments.all()
-                    if payment.status == PaymentStatus.PAID
-                ),
-                Decimal("0"),
-            )
-
-            rows.append(
-                [
-                    order.id,
-                    order.delivery_date.isoformat(),
-                    order.status,
-                    f"{order.total_amount:.2f}",
-                    customer.id if customer else "",
-                    customer_name,
-                    ";".join(payment_methods),
-                    f"{paid_total:.2f}",
-                ]
-            )
-
-        filename = f"pedidos_{from_date.isoformat()}_{to_date.isoformat()}.csv"
-        return build_csv_response(filename=filename, header=header, rows=rows)
+        return build_export_response(
+            filename=f"pedidos_{from_date.isoformat()}_{to_date.isoformat()}",
+            columns=ORDER_EXPORT_COLUMNS,
+            rows=iter_queryset(orders),
+            options=export_options,
+            sheet_title="pedidos",
+        )
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[6]
@@ -697,141 +700,9 @@ def _build_server_health_payload() -> dict:
 
 
 def _build_payment_monitor_payload() -> dict:
-    now = timezone.now()
-    last_24h = now - timedelta(hours=24)
-    last_15m = now - timedelta(minutes=15)
-    payment_config_public = get_payment_providers_config(public=True)
-    payment_providers = ("mercadopago", "efi", "asaas", "mock")
-
-    lifecycle_counts = {
-        "created": Order.objects.filter(status=OrderStatus.CREATED).count(),
-        "confirmed": Order.objects.filter(status=OrderStatus.CONFIRMED).count(),
-        "in_progress": Order.objects.filter(status=OrderStatus.IN_PROGRESS).count(),
-        "out_for_delivery": Order.objects.filter(
-            status=OrderStatus.OUT_FOR_DELIVERY
-        ).count(),
-        "delivered": Order.objects.filter(status=OrderStatus.DELIVERED).count(),
-        "received": Order.objects.filter(status=OrderStatus.RECEIVED).count(),
-        "canceled": Order.objects.filter(status=OrderStatus.CANCELED).count(),
-    }
-
-    provider_rows: list[dict] = []
-    for provider_name in payment_providers:
-        provider_cfg = payment_config_public.get(provider_name, {})
-        intents_24h = PaymentIntent.objects.filter(
-            provider=provider_name,
-            created_at__gte=last_24h,
-        ).count()
-        webhooks_24h_qs = PaymentWebhookEvent.objects.filter(
-            provider=provider_name,
-            created_at__gte=last_24h,
-        )
-        webhooks_24h = webhooks_24h_qs.count()
-        succeeded_24h = webhooks_24h_qs.filter(
-            intent_status=PaymentIntentStatus.SUCCEEDED
-        ).count()
-        failed_24h = webhooks_24h_qs.filter(
-            intent_status=PaymentIntentStatus.FAILED
-        ).count()
-        last_event = (
-            PaymentWebhookEvent.objects.filter(provider=provider_name)
-            .order_by("-created_at")
-            .values_list("created_at", flat=True)
-            .first()
-        )
-
-        success_rate = (
-            (succeeded_24h / webhooks_24h * 100.0) if webhooks_24h > 0 else 0.0
-        )
-        enabled = (
-            bool(provider_cfg.get("enabled"))
-            if isinstance(provider_cfg, dict)
-            else False
-        )
-        configured = (
-            bool(provider_cfg.get("configured"))
-            if isinstance(provider_cfg, dict)
-            else (provider_name == "mock")
-        )
-        if enabled and configured:
-            sync_status = "ok" if failed_24h == 0 else "warning"
-        elif enabled and not configured:
-            sync_status = "danger"
-        else:
-            sync_status = "neutral"
-
-        provider_rows.append(
-            {
-                "provider": provider_name,
-                "enabled": enabled,
-                "configured": configured,
-                "sync_status": sync_status,
-                "intents_24h": intents_24h,
-                "webhooks_24h": webhooks_24h,
-                "webhooks_failed_24h": failed_24h,
-                "success_rate_24h": round(success_rate, 2),
-                "last_event_at": last_event.isoformat() if last_event else None,
-            }
-        )
-
-    series: list[dict] = []
-    for minute_offset in range(14, -1, -1):
-        bucket_start = now - timedelta(minutes=minute_offset + 1)
-        bucket_end = now - timedelta(minutes=minute_offset)
-        orders_created = Order.objects.filter(
-            created_at__gte=bucket_start,
-            created_at__lt=bucket_end,
-        ).count()
-        payments_paid = Payment.objects.filter(
-            paid_at__gte=bucket_start,
-            paid_at__lt=bucket_end,
-            status=PaymentStatus.PAID,
-        ).count()
-        webhooks_received = PaymentWebhookEvent.objects.filter(
-            created_at__gte=bucket_start,
-            created_at__lt=bucket_end,
-        ).count()
-        series.append(
-            {
-                "minute": bucket_end.strftime("%H:%M"),
-                "orders_created": orders_created,
-                "payments_paid": payments_paid,
-                "webhooks_received": webhooks_received,
-            }
-        )
-
-    return {
-        "communication_channel": {
-            "transport": "HTTPS",
-            "auth": "JWT",
-            "encryption": "TLS",
-        },
-        "frontend_provider": payment_config_public.get(
-            "frontend_provider",
-            {"web": "mock", "mobile": "mock"},
-        ),
-        "summary": {
-            "payments_pending": Payment.objects.filter(
-                status=PaymentStatus.PENDING
-            ).count(),
-            "payments_paid": Payment.objects.filter(status=PaymentStatus.PAID).count(),
-            "payments_failed": Payment.objects.filter(
-                status=PaymentStatus.FAILED
-            ).count(),
-            "intents_active": PaymentIntent.objects.filter(
-                status=PaymentIntentStatus.REQUIRES_ACTION
-            ).count(),
-            "intents_processing": PaymentIntent.objects.filter(
-                status=PaymentIntentStatus.PROCESSING
-            ).count(),
-            "webhooks_last_15m": PaymentWebhookEvent.objects.filter(
-                created_at__gte=last_15m
-            ).count(),
-        },
-        "providers": provider_rows,
-        "order_lifecycle": lifecycle_counts,
-        "series_last_15_minutes": series,
-    }
+    return build_payment_monitor_payload(
+        payment_config_public=get_payment_providers_config(public=True),
+    )
 
 
 class EcosystemOpsRealtimeAPIView(APIView):
@@ -848,6 +719,25 @@ class EcosystemOpsRealtimeAPIView(APIView):
         return Response(payload, status=status.HTTP_200_OK)
 
 
+class MenuDayCapacityAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, _request, menu_day_id: int):
+        if not MenuDay.objects.filter(pk=menu_day_id).exists():
+            return Response(
+                {"detail": "Cardapio nao encontrado."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return Response(
+            {
+                "menu_day_id": menu_day_id,
+                "items": get_menu_day_capacity(menu_day_id),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class OrdersOpsDashboardAPIView(APIView):
     permission_classes = [RoleMatrixPermission]
     required_roles_by_method = {"GET": MANAGEMENT_ROLES}
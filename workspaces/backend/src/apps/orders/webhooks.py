@@ -0,0 +1,255 @@
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.jobs.services import compute_retry_delay, enqueue
+
+from .models import PaymentWebhookEvent, PaymentWebhookInboxStatus
+from .payment_providers import (
+    fetch_mercadopago_payment_details,
+    get_payment_provider,
+    map_mercadopago_status_to_intent,
+)
+from .services import (
+    apply_payment_webhook_event,
+    normalize_webhook_event_id,
+    validate_webhook_intent_status,
+)
+
+logger = logging.getLogger(__name__)
+
+PROCESS_PAYMENT_WEBHOOKS_JOB = "orders.process_payment_webhooks"
+PENDING_INBOX_STATUSES = (
+    PaymentWebhookInboxStatus.RECEIVED,
+    PaymentWebhookInboxStatus.FAILED,
+)
+
+
+def schedule_payment_webhook_processing(
+    *,
+    provider: str,
+    provider_intent_ref: str,
+    run_at=None,
+) -> None:
+    enqueue(
+        PROCESS_PAYMENT_WEBHOOKS_JOB,
+        {"provider": provider, "provider_intent_ref": provider_intent_ref},
+        queue="webhooks",
+        run_at=run_at,
+    )
+
+
+@transaction.atomic
+def receive_payment_webhook(
+    *,
+    provider: str | None,
+    event_id: str,
+    provider_intent_ref: str,
+    normalized: dict | None = None,
+    raw_payload: dict | None = None,
+) -> tuple[PaymentWebhookEvent, bool]:
+    """Grava o evento cru no inbox e agenda o processamento.
+
+    Nao consulta intent nem provider: a resposta ao webhook sai logo apos o
+    INSERT. Reentregas do mesmo `event_id` sao respondidas como replay.
+    """
+    normalized_provider = (
+        (provider or get_payment_provider().provider_name).strip().lower()
+    )
+    normalized_event_id = normalize_webhook_event_id(event_id)
+    normalized_intent_ref = (provider_intent_ref or "").strip()
+    normalized_data = dict(normalized or {})
+
+    if not normalized_provider:
+        raise ValidationError("Campo provider obrigatorio.")
+
+    if not normalized_intent_ref:
+        raise ValidationError("Campo provider_intent_ref obrigatorio.")
+
+    if "intent_status" in normalized_data:
+        normalized_data["intent_status"] = validate_webhook_intent_status(
+            normalized_data["intent_status"]
+        )
+    paid_at = normalized_data.get("paid_at")
+    if paid_at is not None and not isinstance(paid_at, str):
+        normalized_data["paid_at"] = paid_at.isoformat()
+
+    webhook_event, created = PaymentWebhookEvent.objects.get_or_create(
+        provider=normalized_provider,
+        event_id=normalized_event_id,
+        defaults={
+            "payload": raw_payload or {},
+            "provider_intent_ref": normalized_intent_ref,
+            "normalized": normalized_data,
+        },
+    )
+    if created:
+        schedule_payment_webhook_processing(
+            provider=normalized_provider,
+            provider_intent_ref=normalized_intent_ref,
+        )
+        webhook_event.refresh_from_db()
+    return webhook_event, created
+
+
+def _resolve_mercadopago_update(webhook_event: PaymentWebhookEvent) -> dict:
+    details = fetch_mercadopago_payment_details(webhook_event.provider_intent_ref)
+    paid_at_raw = str(details.get("date_approved", "")).strip()
+    return {
+        "intent_status": map_mercadopago_status_to_intent(
+            str(details.get("status", "pending"))
+        ),
+        "provider_ref": str(details.get("id", "")).strip()
+        or webhook_event.provider_intent_ref,
+        "paid_at": paid_at_raw or None,
+    }
+
+
+# Providers cujo webhook so traz o id: o status e buscado no processamento.
+_WEBHOOK_UPDATE_RESOLVERS = {
+    "mercadopago": _resolve_mercadopago_update,
+}
+
+
+def _resolve_webhook_update(webhook_event: PaymentWebhookEvent) -> dict:
+    update = dict(webhook_event.normalized or {})
+    resolver = _WEBHOOK_UPDATE_RESOLVERS.get(webhook_event.provider)
+    if "intent_status" not in update and resolver is not None:
+        update.update(resolver(webhook_event))
+
+    if "intent_status" not in update:
+        raise ValidationError("Status de intent ausente no evento de webhook.")
+
+    paid_at_raw = update.get("paid_at")
+    return {
+        "intent_status": update["intent_status"],
+        "provider_ref": update.get("provider_ref"),
+        "paid_at": parse_datetime(paid_at_raw) if paid_at_raw else None,
+    }
+
+
+def _record_webhook_failure(webhook_event: PaymentWebhookEvent, error: str) -> None:
+    webhook_event.attempts += 1
+    webhook_event.last_error = error
+    webhook_event.inbox_status = (
+        PaymentWebhookInboxStatus.DEAD
+        if webhook_event.attempts >= settings.PAYMENTS_WEBHOOK_MAX_ATTEMPTS
+        else PaymentWebhookInboxStatus.FAILED
+    )
+    webhook_event.save(
+        update_fields=["attempts", "last_error", "inbox_status", "updated_at"]
+    )
+
+
+def _describe_webhook_error(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(exc.messages)
+    return f"{type(exc).__name__}: {exc}"
+
+
+def _resolve_pending_webhook_updates(
+    *, provider: str, provider_intent_ref: str
+) -> dict[int, dict | Exception]:
+    """Resolve o update de cada evento pendente, sem transacao nem lock.
+
+    A consulta ao provider (HTTP) acontece aqui para nao segurar os locks
+    do inbox e do intent durante a chamada. Para no primeiro erro: os
+    eventos seguintes ficariam bloqueados de qualquer forma.
+    """
+    resolved: dict[int, dict | Exception] = {}
+    pending_events = PaymentWebhookEvent.objects.filter(
+        provider=provider,
+        provider_intent_ref=provider_intent_ref,
+        inbox_status__in=PENDING_INBOX_STATUSES,
+    ).order_by("created_at", "id")
+    for webhook_event in pending_events:
+        try:
+            resolved[webhook_event.id] = _resolve_webhook_update(webhook_event)
+        except Exception as exc:
+            resolved[webhook_event.id] = exc
+            break
+    return resolved
+
+
+def process_payment_webhook_inbox(*, provider: str, provider_intent_ref: str) -> dict:
+    """Processa, em ordem de chegada, os eventos pendentes de um intent.
+
+    Primeiro resolve os updates fora de transacao (consulta ao provider);
+    depois o lock nas linhas pendentes serializa workers do mesmo intent e
+    so aplica a mudanca local. Um evento com falha interrompe a fila
+    (preservando a ordem) e reagenda o intent; ao esgotar as tentativas ele
+    vira DEAD e deixa de bloquear os demais. Evento que chegou entre as
+    duas fases tambem interrompe a fila e reagenda na hora.
+    """
+    resolved = _resolve_pending_webhook_updates(
+        provider=provider,
+        provider_intent_ref=provider_intent_ref,
+    )
+
+    processed = 0
+    dead = 0
+    retry_at = None
+    with transaction.atomic():
+        pending_events = list(
+            PaymentWebhookEvent.objects.select_for_update()
+            .filter(
+                provider=provider,
+                provider_intent_ref=provider_intent_ref,
+                inbox_status__in=PENDING_INBOX_STATUSES,
+            )
+            .order_by("created_at", "id")
+        )
+        for webhook_event in pending_events:
+            update = resolved.get(webhook_event.id)
+            if update is None:
+                retry_at = timezone.now()
+                break
+            try:
+                if isinstance(update, Exception):
+                    raise update
+                with transaction.atomic():
+                    apply_payment_webhook_event(webhook_event=webhook_event, **update)
+            except Exception as exc:
+                error = _describe_webhook_error(exc)
+                logger.warning(
+                    "Falha ao processar webhook %s (%s:%s): %s",
+                    webhook_event.id,
+                    provider,
+                    webhook_event.event_id,
+                    error,
+                )
+                _record_webhook_failure(webhook_event, error)
+                if webhook_event.inbox_status == PaymentWebhookInboxStatus.DEAD:
+                    dead += 1
+                    continue
+                retry_at = timezone.now() + compute_retry_delay(webhook_event.attempts)
+                break
+            processed += 1
+
+        if retry_at is not None:
+            schedule_payment_webhook_processing(
+                provider=provider,
+                provider_intent_ref=provider_intent_ref,
+                run_at=retry_at,
+            )
+
+    return {"processed": processed, "dead": dead, "retry_scheduled": bool(retry_at)}
+
+
+@transaction.atomic
+def replay_payment_webhook_event(webhook_event: PaymentWebhookEvent) -> None:
+    PaymentWebhookEvent.objects.filter(pk=webhook_event.pk).update(
+        inbox_status=PaymentWebhookInboxStatus.RECEIVED,
+        attempts=0,
+        last_error="",
+        processed_at=None,
+        updated_at=timezone.now(),
+    )
+    schedule_payment_webhook_processing(
+        provider=webhook_event.provider,
+        provider_intent_ref=webhook_event.provider_intent_ref,
+    )
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class PortalConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.portal"
+
+    def ready(self):
+        from apps.portal.services import register_portal_config_signals
+
+        register_portal_config_signals()
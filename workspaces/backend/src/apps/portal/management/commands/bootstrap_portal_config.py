@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.portal.services import bootstrap_portal_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria a configuracao do Portal CMS se faltar, normaliza defaults e "
+        "semeia secoes faltantes sem sobrescrever conteudo existente."
+    )
+
+    def handle(self, *args, **options):
+        config = bootstrap_portal_config()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Portal CMS verificado: "
+                f"config_id={config.id} sections={config.sections.count()}"
+            )
+        )
@@ -0,0 +1,847 @@
+from django.db import migrations
+
+
+# Copia congelada das fixtures do servico nesta versao: a migracao nao pode
+# depender do codigo vivo, que muda (ou some) em versoes futuras.
+SECTION_FIXTURES = [
+    {
+        "template_id": "classic",
+        "page": "home",
+        "key": "hero",
+        "title": "Comida caseira pronta para o seu dia",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Mr Quentinha",
+            "headline": "Marmitas equilibradas com entrega planejada",
+            "subheadline": "Escolha seu cardapio e receba sem complicacao.",
+            "cta_primary": {"label": "Ver cardapio", "href": "/cardapio"},
+            "cta_secondary": {"label": "Baixar app", "href": "/app"},
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "home",
+        "key": "benefits",
+        "title": "Por que escolher o Mr Quentinha",
+        "sort_order": 20,
+        "body_json": {
+            "items": ["Entrega agendada", "Cardapio variado", "Preparo padronizado"]
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "home",
+        "key": "categories",
+        "title": "Categorias",
+        "sort_order": 30,
+        "body_json": {
+            "items": [
+                {"name": "Dia a dia", "description": "Praticidade com sabor"},
+                {"name": "Fit", "description": "Foco em equilibrio"},
+                {"name": "Premium", "description": "Proteina reforcada"},
+            ]
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "home",
+        "key": "faq",
+        "title": "Perguntas frequentes",
+        "sort_order": 40,
+        "body_json": {
+            "items": [
+                {
+                    "question": "Como faco o pedido?",
+                    "answer": "Escolha data, prato e confirme no app ou web.",
+                },
+                {
+                    "question": "Como armazenar?",
+                    "answer": "Conserve refrigerado e aqueca quando for consumir.",
+                },
+            ]
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "home",
+        "key": "footer",
+        "title": "Atendimento",
+        "sort_order": 50,
+        "body_json": {
+            "phone": "(11) 90000-0000",
+            "email": "contato@mrquentinha.com.br",
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "suporte",
+        "key": "hero",
+        "title": "Suporte Portal Classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Central de suporte",
+            "headline": "Suporte para vendas, pedidos e operacao",
+            "subheadline": "Clientes devem abrir chamados no app; equipes operacionais podem usar os canais institucionais.",
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "suporte",
+        "key": "channels",
+        "title": "Canais de suporte",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {
+                    "title": "Suporte cliente",
+                    "description": "Abertura de chamado autenticado no app.",
+                    "value": "app.mrquentinha.com.br/suporte",
+                },
+                {
+                    "title": "Suporte operacional",
+                    "description": "Atendimento comercial e operacional.",
+                    "value": "suporte@mrquentinha.com.br",
+                },
+            ]
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "wiki",
+        "key": "hero",
+        "title": "Wiki Portal Classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Wiki operacional",
+            "headline": "Base de conhecimento do ecossistema",
+            "subheadline": "Documentacao de operacao comercial, suporte e conformidade.",
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "wiki",
+        "key": "topics",
+        "title": "Topicos de wiki",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {"title": "Operacao comercial", "href": "/app"},
+                {"title": "Suporte e chamados", "href": "/suporte"},
+                {"title": "Compliance", "href": "/lgpd"},
+            ]
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "cardapio",
+        "key": "hero",
+        "title": "Cardapio Portal Classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "API ao vivo",
+            "headline": "Cardapio do dia",
+            "subheadline": "Selecione a data para consultar itens e precos atualizados direto do backend.",
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "app",
+        "key": "hero",
+        "title": "App Portal Classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Canal de vendas",
+            "headline": "App e Web Cliente no mesmo fluxo comercial",
+            "subheadline": "A venda acontece no app.mrquentinha.com.br com pedido, pagamento e acompanhamento em tempo real.",
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "sobre",
+        "key": "hero",
+        "title": "Sobre Portal Classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Quem somos",
+            "headline": "Muito prazer, somos o Mr Quentinha",
+            "subheadline": "Comida caseira com processo operacional e tecnologia para venda, suporte e gestao.",
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "como-funciona",
+        "key": "hero",
+        "title": "Como funciona Portal Classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Jornada completa",
+            "headline": "Como funciona o ecossistema Mr Quentinha",
+            "subheadline": "Portal institucional, web cliente e operacao administrativa em um fluxo integrado.",
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "como-funciona",
+        "key": "steps",
+        "title": "Etapas da jornada",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {
+                    "title": "Voce escolhe",
+                    "description": "Use o cardapio por data e finalize no app.",
+                },
+                {
+                    "title": "Nos produzimos",
+                    "description": "A cozinha opera com lote, estoque e qualidade.",
+                },
+                {
+                    "title": "Voce acompanha",
+                    "description": "Pedido, pagamento e suporte no mesmo login.",
+                },
+            ]
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "contato",
+        "key": "hero",
+        "title": "Contato Portal Classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Fale com o Mr Quentinha",
+            "headline": "Contato institucional e comercial",
+            "subheadline": "Parcerias, implantacao e suporte operacional centralizados.",
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "contato",
+        "key": "channels",
+        "title": "Canais de contato",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {
+                    "title": "Comercial e parcerias",
+                    "description": "Implantacao e evolucao de operacao.",
+                    "value": "contato@mrquentinha.com.br",
+                },
+                {
+                    "title": "Suporte operacional",
+                    "description": "Demandas de producao, pedidos e atendimento.",
+                    "value": "suporte@mrquentinha.com.br",
+                },
+                {
+                    "title": "Horario",
+                    "description": "Segunda a sexta, das 08h as 18h.",
+                    "value": "Sao Paulo - SP",
+                },
+            ]
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "privacidade",
+        "key": "hero",
+        "title": "Privacidade Portal Classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Privacidade e seguranca",
+            "headline": "Politica de Privacidade",
+            "subheadline": "Transparencia sobre coleta, uso e protecao de dados pessoais no ecossistema.",
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "termos",
+        "key": "hero",
+        "title": "Termos Portal Classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Termos e condicoes",
+            "headline": "Termos de Uso",
+            "subheadline": "Condicoes para uso do portal, web client e app.",
+        },
+    },
+    {
+        "template_id": "classic",
+        "page": "lgpd",
+        "key": "hero",
+        "title": "LGPD Portal Classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "LGPD em pratica",
+            "headline": "LGPD e seus direitos",
+            "subheadline": "Direitos do titular, bases legais e operacao de conformidade.",
+        },
+    },
+    {
+        "template_id": "letsfit-clean",
+        "page": "home",
+        "key": "hero",
+        "title": "Hero LetsFit",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Plano inteligente",
+            "headline": "Sua semana organizada com marmitas prontas",
+            "subheadline": "Escolha kits e acompanhe seu pedido em tempo real.",
+            "background_image_url": "https://images.unsplash.com/photo-1546069901-ba9599a7e63c",
+            "cta_primary": {"label": "Montar kit", "href": "/cardapio"},
+            "cta_secondary": {"label": "Como funciona", "href": "/como-funciona"},
+        },
+    },
+    {
+        "template_id": "letsfit-clean",
+        "page": "home",
+        "key": "benefits",
+        "title": "Beneficios",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {"text": "Pronto em 5 min", "icon": "clock"},
+                {"text": "Entrega agendada", "icon": "truck"},
+                {"text": "Ingredientes selecionados", "icon": "check"},
+                {"text": "Pagamento no app", "icon": "card"},
+            ]
+        },
+    },
+    {
+        "template_id": "letsfit-clean",
+        "page": "home",
+        "key": "categories",
+        "title": "Categorias letsfit",
+        "sort_order": 30,
+        "body_json": {
+            "items": [
+                {
+                    "name": "Dia a dia",
+                    "description": "Comida caseira equilibrada para todos os dias.",
+                    "image_url": "https://images.unsplash.com/photo-1546069901-ba9599a7e63c",
+                },
+                {
+                    "name": "Low carb",
+                    "description": "Opcao com menos carboidrato e foco em proteina.",
+                    "image_url": "https://images.unsplash.com/photo-1603569283847-aa295f0d016a",
+                },
+                {
+                    "name": "Vegetariano",
+                    "description": "Receitas leves com legumes, graos e proteina vegetal.",
+                    "image_url": "https://images.unsplash.com/photo-1512621776951-a57141f2eefd",
+                },
+                {
+                    "name": "Kits semanais",
+                    "description": "Pacotes fechados para a semana inteira.",
+                    "image_url": "https://images.unsplash.com/photo-1579113800032-c38bd7635818",
+                },
+            ]
+        },
+    },
+    {
+        "template_id": "letsfit-clean",
+        "page": "home",
+        "key": "kit",
+        "title": "Monte seu kit",
+        "sort_order": 40,
+        "body_json": {
+            "kicker": "Nao sabe o que escolher?",
+            "headline": "Monte seu kit para a semana",
+            "description": "Selecione dias e objetivo. O sistema sugere combinacoes do cardapio do dia.",
+            "cta_label": "Simular kit personalizado",
+            "cta_href": "/cardapio",
+        },
+    },
+    {
+        "template_id": "letsfit-clean",
+        "page": "home",
+        "key": "how_to_heat",
+        "title": "Conservacao e aquecimento",
+        "sort_order": 45,
+        "body_json": {
+            "title": "Facil de preparar e armazenar",
+            "subheadline": "As embalagens vao do freezer ao micro-ondas com seguranca.",
+            "cards": [
+                {
+                    "tone": "cold",
+                    "title": "Conservacao",
+                    "description": "Geladeira por ate 3 dias ou freezer por ate 30 dias.",
+                },
+                {
+                    "tone": "hot",
+                    "title": "Aquecimento",
+                    "description": "No micro-ondas por 5 a 7 minutos apos abrir um respiro na embalagem.",
+                },
+            ],
+        },
+    },
+    {
+        "template_id": "letsfit-clean",
+        "page": "home",
+        "key": "faq",
+        "title": "FAQ",
+        "sort_order": 50,
+        "body_json": {
+            "items": [
+                {
+                    "question": "Como agendar a entrega?",
+                    "answer": "No checkout, selecione a data de entrega disponivel.",
+                },
+                {
+                    "question": "Aceita VR/VA?",
+                    "answer": "Aceitamos VR e VA conforme rede habilitada no pagamento.",
+                },
+                {
+                    "question": "A comida chega congelada?",
+                    "answer": "Voce escolhe entre entrega fresca para o dia ou ultracongelada.",
+                },
+            ]
+        },
+    },
+    {
+        "template_id": "letsfit-clean",
+        "page": "home",
+        "key": "footer",
+        "title": "Contato",
+        "sort_order": 60,
+        "body_json": {
+            "phone": "(11) 90000-0000",
+            "email": "atendimento@mrquentinha.com.br",
+        },
+    },
+    {
+        "template_id": "letsfit-clean",
+        "page": "suporte",
+        "key": "hero",
+        "title": "Suporte LetsFit",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Ajuda rapida",
+            "headline": "Suporte para clientes e operacao",
+            "subheadline": "Atendimento multicanal para jornada de compra, pedidos e uso da plataforma.",
+        },
+    },
+    {
+        "template_id": "letsfit-clean",
+        "page": "suporte",
+        "key": "channels",
+        "title": "Canais LetsFit",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {
+                    "title": "App do cliente",
+                    "description": "Canal principal para suporte com historico.",
+                    "value": "app.mrquentinha.com.br/suporte",
+                },
+                {
+                    "title": "Canal institucional",
+                    "description": "Demandas comerciais e operacionais.",
+                    "value": "contato@mrquentinha.com.br",
+                },
+            ]
+        },
+    },
+    {
+        "template_id": "letsfit-clean",
+        "page": "wiki",
+        "key": "hero",
+        "title": "Wiki LetsFit",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Documentacao viva",
+            "headline": "Wiki operacional e de suporte",
+            "subheadline": "Guia rapido para rotinas de venda, atendimento e governanca.",
+        },
+    },
+    {
+        "template_id": "letsfit-clean",
+        "page": "wiki",
+        "key": "topics",
+        "title": "Topicos LetsFit",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {"title": "Vendas no app", "href": "/app"},
+                {"title": "Fluxo de suporte", "href": "/suporte"},
+                {"title": "Privacidade e LGPD", "href": "/privacidade"},
+            ]
+        },
+    },
+    {
+        "template_id": "editorial-jp",
+        "page": "home",
+        "key": "hero",
+        "title": "Hero Editorial JP",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Edicao semanal",
+            "headline": "Cardapio autoral com ritmo de loja editorial",
+            "subheadline": "Layout em blocos largos, foco em curadoria e CTA direto para a area de vendas.",
+            "cta_primary": {"label": "Comprar no app", "href": "/app"},
+            "cta_secondary": {"label": "Ver cardapio", "href": "/cardapio"},
+        },
+    },
+    {
+        "template_id": "editorial-jp",
+        "page": "home",
+        "key": "benefits",
+        "title": "Diferenciais editorial",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {"text": "Curadoria por objetivo alimentar", "icon": "spark"},
+                {"text": "Vendas no app com jornada curta", "icon": "cart"},
+                {"text": "Suporte e wiki conectados", "icon": "support"},
+                {"text": "Operacao em tempo real", "icon": "chart"},
+            ]
+        },
+    },
+    {
+        "template_id": "editorial-jp",
+        "page": "home",
+        "key": "categories",
+        "title": "Linhas editoriais",
+        "sort_order": 30,
+        "body_json": {
+            "items": [
+                {
+                    "name": "Performance",
+                    "description": "Marmitas com proteina reforcada para alta rotina.",
+                    "image_url": "https://images.unsplash.com/photo-1512621776951-a57141f2eefd",
+                },
+                {
+                    "name": "Rotina",
+                    "description": "Opcao equilibrada para almoco e jantar do dia a dia.",
+                    "image_url": "https://images.unsplash.com/photo-1546069901-ba9599a7e63c",
+                },
+                {
+                    "name": "Leves",
+                    "description": "Selecao com menor densidade calorica e alta saciedade.",
+                    "image_url": "https://images.unsplash.com/photo-1490645935967-10de6ba17061",
+                },
+                {
+                    "name": "Kits da semana",
+                    "description": "Pacotes prontos para conversao rapida no app.",
+                    "image_url": "https://images.unsplash.com/photo-1467003909585-2f8a72700288",
+                },
+            ]
+        },
+    },
+    {
+        "template_id": "editorial-jp",
+        "page": "suporte",
+        "key": "hero",
+        "title": "Suporte Editorial JP",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Suporte em duas frentes",
+            "headline": "Atendimento para cliente e operacao",
+            "subheadline": "Clientes no app, time operacional em canais institucionais.",
+        },
+    },
+    {
+        "template_id": "editorial-jp",
+        "page": "suporte",
+        "key": "channels",
+        "title": "Canais editorial",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {
+                    "title": "Suporte cliente (app)",
+                    "description": "Abertura de chamados autenticados e historico.",
+                    "value": "app.mrquentinha.com.br/suporte",
+                },
+                {
+                    "title": "Suporte operacional",
+                    "description": "Comercial, duvidas de implantacao e jornada de loja.",
+                    "value": "suporte@mrquentinha.com.br",
+                },
+            ]
+        },
+    },
+    {
+        "template_id": "editorial-jp",
+        "page": "wiki",
+        "key": "hero",
+        "title": "Wiki Editorial JP",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Base editorial",
+            "headline": "Wiki de apoio para operacao e vendas",
+            "subheadline": "Conteudo curto e acionavel para manter padrao de atendimento.",
+        },
+    },
+    {
+        "template_id": "editorial-jp",
+        "page": "wiki",
+        "key": "topics",
+        "title": "Topicos editorial",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {"title": "Curadoria e cardapio", "href": "/cardapio"},
+                {"title": "Conversao no app", "href": "/app"},
+                {"title": "Atendimento e SLA", "href": "/suporte"},
+            ]
+        },
+    },
+    {
+        "template_id": "client-classic",
+        "page": "home",
+        "key": "hero",
+        "title": "Web Cliente Classico",
+        "sort_order": 10,
+        "body_json": {
+            "headline": "Cardapio do dia com entrega organizada",
+            "subheadline": "Monte seu pedido rapido e acompanhe status em tempo real.",
+        },
+    },
+    {
+        "template_id": "client-classic",
+        "page": "cardapio",
+        "key": "hero",
+        "title": "Cardapio cliente classico",
+        "sort_order": 10,
+        "body_json": {
+            "badge": "Pedido por data",
+            "headline": "Selecione suas marmitas",
+            "subheadline": "Consulte disponibilidade e monte seu carrinho.",
+        },
+    },
+    {
+        "template_id": "client-classic",
+        "page": "pedidos",
+        "key": "hero",
+        "title": "Pedidos cliente classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Meus pedidos",
+            "headline": "Acompanhe seu historico",
+            "subheadline": "Do login ao recebimento: status de preparo, entrega e confirmacao.",
+        },
+    },
+    {
+        "template_id": "client-classic",
+        "page": "conta",
+        "key": "hero",
+        "title": "Conta cliente classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Conta",
+            "headline": "Acesse ou crie sua conta",
+            "subheadline": "Centralize login, cadastro, preferencias e atendimento.",
+        },
+    },
+    {
+        "template_id": "client-classic",
+        "page": "suporte",
+        "key": "hero",
+        "title": "Suporte cliente classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Atendimento",
+            "headline": "Suporte do cliente",
+            "subheadline": "Abra chamados, acompanhe respostas e mantenha historico no login.",
+        },
+    },
+    {
+        "template_id": "client-classic",
+        "page": "wiki",
+        "key": "hero",
+        "title": "Wiki cliente classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Wiki",
+            "headline": "Base de ajuda do cliente",
+            "subheadline": "Guias rapidos para compra, pedidos, conta e suporte.",
+        },
+    },
+    {
+        "template_id": "client-classic",
+        "page": "wiki",
+        "key": "groups",
+        "title": "Grupos da wiki cliente",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {
+                    "title": "Conta e acesso",
+                    "description": "Cadastro, login e seguranca.",
+                    "links": [
+                        {"label": "Minha conta", "href": "/conta"},
+                        {"label": "Privacidade", "href": "/privacidade"},
+                        {"label": "Termos", "href": "/termos"},
+                    ],
+                },
+                {
+                    "title": "Pedidos e pagamento",
+                    "description": "Compra, pagamento e acompanhamento.",
+                    "links": [
+                        {"label": "Cardapio", "href": "/cardapio"},
+                        {"label": "Meus pedidos", "href": "/pedidos"},
+                        {"label": "Suporte", "href": "/suporte"},
+                    ],
+                },
+                {
+                    "title": "Compliance",
+                    "description": "LGPD, privacidade e governanca de dados.",
+                    "links": [
+                        {"label": "LGPD", "href": "/lgpd"},
+                        {"label": "Privacidade", "href": "/privacidade"},
+                        {"label": "Suporte", "href": "/suporte"},
+                    ],
+                },
+            ]
+        },
+    },
+    {
+        "template_id": "client-classic",
+        "page": "privacidade",
+        "key": "hero",
+        "title": "Privacidade cliente classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Privacidade e seguranca",
+            "headline": "Politica de Privacidade",
+            "subheadline": "Coleta, uso e protecao de dados pessoais no ecossistema Mr Quentinha.",
+        },
+    },
+    {
+        "template_id": "client-classic",
+        "page": "termos",
+        "key": "hero",
+        "title": "Termos cliente classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "Termos e condicoes",
+            "headline": "Termos de Uso",
+            "subheadline": "Condicoes para uso do web client e aplicativo.",
+        },
+    },
+    {
+        "template_id": "client-classic",
+        "page": "lgpd",
+        "key": "hero",
+        "title": "LGPD cliente classico",
+        "sort_order": 10,
+        "body_json": {
+            "kicker": "LGPD em pratica",
+            "headline": "LGPD e seus direitos",
+            "subheadline": "Direitos do titular, bases legais e processos de atendimento.",
+        },
+    },
+    {
+        "template_id": "client-quentinhas",
+        "page": "home",
+        "key": "hero",
+        "title": "Web Cliente Quentinhas",
+        "sort_order": 10,
+        "body_json": {
+            "headline": "Sua quentinha favorita chegou no estilo Mr Quentinha",
+            "subheadline": "Visual inspirado em vitrines digitais de quentinhas, com foco em praticidade e conversao.",
+            "badge": "Entrega agendada",
+        },
+    },
+    {
+        "template_id": "client-vitrine-fit",
+        "page": "home",
+        "key": "hero",
+        "title": "Web Cliente Vitrine Fit",
+        "sort_order": 10,
+        "body_json": {
+            "headline": "Monte sua semana com vitrine visual de marmitas",
+            "subheadline": "Template inspirado em lojas de marmitas com foco em foto, descoberta rapida e conversao.",
+            "badge": "Fotos reais e menu por data",
+        },
+    },
+    {
+        "template_id": "client-vitrine-fit",
+        "page": "home",
+        "key": "benefits",
+        "title": "Diferenciais da vitrine",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {"text": "Fotos em destaque", "icon": "image"},
+                {"text": "Busca por data", "icon": "calendar"},
+                {"text": "Checkout em poucos cliques", "icon": "cart"},
+                {"text": "Acompanhamento em tempo real", "icon": "timeline"},
+            ]
+        },
+    },
+    {
+        "template_id": "client-vitrine-fit",
+        "page": "home",
+        "key": "categories",
+        "title": "Colecoes",
+        "sort_order": 30,
+        "body_json": {
+            "items": [
+                {"name": "Mais pedidas", "description": "Top picks da semana"},
+                {"name": "Fit proteico", "description": "Alta proteina e equilibrio"},
+                {"name": "Leves", "description": "Opcoes com menor teor calorico"},
+                {"name": "Kits", "description": "Combos para rotina completa"},
+            ]
+        },
+    },
+    {
+        "template_id": "client-editorial-jp",
+        "page": "home",
+        "key": "hero",
+        "title": "Web Cliente Editorial JP",
+        "sort_order": 10,
+        "body_json": {
+            "headline": "Area de vendas com visual editorial e foco em conversao",
+            "subheadline": "Cards amplos, tipografia de impacto e suporte conectado ao login.",
+            "badge": "Checkout acelerado",
+        },
+    },
+    {
+        "template_id": "client-editorial-jp",
+        "page": "home",
+        "key": "benefits",
+        "title": "Diferenciais cliente editorial",
+        "sort_order": 20,
+        "body_json": {
+            "items": [
+                {"text": "Navegacao por colecoes", "icon": "grid"},
+                {"text": "Resumo da jornada em uma tela", "icon": "timeline"},
+                {"text": "Suporte integrado por conta", "icon": "support"},
+                {"text": "Checkout com pagamentos online", "icon": "card"},
+            ]
+        },
+    },
+]
+
+
+def seed_missing_sections(apps, schema_editor):
+    # A semeadura saiu do caminho de leitura e passou a rodar uma vez aqui
+    # (bancos sem config sao semeados no primeiro acesso).
+    PortalConfig = apps.get_model("portal", "PortalConfig")
+    PortalSection = apps.get_model("portal", "PortalSection")
+    for config in PortalConfig.objects.all():
+        for fixture in SECTION_FIXTURES:
+            PortalSection.objects.get_or_create(
+                config=config,
+                template_id=fixture["template_id"],
+                page=fixture["page"],
+                key=fixture["key"],
+                defaults={
+                    "title": fixture["title"],
+                    "body_json": fixture["body_json"],
+                    "is_enabled": True,
+                    "sort_order": fixture["sort_order"],
+                },
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0012_alter_portalsection_page"),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_missing_sections, migrations.RunPython.noop),
+    ]
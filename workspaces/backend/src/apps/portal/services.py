@@ -7,8 +7,10 @@ import shutil
 import signal
 import subprocess
 import sys
+import threading
 import time
 import uuid
+from collections.abc import Callable
 from copy import deepcopy
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -18,12 +20,21 @@ from urllib.parse import urlencode, urlparse
 from urllib.request import Request, urlopen
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.mail import EmailMultiAlternatives, get_connection
 from django.core.validators import validate_email
 from django.db import transaction
 from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
+from django.utils.cache import quote_etag
+
+from apps.common.cache import (
+    build_tagged_cache_key,
+    get_cache_tag_version,
+    invalidate_cache_tags,
+)
 
 from .models import (
     MobileRelease,
@@ -42,6 +53,11 @@ PortalChannel = Literal["portal", "client", "admin"]
 CHANNEL_PORTAL: PortalChannel = "portal"
 CHANNEL_CLIENT: PortalChannel = "client"
 CHANNEL_ADMIN: PortalChannel = "admin"
+
+PORTAL_CONFIG_CACHE_TAG = "portal-config"
+PORTAL_PUBLIC_PAYLOAD_CACHE_NAMESPACE = "portal-public-payload"
+_PORTAL_CONFIG_SNAPSHOT_LOCK = threading.Lock()
+_PORTAL_CONFIG_SNAPSHOT: dict = {"version": None, "expires_at": 0.0, "config": None}
 PROJECT_ROOT = Path(__file__).resolve().parents[5]
 OPS_RUNTIME_DIR = PROJECT_ROOT / ".runtime" / "ops"
 OPS_PID_DIR = OPS_RUNTIME_DIR / "pids"
@@ -2733,7 +2749,11 @@ def _seed_missing_sections(config: PortalConfig) -> None:
         )
 
 
-def _ensure_connection_defaults(config: PortalConfig) -> None:
+def _ensure_connection_defaults(
+    config: PortalConfig,
+    *,
+    persist: bool = True,
+) -> None:
     fallback_fields = [
         "api_base_url",
         "local_hostname",
@@ -2825,27 +2845,112 @@ def _ensure_connection_defaults(config: PortalConfig) -> None:
         config.cloudflare_settings = normalized_cloudflare_settings
         update_fields.append("cloudflare_settings")
 
-    if update_fields:
+    if update_fields and persist:
         update_fields.append("updated_at")
         config.save(update_fields=update_fields)
 
 
-def ensure_portal_config() -> PortalConfig:
+def bootstrap_portal_config() -> PortalConfig:
+    """Cria/normaliza a config e semeia secoes faltantes (escreve no banco).
+
+    Fora do caminho de leitura: roda so no primeiro acesso a uma config sem
+    secoes e no comando `bootstrap_portal_config`; bancos existentes recebem
+    as secoes faltantes pela migration de dados do portal.
+    """
     config = get_portal_singleton()
-    if config is not None:
-        _ensure_connection_defaults(config)
-        _seed_missing_sections(config)
-        return config
-
-    config = PortalConfig.objects.create(
-        singleton_key=PortalConfig.SINGLETON_KEY,
-        **DEFAULT_CONFIG_PAYLOAD,
-    )
+    if config is None:
+        config = PortalConfig.objects.create(
+            singleton_key=PortalConfig.SINGLETON_KEY,
+            **DEFAULT_CONFIG_PAYLOAD,
+        )
+
     _ensure_connection_defaults(config)
     _seed_missing_sections(config)
     return config
 
 
+def get_portal_config_version() -> str:
+    return get_cache_tag_version(PORTAL_CONFIG_CACHE_TAG)
+
+
+def bump_portal_config_version() -> str:
+    return invalidate_cache_tags(PORTAL_CONFIG_CACHE_TAG)[PORTAL_CONFIG_CACHE_TAG]
+
+
+def reset_portal_config_snapshot() -> None:
+    with _PORTAL_CONFIG_SNAPSHOT_LOCK:
+        _PORTAL_CONFIG_SNAPSHOT.update(version=None, expires_at=0.0, config=None)
+
+
+def _resolve_portal_config_snapshot_ttl() -> float:
+    return float(getattr(settings, "PORTAL_CONFIG_SNAPSHOT_TTL_SECONDS", 30))
+
+
+def _load_portal_config() -> PortalConfig:
+    config = get_portal_singleton()
+    if config is None or not config.sections.exists():
+        # Config recem-criada (banco vazio ou save sem secoes): semeia uma
+        # vez; nas demais leituras nada e gravado.
+        return bootstrap_portal_config()
+    # Defaults de linhas antigas so em memoria; gravar fica com o bootstrap.
+    _ensure_connection_defaults(config, persist=False)
+    return config
+
+
+def ensure_portal_config() -> PortalConfig:
+    # Dentro de transacao a leitura precisa refletir escritas ainda nao
+    # confirmadas, entao o snapshot so e usado/gravado fora de atomic.
+    if transaction.get_connection().in_atomic_block:
+        return _load_portal_config()
+
+    version = get_portal_config_version()
+    now = time.monotonic()
+    with _PORTAL_CONFIG_SNAPSHOT_LOCK:
+        snapshot_config = _PORTAL_CONFIG_SNAPSHOT["config"]
+        if (
+            snapshot_config is not None
+            and _PORTAL_CONFIG_SNAPSHOT["version"] == version
+            and _PORTAL_CONFIG_SNAPSHOT["expires_at"] > now
+        ):
+            return deepcopy(snapshot_config)
+
+    config = _load_portal_config()
+    ttl_seconds = _resolve_portal_config_snapshot_ttl()
+    if ttl_seconds > 0:
+        with _PORTAL_CONFIG_SNAPSHOT_LOCK:
+            _PORTAL_CONFIG_SNAPSHOT.update(
+                # O bootstrap pode ter salvo defaults e trocado a versao.
+                version=get_portal_config_version(),
+                expires_at=now + ttl_seconds,
+                config=deepcopy(config),
+            )
+    return config
+
+
+def _handle_portal_config_change(sender, **kwargs) -> None:
+    bump_portal_config_version()
+    # Segundo bump apos commit descarta snapshots montados por outros
+    # workers antes da escrita ficar visivel.
+    transaction.on_commit(bump_portal_config_version)
+
+
+def register_portal_config_signals() -> None:
+    for model in (PortalConfig, PortalSection):
+        for signal_name, model_signal in (
+            ("save", post_save),
+            ("delete", post_delete),
+        ):
+            model_signal.connect(
+                _handle_portal_config_change,
+                sender=model,
+                weak=False,
+                dispatch_uid=(
+                    f"mrq-portal-config-version:{signal_name}:"
+                    f"{model._meta.label_lower}"
+                ),
+            )
+
+
 @transaction.atomic
 def save_portal_config(
     *,
@@ -3123,6 +3228,57 @@ def build_public_portal_payload(
     }
 
 
+def _resolve_public_payload_last_modified(payload: dict) -> int | None:
+    timestamps = [payload.get("updated_at")]
+    timestamps.extend(section.get("updated_at") for section in payload["sections"])
+    resolved = [value for value in timestamps if isinstance(value, datetime)]
+    if not resolved:
+        return None
+    return int(max(resolved).timestamp())
+
+
+def get_prerendered_public_portal_payload(
+    *,
+    page: str = PortalPage.HOME,
+    channel: PortalChannel = CHANNEL_PORTAL,
+    render: Callable[[dict], bytes],
+) -> dict:
+    """Retorna o payload publico ja renderizado com ETag e Last-Modified.
+
+    O documento fica no cache compartilhado por (page, channel, versao da
+    config); qualquer escrita em PortalConfig/PortalSection troca a versao.
+    """
+    cacheable = (
+        page in PortalPage.values and not transaction.get_connection().in_atomic_block
+    )
+    cache_key = None
+    if cacheable:
+        cache_key = build_tagged_cache_key(
+            PORTAL_PUBLIC_PAYLOAD_CACHE_NAMESPACE,
+            page,
+            channel,
+            tags=[PORTAL_CONFIG_CACHE_TAG],
+        )
+        document = cache.get(cache_key)
+        if document is not None:
+            return document
+
+    payload = build_public_portal_payload(page=page, channel=channel)
+    content = render(payload)
+    document = {
+        "content": content,
+        "etag": quote_etag(hashlib.sha256(content).hexdigest()),
+        "last_modified": _resolve_public_payload_last_modified(payload),
+    }
+    if cache_key is not None:
+        cache.set(
+            cache_key,
+            document,
+            timeout=settings.PORTAL_PUBLIC_PAYLOAD_CACHE_TIMEOUT_SECONDS,
+        )
+    return document
+
+
 def get_payment_providers_config(*, public: bool = False) -> dict:
     config = ensure_portal_config()
     if public:
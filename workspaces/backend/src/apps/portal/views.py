@@ -1,7 +1,12 @@
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
@@ -25,7 +30,6 @@ from .services import (
     build_database_ops_command_catalog,
     build_latest_mobile_release_payload,
     build_portal_version_payload,
-    build_public_portal_payload,
     cancel_installer_job,
     compile_mobile_release,
     copy_remote_backup_to_dev_via_scp,
@@ -33,6 +37,7 @@ from .services import (
     create_remote_database_backup,
     ensure_portal_config,
     get_installer_job_status,
+    get_prerendered_public_portal_payload,
     list_installer_jobs,
     list_remote_database_backups,
     manage_cloudflare_runtime,
@@ -75,6 +80,11 @@ class PortalAdminPermission(permissions.BasePermission):
         return user_has_any_role(user, [SystemRole.ADMIN])
 
 
+def _render_public_portal_payload(payload: dict) -> bytes:
+    serializer = PortalPublicConfigSerializer(payload)
+    return JSONRenderer().render(serializer.data)
+
+
 class PortalConfigPublicAPIView(APIView):
     permission_classes = [permissions.AllowAny]
 
@@ -83,11 +93,36 @@ class PortalConfigPublicAPIView(APIView):
         channel = request.query_params.get("channel", CHANNEL_PORTAL)
 
         try:
-            payload = build_public_portal_payload(page=page, channel=channel)
+            document = get_prerendered_public_portal_payload(
+                page=page,
+                channel=channel,
+                render=_render_public_portal_payload,
+            )
         except DjangoValidationError as exc:
             raise DRFValidationError(exc.messages) from exc
-        serializer = PortalPublicConfigSerializer(payload)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+        response = get_conditional_response(
+            request,
+            etag=document["etag"],
+            last_modified=document["last_modified"],
+        )
+        if response is None:
+            response = HttpResponse(
+                document["content"],
+                content_type="application/json",
+                status=status.HTTP_200_OK,
+            )
+        response["ETag"] = document["etag"]
+        if document["last_modified"] is not None:
+            response["Last-Modified"] = http_date(document["last_modified"])
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.PORTAL_PUBLIC_CACHE_MAX_AGE_SECONDS,
+            stale_while_revalidate=settings.PORTAL_PUBLIC_CACHE_STALE_SECONDS,
+            stale_if_error=settings.PORTAL_PUBLIC_CACHE_STALE_SECONDS,
+        )
+        return response
 
 
 class PortalConfigVersionAPIView(APIView):
@@ -0,0 +1,16 @@
+from apps.jobs.services import register_job_handler
+
+from .models import PurchaseRequest
+from .notifications import notify_purchase_request_created
+
+NOTIFY_PURCHASE_REQUEST_CREATED_JOB = "procurement.notify_purchase_request_created"
+
+
+@register_job_handler(NOTIFY_PURCHASE_REQUEST_CREATED_JOB)
+def notify_purchase_request_created_job(payload: dict) -> dict | None:
+    purchase_request = PurchaseRequest.objects.filter(
+        pk=payload.get("purchase_request_id")
+    ).first()
+    if purchase_request is None:
+        return None
+    return notify_purchase_request_created(purchase_request)
@@ -8,7 +8,10 @@ from apps.finance.services import create_ap_from_purchase
 from apps.inventory.models import StockMovementType, StockReferenceType
 from apps.inventory.selectors import get_stock_map_by_ingredient_ids
 from apps.inventory.services import apply_stock_movement
+from apps.jobs.models import JobStatus
+from apps.jobs.services import enqueue
 
+from .jobs import NOTIFY_PURCHASE_REQUEST_CREATED_JOB
 from .models import (
     Purchase,
     PurchaseItem,
@@ -16,7 +19,6 @@ from .models import (
     PurchaseRequestItem,
     PurchaseRequestStatus,
 )
-from .notifications import notify_purchase_request_created
 
 QTY_DECIMAL_PLACES = Decimal("0.001")
 DEFAULT_MENU_MULTIPLIER = Decimal("1")
@@ -188,7 +190,17 @@ def generate_purchase_request_from_menu(menu_day_id: int, requested_by=None) ->
         items_payload=shortage_items,
         requested_by=requested_by,
     )
-    alert_result = notify_purchase_request_created(purchase_request)
+    # Email/WhatsApp saem do request: o job so fica visivel ao worker
+    # quando esta transacao confirma a requisicao de compra.
+    alert_job = enqueue(
+        NOTIFY_PURCHASE_REQUEST_CREATED_JOB,
+        {"purchase_request_id": purchase_request.id},
+        queue="notifications",
+    )
+    if alert_job.status == JobStatus.SUCCEEDED:
+        alert_result = alert_job.result
+    else:
+        alert_result = {"queued": True, "job_id": alert_job.id}
 
     response_items = [
         {
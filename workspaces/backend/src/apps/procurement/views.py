@@ -21,7 +21,12 @@ from apps.accounts.permissions import (
     PROCUREMENT_REQUEST_WRITE_ROLES,
     RoleMatrixPermission,
 )
-from apps.common.csv_export import build_csv_response
+from apps.common.exports import (
+    ExportColumn,
+    build_export_response,
+    iter_queryset,
+    parse_export_options,
+)
 from apps.common.reports import parse_period
 
 from .models import Purchase, PurchaseRequest, PurchaseRequestStatus
@@ -291,6 +296,27 @@ class PurchaseViewSet(viewsets.ModelViewSet):
         return Response(output.data, status=status.HTTP_200_OK)
 
 
+def _iter_purchase_item_rows(purchases):
+    for purchase in iter_queryset(purchases):
+        for item in purchase.items.all():
+            yield purchase, item
+
+
+PURCHASE_EXPORT_COLUMNS = (
+    ExportColumn("compra_id", lambda row: row[0].id),
+    ExportColumn("data_compra", lambda row: row[0].purchase_date.isoformat()),
+    ExportColumn("fornecedor", lambda row: row[0].supplier_name),
+    ExportColumn("nota_fiscal", lambda row: row[0].invoice_number or ""),
+    ExportColumn("ingrediente", lambda row: row[1].ingredient.name),
+    ExportColumn("quantidade", lambda row: f"{row[1].qty:.3f}"),
+    ExportColumn("unidade", lambda row: row[1].unit),
+    ExportColumn("preco_unitario", lambda row: f"{row[1].unit_price:.2f}"),
+    ExportColumn("imposto", lambda row: f"{row[1].tax_amount or Decimal('0'):.2f}"),
+    ExportColumn("total_item", lambda row: f"{row[1].qty * row[1].unit_price:.2f}"),
+    ExportColumn("total_compra", lambda row: f"{row[0].total_amount:.2f}"),
+)
+
+
 class PurchasesExportAPIView(APIView):
     permission_classes = [RoleMatrixPermission]
     required_roles_by_method = {"GET": PROCUREMENT_PURCHASE_READ_ROLES}
@@ -300,45 +326,16 @@ class PurchasesExportAPIView(APIView):
             from_raw=request.query_params.get("from"),
             to_raw=request.query_params.get("to"),
         )
+        export_options = parse_export_options(request.query_params)
         purchases = list_purchases_by_period(from_date=from_date, to_date=to_date)
 
-        header = [
-            "compra_id",
-            "data_compra",
-            "fornecedor",
-            "nota_fiscal",
-            "ingrediente",
-            "quantidade",
-            "unidade",
-            "preco_unitario",
-            "imposto",
-            "total_item",
-            "total_compra",
-        ]
-
-        rows = []
-        for purchase in purchases:
-            for item in purchase.items.all():
-                item_total = item.qty * item.unit_price
-                tax_amount = item.tax_amount or Decimal("0")
-                rows.append(
-                    [
-                        purchase.id,
-                        purchase.purchase_date.isoformat(),
-                        purchase.supplier_name,
-                        purchase.invoice_number or "",
-                        item.ingredient.name,
-                        f"{item.qty:.3f}",
-                        item.unit,
-                        f"{item.unit_price:.2f}",
-                        f"{tax_amount:.2f}",
-                        f"{item_total:.2f}",
-                        f"{purchase.total_amount:.2f}",
-                    ]
-                )
-
-        filename = f"compras_{from_date.isoformat()}_{to_date.isoformat()}.csv"
-        return build_csv_response(filename=filename, header=header, rows=rows)
+        return build_export_response(
+            filename=f"compras_{from_date.isoformat()}_{to_date.isoformat()}",
+            columns=PURCHASE_EXPORT_COLUMNS,
+            rows=_iter_purchase_item_rows(purchases),
+            options=export_options,
+            sheet_title="compras",
+        )
 
     def update(self, request, *args, **kwargs):
         if "items" in request.data:
@@ -10,7 +10,12 @@ from apps.accounts.permissions import (
     PRODUCTION_WRITE_ROLES,
     RoleMatrixPermission,
 )
-from apps.common.csv_export import build_csv_response
+from apps.common.exports import (
+    ExportColumn,
+    build_export_response,
+    iter_queryset,
+    parse_export_options,
+)
 from apps.common.reports import parse_period
 
 from .selectors import list_batches, list_batches_by_period
@@ -74,6 +79,23 @@ class ProductionBatchViewSet(viewsets.ModelViewSet):
         return super().partial_update(request, *args, **kwargs)
 
 
+def _iter_batch_item_rows(batches):
+    for batch in iter_queryset(batches):
+        for item in batch.items.all():
+            yield batch, item
+
+
+BATCH_EXPORT_COLUMNS = (
+    ExportColumn("lote_id", lambda row: row[0].id),
+    ExportColumn("data_producao", lambda row: row[0].production_date.isoformat()),
+    ExportColumn("status", lambda row: row[0].status),
+    ExportColumn("prato", lambda row: row[1].menu_item.dish.name),
+    ExportColumn("quantidade_planejada", lambda row: row[1].qty_planned),
+    ExportColumn("quantidade_produzida", lambda row: row[1].qty_produced),
+    ExportColumn("quantidade_perdas", lambda row: row[1].qty_waste),
+)
+
+
 class ProductionExportAPIView(APIView):
     permission_classes = [RoleMatrixPermission]
     required_roles_by_method = {"GET": PRODUCTION_READ_ROLES}
@@ -83,33 +105,13 @@ class ProductionExportAPIView(APIView):
             from_raw=request.query_params.get("from"),
             to_raw=request.query_params.get("to"),
         )
+        export_options = parse_export_options(request.query_params)
         batches = list_batches_by_period(from_date=from_date, to_date=to_date)
 
-        header = [
-            "lote_id",
-            "data_producao",
-            "status",
-            "prato",
-            "quantidade_planejada",
-            "quantidade_produzida",
-            "quantidade_perdas",
-        ]
-
-        rows = []
-        for batch in batches:
-            for item in batch.items.all():
-                dish_name = item.menu_item.dish.name
-                rows.append(
-                    [
-                        batch.id,
-                        batch.production_date.isoformat(),
-                        batch.status,
-                        dish_name,
-                        item.qty_planned,
-                        item.qty_produced,
-                        item.qty_waste,
-                    ]
-                )
-
-        filename = f"producao_{from_date.isoformat()}_{to_date.isoformat()}.csv"
-        return build_csv_response(filename=filename, header=header, rows=rows)
+        return build_export_response(
+            filename=f"producao_{from_date.isoformat()}_{to_date.isoformat()}",
+            columns=BATCH_EXPORT_COLUMNS,
+            rows=_iter_batch_item_rows(batches),
+            options=export_options,
+            sheet_title="producao",
+        )
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import PurePosixPath
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+CONTENT_ADDRESS_DIR = "sha256"
+DEFAULT_GC_MIN_AGE = timedelta(hours=24)
+IMMUTABLE_MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_EXTENSION_ALIASES = {".jpeg": ".jpg"}
+_CONTENT_ADDRESSED_RE = re.compile(
+    rf"(^|/){CONTENT_ADDRESS_DIR}/[0-9a-f]{{2}}/[0-9a-f]{{64}}\.[a-z0-9]+$"
+)
+# Variantes responsivas levam o digest do original no nome.
+_VARIANT_RE = re.compile(r"(^|/)variants/[^/]+-[0-9a-f]{12}-\d+w\.[a-z0-9]+$")
+
+
+def resolve_upload_root(upload_to) -> str:
+    """Prefixo fixo do `upload_to` (sem os diretorios de data)."""
+    if not isinstance(upload_to, str):
+        return ""
+    return "/".join(
+        segment for segment in upload_to.split("/") if segment and "%" not in segment
+    )
+
+
+def build_content_addressed_name(
+    *,
+    upload_root: str,
+    content: bytes,
+    extension: str,
+) -> str:
+    digest = hashlib.sha256(content).hexdigest()
+    extension = extension.lower() or ".bin"
+    extension = _EXTENSION_ALIASES.get(extension, extension)
+    return str(
+        PurePosixPath(upload_root)
+        / CONTENT_ADDRESS_DIR
+        / digest[:2]
+        / f"{digest}{extension}"
+    )
+
+
+def is_content_addressed_name(name: str) -> bool:
+    return bool(_CONTENT_ADDRESSED_RE.search(str(name or "")))
+
+
+def is_immutable_media_name(name: str) -> bool:
+    name = str(name or "")
+    return bool(_CONTENT_ADDRESSED_RE.search(name) or _VARIANT_RE.search(name))
+
+
+def store_content_addressed(*, field_file, content: bytes, upload_root: str) -> str:
+    """Aponta o campo para o objeto com o sha256 do conteudo.
+
+    Conteudo ja existente vira apenas referencia (nada e gravado); objetos
+    enderecados por conteudo nunca sao reescritos.
+    """
+    storage = field_file.storage
+    name = build_content_addressed_name(
+        upload_root=upload_root,
+        content=content,
+        extension=PurePosixPath(field_file.name).suffix,
+    )
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(content))
+
+    field_file.name = name
+    field_file._committed = True
+    setattr(field_file.instance, field_file.field.attname, name)
+    return name
+
+
+@dataclass
+class MediaGarbageReport:
+    scanned: int = 0
+    deleted: int = 0
+    kept_recent: int = 0
+    freed_bytes: int = 0
+    deleted_names: list[str] = field(default_factory=list)
+
+
+def _iter_storage_files(storage, directory: str):
+    try:
+        subdirectories, files = storage.listdir(directory)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    for file_name in files:
+        yield f"{directory}/{file_name}"
+    for subdirectory in subdirectories:
+        yield from _iter_storage_files(storage, f"{directory}/{subdirectory}")
+
+
+def _collect_media_references(content_addressed_fields) -> dict:
+    """Agrupa, por (storage, prefixo), os nomes ainda referenciados.
+
+    Contam o valor do campo e as variantes do manifesto `<campo>_variants`.
+    """
+    references: dict[tuple, set[str]] = defaultdict(set)
+    for model_label, field_name in content_addressed_fields:
+        model = apps.get_model(model_label)
+        model_field = model._meta.get_field(field_name)
+        upload_root = resolve_upload_root(model_field.upload_to)
+        if not upload_root:
+            continue
+
+        key = (model_field.storage, upload_root)
+        references[key].update(
+            name
+            for name in model.objects.exclude(**{field_name: ""})
+            .exclude(**{f"{field_name}__isnull": True})
+            .values_list(field_name, flat=True)
+            .iterator()
+        )
+
+        manifest_field = f"{field_name}_variants"
+        if any(f.name == manifest_field for f in model._meta.concrete_fields):
+            from .image_derivatives import list_manifest_names
+
+            for manifest in model.objects.values_list(
+                manifest_field, flat=True
+            ).iterator():
+                references[key].update(list_manifest_names(manifest))
+    return references
+
+
+def collect_orphan_media(
+    content_addressed_fields,
+    *,
+    min_age: timedelta = DEFAULT_GC_MIN_AGE,
+    dry_run: bool = False,
+) -> MediaGarbageReport:
+    """Remove arquivos sem referencia sob o prefixo dos campos informados.
+
+    Arquivos mais novos que `min_age` ficam: podem pertencer a um upload cuja
+    transacao ainda nao confirmou.
+    """
+    report = MediaGarbageReport()
+    cutoff = timezone.now() - min_age
+    for (storage, upload_root), referenced in _collect_media_references(
+        content_addressed_fields
+    ).items():
+        for name in _iter_storage_files(storage, upload_root):
+            report.scanned += 1
+            if name in referenced:
+                continue
+            if storage.get_modified_time(name) > cutoff:
+                report.kept_recent += 1
+                continue
+
+            report.deleted += 1
+            report.freed_bytes += storage.size(name)
+            report.deleted_names.append(name)
+            if not dry_run:
+                storage.delete(name)
+    return report
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from .image_pipeline import _resample_filter
+
+
+@dataclass(frozen=True)
+class ImageDerivativeSpec:
+    widths: tuple[int, ...]
+    quality: int = 80
+
+
+# Larguras pensadas para cards (mobile) ate o destaque do cardapio (desktop).
+IMAGE_DERIVATIVE_SPECS: dict[tuple[str, str], ImageDerivativeSpec] = {
+    ("catalog.dish", "image"): ImageDerivativeSpec(widths=(320, 640, 960, 1200)),
+    ("catalog.ingredient", "image"): ImageDerivativeSpec(widths=(160, 320, 640)),
+}
+
+# Ordem de preferencia do <picture>: o formato mais compacto vem primeiro.
+DERIVATIVE_FORMATS: dict[str, dict] = {
+    "avif": {"pil_format": "AVIF", "mime": "image/avif", "feature": "avif"},
+    "webp": {"pil_format": "WEBP", "mime": "image/webp", "feature": "webp"},
+}
+_SOURCE_FORMATS = {"JPEG", "PNG", "WEBP"}
+_DIGEST_LENGTH = 12
+
+
+def resolve_derivative_spec(
+    *,
+    model_label_lower: str,
+    field_name: str,
+) -> ImageDerivativeSpec | None:
+    return IMAGE_DERIVATIVE_SPECS.get((model_label_lower, field_name))
+
+
+def _pillow_supports(feature: str) -> bool:
+    try:
+        return bool(features.check(feature))
+    except ValueError:
+        # Pillow antigo nao conhece a feature (ex.: avif antes do 11.2).
+        return False
+
+
+def get_derivative_formats() -> list[str]:
+    """Formatos configurados que o Pillow instalado consegue codificar."""
+    configured = [
+        str(name).strip().lower()
+        for name in getattr(settings, "IMAGE_DERIVATIVE_FORMATS", ["avif", "webp"])
+    ]
+    return [
+        name
+        for name in DERIVATIVE_FORMATS
+        if name in configured and _pillow_supports(DERIVATIVE_FORMATS[name]["feature"])
+    ]
+
+
+def build_derivative_name(
+    *,
+    source_name: str,
+    digest: str,
+    width: int,
+    format_name: str,
+) -> str:
+    # O digest do original no nome torna cada variante imutavel (cache longo).
+    source = PurePosixPath(source_name)
+    return str(
+        source.parent / "variants" / f"{source.stem}-{digest}-{width}w.{format_name}"
+    )
+
+
+def _encode_variant(
+    image: Image.Image,
+    *,
+    width: int,
+    format_name: str,
+    quality: int,
+) -> tuple[bytes, int]:
+    height = max(1, round(image.height * width / image.width))
+    resized = (
+        image
+        if width == image.width
+        else image.resize((width, height), _resample_filter())
+    )
+    output = BytesIO()
+    save_kwargs: dict[str, int] = {"quality": quality}
+    if format_name == "webp":
+        save_kwargs["method"] = 4
+    resized.save(
+        output,
+        format=DERIVATIVE_FORMATS[format_name]["pil_format"],
+        **save_kwargs,
+    )
+    return output.getvalue(), height
+
+
+def list_manifest_names(manifest: dict | None) -> set[str]:
+    names = set()
+    for variants in (manifest or {}).get("formats", {}).values():
+        names.update(variant["name"] for variant in variants)
+    return names
+
+
+def generate_image_derivatives(
+    *,
+    field_file,
+    spec: ImageDerivativeSpec,
+    formats: list[str] | None = None,
+) -> dict:
+    """Gera as variantes responsivas do arquivo e devolve o manifesto.
+
+    Larguras maiores que o original nao sao geradas (sem upscale); a maior
+    variante usa a largura do original, limitada a maior largura do perfil.
+    Origem nao suportada (ex.: SVG) gera manifesto sem variantes, para nao ser
+    reprocessada a cada save.
+    """
+    storage = field_file.storage
+    manifest = {"source": field_file.name, "formats": {}}
+
+    with storage.open(field_file.name, "rb") as source_file:
+        raw_bytes = source_file.read()
+
+    try:
+        with Image.open(BytesIO(raw_bytes)) as opened:
+            if (opened.format or "").upper() not in _SOURCE_FORMATS:
+                return manifest
+            image = ImageOps.exif_transpose(opened)
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    except (UnidentifiedImageError, OSError, ValueError):
+        return manifest
+
+    digest = hashlib.sha256(raw_bytes).hexdigest()[:_DIGEST_LENGTH]
+    widths = sorted(
+        {width for width in spec.widths if width < image.width}
+        | {min(image.width, max(spec.widths))}
+    )
+
+    manifest.update({"width": image.width, "height": image.height})
+    for format_name in formats if formats is not None else get_derivative_formats():
+        variants = []
+        for width in widths:
+            name = build_derivative_name(
+                source_name=field_file.name,
+                digest=digest,
+                width=width,
+                format_name=format_name,
+            )
+            height = max(1, round(image.height * width / image.width))
+            if not storage.exists(name):
+                content, height = _encode_variant(
+                    image,
+                    width=width,
+                    format_name=format_name,
+                    quality=spec.quality,
+                )
+                name = storage.save(name, ContentFile(content))
+            variants.append({"name": name, "width": width, "height": height})
+        manifest["formats"][format_name] = variants
+    return manifest
@@ -11,6 +11,12 @@ from django.db.models import ImageField
 from django.db.models.signals import pre_save
 from PIL import Image, ImageOps, UnidentifiedImageError
 
+from .content_storage import (
+    is_content_addressed_name,
+    resolve_upload_root,
+    store_content_addressed,
+)
+
 ImageMode = Literal["crop", "contain"]
 
 
@@ -20,14 +26,19 @@ class ImageTransformSpec:
     width: int
     height: int
     quality: int = 88
+    # Nome pelo sha256 do conteudo normalizado: arquivos iguais viram
+    # referencias ao mesmo objeto, que nunca e reescrito.
+    content_addressed: bool = False
 
 
 # Perfis de transformacao por contexto.
 # Cardapio usa corte central para manter vitrine consistente.
 IMAGE_TRANSFORM_SPECS: dict[tuple[str, str], ImageTransformSpec] = {
-    ("catalog.dish", "image"): ImageTransformSpec(mode="crop", width=1200, height=900),
+    ("catalog.dish", "image"): ImageTransformSpec(
+        mode="crop", width=1200, height=900, content_addressed=True
+    ),
     ("catalog.ingredient", "image"): ImageTransformSpec(
-        mode="crop", width=1000, height=1000
+        mode="crop", width=1000, height=1000, content_addressed=True
     ),
     ("accounts.userprofile", "profile_photo"): ImageTransformSpec(
         mode="crop", width=800, height=800
@@ -78,6 +89,12 @@ def _resample_filter() -> int:
     return Image.LANCZOS
 
 
+def list_content_addressed_fields() -> list[tuple[str, str]]:
+    return [
+        key for key, spec in IMAGE_TRANSFORM_SPECS.items() if spec.content_addressed
+    ]
+
+
 def _resolve_spec(*, model_label_lower: str, field_name: str) -> ImageTransformSpec:
     return IMAGE_TRANSFORM_SPECS.get(
         (model_label_lower, field_name),
@@ -141,6 +158,14 @@ def _process_uncommitted_field(*, field_file, spec: ImageTransformSpec) -> None:
         return
 
     normalized = _normalize_image_bytes(raw_bytes=raw_bytes, spec=spec)
+    if spec.content_addressed:
+        # Formato nao normalizavel (ex.: SVG) tambem e enderecado por conteudo.
+        store_content_addressed(
+            field_file=field_file,
+            content=normalized or raw_bytes,
+            upload_root=resolve_upload_root(field_file.field.upload_to),
+        )
+        return
     if not normalized:
         return
 
@@ -172,6 +197,28 @@ def _process_committed_field(*, field_file, spec: ImageTransformSpec) -> None:
         return
 
 
+def _process_committed_content_addressed_field(
+    *,
+    field_file,
+    spec: ImageTransformSpec,
+) -> None:
+    # Arquivo ja gravado com nome livre (legado ou `FieldFile.save`): o
+    # original fica para o comando `collect_orphan_media`, pois pode ter
+    # outra referencia.
+    try:
+        with field_file.storage.open(field_file.name, "rb") as stored:
+            raw_bytes = stored.read()
+    except OSError:
+        return
+
+    normalized = _normalize_image_bytes(raw_bytes=raw_bytes, spec=spec)
+    store_content_addressed(
+        field_file=field_file,
+        content=normalized or raw_bytes,
+        upload_root=resolve_upload_root(field_file.field.upload_to),
+    )
+
+
 def _register_model_receiver(*, model) -> None:
     image_field_names = [
         field.name
@@ -206,6 +253,14 @@ def _register_model_receiver(*, model) -> None:
                 _process_uncommitted_field(field_file=field_file, spec=spec)
                 continue
 
+            if spec.content_addressed:
+                if not is_content_addressed_name(field_file.name):
+                    _process_committed_content_addressed_field(
+                        field_file=field_file,
+                        spec=spec,
+                    )
+                continue
+
             if update_fields_set is not None and field_name in update_fields_set:
                 _process_committed_field(field_file=field_file, spec=spec)
 
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import mimetypes
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+# mimetypes do Python 3.11 ainda nao conhece avif.
+_EXTRA_CONTENT_TYPES = {".avif": "image/avif", ".webp": "image/webp"}
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def normalize_media_name(raw_name: str) -> str:
+    """Nome relativo ao storage, sem `..`, barras iniciais ou diretorio."""
+    name = posixpath.normpath(str(raw_name or "").strip().lstrip("/"))
+    if name in {"", "."} or name == ".." or name.startswith("../"):
+        raise Http404("Midia nao encontrada.")
+    return name
+
+
+def guess_media_content_type(name: str) -> str:
+    extension = posixpath.splitext(name)[1].lower()
+    content_type, _encoding = mimetypes.guess_type(name)
+    return (
+        content_type
+        or _EXTRA_CONTENT_TYPES.get(extension)
+        or "application/octet-stream"
+    )
+
+
+def _build_accel_redirect_response(*, name: str, cache_control: str) -> HttpResponse:
+    # O nginx faz a transferencia (sendfile), com Range, ETag e
+    # Last-Modified proprios; o worker so autoriza.
+    response = HttpResponse(content_type=guess_media_content_type(name))
+    response["X-Accel-Redirect"] = (
+        settings.MEDIA_ACCEL_REDIRECT_LOCATION.rstrip("/") + "/" + quote(name)
+    )
+    response["Cache-Control"] = cache_control
+    return response
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Intervalo unico `bytes=a-b`; multiplos intervalos viram resposta 200."""
+    match = _RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    raw_start, raw_end = match.groups()
+    if not raw_start and not raw_end:
+        return None
+    if not raw_start:
+        # Sufixo: os ultimos N bytes.
+        length = min(int(raw_end), size)
+        return size - length, size - 1
+    start = int(raw_start)
+    end = min(int(raw_end), size - 1) if raw_end else size - 1
+    return start, end
+
+
+def _iter_file_range(file_handle, *, start: int, length: int):
+    try:
+        file_handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = file_handle.read(min(_STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file_handle.close()
+
+
+def build_media_response(
+    request,
+    *,
+    name: str,
+    cache_control: str,
+    storage=None,
+):
+    """Resposta de midia ja autorizada pela view.
+
+    Com `MEDIA_ACCEL_REDIRECT_ENABLED` a entrega vai para o nginx via
+    X-Accel-Redirect. Sem nginx (dev/testes), o Django atende ETag,
+    Last-Modified, condicionais e Range de intervalo unico.
+    """
+    storage = storage or default_storage
+    name = normalize_media_name(name)
+    if settings.MEDIA_ACCEL_REDIRECT_ENABLED:
+        return _build_accel_redirect_response(name=name, cache_control=cache_control)
+
+    try:
+        file_handle = storage.open(name, "rb")
+    except (OSError, SuspiciousFileOperation) as exc:
+        # Inclui diretorios (IsADirectoryError) e caminhos fora do storage.
+        raise Http404("Midia nao encontrada.") from exc
+    size = storage.size(name)
+    modified_at = storage.get_modified_time(name)
+
+    last_modified = int(modified_at.timestamp())
+    # Mesmo formato do nginx: alternar entre os dois modos nao invalida caches.
+    etag = f'"{last_modified:x}-{size:x}"'
+    conditional = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified,
+    )
+    if conditional is not None:
+        file_handle.close()
+        conditional["Cache-Control"] = cache_control
+        return conditional
+
+    content_type = guess_media_content_type(name)
+    byte_range = None
+    range_header = request.headers.get("Range", "")
+    if_range = request.headers.get("If-Range", "")
+    if range_header and (not if_range or if_range == etag):
+        byte_range = _parse_range(range_header, size)
+
+    if byte_range is not None and (
+        byte_range[0] >= size or byte_range[0] > byte_range[1]
+    ):
+        file_handle.close()
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    elif byte_range is not None:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _iter_file_range(file_handle, start=start, length=end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(end - start + 1)
+    else:
+        response = FileResponse(file_handle, content_type=content_type)
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = cache_control
+    return response
@@ -24,6 +24,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "corsheaders",
     "rest_framework",
     "dbbackup",
@@ -38,6 +39,7 @@ INSTALLED_APPS = [
     "apps.portal.apps.PortalConfig",
     "apps.personal_finance.apps.PersonalFinanceConfig",
     "apps.admin_audit.apps.AdminAuditConfig",
+    "apps.jobs.apps.JobsConfig",
 ]
 
 MIDDLEWARE = [
@@ -96,6 +98,19 @@ STATIC_ROOT = ROOT_DIR / "staticfiles"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = ROOT_DIR / "media"
+# Formatos das variantes responsivas do catalogo; avif so e gerado quando o
+# Pillow instalado tem suporte.
+IMAGE_DERIVATIVE_FORMATS = env.list(
+    "IMAGE_DERIVATIVE_FORMATS",
+    default=["avif", "webp"],
+)
+# Com nginx na frente, a view autoriza e o nginx entrega o arquivo a partir
+# da location interna (ver infra/nginx e scripts/setup_nginx_prod.sh).
+MEDIA_ACCEL_REDIRECT_ENABLED = env.bool("MEDIA_ACCEL_REDIRECT_ENABLED", default=False)
+MEDIA_ACCEL_REDIRECT_LOCATION = env(
+    "MEDIA_ACCEL_REDIRECT_LOCATION",
+    default="/_protected_media/",
+)
 
 DBBACKUP_STORAGE = env(
     "DBBACKUP_STORAGE",
@@ -111,6 +126,55 @@ DBBACKUP_CONNECTORS = env.list("DBBACKUP_CONNECTORS", default=["postgresql"])
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Cache compartilhado entre workers do gunicorn. Exemplos de CACHE_URL:
+# filecache:///var/tmp/mrq-cache, dbcache://mrq_cache_table (exige
+# `createcachetable`), redis://127.0.0.1:6379/1 (exige pacote `redis`,
+# compativel com Valkey/KeyDB) ou locmemcache:// (somente um processo).
+CACHES = {
+    "default": env.cache(
+        "CACHE_URL",
+        default=f"filecache://{ROOT_DIR / '.runtime' / 'cache'}",
+    )
+}
+CACHES["default"]["KEY_PREFIX"] = env("CACHE_KEY_PREFIX", default="mrq")
+CACHES["default"]["TIMEOUT"] = env.int("CACHE_DEFAULT_TIMEOUT", default=300)
+
+# Embute papeis e versao de permissoes no access token (autorizacao sem
+# consulta ao banco enquanto a versao do token for a vigente).
+AUTH_JWT_ROLE_CLAIMS_ENABLED = env.bool("AUTH_JWT_ROLE_CLAIMS_ENABLED", default=False)
+RBAC_PERMISSION_CACHE_TIMEOUT_SECONDS = env.int(
+    "RBAC_PERMISSION_CACHE_TIMEOUT_SECONDS",
+    default=900,
+)
+PORTAL_CONFIG_SNAPSHOT_TTL_SECONDS = env.int(
+    "PORTAL_CONFIG_SNAPSHOT_TTL_SECONDS",
+    default=30,
+)
+PORTAL_PUBLIC_PAYLOAD_CACHE_TIMEOUT_SECONDS = env.int(
+    "PORTAL_PUBLIC_PAYLOAD_CACHE_TIMEOUT_SECONDS",
+    default=3600,
+)
+PORTAL_PUBLIC_CACHE_MAX_AGE_SECONDS = env.int(
+    "PORTAL_PUBLIC_CACHE_MAX_AGE_SECONDS",
+    default=60,
+)
+PORTAL_PUBLIC_CACHE_STALE_SECONDS = env.int(
+    "PORTAL_PUBLIC_CACHE_STALE_SECONDS",
+    default=300,
+)
+CATALOG_PUBLIC_MENU_CACHE_TIMEOUT_SECONDS = env.int(
+    "CATALOG_PUBLIC_MENU_CACHE_TIMEOUT_SECONDS",
+    default=3600,
+)
+CATALOG_PUBLIC_MENU_CACHE_MAX_AGE_SECONDS = env.int(
+    "CATALOG_PUBLIC_MENU_CACHE_MAX_AGE_SECONDS",
+    default=30,
+)
+CATALOG_PUBLIC_MENU_CACHE_STALE_SECONDS = env.int(
+    "CATALOG_PUBLIC_MENU_CACHE_STALE_SECONDS",
+    default=60,
+)
+
 PAYMENTS_PROVIDER_DEFAULT = env(
     "PAYMENTS_PROVIDER_DEFAULT",
     default="mock",
@@ -123,11 +187,98 @@ PAYMENTS_WEBHOOK_TOKEN = env(
     "PAYMENTS_WEBHOOK_TOKEN",
     default="dev-mrquentinha-webhook-token",
 )
+PAYMENT_MONITOR_ROLLUP_GRACE_SECONDS = env.int(
+    "PAYMENT_MONITOR_ROLLUP_GRACE_SECONDS",
+    default=120,
+)
+PAYMENT_MONITOR_ROLLUP_RETENTION_MINUTES = env.int(
+    "PAYMENT_MONITOR_ROLLUP_RETENTION_MINUTES",
+    default=180,
+)
+ORDERS_CAPACITY_SHARDS = env.int("ORDERS_CAPACITY_SHARDS", default=4)
+ORDERS_RESERVATION_HOLD_MINUTES = env.int(
+    "ORDERS_RESERVATION_HOLD_MINUTES",
+    default=20,
+)
+PAYMENTS_HTTP_TIMEOUT_SECONDS = env.float("PAYMENTS_HTTP_TIMEOUT_SECONDS", default=8)
+PAYMENTS_HTTP_MAX_RETRIES = env.int("PAYMENTS_HTTP_MAX_RETRIES", default=2)
+PAYMENTS_HTTP_RETRY_BACKOFF_SECONDS = env.float(
+    "PAYMENTS_HTTP_RETRY_BACKOFF_SECONDS",
+    default=0.2,
+)
+PAYMENTS_HTTP_POOL_MAXSIZE = env.int("PAYMENTS_HTTP_POOL_MAXSIZE", default=4)
+PAYMENTS_CIRCUIT_FAILURE_THRESHOLD = env.int(
+    "PAYMENTS_CIRCUIT_FAILURE_THRESHOLD",
+    default=5,
+)
+PAYMENTS_CIRCUIT_RESET_SECONDS = env.float(
+    "PAYMENTS_CIRCUIT_RESET_SECONDS",
+    default=30,
+)
+PAYMENTS_TOKEN_REFRESH_MARGIN_SECONDS = env.int(
+    "PAYMENTS_TOKEN_REFRESH_MARGIN_SECONDS",
+    default=60,
+)
+PAYMENTS_WEBHOOK_MAX_ATTEMPTS = env.int("PAYMENTS_WEBHOOK_MAX_ATTEMPTS", default=8)
 PAYMENTS_WEBHOOK_THROTTLE_RATE = env(
     "PAYMENTS_WEBHOOK_THROTTLE_RATE",
     default="120/min",
 )
 
+JOBS_RUN_EAGERLY = env.bool("JOBS_RUN_EAGERLY", default=False)
+JOBS_DEFAULT_MAX_ATTEMPTS = env.int("JOBS_DEFAULT_MAX_ATTEMPTS", default=5)
+JOBS_RETRY_BACKOFF_SECONDS = env.int("JOBS_RETRY_BACKOFF_SECONDS", default=10)
+JOBS_RETRY_BACKOFF_MAX_SECONDS = env.int(
+    "JOBS_RETRY_BACKOFF_MAX_SECONDS",
+    default=900,
+)
+JOBS_LOCK_TIMEOUT_SECONDS = env.int("JOBS_LOCK_TIMEOUT_SECONDS", default=600)
+JOBS_HEARTBEAT_INTERVAL_SECONDS = env.float(
+    "JOBS_HEARTBEAT_INTERVAL_SECONDS",
+    default=60.0,
+)
+JOBS_POLL_INTERVAL_SECONDS = env.float("JOBS_POLL_INTERVAL_SECONDS", default=1.0)
+JOBS_WORKER_PROCESSES = env.int("JOBS_WORKER_PROCESSES", default=1)
+
+OCR_BATCH_MAX_FILES = env.int("OCR_BATCH_MAX_FILES", default=50)
+OCR_INGREDIENT_INDEX_TTL_SECONDS = env.int(
+    "OCR_INGREDIENT_INDEX_TTL_SECONDS",
+    default=300,
+)
+OCR_STATUS_LONG_POLL_MAX_SECONDS = env.int(
+    "OCR_STATUS_LONG_POLL_MAX_SECONDS",
+    default=25,
+)
+OCR_STATUS_LONG_POLL_INTERVAL_SECONDS = env.float(
+    "OCR_STATUS_LONG_POLL_INTERVAL_SECONDS",
+    default=0.5,
+)
+
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", default=2000)
+EXPORT_CSV_ROWS_PER_CHUNK = env.int("EXPORT_CSV_ROWS_PER_CHUNK", default=500)
+FINANCE_COST_CACHE_TIMEOUT_SECONDS = env.int(
+    "FINANCE_COST_CACHE_TIMEOUT_SECONDS",
+    default=3600,
+)
+
+# Auditoria admin: registros vao para um spool por processo e sao gravados em
+# lote por uma thread (por tempo ou volume). Acima de MAX_PENDING descarta.
+ADMIN_AUDIT_WRITE_EAGERLY = env.bool("ADMIN_AUDIT_WRITE_EAGERLY", default=False)
+ADMIN_AUDIT_SPOOL_DIR = env(
+    "ADMIN_AUDIT_SPOOL_DIR",
+    default=str(ROOT_DIR / ".runtime" / "admin_audit_spool"),
+)
+ADMIN_AUDIT_BATCH_SIZE = env.int("ADMIN_AUDIT_BATCH_SIZE", default=200)
+ADMIN_AUDIT_FLUSH_INTERVAL_SECONDS = env.float(
+    "ADMIN_AUDIT_FLUSH_INTERVAL_SECONDS",
+    default=2.0,
+)
+ADMIN_AUDIT_MAX_PENDING = env.int("ADMIN_AUDIT_MAX_PENDING", default=50000)
+# Retencao do log bruto (purge_admin_activity_logs); rollups horarios ficam.
+ADMIN_AUDIT_RETENTION_DAYS = env.int("ADMIN_AUDIT_RETENTION_DAYS", default=90)
+# Janela do log bruto usada no painel por rollup (IPs, caminhos, falhas).
+ADMIN_AUDIT_OVERVIEW_RAW_HOURS = env.int("ADMIN_AUDIT_OVERVIEW_RAW_HOURS", default=24)
+
 EMAIL_BACKEND = env(
     "EMAIL_BACKEND",
     default="django.core.mail.backends.console.EmailBackend",
@@ -178,7 +329,7 @@ CORREIOS_CEP_REQUEST_TIMEOUT_SECONDS = env.int(
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.accounts.authentication.RoleClaimsJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
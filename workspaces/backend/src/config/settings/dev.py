@@ -8,6 +8,10 @@ if DEBUG:  # noqa: F405
         dict.fromkeys([*ALLOWED_HOSTS, ".trycloudflare.com"])  # noqa: F405
     )  # noqa: F405
 
+# Sem worker dedicado em dev: jobs rodam no proprio request por padrao.
+JOBS_RUN_EAGERLY = env.bool("JOBS_RUN_EAGERLY", default=True)
+ADMIN_AUDIT_WRITE_EAGERLY = env.bool("ADMIN_AUDIT_WRITE_EAGERLY", default=True)
+
 CORS_MIDDLEWARE = "corsheaders.middleware.CorsMiddleware"
 if CORS_MIDDLEWARE not in MIDDLEWARE:  # noqa: F405
     common_middleware = "django.middleware.common.CommonMiddleware"
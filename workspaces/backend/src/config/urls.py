@@ -1,13 +1,17 @@
-from django.conf import settings
 from django.contrib import admin
 from django.http import HttpResponseForbidden
 from django.urls import include, path, re_path
 from django.views.generic import RedirectView
-from django.views.static import serve
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from apps.shared.content_storage import (
+    IMMUTABLE_MEDIA_CACHE_CONTROL,
+    is_immutable_media_name,
+)
+from apps.shared.media_delivery import build_media_response, normalize_media_name
+
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
@@ -43,7 +47,8 @@ def health_view(_request):
 
 
 def protected_media_serve_view(request, path: str):
-    normalized_path = str(path or "").strip().lstrip("/")
+    # Normalizar antes do filtro: `catalog/../accounts/...` nao passa.
+    normalized_path = normalize_media_name(path)
     sensitive_prefixes = (
         "accounts/profile/",
         "accounts/documents/",
@@ -52,7 +57,18 @@ def protected_media_serve_view(request, path: str):
     if any(normalized_path.startswith(prefix) for prefix in sensitive_prefixes):
         return HttpResponseForbidden("Acesso direto a esta midia nao permitido.")
 
-    return serve(request, normalized_path, document_root=settings.MEDIA_ROOT)
+    # Nome derivado do conteudo nunca muda sob a mesma URL; os demais podem
+    # ser reescritos no lugar e sao revalidados por ETag.
+    cache_control = (
+        IMMUTABLE_MEDIA_CACHE_CONTROL
+        if is_immutable_media_name(normalized_path)
+        else "public, no-cache"
+    )
+    return build_media_response(
+        request,
+        name=normalized_path,
+        cache_control=cache_control,
+    )
 
 
 urlpatterns = [
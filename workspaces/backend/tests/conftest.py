@@ -1,5 +1,6 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 from apps.accounts.services import (
@@ -9,6 +10,20 @@ from apps.accounts.services import (
 )
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(settings):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "mrq-tests",
+            "KEY_PREFIX": "mrq-tests",
+        }
+    }
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def admin_user(db):
     User = get_user_model()
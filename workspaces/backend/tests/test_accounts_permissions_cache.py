@@ -0,0 +1,112 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.authentication import RoleClaimsJWTAuthentication
+from apps.accounts.models import Role, UserRole, UserTask
+from apps.accounts.services import (
+    SystemRole,
+    assign_roles_to_user,
+    get_user_admin_module_access_map,
+    get_user_permission_version,
+    get_user_role_codes,
+    get_user_task_codes,
+    user_has_any_role,
+)
+
+
+@pytest.mark.django_db
+def test_pacote_de_permissoes_e_reaproveitado_entre_requisicoes(
+    create_user_with_roles,
+    django_assert_num_queries,
+):
+    user = create_user_with_roles(
+        username="rbac_cache",
+        role_codes=[SystemRole.FINANCEIRO],
+    )
+    assert get_user_role_codes(user) == {SystemRole.FINANCEIRO}
+
+    # Nova requisicao = novo objeto de usuario; o pacote vem do cache.
+    fresh_user = get_user_model().objects.get(pk=user.pk)
+    with django_assert_num_queries(0):
+        assert user_has_any_role(fresh_user, [SystemRole.FINANCEIRO])
+        assert get_user_task_codes(fresh_user) == set()
+        assert get_user_admin_module_access_map(fresh_user)
+
+
+@pytest.mark.django_db
+def test_versao_de_permissoes_muda_quando_papeis_mudam(create_user_with_roles):
+    user = create_user_with_roles(
+        username="rbac_version",
+        role_codes=[SystemRole.CLIENTE],
+    )
+    initial_version = get_user_permission_version(user)
+
+    assign_roles_to_user(user=user, role_codes=[SystemRole.COZINHA], replace=True)
+
+    assert get_user_permission_version(user) != initial_version
+    assert get_user_role_codes(user) == {SystemRole.COZINHA}
+
+    # Escrita direta no modelo (admin, shell) tambem invalida o pacote.
+    UserRole.objects.create(
+        user=user,
+        role=Role.objects.get(code=SystemRole.COMPRAS),
+    )
+    fresh_user = get_user_model().objects.get(pk=user.pk)
+    assert get_user_role_codes(fresh_user) == {SystemRole.COZINHA, SystemRole.COMPRAS}
+
+    role = Role.objects.get(code=SystemRole.COZINHA)
+    role.is_active = False
+    role.save()
+    fresh_user = get_user_model().objects.get(pk=user.pk)
+    assert get_user_role_codes(fresh_user) == {SystemRole.COMPRAS}
+
+
+@pytest.mark.django_db
+def test_catalogo_de_tarefas_semeado_no_migrate():
+    assert UserTask.objects.filter(is_active=True).exists()
+
+
+@pytest.mark.django_db
+def test_token_com_claims_de_papeis_autoriza_sem_consultar_papeis(
+    settings,
+    anonymous_client,
+    create_user_with_roles,
+    django_assert_num_queries,
+):
+    settings.AUTH_JWT_ROLE_CLAIMS_ENABLED = True
+    user = create_user_with_roles(
+        username="rbac_claims",
+        role_codes=[SystemRole.FINANCEIRO],
+        password="senha_claims_123",
+    )
+    token_response = anonymous_client.post(
+        "/api/v1/accounts/token/",
+        {"username": "rbac_claims", "password": "senha_claims_123"},
+        format="json",
+    )
+    assert token_response.status_code == 200
+    tokens = token_response.json()
+    access = AccessToken(tokens["access"])
+    assert access["roles"] == [SystemRole.FINANCEIRO]
+
+    authentication = RoleClaimsJWTAuthentication()
+    authenticated_user = authentication.get_user(access)
+    with django_assert_num_queries(0):
+        assert user_has_any_role(authenticated_user, [SystemRole.FINANCEIRO])
+
+    # Papeis alterados: a versao do token fica obsoleta e o banco decide.
+    assign_roles_to_user(user=user, role_codes=[SystemRole.COZINHA], replace=True)
+    stale_user = authentication.get_user(access)
+    assert not hasattr(stale_user, "_rbac_claim_roles")
+    assert get_user_role_codes(stale_user) == {SystemRole.COZINHA}
+
+    refresh_response = anonymous_client.post(
+        "/api/v1/accounts/token/refresh/",
+        {"refresh": tokens["refresh"]},
+        format="json",
+    )
+    assert refresh_response.status_code == 200
+    refreshed_access = AccessToken(refresh_response.json()["access"])
+    assert refreshed_access["roles"] == [SystemRole.COZINHA]
+    assert refreshed_access["perm_ver"] == get_user_permission_version(user)
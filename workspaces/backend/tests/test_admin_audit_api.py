@@ -219,3 +219,47 @@ def test_admin_activity_overview_endpoint_requer_admin(
     anonymous_client.force_authenticate(user=operador)
     response = anonymous_client.get("/api/v1/admin-audit/admin-activity/overview/")
     assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_admin_activity_search_ranqueia_e_pagina_por_cursor(client, admin_user):
+    for index in range(3):
+        AdminActivityLog.objects.create(
+            actor=admin_user,
+            actor_username="admin_test",
+            channel="web-admin",
+            method="GET",
+            path=f"/api/v1/procurement/purchase-requests/{index}/",
+            action_group="procurement",
+            http_status=200,
+            duration_ms=10,
+        )
+    AdminActivityLog.objects.create(
+        actor_username="outro",
+        channel="web-admin",
+        method="GET",
+        path="/api/v1/orders/",
+        action_group="orders",
+        http_status=200,
+        duration_ms=10,
+    )
+
+    url = "/api/v1/admin-audit/admin-activity/search/"
+    first_page = client.get(url, {"q": "purchase-req", "limit": 2}).json()
+
+    assert len(first_page["results"]) == 2
+    assert first_page["next_cursor"]
+    second_page = client.get(
+        url, {"q": "purchase-req", "limit": 2, "cursor": first_page["next_cursor"]}
+    ).json()
+    assert len(second_page["results"]) == 1
+    assert second_page["next_cursor"] is None
+    paths = {row["path"] for row in first_page["results"] + second_page["results"]}
+    assert len(paths) == 3
+    assert all("purchase-requests" in path for path in paths)
+
+    filtered = client.get("/api/v1/admin-audit/admin-activity/?search=orders").json()
+    assert [row["path"] for row in filtered["results"]] == ["/api/v1/orders/"]
+
+    invalid = client.get(url, {"q": "orders", "cursor": "%%%"})
+    assert invalid.status_code == 400
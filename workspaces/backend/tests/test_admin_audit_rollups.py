@@ -0,0 +1,166 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.admin_audit.models import AdminActivityHourlyRollup, AdminActivityLog
+from apps.admin_audit.rollups import (
+    REFRESH_ADMIN_ACTIVITY_ROLLUPS_JOB,
+    estimate_duration_percentile,
+    rebuild_admin_activity_rollups,
+    truncate_to_hour,
+)
+from apps.admin_audit.selectors import build_admin_activity_overview
+from apps.admin_audit.services import purge_admin_activity_logs
+from apps.admin_audit.writer import write_admin_activity_logs
+from apps.jobs.models import Job
+from apps.jobs.services import run_next_job
+
+
+def _create_log(*, duration_ms, http_status=200, method="GET", **overrides):
+    values = {
+        "actor_username": "admin_test",
+        "channel": "web-admin",
+        "method": method,
+        "path": "/api/v1/orders/",
+        "action_group": "orders",
+        "http_status": http_status,
+        "is_success": http_status < 400,
+        "duration_ms": duration_ms,
+    }
+    values.update(overrides)
+    return AdminActivityLog.objects.create(**values)
+
+
+@pytest.mark.django_db
+def test_overview_sem_filtros_usa_rollup_horario():
+    _create_log(duration_ms=10)
+    _create_log(duration_ms=20, method="POST", http_status=201)
+    _create_log(duration_ms=30, http_status=403, actor_username="")
+    _create_log(duration_ms=40, http_status=500)
+
+    rollups = AdminActivityHourlyRollup.objects.all()
+    assert sum(rollup.events for rollup in rollups) == 4
+
+    payload = build_admin_activity_overview()
+
+    assert payload["source"] == "rollup"
+    totals = payload["totals"]
+    assert totals["events"] == 4
+    assert totals["success_count"] == 2
+    assert totals["client_error_count"] == 1
+    assert totals["server_error_count"] == 1
+    assert totals["avg_duration_ms"] == 25.0
+    assert totals["max_duration_ms"] == 40
+    assert totals["unique_actors"] == 1
+    assert 25 <= totals["p95_duration_ms"] <= 40
+    assert payload["security"]["forbidden_count"] == 1
+    assert payload["security"]["anonymous_count"] == 1
+    assert {"key": "GET", "count": 3} in payload["by_method"]
+    assert sum(item["events"] for item in payload["hourly_series_last_24h"]) == 4
+
+
+@pytest.mark.django_db
+def test_overview_com_busca_calcula_percentis_no_banco():
+    for duration_ms in (10, 20, 30, 40):
+        _create_log(duration_ms=duration_ms)
+
+    payload = build_admin_activity_overview(search="orders")
+
+    assert payload["source"] == "raw"
+    assert payload["totals"]["p50_duration_ms"] == 25.0
+    assert payload["totals"]["p95_duration_ms"] == 38.5
+    assert payload["totals"]["max_duration_ms"] == 40
+
+
+@pytest.mark.django_db
+def test_rollup_e_recalculado_ao_alterar_e_reconstruir():
+    log = _create_log(duration_ms=15)
+    AdminActivityLog.objects.filter(pk=log.pk).update(http_status=502)
+
+    assert rebuild_admin_activity_rollups() == 1
+
+    rollup = AdminActivityHourlyRollup.objects.get()
+    assert rollup.events == 1
+    assert rollup.server_error_count == 1
+    assert rollup.duration_le_25ms == 1
+
+
+@pytest.mark.django_db
+def test_purge_remove_log_bruto_e_preserva_rollups(settings):
+    old_log = _create_log(
+        duration_ms=50,
+        created_at=timezone.now() - timedelta(days=45),
+    )
+    _create_log(duration_ms=60)
+    settings.ADMIN_AUDIT_RETENTION_DAYS = 30
+
+    assert purge_admin_activity_logs(batch_size=1) == 1
+
+    assert not AdminActivityLog.objects.filter(pk=old_log.pk).exists()
+    assert build_admin_activity_overview()["totals"]["events"] == 2
+
+    # Spool reprocessado tarde numa hora ja purgada nao sobrescreve o rollup.
+    write_admin_activity_logs(
+        [
+            {
+                "actor_username": "admin_test",
+                "channel": "web-admin",
+                "method": "GET",
+                "path": "/api/v1/orders/",
+                "http_status": 200,
+                "duration_ms": 70,
+                "created_at": old_log.created_at.isoformat(),
+            }
+        ]
+    )
+    old_rollup = AdminActivityHourlyRollup.objects.get(
+        hour=truncate_to_hour(old_log.created_at)
+    )
+    assert old_rollup.events == 1
+    assert old_rollup.duration_max_ms == 50
+
+
+@pytest.mark.django_db
+def test_save_avulso_recalcula_rollup_via_job(settings):
+    settings.JOBS_RUN_EAGERLY = False
+    log = _create_log(duration_ms=15)
+
+    assert not AdminActivityHourlyRollup.objects.exists()
+    job = Job.objects.get(name=REFRESH_ADMIN_ACTIVITY_ROLLUPS_JOB)
+
+    run_next_job(worker_id="test-worker", queues=[job.queue])
+
+    rollup = AdminActivityHourlyRollup.objects.get()
+    assert rollup.hour == truncate_to_hour(log.created_at)
+    assert rollup.events == 1
+
+
+def test_estimate_duration_percentile_interpola_no_bucket():
+    histogram = [0] * 11
+    histogram[3] = 10  # 50ms < duracao <= 100ms
+
+    assert estimate_duration_percentile(histogram, 0.5, max_duration_ms=90) == 70.0
+    assert estimate_duration_percentile([0] * 11, 0.95, max_duration_ms=0) == 0.0
+
+
+@pytest.mark.django_db
+def test_overview_por_rollup_limita_detalhes_do_log_bruto(settings):
+    settings.ADMIN_AUDIT_OVERVIEW_RAW_HOURS = 24
+    _create_log(
+        duration_ms=10,
+        http_status=500,
+        path="/api/v1/antigo/",
+        ip_address="10.0.0.1",
+        created_at=timezone.now() - timedelta(days=3),
+    )
+    _create_log(duration_ms=20, http_status=404, ip_address="10.0.0.2")
+
+    payload = build_admin_activity_overview()
+
+    assert payload["source"] == "rollup"
+    assert payload["totals"]["events"] == 2
+    assert payload["totals"]["unique_ips"] == 1
+    assert [item["key"] for item in payload["top_paths"]] == ["/api/v1/orders/"]
+    failed_events = payload["security"]["failed_events"]
+    assert [event["http_status"] for event in failed_events] == [404]
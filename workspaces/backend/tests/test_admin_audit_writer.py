@@ -0,0 +1,190 @@
+import json
+import os
+import uuid
+
+import pytest
+from django.utils import timezone
+
+from apps.admin_audit import writer as writer_module
+from apps.admin_audit.models import AdminActivityHourlyRollup, AdminActivityLog
+from apps.admin_audit.rollups import REFRESH_ADMIN_ACTIVITY_ROLLUPS_JOB
+from apps.admin_audit.writer import AdminAuditWriter, write_admin_activity_logs
+from apps.jobs.models import Job
+
+DEAD_PID = 2**22 + 7
+
+
+def _build_writer(spool_dir, **overrides):
+    options = {
+        "spool_dir": spool_dir,
+        "batch_size": 100,
+        "flush_interval_seconds": 60,
+        "max_pending": 1000,
+    }
+    options.update(overrides)
+    writer = AdminAuditWriter(**options)
+    # Sem thread de flush: o teste controla quando o lote e gravado.
+    writer._ensure_flusher = lambda: None
+    return writer
+
+
+def _record(**overrides):
+    record = {
+        "request_id": str(uuid.uuid4()),
+        "created_at": timezone.now().isoformat(),
+        "actor_id": None,
+        "actor_username": "",
+        "channel": "web-admin",
+        "method": "GET",
+        "path": "/api/v1/orders/",
+        "action_group": "orders",
+        "http_status": 200,
+        "is_success": True,
+        "duration_ms": 12,
+        "metadata": {},
+    }
+    record.update(overrides)
+    return record
+
+
+@pytest.mark.django_db
+def test_admin_audit_writer_grava_em_lote_no_flush(tmp_path, admin_user):
+    writer = _build_writer(tmp_path)
+    created_at = timezone.now() - timezone.timedelta(minutes=5)
+
+    writer.submit(_record(actor_id=admin_user.pk, created_at=created_at.isoformat()))
+    writer.submit(_record(actor_id=999999))
+
+    assert AdminActivityLog.objects.count() == 0
+    assert writer.get_metrics()["pending"] == 2
+
+    assert writer.flush() == 2
+
+    entries = list(AdminActivityLog.objects.order_by("id"))
+    assert entries[0].actor_id == admin_user.pk
+    assert entries[0].created_at == created_at
+    assert entries[1].actor_id is None
+    metrics = writer.get_metrics()
+    assert metrics["pending"] == 0
+    assert metrics["flushed"] == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.django_db
+def test_admin_audit_writer_recupera_spool_de_processo_encerrado(tmp_path):
+    replayed = _record()
+    write_admin_activity_logs([replayed])
+    orphan = tmp_path / f"{DEAD_PID}-abc123.open"
+    orphan.write_text(
+        json.dumps(replayed) + "\n" + json.dumps(_record()) + "\n" + '{"path": "/api',
+        encoding="utf-8",
+    )
+    writer = _build_writer(tmp_path)
+
+    writer.flush()
+
+    # Registro ja gravado antes da queda nao e duplicado.
+    assert AdminActivityLog.objects.count() == 2
+    metrics = writer.get_metrics()
+    assert metrics["recovered_segments"] == 1
+    assert metrics["corrupt_lines"] == 1
+    assert not orphan.exists()
+
+
+@pytest.mark.django_db
+def test_admin_audit_writer_descarta_quando_spool_cheio(tmp_path):
+    writer = _build_writer(tmp_path, batch_size=2, max_pending=2)
+
+    assert writer.submit(_record()) is True
+    assert writer.submit(_record()) is True
+    assert writer.submit(_record()) is False
+    assert writer.get_metrics()["dropped"] == 1
+
+    writer.flush()
+
+    assert writer.submit(_record()) is True
+    assert AdminActivityLog.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_admin_activity_middleware_enfileira_sem_gravar_no_request(
+    client,
+    settings,
+    tmp_path,
+    monkeypatch,
+):
+    settings.ADMIN_AUDIT_WRITE_EAGERLY = False
+    writer = _build_writer(tmp_path)
+    monkeypatch.setattr(writer_module, "_writer", writer)
+
+    response = client.get(
+        "/api/v1/portal/admin/config/",
+        HTTP_ORIGIN="http://10.211.55.21:3002",
+    )
+
+    assert response.status_code == 200
+    assert AdminActivityLog.objects.count() == 0
+
+    writer.flush()
+
+    entry = AdminActivityLog.objects.get()
+    assert entry.actor_username == "admin_test"
+    assert entry.path == "/api/v1/portal/admin/config/"
+
+
+@pytest.mark.django_db
+def test_admin_audit_writer_registro_invalido_nao_trava_o_segmento(tmp_path):
+    writer = _build_writer(tmp_path)
+    writer.submit(_record(ip_address="not-an-ip", user_agent="x" * 2000))
+    writer.submit(_record(ip_address="10.0.0.1"))
+    # Linha gravada por versao anterior, sem limpeza: vai para dead-letter.
+    orphan = tmp_path / f"{os.getpid()}-legacy1.ready"
+    orphan.write_text(json.dumps(_record(request_id="invalido")) + "\n")
+
+    assert writer.flush() == 2
+
+    entries = list(AdminActivityLog.objects.order_by("id"))
+    assert [entry.ip_address for entry in entries] == [None, "10.0.0.1"]
+    assert len(entries[0].user_agent) == 512
+    metrics = writer.get_metrics()
+    assert metrics["pending"] == 0
+    assert metrics["dead_lettered"] == 1
+    assert metrics["flush_failures"] == 0
+    (dead_letter,) = tmp_path.glob("dead-letter-*.jsonl")
+    assert json.loads(dead_letter.read_text())["request_id"] == "invalido"
+
+
+@pytest.mark.django_db
+def test_admin_audit_writer_recupera_segmento_com_mesmo_pid_apos_reinicio(tmp_path):
+    # Container reiniciado: o worker novo recebe o mesmo PID do que caiu.
+    orphan = tmp_path / f"{os.getpid()}-crashed1.open"
+    orphan.write_text(json.dumps(_record()) + "\n", encoding="utf-8")
+    writer = _build_writer(tmp_path)
+    writer.submit(_record())
+
+    assert writer.flush() == 2
+    assert writer.get_metrics()["recovered_segments"] == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.django_db
+def test_admin_audit_writer_nao_reivindica_segmento_com_dono_vivo(tmp_path):
+    owner = _build_writer(tmp_path)
+    owner.submit(_record())
+    other = _build_writer(tmp_path)
+
+    assert other.flush() == 0
+    assert owner.flush() == 1
+    assert owner.get_metrics()["pending"] == 0
+
+
+@pytest.mark.django_db
+def test_gravacao_eager_agenda_rollup_em_vez_de_recalcular_no_request(settings):
+    settings.ADMIN_AUDIT_WRITE_EAGERLY = True
+    settings.JOBS_RUN_EAGERLY = False
+
+    writer_module.submit_admin_activity_log(_record())
+
+    assert AdminActivityLog.objects.count() == 1
+    assert not AdminActivityHourlyRollup.objects.exists()
+    assert Job.objects.filter(name=REFRESH_ADMIN_ACTIVITY_ROLLUPS_JOB).count() == 1
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from apps.catalog.models import Dish, Ingredient, IngredientUnit
+from apps.shared.image_derivatives import get_derivative_formats
+
+
+def build_png(*, width: int, height: int, color=(255, 106, 0)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def build_upload(
+    *,
+    width: int,
+    height: int,
+    filename: str = "prato.png",
+    color=(255, 106, 0),
+):
+    return SimpleUploadedFile(
+        filename,
+        build_png(width=width, height=height, color=color),
+        content_type="image/png",
+    )
+
+
+@pytest.mark.django_db
+def test_upload_de_imagem_gera_variantes_webp_e_srcset(client, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    dish = Dish.objects.create(name="Frango Responsivo", yield_portions=10)
+
+    response = client.post(
+        f"/api/v1/catalog/dishes/{dish.id}/image/",
+        data={"image": build_upload(width=1600, height=1200)},
+    )
+    assert response.status_code == 200
+
+    dish.refresh_from_db()
+    manifest = dish.image_variants
+    assert manifest["source"] == dish.image.name
+    assert (manifest["width"], manifest["height"]) == (1200, 900)
+    assert set(manifest["formats"]) == set(get_derivative_formats())
+
+    webp_variants = manifest["formats"]["webp"]
+    assert [variant["width"] for variant in webp_variants] == [320, 640, 960, 1200]
+    assert webp_variants[0]["height"] == 240
+    for variant in webp_variants:
+        variant_path = Path(settings.MEDIA_ROOT) / variant["name"]
+        with Image.open(variant_path) as opened:
+            assert opened.format == "WEBP"
+            assert opened.size == (variant["width"], variant["height"])
+
+    detail = client.get(f"/api/v1/catalog/dishes/{dish.id}/").json()
+    sources = {source["format"]: source for source in detail["image_sources"]}
+    assert sources["webp"]["type"] == "image/webp"
+    assert sources["webp"]["widths"] == [320, 640, 960, 1200]
+    assert sources["webp"]["srcset"].startswith("http://testserver/media/")
+    assert "-320w.webp 320w, " in sources["webp"]["srcset"]
+    assert detail["image_sources"][0]["format"] == get_derivative_formats()[0]
+
+
+@pytest.mark.django_db
+def test_trocar_imagem_e_coleta_de_orfaos_remove_variantes_antigas(
+    client,
+    settings,
+    tmp_path,
+):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.IMAGE_DERIVATIVE_FORMATS = ["webp"]
+    ingredient = Ingredient.objects.create(
+        name="Tomate Responsivo",
+        unit=IngredientUnit.KILOGRAM,
+    )
+
+    client.post(
+        f"/api/v1/catalog/ingredients/{ingredient.id}/image/",
+        data={"image": build_upload(width=400, height=400, filename="tomate.png")},
+    )
+    ingredient.refresh_from_db()
+    first_manifest = ingredient.image_variants
+    assert list(first_manifest["formats"]) == ["webp"]
+    assert [v["width"] for v in first_manifest["formats"]["webp"]] == [160, 320, 640]
+
+    client.post(
+        f"/api/v1/catalog/ingredients/{ingredient.id}/image/",
+        data={
+            "image": build_upload(
+                width=600,
+                height=600,
+                filename="tomate.png",
+                color=(200, 30, 30),
+            )
+        },
+    )
+    ingredient.refresh_from_db()
+    second_manifest = ingredient.image_variants
+    assert second_manifest["source"] == ingredient.image.name
+    assert [v["width"] for v in second_manifest["formats"]["webp"]] == [160, 320, 640]
+
+    media_root = Path(settings.MEDIA_ROOT)
+    assert (media_root / first_manifest["formats"]["webp"][0]["name"]).exists()
+
+    call_command("collect_orphan_media", "--min-age-hours=0")
+
+    for variant in first_manifest["formats"]["webp"]:
+        assert not (media_root / variant["name"]).exists()
+    assert (media_root / second_manifest["formats"]["webp"][0]["name"]).exists()
+
+
+@pytest.mark.django_db
+def test_manifesto_de_outra_imagem_nao_expoe_srcset(client, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    dish = Dish.objects.create(name="Prato Pendente", yield_portions=4)
+    dish.image.save("pendente.svg", ContentFile(b"<svg></svg>"), save=False)
+    dish.save(update_fields=["image", "updated_at"])
+
+    dish.refresh_from_db()
+    # Origem nao suportada: manifesto sem variantes evita reprocessamento.
+    assert dish.image_variants == {"source": dish.image.name, "formats": {}}
+
+    Dish.objects.filter(pk=dish.pk).update(
+        image_variants={
+            "source": "catalog/dishes/antiga.png",
+            "formats": {"webp": [{"name": "x.webp", "width": 320, "height": 240}]},
+        }
+    )
+    detail = client.get(f"/api/v1/catalog/dishes/{dish.id}/").json()
+    assert detail["image_url"] is not None
+    assert detail["image_sources"] == []
+
+
+@pytest.mark.django_db
+def test_comando_gera_variantes_pendentes_sem_upscale(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.IMAGE_DERIVATIVE_FORMATS = ["webp"]
+    dish = Dish.objects.create(name="Prato Legado", yield_portions=4)
+    # Imagem gravada antes do pipeline: update direto nao dispara sinais.
+    legacy_name = default_storage.save(
+        "catalog/dishes/legado.png",
+        ContentFile(build_png(width=800, height=600)),
+    )
+    Dish.objects.filter(pk=dish.pk).update(image=legacy_name)
+    Dish.objects.create(name="Prato Sem Foto", yield_portions=4)
+
+    call_command("generate_catalog_image_variants")
+
+    dish.refresh_from_db()
+    assert dish.image_variants["source"] == dish.image.name
+    assert [v["width"] for v in dish.image_variants["formats"]["webp"]] == [
+        320,
+        640,
+        800,
+    ]
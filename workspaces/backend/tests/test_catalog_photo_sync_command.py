@@ -142,3 +142,124 @@ def test_sync_catalog_photos_aplica_placeholder_quando_falha_download(
     dish.refresh_from_db()
     assert dish.image.name
     assert dish.image.name.endswith(".svg")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_catalog_photos_from_directory_nao_acessa_rede(
+    settings,
+    tmp_path,
+    monkeypatch,
+):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    photos_dir = tmp_path / "fotos"
+    (photos_dir / "dishes").mkdir(parents=True)
+    (photos_dir / "dishes" / "Frango Grelhado.png").write_bytes(PNG_BYTES)
+
+    matched = Dish.objects.create(name="frango grelhado", yield_portions=5)
+    unmatched = Dish.objects.create(name="prato desconhecido", yield_portions=2)
+
+    def fake_urlopen(_request, timeout=0):  # noqa: ARG001
+        raise AssertionError("modo offline nao deve acessar a rede")
+
+    monkeypatch.setattr(
+        "apps.catalog.management.commands.sync_catalog_photos.urlopen",
+        fake_urlopen,
+    )
+
+    call_command(
+        "sync_catalog_photos",
+        only="dishes",
+        from_directory=str(photos_dir),
+    )
+
+    matched.refresh_from_db()
+    unmatched.refresh_from_db()
+    assert matched.image.name
+    assert not unmatched.image
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_catalog_photos_retoma_checkpoint_e_reusa_cache(
+    settings,
+    tmp_path,
+    monkeypatch,
+):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    checkpoint_path = tmp_path / "sync" / "checkpoint.json"
+    cache_dir = tmp_path / "sync" / "cache"
+
+    dish = Dish.objects.create(name="frango grelhado", yield_portions=5)
+
+    urlopen_call_count = {"total": 0}
+
+    def fake_urlopen(request, timeout=0):  # noqa: ARG001
+        urlopen_call_count["total"] += 1
+        request_url = getattr(request, "full_url", str(request))
+        if "w/api.php" in request_url:
+            return FakeResponse(
+                build_commons_search_response("https://images.example.test/photo.jpg")
+            )
+        return FakeResponse(PNG_BYTES, content_type="image/png")
+
+    monkeypatch.setattr(
+        "apps.catalog.management.commands.sync_catalog_photos.urlopen",
+        fake_urlopen,
+    )
+
+    options = {
+        "only": "dishes",
+        "force": True,
+        "workers": 2,
+        "cache_dir": str(cache_dir),
+        "checkpoint": str(checkpoint_path),
+    }
+    call_command("sync_catalog_photos", **options)
+
+    dish.refresh_from_db()
+    assert dish.image.name
+    assert urlopen_call_count["total"] == 2
+    checkpoint = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    assert checkpoint["entries"] == {f"dish:{dish.id}": "updated"}
+
+    # Retomada: item concluido e pulado sem nova busca.
+    call_command("sync_catalog_photos", **options)
+    assert urlopen_call_count["total"] == 2
+
+    # Checkpoint descartado: busca e download saem do cache em disco.
+    call_command("sync_catalog_photos", reset_checkpoint=True, **options)
+    assert urlopen_call_count["total"] == 2
+    assert checkpoint_path.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_catalog_photos_placeholder_nao_entra_no_checkpoint(
+    settings,
+    tmp_path,
+    monkeypatch,
+):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    checkpoint_path = tmp_path / "sync" / "checkpoint.json"
+    dish = Dish.objects.create(name="prato sem foto", yield_portions=3)
+    urlopen_call_count = {"total": 0}
+
+    def fake_urlopen(_request, timeout=0):  # noqa: ARG001
+        urlopen_call_count["total"] += 1
+        raise URLError("offline")
+
+    monkeypatch.setattr(
+        "apps.catalog.management.commands.sync_catalog_photos.urlopen",
+        fake_urlopen,
+    )
+
+    options = {"only": "dishes", "force": True, "checkpoint": str(checkpoint_path)}
+    call_command("sync_catalog_photos", **options)
+
+    dish.refresh_from_db()
+    assert dish.image.name.endswith(".svg")
+    assert not checkpoint_path.exists()
+    first_run_calls = urlopen_call_count["total"]
+    assert first_run_calls > 0
+
+    # Retomada tenta de novo o item que ficou com placeholder.
+    call_command("sync_catalog_photos", **options)
+    assert urlopen_call_count["total"] == 2 * first_run_calls
@@ -0,0 +1,113 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db.models import F
+
+from apps.catalog.models import Dish, MenuDay
+from apps.catalog.services import set_menu_for_day
+from apps.orders.models import MenuItemCapacityShard
+from apps.orders.reservations import sync_capacity_shards
+
+MENU_DATE = date(2026, 5, 4)
+MENU_URL = "/api/v1/catalog/menus/by-date/2026-05-04/"
+
+
+def _create_menu(*, available_qty: int | None = None) -> MenuDay:
+    dish = Dish.objects.create(name="Frango Grelhado", yield_portions=10)
+    return set_menu_for_day(
+        menu_date=MENU_DATE,
+        title="Cardapio de segunda",
+        items_payload=[
+            {
+                "dish": dish,
+                "sale_price": Decimal("22.00"),
+                "available_qty": available_qty,
+            }
+        ],
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cardapio_publico_em_cache_revalida_por_etag(
+    anonymous_client,
+    django_assert_num_queries,
+):
+    _create_menu()
+
+    first = anonymous_client.get(MENU_URL)
+    assert first.status_code == 200
+    assert first.json()["menu_items"][0]["dish"]["name"] == "Frango Grelhado"
+    assert first.json()["remaining_capacity"] == {}
+    assert first["ETag"]
+    assert first["Last-Modified"]
+    assert "public" in first["Cache-Control"]
+    assert "max-age=30" in first["Cache-Control"]
+
+    # Documento em cache: so a consulta leve de saldo vai ao banco.
+    with django_assert_num_queries(1):
+        cached = anonymous_client.get(MENU_URL)
+    assert cached.json() == first.json()
+    assert cached["ETag"] == first["ETag"]
+
+    revalidated = anonymous_client.get(MENU_URL, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cardapio_publico_invalida_por_servico_e_prato(anonymous_client):
+    menu_day = _create_menu()
+    first = anonymous_client.get(MENU_URL)
+    assert first.status_code == 200
+
+    dish = menu_day.items.get().dish
+    dish.name = "Frango Assado"
+    dish.save()
+
+    renamed = anonymous_client.get(MENU_URL)
+    assert renamed.json()["menu_items"][0]["dish"]["name"] == "Frango Assado"
+    assert renamed["ETag"] != first["ETag"]
+
+    other_dish = Dish.objects.create(name="Tilapia", yield_portions=5)
+    set_menu_for_day(
+        menu_date=MENU_DATE,
+        title="Cardapio de segunda",
+        items_payload=[{"dish": other_dish, "sale_price": Decimal("25.00")}],
+        menu_day=menu_day,
+    )
+
+    replaced = anonymous_client.get(MENU_URL)
+    assert [item["dish"]["name"] for item in replaced.json()["menu_items"]] == [
+        "Tilapia"
+    ]
+
+    set_menu_for_day(
+        menu_date=date(2026, 5, 5),
+        title="Cardapio de terca",
+        items_payload=None,
+        menu_day=menu_day,
+    )
+    assert anonymous_client.get(MENU_URL).status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cardapio_publico_sobrepoe_saldo_sem_reconstruir_documento(
+    anonymous_client,
+):
+    menu_day = _create_menu(available_qty=10)
+    menu_item = menu_day.items.get()
+    sync_capacity_shards([menu_item])
+
+    first = anonymous_client.get(MENU_URL)
+    assert first.json()["remaining_capacity"] == {str(menu_item.id): 10}
+    # Saldo sem data de alteracao: validacao so por ETag.
+    assert not first.has_header("Last-Modified")
+
+    shard = MenuItemCapacityShard.objects.filter(menu_item=menu_item).first()
+    MenuItemCapacityShard.objects.filter(pk=shard.pk).update(
+        reserved_qty=F("reserved_qty") + 3
+    )
+
+    after_sale = anonymous_client.get(MENU_URL, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert after_sale.status_code == 200
+    assert after_sale.json()["remaining_capacity"] == {str(menu_item.id): 7}
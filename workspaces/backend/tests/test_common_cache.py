@@ -0,0 +1,50 @@
+from datetime import date
+
+from apps.common.cache import (
+    cache_key,
+    cached_selector,
+    get_cache_tag_version,
+    invalidate_cache_tags,
+)
+
+
+def test_cache_key_mantem_partes_simples_legiveis():
+    assert cache_key("menu", "by-date", date(2026, 3, 2)) == "menu:by-date:2026-03-02"
+
+
+def test_cache_key_faz_hash_de_partes_inseguras():
+    key = cache_key("portal", "pagina com espaco", "x" * 300)
+
+    assert key.startswith("portal:h:")
+    assert len(key) < 80
+    assert key == cache_key("portal", "pagina com espaco", "x" * 300)
+
+
+def test_invalidate_cache_tags_troca_versao():
+    first_version = get_cache_tag_version("catalog")
+
+    assert get_cache_tag_version("catalog") == first_version
+    invalidate_cache_tags("catalog")
+    assert get_cache_tag_version("catalog") != first_version
+
+
+def test_cached_selector_reaproveita_resultado_e_invalida_por_tag():
+    calls: list[str] = []
+
+    @cached_selector("tests-selector", tags=("catalog",))
+    def load_value(*, name: str) -> dict | None:
+        calls.append(name)
+        return None if name == "vazio" else {"name": name}
+
+    assert load_value(name="a") == {"name": "a"}
+    assert load_value(name="a") == {"name": "a"}
+    assert load_value(name="vazio") is None
+    assert load_value(name="vazio") is None
+    assert calls == ["a", "vazio"]
+
+    invalidate_cache_tags("catalog")
+    load_value(name="a")
+    load_value.invalidate()
+    load_value(name="a")
+
+    assert calls == ["a", "vazio", "a", "a"]
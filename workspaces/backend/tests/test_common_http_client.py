@@ -0,0 +1,230 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.core.exceptions import ValidationError
+
+from apps.common.http_client import (
+    CircuitOpenError,
+    CircuitState,
+    HttpClientMetrics,
+    HttpConnectionError,
+    HttpStatusError,
+    PooledHttpClient,
+    disable_http_retries,
+)
+from apps.orders import payment_providers
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        self._reply()
+
+    def do_POST(self):  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self._reply()
+
+    def _reply(self):
+        server = self.server
+        server.ports.add(self.client_address[1])
+        status = server.statuses.pop(0) if server.statuses else 200
+        server.calls += 1
+        body = json.dumps({"ok": status < 400, "call": server.calls}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Fecha sem avisar (sem `Connection: close`), como um keep-alive
+        # encerrado por inatividade no provider.
+        self.close_connection = server.drop_after_reply
+
+    def log_message(self, *_args):
+        return
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ScriptedHandler)
+    server.statuses = []
+    server.ports = set()
+    server.calls = 0
+    server.drop_after_reply = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _build_client(**overrides) -> PooledHttpClient:
+    options = {
+        "timeout_seconds": 2,
+        "max_retries": 2,
+        "retry_backoff_seconds": 0,
+        "pool_maxsize": 2,
+        "failure_threshold": 2,
+        "reset_seconds": 60,
+    }
+    options.update(overrides)
+    return PooledHttpClient(**options)
+
+
+def _url(server, path="/ping") -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_client_reaproveita_conexao_keep_alive(http_server):
+    client = _build_client()
+
+    for _ in range(3):
+        assert client.request_json(key="t", method="GET", url=_url(http_server))["ok"]
+
+    assert http_server.calls == 3
+    assert len(http_server.ports) == 1
+    metrics = client.get_metrics()["t"]
+    assert metrics["requests"] == 3
+    assert metrics["errors"] == 0
+    assert metrics["circuit_state"] == CircuitState.CLOSED
+
+
+def test_client_repete_apenas_chamadas_idempotentes(http_server):
+    client = _build_client(failure_threshold=10)
+
+    http_server.statuses = [503, 200]
+    assert client.request_json(key="t", method="GET", url=_url(http_server))["ok"]
+    assert client.get_metrics()["t"]["retries"] == 1
+
+    http_server.statuses = [503]
+    with pytest.raises(HttpStatusError):
+        client.request_json(key="t", method="POST", url=_url(http_server), payload={})
+    assert http_server.calls == 3
+
+    http_server.statuses = [503, 200]
+    response = client.request_json(
+        key="t",
+        method="POST",
+        url=_url(http_server),
+        headers={"X-Idempotency-Key": "abc"},
+        payload={},
+    )
+    assert response["ok"]
+
+
+def test_disable_http_retries_nao_repete_post_com_chave_de_idempotencia(http_server):
+    client = _build_client(failure_threshold=10)
+
+    http_server.statuses = [503, 200]
+    with disable_http_retries(), pytest.raises(HttpStatusError):
+        client.request_json(
+            key="t",
+            method="POST",
+            url=_url(http_server),
+            headers={"X-Idempotency-Key": "abc"},
+            payload={},
+        )
+    assert http_server.calls == 1
+    assert client.get_metrics()["t"]["retries"] == 0
+
+    assert client.request_json(key="t", method="GET", url=_url(http_server))["ok"]
+
+
+def test_metricas_nao_perdem_incrementos_entre_threads():
+    metrics = HttpClientMetrics()
+
+    def record():
+        for _ in range(2000):
+            metrics.record_attempt(retry=True)
+            metrics.record_error()
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == snapshot["retries"] == snapshot["errors"] == 16000
+
+
+def test_circuit_breaker_abre_e_fecha_apos_probe(http_server):
+    client = _build_client(max_retries=0, reset_seconds=0.05)
+
+    http_server.statuses = [500, 500]
+    for _ in range(2):
+        with pytest.raises(HttpStatusError):
+            client.request_json(key="t", method="GET", url=_url(http_server))
+
+    breaker = client.get_breaker("t")
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        client.request_json(key="t", method="GET", url=_url(http_server))
+    assert http_server.calls == 2
+
+    breaker.opened_at -= 1
+    assert client.request_json(key="t", method="GET", url=_url(http_server))["ok"]
+    assert breaker.state == CircuitState.CLOSED
+    assert client.get_metrics()["t"]["short_circuited"] == 1
+
+
+def test_conexao_reaproveitada_caida_so_reenvia_chamada_idempotente(http_server):
+    client = _build_client(max_retries=0, failure_threshold=10)
+    http_server.drop_after_reply = True
+
+    assert client.request_json(key="t", method="GET", url=_url(http_server))["ok"]
+    with pytest.raises(HttpConnectionError):
+        client.request_json(key="t", method="POST", url=_url(http_server), payload={})
+    assert http_server.calls == 1
+
+    assert client.request_json(key="t", method="GET", url=_url(http_server))["ok"]
+    assert client.request_json(key="t", method="GET", url=_url(http_server))["ok"]
+    assert http_server.calls == 3
+
+
+def test_circuit_breaker_conta_uma_falha_por_chamada_com_retries(http_server):
+    client = _build_client(max_retries=2, failure_threshold=2)
+
+    http_server.statuses = [503, 503, 503]
+    with pytest.raises(HttpStatusError):
+        client.request_json(key="t", method="GET", url=_url(http_server))
+
+    breaker = client.get_breaker("t")
+    assert http_server.calls == 3
+    assert breaker.consecutive_failures == 1
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_provider_request_json_converte_falhas_em_validation_error(
+    http_server,
+    settings,
+):
+    settings.PAYMENTS_HTTP_MAX_RETRIES = 0
+    settings.PAYMENTS_CIRCUIT_FAILURE_THRESHOLD = 1
+    payment_providers.reset_payment_http_client()
+    try:
+        http_server.statuses = [502]
+        with pytest.raises(ValidationError, match="Falha HTTP 502"):
+            payment_providers.BasePaymentProvider._request_json(
+                method="GET",
+                url=_url(http_server),
+                headers={},
+                provider_name="asaas",
+            )
+
+        with pytest.raises(ValidationError, match="temporariamente indisponivel"):
+            payment_providers.BasePaymentProvider._request_json(
+                method="GET",
+                url=_url(http_server),
+                headers={},
+                provider_name="asaas",
+            )
+        assert (
+            payment_providers.get_payment_http_metrics()["asaas"]["circuit_state"]
+            == CircuitState.OPEN
+        )
+    finally:
+        payment_providers.reset_payment_http_client()
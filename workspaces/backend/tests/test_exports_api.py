@@ -1,6 +1,9 @@
+import gzip
+import io
 from datetime import date
 from decimal import Decimal
 
+import openpyxl
 import pytest
 
 from apps.accounts.services import SystemRole
@@ -41,7 +44,7 @@ def _create_menu_item(
 
 
 def _csv_lines(response) -> list[str]:
-    return response.content.decode("utf-8").strip().splitlines()
+    return b"".join(response.streaming_content).decode("utf-8").strip().splitlines()
 
 
 @pytest.mark.django_db
@@ -208,3 +211,60 @@ def test_export_financeiro_csv_fluxo_caixa_e_dre(client, create_user_with_roles)
     dre_lines = _csv_lines(dre_response)
     assert dre_lines[0] == "indicador,valor"
     assert "receita_total" in dre_lines[1]
+
+
+@pytest.mark.django_db
+def test_export_producao_suporta_gzip_e_xlsx(client):
+    production_date = date(2026, 3, 9)
+    menu_item = _create_menu_item(
+        menu_date=production_date,
+        dish_name="Prato Export Streaming",
+        ingredient_name="Ingrediente Export Streaming",
+    )
+    batch = create_batch_for_date(
+        production_date=production_date,
+        items_payload=[
+            {
+                "menu_item": menu_item,
+                "qty_planned": 6,
+                "qty_produced": 6,
+                "qty_waste": 0,
+            }
+        ],
+    )
+    url = "/api/v1/production/reports/production/?from=2026-03-01&to=2026-03-31"
+
+    gzip_response = client.get(f"{url}&compress=gzip")
+    assert gzip_response.status_code == 200
+    assert gzip_response["Content-Type"] == "application/gzip"
+    assert "producao_2026-03-01_2026-03-31.csv.gz" in (
+        gzip_response["Content-Disposition"]
+    )
+    gzip_lines = (
+        gzip.decompress(b"".join(gzip_response.streaming_content))
+        .decode("utf-8")
+        .splitlines()
+    )
+    assert gzip_lines[0].startswith("lote_id,data_producao,status,prato")
+    assert gzip_lines[1].startswith(f"{batch.id},2026-03-09")
+
+    xlsx_response = client.get(f"{url}&file_format=xlsx")
+    assert xlsx_response.status_code == 200
+    assert "producao_2026-03-01_2026-03-31.xlsx" in (
+        xlsx_response["Content-Disposition"]
+    )
+    workbook = openpyxl.load_workbook(
+        io.BytesIO(b"".join(xlsx_response.streaming_content)),
+        read_only=True,
+    )
+    sheet_rows = list(workbook["producao"].iter_rows(values_only=True))
+    assert sheet_rows[0][0] == "lote_id"
+    assert sheet_rows[1][:4] == (
+        batch.id,
+        "2026-03-09",
+        batch.status,
+        menu_item.dish.name,
+    )
+
+    invalid_response = client.get(f"{url}&file_format=pdf")
+    assert invalid_response.status_code == 400
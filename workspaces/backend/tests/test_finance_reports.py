@@ -2,6 +2,7 @@ from datetime import date, datetime
 from decimal import Decimal
 
 import pytest
+from django.core.management import call_command
 from django.utils import timezone
 
 from apps.catalog.models import (
@@ -12,6 +13,7 @@ from apps.catalog.models import (
     MenuDay,
     MenuItem,
 )
+from apps.finance.costing import get_menu_costs
 from apps.finance.models import (
     Account,
     AccountType,
@@ -29,6 +31,7 @@ from apps.finance.reports import (
     get_menu_item_cost,
 )
 from apps.orders.models import Order, OrderItem, OrderStatus
+from apps.orders.services import update_order_status
 from apps.procurement.models import Purchase, PurchaseItem
 
 
@@ -263,3 +266,99 @@ def test_get_kpis_retorna_pedidos_ticket_e_margem_media():
     assert kpis["lucro_bruto"] == Decimal("12.00")
     assert kpis["ticket_medio"] == Decimal("30.00")
     assert kpis["margem_media"] == Decimal("40.00")
+
+
+@pytest.mark.django_db
+def test_get_menu_costs_calcula_cardapio_em_lote_e_reaproveita_cache(
+    django_assert_max_num_queries,
+):
+    menu_day = MenuDay.objects.create(
+        menu_date=date(2026, 4, 12), title="Cardapio Lote"
+    )
+    menu_items = []
+    for index in range(3):
+        ingredient = Ingredient.objects.create(
+            name=f"Ingrediente Lote {index}",
+            unit=IngredientUnit.KILOGRAM,
+        )
+        dish = Dish.objects.create(name=f"Prato Lote {index}", yield_portions=2)
+        DishIngredient.objects.create(
+            dish=dish,
+            ingredient=ingredient,
+            quantity=Decimal("1.000"),
+            unit=IngredientUnit.KILOGRAM,
+        )
+        _create_purchase_with_item(
+            ingredient=ingredient,
+            purchase_date=date(2026, 4, 11),
+            qty=Decimal("2.000"),
+            unit_price=Decimal(4 * (index + 1)),
+        )
+        menu_items.append(
+            MenuItem.objects.create(
+                menu_day=menu_day,
+                dish=dish,
+                sale_price=Decimal("20.00"),
+                is_active=True,
+            )
+        )
+
+    with django_assert_max_num_queries(3):
+        costs = get_menu_costs(menu_day)
+
+    assert costs == {
+        menu_items[0].id: Decimal("2.00"),
+        menu_items[1].id: Decimal("4.00"),
+        menu_items[2].id: Decimal("6.00"),
+    }
+
+    with django_assert_max_num_queries(2):
+        assert get_menu_costs(menu_day) == costs
+
+    _create_purchase_with_item(
+        ingredient=menu_items[0].dish.dish_ingredients.get().ingredient,
+        purchase_date=date(2026, 4, 11),
+        qty=Decimal("2.000"),
+        unit_price=Decimal("8.00"),
+    )
+
+    assert get_menu_costs(menu_day)[menu_items[0].id] == Decimal("3.00")
+
+
+@pytest.mark.django_db
+def test_confirmacao_congela_custo_do_item_e_dre_usa_snapshot():
+    period_from, period_to = _setup_dre_scenario()
+    order_item = OrderItem.objects.get(order__delivery_date=date(2026, 4, 20))
+    order = order_item.order
+    order.status = OrderStatus.CREATED
+    order.save(update_fields=["status", "updated_at"])
+
+    update_order_status(order_id=order.id, new_status=OrderStatus.CONFIRMED)
+    order_item.refresh_from_db()
+    assert order_item.estimated_unit_cost == Decimal("6.00")
+
+    for new_status in (
+        OrderStatus.IN_PROGRESS,
+        OrderStatus.OUT_FOR_DELIVERY,
+        OrderStatus.DELIVERED,
+    ):
+        update_order_status(order_id=order.id, new_status=new_status)
+
+    # Compra posterior mais cara nao altera o CMV ja congelado.
+    _create_purchase_with_item(
+        ingredient=order_item.menu_item.dish.dish_ingredients.get().ingredient,
+        purchase_date=date(2026, 4, 15),
+        qty=Decimal("10.000"),
+        unit_price=Decimal("12.00"),
+    )
+    assert get_dre(from_date=period_from, to_date=period_to)["cmv_estimado"] == (
+        Decimal("18.00")
+    )
+
+    call_command("backfill_order_item_costs", "--recompute")
+
+    order_item.refresh_from_db()
+    assert order_item.estimated_unit_cost == Decimal("9.00")
+    assert get_dre(from_date=period_from, to_date=period_to)["cmv_estimado"] == (
+        Decimal("27.00")
+    )
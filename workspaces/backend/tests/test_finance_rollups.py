@@ -0,0 +1,229 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from apps.catalog.models import (
+    Dish,
+    DishIngredient,
+    Ingredient,
+    IngredientUnit,
+    MenuDay,
+    MenuItem,
+)
+from apps.finance.models import (
+    Account,
+    AccountType,
+    CashDirection,
+    CashflowDailyRollup,
+    CashMovement,
+    DreDailyRollup,
+)
+from apps.finance.reports import get_cashflow, get_kpis
+from apps.finance.rollups import schedule_dre_rollup_refresh
+from apps.jobs.models import Job, JobStatus
+from apps.jobs.services import run_next_job
+from apps.orders.models import Order, OrderItem, OrderStatus
+
+
+def _create_movement(account, *, day: int, direction: str, amount: str, hour=10):
+    return CashMovement.objects.create(
+        movement_date=timezone.make_aware(datetime(2026, 5, day, hour, 0)),
+        direction=direction,
+        amount=Decimal(amount),
+        account=account,
+        reference_type="AR" if direction == CashDirection.IN else "AP",
+        reference_id=day,
+    )
+
+
+@pytest.mark.django_db
+def test_cash_rollup_acompanha_criacao_alteracao_e_remocao_de_movimentos():
+    account = Account.objects.create(name="Conta Rollup", type=AccountType.ASSET)
+    first = _create_movement(account, day=3, direction=CashDirection.IN, amount="50")
+    _create_movement(account, day=3, direction=CashDirection.IN, amount="25", hour=15)
+
+    rollup = CashflowDailyRollup.objects.get(
+        day=date(2026, 5, 3),
+        account=account,
+        direction=CashDirection.IN,
+        category="AR",
+    )
+    assert rollup.total_amount == Decimal("75.00")
+    assert rollup.movements_count == 2
+
+    first.movement_date = timezone.make_aware(datetime(2026, 5, 4, 9, 0))
+    first.save()
+    _create_movement(account, day=4, direction=CashDirection.OUT, amount="20")
+
+    items = get_cashflow(from_date=date(2026, 5, 1), to_date=date(2026, 5, 31))
+    assert [(item["date"], item["net"]) for item in items] == [
+        (date(2026, 5, 3), Decimal("25.00")),
+        (date(2026, 5, 4), Decimal("30.00")),
+    ]
+    assert items[-1]["running_balance"] == Decimal("55.00")
+
+    first.delete()
+    items = get_cashflow(from_date=date(2026, 5, 1), to_date=date(2026, 5, 31))
+    assert items[-1]["total_in"] == Decimal("0.00")
+    assert items[-1]["running_balance"] == Decimal("5.00")
+
+
+@pytest.mark.django_db
+def test_pedido_entregue_agenda_recalculo_do_dia_da_dre(settings):
+    settings.JOBS_RUN_EAGERLY = False
+    delivery_date = date(2026, 5, 10)
+    order = Order.objects.create(
+        customer=None,
+        delivery_date=delivery_date,
+        status=OrderStatus.CREATED,
+        total_amount=Decimal("40.00"),
+    )
+    assert not Job.objects.filter(name="finance.refresh_dre_rollups").exists()
+
+    order.status = OrderStatus.DELIVERED
+    order.save(update_fields=["status", "updated_at"])
+
+    job = Job.objects.get(name="finance.refresh_dre_rollups")
+    assert job.status == JobStatus.QUEUED
+    assert job.payload["days"] == ["2026-05-10"]
+    # Sem rollup materializado o dia ainda sai do calculo ao vivo.
+    assert not DreDailyRollup.objects.filter(day=delivery_date).exists()
+    assert get_kpis(from_date=delivery_date, to_date=delivery_date)["pedidos"] == 1
+
+    call_command("rebuild_finance_rollups", "--from", "2026-05-01")
+
+    kpis = get_kpis(from_date=delivery_date, to_date=delivery_date)
+    assert kpis["pedidos"] == 1
+    assert kpis["receita_total"] == Decimal("40.00")
+
+
+@pytest.mark.django_db
+def test_rebuild_finance_rollups_reconstroi_tabelas_a_partir_da_origem():
+    account = Account.objects.create(name="Conta Rebuild", type=AccountType.ASSET)
+    _create_movement(account, day=7, direction=CashDirection.IN, amount="80")
+    _create_movement(account, day=8, direction=CashDirection.OUT, amount="30")
+    Order.objects.create(
+        customer=None,
+        delivery_date=date(2026, 5, 8),
+        status=OrderStatus.DELIVERED,
+        total_amount=Decimal("80.00"),
+    )
+    expected = get_cashflow(from_date=date(2026, 5, 1), to_date=date(2026, 5, 31))
+
+    CashflowDailyRollup.objects.all().delete()
+    DreDailyRollup.objects.all().delete()
+    DreDailyRollup.objects.create(day=date(2026, 5, 20), revenue_total=Decimal("9"))
+
+    call_command("rebuild_finance_rollups")
+
+    assert (
+        get_cashflow(from_date=date(2026, 5, 1), to_date=date(2026, 5, 31)) == expected
+    )
+    assert list(DreDailyRollup.objects.values_list("day", "revenue_total")) == [
+        (date(2026, 5, 8), Decimal("80.00"))
+    ]
+
+
+@pytest.mark.django_db
+def test_varias_escritas_reaproveitam_o_job_de_dre_na_fila(settings):
+    settings.JOBS_RUN_EAGERLY = False
+    DreDailyRollup.objects.create(day=date(2026, 5, 1))
+    for day in (12, 10, 12):
+        Order.objects.create(
+            customer=None,
+            delivery_date=date(2026, 5, day),
+            status=OrderStatus.DELIVERED,
+            total_amount=Decimal("10.00"),
+        )
+    schedule_dre_rollup_refresh(from_date=date(2026, 5, 3))
+    schedule_dre_rollup_refresh(from_date=date(2026, 5, 1))
+
+    job = Job.objects.get(name="finance.refresh_dre_rollups")
+    assert job.payload == {
+        "days": ["2026-05-10", "2026-05-12"],
+        "from_date": "2026-05-01",
+    }
+
+    run_next_job(worker_id="test-worker", queues=["finance"])
+    schedule_dre_rollup_refresh(days={date(2026, 5, 10)})
+
+    assert Job.objects.filter(name="finance.refresh_dre_rollups").count() == 2
+
+
+@pytest.mark.django_db
+def test_ficha_tecnica_recalcula_so_dias_com_venda_do_prato(settings):
+    settings.JOBS_RUN_EAGERLY = False
+    ingredient = Ingredient.objects.create(
+        name="Ingrediente DRE", unit=IngredientUnit.KILOGRAM
+    )
+    dish = Dish.objects.create(name="Prato DRE", yield_portions=1)
+    menu_day = MenuDay.objects.create(menu_date=date(2026, 5, 15), title="DRE")
+    menu_item = MenuItem.objects.create(
+        menu_day=menu_day, dish=dish, sale_price=Decimal("20.00"), is_active=True
+    )
+    order = Order.objects.create(
+        customer=None,
+        delivery_date=date(2026, 5, 15),
+        status=OrderStatus.DELIVERED,
+        total_amount=Decimal("20.00"),
+    )
+    OrderItem.objects.create(
+        order=order, menu_item=menu_item, qty=1, unit_price=Decimal("20.00")
+    )
+    Job.objects.filter(name="finance.refresh_dre_rollups").delete()
+
+    DishIngredient.objects.create(
+        dish=dish,
+        ingredient=ingredient,
+        quantity=Decimal("1.000"),
+        unit=IngredientUnit.KILOGRAM,
+    )
+
+    job = Job.objects.get(name="finance.refresh_dre_rollups")
+    assert job.payload == {"days": ["2026-05-15"], "from_date": None}
+
+
+@pytest.mark.django_db
+def test_relatorios_usam_calculo_ao_vivo_para_dias_sem_rollup():
+    account = Account.objects.create(name="Conta Legado", type=AccountType.ASSET)
+    _create_movement(account, day=7, direction=CashDirection.IN, amount="80")
+    _create_movement(account, day=8, direction=CashDirection.OUT, amount="30")
+    Order.objects.create(
+        customer=None,
+        delivery_date=date(2026, 5, 8),
+        status=OrderStatus.DELIVERED,
+        total_amount=Decimal("80.00"),
+    )
+    period = {"from_date": date(2026, 5, 1), "to_date": date(2026, 5, 31)}
+    expected_cashflow = get_cashflow(**period)
+    expected_kpis = get_kpis(**period)
+
+    # Historico anterior as tabelas de rollup (deploy sem rebuild).
+    CashflowDailyRollup.objects.all().delete()
+    DreDailyRollup.objects.all().delete()
+
+    assert get_cashflow(**period) == expected_cashflow
+    assert get_kpis(**period) == expected_kpis
+    assert expected_kpis["pedidos"] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("command_name", "args", "message"),
+    [
+        ("rebuild_finance_rollups", ["--from", "01/05/2026"], "--from deve estar"),
+        (
+            "backfill_order_item_costs",
+            ["--from", "2026-05-02", "--to", "2026-05-01"],
+            "menor ou igual",
+        ),
+        ("rebuild_admin_activity_rollups", ["--to", "ontem"], "--to deve estar"),
+    ],
+)
+def test_comandos_de_recalculo_validam_periodo(command_name, args, message):
+    with pytest.raises(CommandError, match=message):
+        call_command(command_name, *args)
@@ -0,0 +1,149 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.jobs.models import Job, JobPriority, JobStatus
+from apps.jobs.services import (
+    enqueue,
+    register_job_handler,
+    requeue_stale_jobs,
+    run_next_job,
+)
+
+CALLS: list[dict] = []
+
+
+@register_job_handler("tests.echo")
+def _echo_job(payload: dict) -> dict:
+    CALLS.append(payload)
+    return {"echo": payload.get("value")}
+
+
+@register_job_handler("tests.boom")
+def _boom_job(payload: dict) -> None:
+    raise RuntimeError("falha simulada")
+
+
+@register_job_handler("tests.slow", atomic=False)
+def _slow_job(payload: dict) -> dict:
+    time.sleep(payload["seconds"])
+    # Outro worker varrendo locks expirados enquanto este job ainda roda.
+    return {"requeued": requeue_stale_jobs(timeout_seconds=payload["timeout"])}
+
+
+@pytest.fixture(autouse=True)
+def queued_mode(settings):
+    settings.JOBS_RUN_EAGERLY = False
+    settings.JOBS_RETRY_BACKOFF_SECONDS = 0
+    CALLS.clear()
+
+
+@pytest.mark.django_db
+def test_enqueue_e_worker_executam_job_com_sucesso():
+    job = enqueue("tests.echo", {"value": 7})
+    assert job.status == JobStatus.QUEUED
+    assert CALLS == []
+
+    processed = run_next_job(worker_id="test-worker")
+
+    assert processed.id == job.id
+    job.refresh_from_db()
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.attempts == 1
+    assert job.result == {"echo": 7}
+    assert job.finished_at is not None
+    assert run_next_job(worker_id="test-worker") is None
+
+
+@pytest.mark.django_db
+def test_enqueue_rejeita_job_sem_handler():
+    with pytest.raises(ValidationError):
+        enqueue("tests.inexistente")
+
+
+@pytest.mark.django_db
+def test_job_com_erro_reagenda_e_vira_dead_ao_esgotar_tentativas():
+    job = enqueue("tests.boom", max_attempts=2)
+
+    run_next_job(worker_id="test-worker")
+    job.refresh_from_db()
+    assert job.status == JobStatus.QUEUED
+    assert job.attempts == 1
+    assert "falha simulada" in job.last_error
+
+    run_next_job(worker_id="test-worker")
+    job.refresh_from_db()
+    assert job.status == JobStatus.DEAD
+    assert job.attempts == 2
+    assert run_next_job(worker_id="test-worker") is None
+
+
+@pytest.mark.django_db
+def test_worker_respeita_prioridade_e_agendamento():
+    low = enqueue("tests.echo", {"value": "low"}, priority=JobPriority.LOW)
+    enqueue(
+        "tests.echo",
+        {"value": "futuro"},
+        priority=JobPriority.HIGH,
+        run_at=timezone.now() + timedelta(hours=1),
+    )
+    high = enqueue("tests.echo", {"value": "high"}, priority=JobPriority.HIGH)
+
+    assert run_next_job(worker_id="w").id == high.id
+    assert run_next_job(worker_id="w").id == low.id
+    assert run_next_job(worker_id="w") is None
+
+
+@pytest.mark.django_db
+def test_requeue_stale_jobs_devolve_job_preso():
+    job = enqueue("tests.echo", {"value": 1})
+    Job.objects.filter(pk=job.pk).update(
+        status=JobStatus.RUNNING,
+        attempts=1,
+        locked_by="worker-morto",
+        locked_at=timezone.now() - timedelta(hours=2),
+    )
+
+    assert requeue_stale_jobs(timeout_seconds=60) == 1
+    job.refresh_from_db()
+    assert job.status == JobStatus.QUEUED
+    assert job.locked_by == ""
+
+
+@pytest.mark.django_db(transaction=True)
+def test_heartbeat_impede_requeue_de_job_longo_em_execucao(settings):
+    settings.JOBS_HEARTBEAT_INTERVAL_SECONDS = 0.05
+    job = enqueue("tests.slow", {"seconds": 0.6, "timeout": 0.3})
+
+    run_next_job(worker_id="worker-lento")
+
+    job.refresh_from_db()
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.attempts == 1
+    assert job.result == {"requeued": 0}
+
+
+@pytest.mark.django_db
+def test_enqueue_em_modo_eager_executa_no_processo(settings):
+    settings.JOBS_RUN_EAGERLY = True
+
+    job = enqueue("tests.echo", {"value": "inline"})
+
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == {"echo": "inline"}
+    assert CALLS == [{"value": "inline"}]
+
+
+@pytest.mark.django_db
+def test_run_worker_once_processa_fila_e_encerra():
+    enqueue("tests.echo", {"value": 1}, queue="notifications")
+    enqueue("tests.echo", {"value": 2}, queue="outra")
+
+    call_command("run_worker", "--once", "--queue", "notifications")
+
+    assert CALLS == [{"value": 1}]
+    assert Job.objects.filter(status=JobStatus.QUEUED).count() == 1
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from io import BytesIO, StringIO
+from pathlib import Path
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from apps.catalog.models import Dish, Ingredient, IngredientUnit
+from apps.shared.content_storage import (
+    IMMUTABLE_MEDIA_CACHE_CONTROL,
+    is_content_addressed_name,
+)
+
+
+def build_png(*, color=(255, 106, 0), size=(64, 48)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, color=color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def stored_files(media_root: Path, prefix: str) -> list[Path]:
+    return sorted(path for path in (media_root / prefix).rglob("*.png"))
+
+
+@pytest.mark.django_db
+def test_imagens_iguais_viram_referencia_ao_mesmo_arquivo(client, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.IMAGE_DERIVATIVE_FORMATS = []
+    first = Dish.objects.create(name="Prato Um", yield_portions=4)
+    second = Dish.objects.create(name="Prato Dois", yield_portions=4)
+
+    for dish, filename in ((first, "um.png"), (second, "dois.PNG")):
+        response = client.post(
+            f"/api/v1/catalog/dishes/{dish.id}/image/",
+            data={
+                "image": SimpleUploadedFile(
+                    filename, build_png(), content_type="image/png"
+                )
+            },
+        )
+        assert response.status_code == 200
+
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.image.name == second.image.name
+    assert is_content_addressed_name(first.image.name)
+    assert first.image.name.startswith("catalog/dishes/sha256/")
+    assert stored_files(Path(settings.MEDIA_ROOT), "catalog/dishes") == [
+        Path(settings.MEDIA_ROOT) / first.image.name
+    ]
+
+
+@pytest.mark.django_db
+def test_arquivo_legado_migra_para_endereco_por_conteudo(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.IMAGE_DERIVATIVE_FORMATS = []
+    ingredient = Ingredient.objects.create(name="Cebola", unit=IngredientUnit.UNIT)
+    ingredient.image.save("legado.png", ContentFile(build_png()), save=False)
+    legacy_name = ingredient.image.name
+
+    ingredient.save(update_fields=["image", "updated_at"])
+
+    ingredient.refresh_from_db()
+    assert ingredient.image.name != legacy_name
+    assert is_content_addressed_name(ingredient.image.name)
+    with Image.open(Path(settings.MEDIA_ROOT) / ingredient.image.name) as opened:
+        assert opened.size == (1000, 1000)
+    # O original sem referencia fica para a coleta de orfaos.
+    assert (Path(settings.MEDIA_ROOT) / legacy_name).exists()
+
+
+@pytest.mark.django_db
+def test_coleta_de_orfaos_preserva_referenciados_e_recentes(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.IMAGE_DERIVATIVE_FORMATS = []
+    media_root = Path(settings.MEDIA_ROOT)
+    kept = Dish.objects.create(name="Prato Mantido", yield_portions=4)
+    kept.image = ContentFile(build_png(color=(10, 10, 10)), name="mantido.png")
+    kept.save()
+    replaced = Dish.objects.create(name="Prato Trocado", yield_portions=4)
+    replaced.image = ContentFile(build_png(color=(20, 20, 20)), name="antigo.png")
+    replaced.save()
+    old_name = replaced.image.name
+
+    replaced.image = ContentFile(build_png(color=(30, 30, 30)), name="novo.png")
+    replaced.save()
+
+    output = StringIO()
+    call_command("collect_orphan_media", stdout=output)
+    assert "Recentes preservados: 1." in output.getvalue()
+    assert (media_root / old_name).exists()
+
+    call_command("collect_orphan_media", "--min-age-hours=0", "--dry-run")
+    assert (media_root / old_name).exists()
+
+    call_command("collect_orphan_media", "--min-age-hours=0")
+    assert not (media_root / old_name).exists()
+    assert (media_root / kept.image.name).exists()
+    assert (media_root / replaced.image.name).exists()
+
+
+@pytest.mark.django_db
+def test_midia_enderecada_por_conteudo_tem_cache_imutavel(
+    anonymous_client,
+    settings,
+    tmp_path,
+):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.IMAGE_DERIVATIVE_FORMATS = []
+    dish = Dish.objects.create(name="Prato Cache", yield_portions=4)
+    dish.image = ContentFile(build_png(), name="cache.png")
+    dish.save()
+
+    response = anonymous_client.get(f"/media/{dish.image.name}")
+
+    assert response.status_code == 200
+    assert response["Cache-Control"] == IMMUTABLE_MEDIA_CACHE_CONTROL
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from apps.accounts.media_access import build_profile_media_url
+from apps.accounts.models import UserProfile
+
+MEDIA_BYTES = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def public_media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    target = Path(settings.MEDIA_ROOT) / "catalog" / "dishes" / "foto.png"
+    target.parent.mkdir(parents=True)
+    target.write_bytes(MEDIA_BYTES)
+    return "/media/catalog/dishes/foto.png"
+
+
+def read_body(response) -> bytes:
+    return b"".join(response.streaming_content)
+
+
+def test_midia_publica_envia_etag_last_modified_e_revalida(
+    anonymous_client,
+    public_media,
+):
+    response = anonymous_client.get(public_media)
+
+    assert response.status_code == 200
+    assert read_body(response) == MEDIA_BYTES
+    assert response["Content-Type"] == "image/png"
+    assert response["Accept-Ranges"] == "bytes"
+    assert response["Cache-Control"] == "public, no-cache"
+    assert response["Last-Modified"]
+
+    revalidated = anonymous_client.get(
+        public_media,
+        HTTP_IF_NONE_MATCH=response["ETag"],
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+
+def test_midia_publica_atende_range(anonymous_client, public_media):
+    response = anonymous_client.get(public_media, HTTP_RANGE="bytes=10-19")
+
+    assert response.status_code == 206
+    assert response["Content-Range"] == f"bytes 10-19/{len(MEDIA_BYTES)}"
+    assert response["Content-Length"] == "10"
+    assert read_body(response) == MEDIA_BYTES[10:20]
+
+    suffix = anonymous_client.get(public_media, HTTP_RANGE="bytes=-4")
+    assert suffix.status_code == 206
+    assert read_body(suffix) == MEDIA_BYTES[-4:]
+
+    stale = anonymous_client.get(
+        public_media,
+        HTTP_RANGE="bytes=0-9",
+        HTTP_IF_RANGE='"outro-etag"',
+    )
+    assert stale.status_code == 200
+
+    unsatisfiable = anonymous_client.get(public_media, HTTP_RANGE="bytes=5000-")
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable["Content-Range"] == f"bytes */{len(MEDIA_BYTES)}"
+
+
+def test_midia_publica_com_accel_redirect_delega_ao_nginx(
+    anonymous_client,
+    public_media,
+    settings,
+):
+    settings.MEDIA_ACCEL_REDIRECT_ENABLED = True
+
+    response = anonymous_client.get(public_media)
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response["X-Accel-Redirect"] == "/_protected_media/catalog/dishes/foto.png"
+    assert response["Content-Type"] == "image/png"
+    assert response["Cache-Control"] == "public, no-cache"
+
+
+def test_caminho_com_traversal_nao_escapa_do_filtro_sensivel(
+    anonymous_client,
+    settings,
+    tmp_path,
+):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.MEDIA_ACCEL_REDIRECT_ENABLED = True
+
+    response = anonymous_client.get("/media/catalog/../accounts/documents/rg.png")
+    assert response.status_code == 403
+
+    missing = anonymous_client.get("/media/../settings.py")
+    assert missing.status_code == 404
+
+
+@pytest.mark.django_db
+def test_midia_de_perfil_assinada_usa_accel_redirect_privado(
+    anonymous_client,
+    admin_user,
+    settings,
+    tmp_path,
+):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.MEDIA_ACCEL_REDIRECT_ENABLED = True
+    profile, _created = UserProfile.objects.get_or_create(user=admin_user)
+    UserProfile.objects.filter(pk=profile.pk).update(
+        document_front_image="accounts/documents/front/rg.png"
+    )
+    profile.refresh_from_db()
+
+    url = build_profile_media_url(
+        request=None,
+        profile=profile,
+        field_name="document_front_image",
+    )
+    response = anonymous_client.get(url)
+
+    assert response.status_code == 200
+    assert (
+        response["X-Accel-Redirect"]
+        == "/_protected_media/accounts/documents/front/rg.png"
+    )
+    assert response["Cache-Control"] == "private, no-store"
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import json
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
 from io import BytesIO
 
 import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
 
 from apps.catalog.models import (
     Ingredient,
@@ -14,7 +15,10 @@ from apps.catalog.models import (
     NutritionFact,
     NutritionSource,
 )
+from apps.jobs.models import Job, JobStatus
+from apps.jobs.services import claim_next_job, requeue_stale_jobs, run_next_job
 from apps.ocr_ai.models import OCRJob, OCRJobStatus, OCRKind
+from apps.ocr_ai.services import PROCESS_OCR_JOB_NAME
 from apps.procurement.models import Purchase, PurchaseItem
 
 
@@ -322,3 +326,120 @@ def test_apply_ocr_job_price_tag_atualiza_preco_e_imagem_item_compra(
     purchase_item.refresh_from_db()
     assert purchase_item.price_tag_image.name
     assert purchase_item.unit_price == Decimal("12.49")
+
+
+@pytest.mark.django_db
+def test_create_ocr_job_enfileira_e_status_acompanha_worker(client, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.JOBS_RUN_EAGERLY = False
+
+    create_response = client.post(
+        "/api/v1/ocr/jobs/",
+        data={
+            "kind": OCRKind.PRICE_TAG,
+            "image": build_test_image(),
+            "raw_text": "Feijao Carioca\nR$ 8,99",
+        },
+    )
+
+    assert create_response.status_code == 201
+    job_id = create_response.json()["id"]
+    assert create_response.json()["status"] == OCRJobStatus.PENDING
+
+    status_response = client.get(f"/api/v1/ocr/jobs/{job_id}/status/")
+    assert status_response.status_code == 200
+    assert status_response.json()["status"] == OCRJobStatus.PENDING
+
+    pending_apply = client.post(
+        f"/api/v1/ocr/jobs/{job_id}/apply/",
+        data=json.dumps({"target_type": "INGREDIENT", "target_id": 1, "mode": "merge"}),
+        content_type="application/json",
+    )
+    assert pending_apply.status_code == 400
+    assert OCRJob.objects.get(pk=job_id).status == OCRJobStatus.PENDING
+
+    processed = run_next_job(worker_id="test-worker", queues=["ocr"])
+    assert processed is not None
+    assert processed.status == JobStatus.SUCCEEDED
+
+    status_response = client.get(f"/api/v1/ocr/jobs/{job_id}/status/?wait=5")
+    assert status_response.status_code == 200
+    assert status_response.json()["status"] == OCRJobStatus.PROCESSED
+    assert OCRJob.objects.get(pk=job_id).parsed_json
+
+
+@pytest.mark.django_db
+def test_ocr_job_vira_failed_quando_worker_morre_em_todas_as_tentativas(
+    client, settings, tmp_path
+):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.JOBS_RUN_EAGERLY = False
+    create_response = client.post(
+        "/api/v1/ocr/jobs/",
+        data={"kind": OCRKind.PRICE_TAG, "image": build_test_image()},
+    )
+    ocr_job_id = create_response.json()["id"]
+    queue_job = Job.objects.get(name=PROCESS_OCR_JOB_NAME)
+
+    # Worker morre com o job em RUNNING; a fila reentrega uma vez.
+    for expected_status in (JobStatus.QUEUED, JobStatus.DEAD):
+        Job.objects.filter(pk=queue_job.pk).update(run_at=timezone.now())
+        claim_next_job(worker_id="test-worker", queues=["ocr"])
+        OCRJob.objects.filter(pk=ocr_job_id).update(status=OCRJobStatus.PROCESSING)
+        Job.objects.filter(pk=queue_job.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+        assert requeue_stale_jobs(timeout_seconds=60) == 1
+        queue_job.refresh_from_db()
+        assert queue_job.status == expected_status
+
+    ocr_job = OCRJob.objects.get(pk=ocr_job_id)
+    assert ocr_job.status == OCRJobStatus.FAILED
+    assert ocr_job.error_message
+
+
+@pytest.mark.django_db
+def test_batch_upload_cria_jobs_pendentes_na_fila_ocr(client, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.JOBS_RUN_EAGERLY = False
+
+    response = client.post(
+        "/api/v1/ocr/jobs/batch/",
+        data={
+            "kind": OCRKind.RECEIPT,
+            "images": [
+                build_test_image(filename="cupom-1.png"),
+                build_test_image(filename="cupom-2.png"),
+            ],
+        },
+    )
+
+    assert response.status_code == 202
+    body = response.json()
+    assert len(body) == 2
+    assert {item["status"] for item in body} == {OCRJobStatus.PENDING}
+    assert Job.objects.filter(queue="ocr", status=JobStatus.QUEUED).count() == 2
+
+    ids = ",".join(str(item["id"]) for item in body)
+    list_response = client.get(f"/api/v1/ocr/jobs/?ids={ids}")
+    assert list_response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_batch_upload_respeita_limite_de_arquivos(client, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.OCR_BATCH_MAX_FILES = 1
+
+    response = client.post(
+        "/api/v1/ocr/jobs/batch/",
+        data={
+            "kind": OCRKind.RECEIPT,
+            "images": [
+                build_test_image(filename="cupom-1.png"),
+                build_test_image(filename="cupom-2.png"),
+            ],
+        },
+    )
+
+    assert response.status_code == 400
+    assert OCRJob.objects.count() == 0
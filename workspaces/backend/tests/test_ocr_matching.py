@@ -0,0 +1,57 @@
+import pytest
+
+from apps.catalog.models import Ingredient, IngredientUnit
+from apps.ocr_ai.matching import (
+    IngredientMatchIndex,
+    build_trigrams,
+    normalize_lookup_text,
+    search_ingredient_candidates,
+)
+
+
+def test_normalize_lookup_text_remove_acentos_e_pontuacao():
+    assert normalize_lookup_text("  Feijão-Carioca (1kg) ") == "feijao carioca 1kg"
+    assert "  f" in build_trigrams("feijao")
+
+
+def test_index_retorna_top_k_ordenado_por_score():
+    index = IngredientMatchIndex.build(
+        [
+            (1, "Feijao Carioca"),
+            (2, "Feijao Preto"),
+            (3, "Arroz Branco"),
+            (4, "Farinha de Mandioca"),
+        ]
+    )
+
+    exact = index.search("FEIJÃO CARIOCA")
+    assert exact == [
+        {
+            "ingredient_id": 1,
+            "ingredient_name": "Feijao Carioca",
+            "confidence": 1.0,
+            "match_type": "exact",
+        }
+    ]
+
+    candidates = index.search("Feijao Cariocaa Tipo 1", limit=2)
+    assert 1 <= len(candidates) <= 2
+    assert candidates[0]["ingredient_id"] == 1
+    assert candidates[0]["match_type"] == "fuzzy"
+    assert candidates[0]["confidence"] >= 0.62
+
+    mentioned = index.search("Marca Boa", raw_text="Produto Marca Boa arroz branco")
+    assert mentioned[0]["ingredient_id"] == 3
+    assert mentioned[0]["confidence"] == 0.78
+
+
+@pytest.mark.django_db
+def test_search_ingredient_candidates_reflete_alteracoes_no_catalogo():
+    Ingredient.objects.create(name="Cebola", unit=IngredientUnit.KILOGRAM)
+    assert search_ingredient_candidates("Tomate Italiano") == []
+
+    Ingredient.objects.create(name="Tomate Italiano", unit=IngredientUnit.KILOGRAM)
+
+    candidates = search_ingredient_candidates("Tomate Italiano")
+    assert candidates[0]["ingredient_name"] == "tomate italiano"
+    assert candidates[0]["match_type"] == "exact"
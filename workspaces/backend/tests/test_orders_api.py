@@ -16,6 +16,7 @@ from apps.catalog.models import (
     MenuItem,
 )
 from apps.finance.models import AccountType, CashDirection, CashMovement
+from apps.jobs.models import Job, JobStatus
 from apps.orders.models import OrderStatus, PaymentWebhookEvent
 from apps.orders.payment_providers import ProviderIntentResult
 from apps.orders.services import create_order, update_order_status
@@ -807,7 +808,7 @@ def test_payment_webhook_retorna_429_quando_excede_rate_limit(settings):
 
 
 @pytest.mark.django_db
-def test_payment_webhook_retorna_404_quando_intent_nao_encontrado(settings):
+def test_payment_webhook_aceita_evento_sem_intent_e_agenda_retry(settings):
     settings.PAYMENTS_WEBHOOK_TOKEN = "webhook-token-not-found"
 
     webhook_client = APIClient()
@@ -825,7 +826,15 @@ def test_payment_webhook_retorna_404_quando_intent_nao_encontrado(settings):
         HTTP_X_WEBHOOK_TOKEN=settings.PAYMENTS_WEBHOOK_TOKEN,
     )
 
-    assert response.status_code == 404
+    assert response.status_code == 202
+    assert response.json()["inbox_status"] == "FAILED"
+    webhook_event = PaymentWebhookEvent.objects.get(event_id="evt-not-found-001")
+    assert webhook_event.attempts == 1
+    assert "nao encontrado" in webhook_event.last_error
+    assert Job.objects.filter(
+        name="orders.process_payment_webhooks",
+        status=JobStatus.QUEUED,
+    ).exists()
 
 
 @pytest.mark.django_db
@@ -991,7 +1000,7 @@ def test_mercadopago_webhook_atualiza_pagamento_com_status_em_tempo_real(
         }
 
     monkeypatch.setattr(
-        "apps.orders.views.fetch_mercadopago_payment_details",
+        "apps.orders.webhooks.fetch_mercadopago_payment_details",
         _fake_fetch_mercadopago_payment_details,
     )
 
@@ -1129,3 +1138,37 @@ def test_efi_webhook_atualiza_pagamento_com_payload_generico(
 
     payment.refresh_from_db()
     assert payment.status == "PAID"
+
+
+@pytest.mark.django_db
+def test_orders_search_por_nome_do_cliente_e_id(client, create_user_with_roles):
+    from apps.accounts.models import UserProfile
+    from apps.orders.models import Order
+
+    maria = create_user_with_roles(username="cliente_maria", role_codes=["CLIENTE"])
+    UserProfile.objects.create(user=maria, full_name="Maria Aparecida Souza")
+    joao = create_user_with_roles(username="cliente_joao", role_codes=["CLIENTE"])
+    UserProfile.objects.create(user=joao, full_name="Joao Pereira")
+    maria_order = Order.objects.create(
+        customer=maria,
+        delivery_date=date(2026, 5, 4),
+        total_amount=Decimal("25.00"),
+    )
+    joao_order = Order.objects.create(
+        customer=joao,
+        delivery_date=date(2026, 5, 4),
+        total_amount=Decimal("30.00"),
+    )
+
+    response = client.get("/api/v1/orders/orders/search/", {"q": "maria apar"})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert [row["id"] for row in payload["results"]] == [maria_order.id]
+    assert payload["next_cursor"] is None
+
+    by_id = client.get("/api/v1/orders/orders/search/", {"q": f"#{joao_order.id}"})
+    assert by_id.json()["results"][0]["id"] == joao_order.id
+
+    by_username = client.get("/api/v1/orders/orders/search/", {"q": "cliente_joao"})
+    assert [row["id"] for row in by_username.json()["results"]] == [joao_order.id]
@@ -0,0 +1,186 @@
+from decimal import Decimal
+from urllib.parse import urlsplit
+
+import pytest
+from django.core.exceptions import ValidationError
+
+from apps.accounts.services import SystemRole
+from apps.common.http_client import HttpStatusError
+from apps.orders import payment_providers
+from apps.orders.models import (
+    Order,
+    Payment,
+    PaymentMethod,
+    PaymentProviderCustomer,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_token_cache():
+    payment_providers.reset_provider_token_cache()
+    yield
+    payment_providers.reset_provider_token_cache()
+
+
+@pytest.fixture
+def fake_provider_api(monkeypatch):
+    calls: list[tuple[str, str]] = []
+    responses: dict[tuple[str, str], dict] = {}
+
+    def fake_request_json(*, method, url, headers, payload=None, **kwargs):
+        path = urlsplit(url).path.removeprefix("/api/v3")
+        calls.append((method, path))
+        return responses.get((method, path), {})
+
+    monkeypatch.setattr(
+        payment_providers.BasePaymentProvider,
+        "_request_json",
+        staticmethod(fake_request_json),
+    )
+    monkeypatch.setattr(
+        payment_providers,
+        "get_provider_settings",
+        lambda provider_name: {
+            "api_key": "asaas-key",
+            "client_id": "efi-client",
+            "client_secret": "efi-secret",
+        },
+    )
+    return calls, responses
+
+
+def _build_payment(customer, *, order_id: int) -> Payment:
+    order = Order(id=order_id, customer=customer, total_amount=Decimal("25.00"))
+    return Payment(
+        id=order_id,
+        order=order,
+        method=PaymentMethod.PIX,
+        amount=Decimal("25.00"),
+    )
+
+
+@pytest.mark.django_db
+def test_efi_reaproveita_token_ate_perto_de_expirar(fake_provider_api, settings):
+    settings.PAYMENTS_TOKEN_REFRESH_MARGIN_SECONDS = 60
+    calls, responses = fake_provider_api
+    responses[("POST", "/v1/authorize")] = {
+        "access_token": "token-1",
+        "expires_in": 3600,
+    }
+    responses[("POST", "/v1/charge/one-step/link")] = {
+        "data": {"charge_id": "charge-1", "payment_url": "https://efi/pay"}
+    }
+    provider = payment_providers.EfiPaymentProvider()
+
+    for index in range(3):
+        provider.create_intent(
+            payment=_build_payment(None, order_id=100 + index),
+            idempotency_key=f"efi-{index}",
+        )
+
+    assert calls.count(("POST", "/v1/authorize")) == 1
+    assert calls.count(("POST", "/v1/charge/one-step/link")) == 3
+
+    # Token com validade menor que a margem nao entra no cache.
+    payment_providers.reset_provider_token_cache()
+    responses[("POST", "/v1/authorize")]["expires_in"] = 30
+    for index in range(2):
+        provider.create_intent(
+            payment=_build_payment(None, order_id=200 + index),
+            idempotency_key=f"efi-short-{index}",
+        )
+    assert calls.count(("POST", "/v1/authorize")) == 3
+
+
+@pytest.mark.django_db
+def test_asaas_persiste_vinculo_de_cliente(fake_provider_api, create_user_with_roles):
+    calls, responses = fake_provider_api
+    customer = create_user_with_roles(
+        username="cliente_asaas_cache",
+        role_codes=[SystemRole.CLIENTE],
+    )
+    customer.email = "cliente.asaas@example.com"
+    customer.save(update_fields=["email"])
+    responses[("GET", "/customers")] = {"data": []}
+    responses[("POST", "/customers")] = {"id": "cus_123"}
+    responses[("POST", "/payments")] = {"id": "pay_1", "status": "PENDING"}
+    provider = payment_providers.AsaasPaymentProvider()
+
+    for index in range(2):
+        result = provider.create_intent(
+            payment=_build_payment(customer, order_id=300 + index),
+            idempotency_key=f"asaas-{index}",
+        )
+        assert result.provider_intent_ref == "pay_1"
+
+    customer_calls = [call for call in calls if call[1].startswith("/customers")]
+    assert len(customer_calls) == 2
+    link = PaymentProviderCustomer.objects.get(provider="asaas", customer=customer)
+    assert link.provider_customer_id == "cus_123"
+    assert link.email == "cliente.asaas@example.com"
+
+
+@pytest.mark.django_db
+def test_asaas_refaz_vinculo_quando_cliente_nao_existe_mais(
+    fake_provider_api,
+    monkeypatch,
+    create_user_with_roles,
+):
+    calls, responses = fake_provider_api
+    customer = create_user_with_roles(
+        username="cliente_asaas_removido",
+        role_codes=[SystemRole.CLIENTE],
+    )
+    responses[("GET", "/customers")] = {"data": [{"id": "cus_novo"}]}
+    responses[("POST", "/payments")] = {"id": "pay_2", "status": "PENDING"}
+    account_ref = payment_providers.AsaasPaymentProvider._build_account_ref(
+        api_base_url="https://sandbox.asaas.com/api/v3",
+        api_key="asaas-key",
+    )
+    PaymentProviderCustomer.objects.create(
+        provider="asaas",
+        account_ref=account_ref,
+        customer=customer,
+        provider_customer_id="cus_removido",
+    )
+    # Vinculo de outra chave no mesmo endpoint nao pode ser reaproveitado.
+    PaymentProviderCustomer.objects.create(
+        provider="asaas",
+        account_ref="https://sandbox.asaas.com/api/v3",
+        customer=customer,
+        provider_customer_id="cus_outra_conta",
+    )
+    fake_request_json = payment_providers.BasePaymentProvider._request_json
+    sent_customers: list[str] = []
+
+    def request_with_missing_customer(*, method, url, headers, payload=None, **kw):
+        if url.endswith("/payments") and method == "POST":
+            sent_customers.append(payload["customer"])
+            if payload["customer"] == "cus_removido":
+                raise ValidationError("Falha HTTP 404") from HttpStatusError(
+                    status=404,
+                    reason="Not Found",
+                    body='{"errors":[{"code":"invalid_customer"}]}',
+                )
+        return fake_request_json(
+            method=method, url=url, headers=headers, payload=payload, **kw
+        )
+
+    monkeypatch.setattr(
+        payment_providers.BasePaymentProvider,
+        "_request_json",
+        staticmethod(request_with_missing_customer),
+    )
+
+    result = payment_providers.AsaasPaymentProvider().create_intent(
+        payment=_build_payment(customer, order_id=400),
+        idempotency_key="asaas-removido",
+    )
+
+    assert result.provider_intent_ref == "pay_2"
+    assert sent_customers == ["cus_removido", "cus_novo"]
+    assert calls.count(("GET", "/customers")) == 1
+    link = PaymentProviderCustomer.objects.get(
+        provider="asaas", account_ref=account_ref, customer=customer
+    )
+    assert link.provider_customer_id == "cus_novo"
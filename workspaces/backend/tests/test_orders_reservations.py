@@ -0,0 +1,209 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from apps.accounts.services import SystemRole
+from apps.catalog.models import Dish, MenuDay, MenuItem
+from apps.jobs.models import Job
+from apps.orders.models import (
+    MenuItemCapacityShard,
+    OrderReservation,
+    OrderReservationStatus,
+    OrderStatus,
+    PaymentMethod,
+    PaymentStatus,
+)
+from apps.orders.reservations import release_expired_reservations
+from apps.orders.selectors import get_menu_day_capacity
+from apps.orders.services import (
+    create_order,
+    update_order_status,
+    update_payment_status,
+)
+
+DELIVERY_DATE = date(2026, 4, 10)
+
+
+def _create_limited_menu_item(*, available_qty: int | None) -> MenuItem:
+    menu_day, _ = MenuDay.objects.get_or_create(
+        menu_date=DELIVERY_DATE,
+        defaults={"title": "Cardapio reservas"},
+    )
+    dish = Dish.objects.create(name=f"Prato {Dish.objects.count()}", yield_portions=10)
+    return MenuItem.objects.create(
+        menu_day=menu_day,
+        dish=dish,
+        sale_price=Decimal("20.00"),
+        available_qty=available_qty,
+        is_active=True,
+    )
+
+
+def _remaining(menu_item: MenuItem) -> int | None:
+    rows = get_menu_day_capacity(menu_item.menu_day_id)
+    return next(
+        row["remaining_qty"] for row in rows if row["menu_item_id"] == menu_item.id
+    )
+
+
+@pytest.fixture
+def customer(create_user_with_roles):
+    return create_user_with_roles(
+        username="cliente_reservas",
+        role_codes=[SystemRole.CLIENTE],
+    )
+
+
+@pytest.mark.django_db
+def test_create_order_reserva_capacidade_e_bloqueia_oversell(customer, settings):
+    settings.JOBS_RUN_EAGERLY = False
+    menu_item = _create_limited_menu_item(available_qty=5)
+
+    order = create_order(
+        customer=customer,
+        delivery_date=DELIVERY_DATE,
+        items_payload=[{"menu_item": menu_item, "qty": 3}],
+    )
+
+    reservations = list(order.reservations.all())
+    assert sum(reservation.qty for reservation in reservations) == 3
+    assert {reservation.status for reservation in reservations} == {
+        OrderReservationStatus.HELD
+    }
+    assert all(reservation.expires_at is not None for reservation in reservations)
+    assert Job.objects.filter(name="orders.expire_order_reservations").exists()
+    assert _remaining(menu_item) == 2
+
+    with pytest.raises(ValidationError, match="Restam 2"):
+        create_order(
+            customer=customer,
+            delivery_date=DELIVERY_DATE,
+            items_payload=[{"menu_item": menu_item, "qty": 3}],
+        )
+    assert _remaining(menu_item) == 2
+
+
+@pytest.mark.django_db
+def test_reserva_divide_quantidade_entre_shards(customer, settings):
+    settings.ORDERS_CAPACITY_SHARDS = 4
+    menu_item = _create_limited_menu_item(available_qty=5)
+
+    order = create_order(
+        customer=customer,
+        delivery_date=DELIVERY_DATE,
+        items_payload=[{"menu_item": menu_item, "qty": 5}],
+        payment_method=PaymentMethod.CASH,
+    )
+
+    assert order.reservations.count() > 1
+    assert sum(order.reservations.values_list("qty", flat=True)) == 5
+    assert order.reservations.filter(expires_at__isnull=False).count() == 0
+    assert MenuItemCapacityShard.objects.filter(menu_item=menu_item).count() == 4
+    assert _remaining(menu_item) == 0
+
+
+@pytest.mark.django_db
+def test_cancelamento_libera_capacidade(customer):
+    menu_item = _create_limited_menu_item(available_qty=4)
+    order = create_order(
+        customer=customer,
+        delivery_date=DELIVERY_DATE,
+        items_payload=[{"menu_item": menu_item, "qty": 4}],
+    )
+    assert _remaining(menu_item) == 0
+
+    update_order_status(order_id=order.id, new_status=OrderStatus.CANCELED)
+
+    assert _remaining(menu_item) == 4
+    assert set(order.reservations.values_list("status", flat=True)) == {
+        OrderReservationStatus.RELEASED
+    }
+
+
+@pytest.mark.django_db
+def test_hold_expirado_libera_e_pagamento_confirma_reserva(customer):
+    menu_item = _create_limited_menu_item(available_qty=6)
+    unpaid_order = create_order(
+        customer=customer,
+        delivery_date=DELIVERY_DATE,
+        items_payload=[{"menu_item": menu_item, "qty": 2}],
+    )
+    paid_order = create_order(
+        customer=customer,
+        delivery_date=DELIVERY_DATE,
+        items_payload=[{"menu_item": menu_item, "qty": 3}],
+    )
+    update_payment_status(
+        payment_id=paid_order.payments.get().id,
+        update_data={"status": PaymentStatus.PAID},
+    )
+    assert set(paid_order.reservations.values_list("status", flat=True)) == {
+        OrderReservationStatus.CONFIRMED
+    }
+
+    released = release_expired_reservations(now=timezone.now() + timedelta(days=1))
+
+    assert released == unpaid_order.reservations.count()
+    assert _remaining(menu_item) == 3
+    assert not OrderReservation.objects.filter(
+        order=paid_order,
+        status=OrderReservationStatus.RELEASED,
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_item_sem_limite_nao_cria_reserva(customer, anonymous_client):
+    menu_item = _create_limited_menu_item(available_qty=None)
+    order = create_order(
+        customer=customer,
+        delivery_date=DELIVERY_DATE,
+        items_payload=[{"menu_item": menu_item, "qty": 50}],
+    )
+
+    assert order.reservations.count() == 0
+
+    response = anonymous_client.get(
+        f"/api/v1/orders/menu-days/{menu_item.menu_day_id}/capacity/"
+    )
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert item["menu_item_id"] == menu_item.id
+    assert item["remaining_qty"] is None
+
+
+@pytest.mark.django_db
+def test_reduzir_capacidade_redistribui_reservas_sem_oversell(customer, settings):
+    settings.ORDERS_CAPACITY_SHARDS = 4
+    menu_item = _create_limited_menu_item(available_qty=12)
+    create_order(
+        customer=customer,
+        delivery_date=DELIVERY_DATE,
+        items_payload=[{"menu_item": menu_item, "qty": 3}],
+        payment_method=PaymentMethod.CASH,
+    )
+
+    menu_item.available_qty = 4
+    menu_item.save(update_fields=["available_qty"])
+
+    create_order(
+        customer=customer,
+        delivery_date=DELIVERY_DATE,
+        items_payload=[{"menu_item": menu_item, "qty": 1}],
+        payment_method=PaymentMethod.CASH,
+    )
+    for _ in range(2):
+        with pytest.raises(ValidationError, match="Restam 0"):
+            create_order(
+                customer=customer,
+                delivery_date=DELIVERY_DATE,
+                items_payload=[{"menu_item": menu_item, "qty": 1}],
+                payment_method=PaymentMethod.CASH,
+            )
+
+    totals = MenuItemCapacityShard.objects.filter(menu_item=menu_item)
+    assert sum(totals.values_list("reserved_qty", flat=True)) == 4
+    assert sum(totals.values_list("capacity", flat=True)) == 4
+    assert _remaining(menu_item) == 0
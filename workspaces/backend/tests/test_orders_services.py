@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 
 import pytest
@@ -21,7 +21,22 @@ from apps.finance.models import (
     CashMovement,
 )
 from apps.finance.services import create_ar_from_order
-from apps.orders.models import OrderStatus, PaymentMethod, PaymentStatus
+from apps.jobs.models import Job, JobStatus
+from apps.jobs.services import run_next_job
+from apps.orders.models import (
+    Order,
+    OrderStatus,
+    Payment,
+    PaymentIntentStatus,
+    PaymentMethod,
+    PaymentMonitorMinuteRollup,
+    PaymentStatus,
+    PaymentWebhookEvent,
+)
+from apps.orders.monitoring import (
+    MATERIALIZE_PAYMENT_MONITOR_ROLLUPS_JOB,
+    build_payment_monitor_payload,
+)
 from apps.orders.services import (
     create_order,
     update_order_status,
@@ -594,3 +609,108 @@ def test_create_order_rejeita_payment_method_invalido(create_user_with_roles):
             items_payload=[{"menu_item": menu_item, "qty": 1}],
             payment_method="BOLETO",
         )
+
+
+@pytest.mark.django_db
+def test_payment_monitor_agrega_series_e_materializa_minutos_assentados(
+    create_user_with_roles,
+    django_assert_max_num_queries,
+):
+    now = datetime(2026, 3, 7, 12, 30, 20, tzinfo=UTC)
+    delivery_date = date(2026, 3, 7)
+    menu_item = _create_menu_item(
+        menu_date=delivery_date,
+        sale_price=Decimal("22.00"),
+        dish_name="Prato Monitor",
+        ingredient_name="Ingrediente Monitor",
+    )
+    customer = create_user_with_roles(
+        username="customer_payment_monitor", role_codes=[SystemRole.CLIENTE]
+    )
+    orders = [
+        create_order(
+            customer=customer,
+            delivery_date=delivery_date,
+            items_payload=[{"menu_item": menu_item, "qty": 1}],
+        )
+        for _ in range(2)
+    ]
+    Order.objects.filter(pk=orders[0].pk).update(created_at=now - timedelta(minutes=10))
+    Order.objects.filter(pk=orders[1].pk).update(created_at=now)
+    Payment.objects.filter(order=orders[0]).update(
+        status=PaymentStatus.PAID,
+        paid_at=now - timedelta(minutes=10),
+    )
+    event = PaymentWebhookEvent.objects.create(
+        provider="mock",
+        event_id="evt-monitor-001",
+        intent_status=PaymentIntentStatus.FAILED,
+    )
+    PaymentWebhookEvent.objects.filter(pk=event.pk).update(created_at=now)
+
+    payload = build_payment_monitor_payload(payment_config_public={}, now=now)
+
+    series = payload["series_last_15_minutes"]
+    assert len(series) == 15
+    assert series[-1] == {
+        "minute": "12:30",
+        "orders_created": 1,
+        "payments_paid": 0,
+        "webhooks_received": 1,
+    }
+    assert series[4]["minute"] == "12:20"
+    assert series[4]["orders_created"] == 1
+    assert series[4]["payments_paid"] == 1
+    assert payload["order_lifecycle"]["created"] == 2
+    assert payload["summary"]["payments_paid"] == 1
+    assert payload["summary"]["payments_pending"] == 1
+    assert payload["summary"]["webhooks_last_15m"] == 1
+    mock_row = next(row for row in payload["providers"] if row["provider"] == "mock")
+    assert mock_row["webhooks_24h"] == 1
+    assert mock_row["webhooks_failed_24h"] == 1
+    assert mock_row["last_event_at"] is not None
+
+    assert PaymentMonitorMinuteRollup.objects.count() == 12
+    assert (
+        PaymentMonitorMinuteRollup.objects.get(
+            minute=datetime(2026, 3, 7, 12, 20, tzinfo=UTC)
+        ).payments_paid
+        == 1
+    )
+
+    # 3 agregados, webhooks 24h, ultimo evento, rollups e 3 minutos ao vivo.
+    with django_assert_max_num_queries(9):
+        cached_payload = build_payment_monitor_payload(
+            payment_config_public={},
+            now=now,
+        )
+    assert cached_payload["series_last_15_minutes"] == series
+
+
+@pytest.mark.django_db
+def test_payment_monitor_nao_grava_rollup_no_get_e_agenda_job_unico(settings):
+    settings.JOBS_RUN_EAGERLY = False
+    now = datetime(2026, 3, 7, 12, 30, 20, tzinfo=UTC)
+    old_event = PaymentWebhookEvent.objects.create(
+        provider="mock",
+        event_id="evt-monitor-antigo",
+        intent_status=PaymentIntentStatus.SUCCEEDED,
+    )
+    PaymentWebhookEvent.objects.filter(pk=old_event.pk).update(
+        created_at=now - timedelta(days=3)
+    )
+
+    payload = build_payment_monitor_payload(payment_config_public={}, now=now)
+    build_payment_monitor_payload(payment_config_public={}, now=now)
+
+    mock_row = next(row for row in payload["providers"] if row["provider"] == "mock")
+    assert mock_row["webhooks_24h"] == 0
+    assert mock_row["last_event_at"] == (now - timedelta(days=3)).isoformat()
+    assert not PaymentMonitorMinuteRollup.objects.exists()
+    job = Job.objects.get(name=MATERIALIZE_PAYMENT_MONITOR_ROLLUPS_JOB)
+
+    run_next_job(worker_id="test-worker", queues=["orders"])
+
+    job.refresh_from_db()
+    assert job.status == JobStatus.SUCCEEDED
+    assert PaymentMonitorMinuteRollup.objects.count() == 12
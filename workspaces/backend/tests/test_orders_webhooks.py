@@ -0,0 +1,156 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+
+from apps.accounts.services import SystemRole
+from apps.catalog.models import Dish, MenuDay, MenuItem
+from apps.jobs.models import Job, JobStatus
+from apps.jobs.services import run_next_job
+from apps.orders.models import (
+    PaymentStatus,
+    PaymentWebhookEvent,
+    PaymentWebhookInboxStatus,
+)
+from apps.orders.services import create_or_get_payment_intent, create_order
+from apps.orders.webhooks import (
+    PROCESS_PAYMENT_WEBHOOKS_JOB,
+    receive_payment_webhook,
+    replay_payment_webhook_event,
+)
+
+DELIVERY_DATE = date(2026, 5, 4)
+
+
+@pytest.fixture
+def payment_intent(create_user_with_roles):
+    customer = create_user_with_roles(
+        username="cliente_webhook_inbox",
+        role_codes=[SystemRole.CLIENTE],
+    )
+    menu_day = MenuDay.objects.create(menu_date=DELIVERY_DATE, title="Inbox")
+    menu_item = MenuItem.objects.create(
+        menu_day=menu_day,
+        dish=Dish.objects.create(name="Prato Inbox", yield_portions=10),
+        sale_price=Decimal("20.00"),
+        is_active=True,
+    )
+    order = create_order(
+        customer=customer,
+        delivery_date=DELIVERY_DATE,
+        items_payload=[{"menu_item": menu_item, "qty": 1}],
+    )
+    intent, _ = create_or_get_payment_intent(
+        payment_id=order.payments.get().id,
+        idempotency_key="intent-inbox-001",
+    )
+    return intent
+
+
+def _receive(intent, *, event_id: str, intent_status: str):
+    return receive_payment_webhook(
+        provider="mock",
+        event_id=event_id,
+        provider_intent_ref=intent.provider_intent_ref,
+        normalized={"intent_status": intent_status},
+        raw_payload={"event_id": event_id},
+    )
+
+
+@pytest.mark.django_db
+def test_inbox_grava_evento_e_worker_processa_em_ordem(payment_intent, settings):
+    settings.JOBS_RUN_EAGERLY = False
+
+    processing_event, created = _receive(
+        payment_intent,
+        event_id="evt-inbox-001",
+        intent_status="PROCESSING",
+    )
+    paid_event, _ = _receive(
+        payment_intent,
+        event_id="evt-inbox-002",
+        intent_status="SUCCEEDED",
+    )
+
+    assert created is True
+    assert processing_event.inbox_status == PaymentWebhookInboxStatus.RECEIVED
+    assert processing_event.intent_id is None
+    assert Job.objects.filter(name=PROCESS_PAYMENT_WEBHOOKS_JOB).count() == 2
+
+    job = run_next_job(worker_id="test-worker", queues=["webhooks"])
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result["processed"] == 2
+
+    processing_event.refresh_from_db()
+    paid_event.refresh_from_db()
+    assert processing_event.inbox_status == PaymentWebhookInboxStatus.PROCESSED
+    assert paid_event.inbox_status == PaymentWebhookInboxStatus.PROCESSED
+    assert processing_event.processed_at < paid_event.processed_at
+    payment_intent.payment.refresh_from_db()
+    assert payment_intent.payment.status == PaymentStatus.PAID
+
+    # Segundo job do mesmo intent nao encontra pendencias.
+    second_job = run_next_job(worker_id="test-worker", queues=["webhooks"])
+    assert second_job.result["processed"] == 0
+
+
+@pytest.mark.django_db
+def test_inbox_marca_evento_dead_e_permite_replay(payment_intent, settings):
+    settings.PAYMENTS_WEBHOOK_MAX_ATTEMPTS = 1
+    event, _ = receive_payment_webhook(
+        provider="mock",
+        event_id="evt-inbox-dead",
+        provider_intent_ref="intent-ainda-inexistente",
+        normalized={"intent_status": "SUCCEEDED"},
+    )
+
+    assert event.inbox_status == PaymentWebhookInboxStatus.DEAD
+    assert event.attempts == 1
+    assert "nao encontrado" in event.last_error
+
+    PaymentWebhookEvent.objects.filter(pk=event.pk).update(
+        provider_intent_ref=payment_intent.provider_intent_ref
+    )
+    event.refresh_from_db()
+    replay_payment_webhook_event(event)
+
+    event.refresh_from_db()
+    assert event.inbox_status == PaymentWebhookInboxStatus.PROCESSED
+    assert event.attempts == 0
+    assert event.intent_id == payment_intent.id
+
+
+@pytest.mark.django_db(transaction=True)
+def test_inbox_consulta_provider_fora_da_transacao(
+    payment_intent, monkeypatch, settings
+):
+    settings.JOBS_RUN_EAGERLY = False
+    payment_intent.provider = "mercadopago"
+    payment_intent.provider_intent_ref = "mp-inbox-001"
+    payment_intent.save(update_fields=["provider", "provider_intent_ref"])
+    fetch_calls = []
+
+    def _fake_fetch(payment_id: str) -> dict:
+        fetch_calls.append(connection.in_atomic_block)
+        return {"id": payment_id, "status": "approved"}
+
+    monkeypatch.setattr(
+        "apps.orders.webhooks.fetch_mercadopago_payment_details",
+        _fake_fetch,
+    )
+    event, _ = receive_payment_webhook(
+        provider="mercadopago",
+        event_id="evt-mp-inbox-001",
+        provider_intent_ref="mp-inbox-001",
+    )
+
+    job = run_next_job(worker_id="test-worker", queues=["webhooks"])
+
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result["processed"] == 1
+    assert fetch_calls == [False]
+    event.refresh_from_db()
+    assert event.inbox_status == PaymentWebhookInboxStatus.PROCESSED
+    payment_intent.payment.refresh_from_db()
+    assert payment_intent.payment.status == PaymentStatus.PAID
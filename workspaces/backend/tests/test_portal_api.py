@@ -32,6 +32,57 @@ def test_portal_public_config_get_sem_auth_retorna_200(anonymous_client):
     assert "sections" in payload
 
 
+@pytest.mark.django_db
+def test_portal_public_config_retorna_etag_e_304_quando_nao_modificado(
+    anonymous_client,
+):
+    ensure_portal_config()
+
+    response = anonymous_client.get("/api/v1/portal/config/?page=home")
+
+    assert response.status_code == 200
+    etag = response["ETag"]
+    assert etag.startswith('"')
+    assert "Last-Modified" in response
+    assert "public" in response["Cache-Control"]
+    assert "stale-while-revalidate=" in response["Cache-Control"]
+
+    not_modified = anonymous_client.get(
+        "/api/v1/portal/config/?page=home",
+        HTTP_IF_NONE_MATCH=etag,
+    )
+
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified["ETag"] == etag
+
+
+@pytest.mark.django_db(transaction=True)
+def test_portal_public_config_serve_payload_pre_renderizado_sem_queries(
+    anonymous_client,
+    django_assert_num_queries,
+):
+    config = ensure_portal_config()
+    first = anonymous_client.get("/api/v1/portal/config/?page=home")
+
+    with django_assert_num_queries(0):
+        cached = anonymous_client.get("/api/v1/portal/config/?page=home")
+
+    assert cached.content == first.content
+    assert cached["ETag"] == first["ETag"]
+
+    config.site_name = "Mr Quentinha Editado"
+    config.save(update_fields=["site_name", "updated_at"])
+    refreshed = anonymous_client.get(
+        "/api/v1/portal/config/?page=home",
+        HTTP_IF_NONE_MATCH=first["ETag"],
+    )
+
+    assert refreshed.status_code == 200
+    assert refreshed["ETag"] != first["ETag"]
+    assert refreshed.json()["site_name"] == "Mr Quentinha Editado"
+
+
 @pytest.mark.django_db
 def test_portal_public_config_client_channel_retorna_200(anonymous_client):
     ensure_portal_config()
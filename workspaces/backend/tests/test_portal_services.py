@@ -1,5 +1,8 @@
 import pytest
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from apps.portal import services as portal_services
 from apps.portal.models import PortalConfig, PortalSection
@@ -1240,3 +1243,55 @@ def test_validate_installer_wizard_ssh_password_sem_senha_falha():
         )
 
     assert "SSH: informe a senha" in str(exc_info.value)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_ensure_portal_config_reutiliza_snapshot_sem_queries(
+    django_assert_num_queries,
+):
+    portal_services.reset_portal_config_snapshot()
+    first = ensure_portal_config()
+
+    with django_assert_num_queries(0):
+        cached = ensure_portal_config()
+        payment_settings = portal_services.get_payment_providers_config()
+
+    assert cached.id == first.id
+    assert cached is not first
+    assert payment_settings["default_provider"] == "mock"
+
+
+@pytest.mark.django_db
+def test_ensure_portal_config_em_transacao_nao_grava():
+    ensure_portal_config()
+    PortalConfig.objects.update(cors_allowed_origins=[])
+
+    with CaptureQueriesContext(connection) as queries:
+        config = ensure_portal_config()
+
+    assert config.cors_allowed_origins
+    assert all(query["sql"].lstrip().startswith("SELECT") for query in queries)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_ensure_portal_config_invalida_snapshot_apos_escrita():
+    portal_services.reset_portal_config_snapshot()
+    ensure_portal_config()
+
+    save_portal_config(payload={"site_name": "Mr Quentinha Centro"})
+    assert ensure_portal_config().site_name == "Mr Quentinha Centro"
+
+    sections = PortalSection.objects.filter(
+        template_id="classic",
+        page="home",
+        key="hero",
+    )
+    sections.delete()
+    assert not sections.exists()
+
+    # Leitura nao escreve: secoes faltantes so voltam pelo bootstrap explicito.
+    ensure_portal_config()
+    assert not sections.exists()
+
+    call_command("bootstrap_portal_config")
+    assert sections.exists()
@@ -20,6 +20,7 @@ from apps.inventory.models import (
     StockReferenceType,
 )
 from apps.inventory.selectors import get_stock_by_ingredient
+from apps.jobs.models import Job, JobStatus
 from apps.procurement.models import Purchase, PurchaseItem, PurchaseRequest
 from apps.procurement.services import (
     create_purchase_and_apply_stock,
@@ -226,3 +227,16 @@ def test_generate_purchase_request_from_menu_com_estoque_parcial_cria_somente_fa
     purchase_request = PurchaseRequest.objects.get(pk=result["purchase_request_id"])
     assert purchase_request.items.count() == 1
     assert purchase_request.items.first().ingredient_id == arroz.id
+
+
+@pytest.mark.django_db
+def test_generate_purchase_request_from_menu_enfileira_alerta_sem_worker(settings):
+    settings.JOBS_RUN_EAGERLY = False
+    menu_day, _arroz, _feijao = _create_menu_for_procurement()
+
+    result = generate_purchase_request_from_menu(menu_day.id)
+
+    job = Job.objects.get(name="procurement.notify_purchase_request_created")
+    assert job.status == JobStatus.QUEUED
+    assert job.payload == {"purchase_request_id": result["purchase_request_id"]}
+    assert result["alerts"] == {"queued": True, "job_id": job.id}
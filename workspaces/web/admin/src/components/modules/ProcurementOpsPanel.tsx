@@ -8,7 +8,7 @@ import { InlinePreloader } from "@/components/InlinePreloader";
 import {
   applyOcrJobAdmin,
   ApiError,
-  createOcrJobAdmin,
+  createOcrJobAndWaitAdmin,
   createPurchaseAdmin,
   generatePurchaseRequestFromMenuAdmin,
   listIngredientsAdmin,
@@ -18,6 +18,7 @@ import {
   uploadPurchaseItemLabelImageAdmin,
   uploadPurchaseReceiptImageAdmin,
   updatePurchaseRequestStatusAdmin,
+  waitForOcrJobAdmin,
 } from "@/lib/api";
 import { containResizeImage } from "@/lib/imageUpload";
 import { formatProcurementStatusLabel } from "@/lib/labels";
@@ -51,7 +52,7 @@ type ItemImageType = "front" | "back" | "product" | "price";
 type OcrDraftJobInfo = {
   jobId: number;
   kind: "LABEL_FRONT" | "LABEL_BACK" | "PRODUCT" | "PRICE_TAG";
-  status: "PENDING" | "PROCESSED" | "APPLIED" | "FAILED";
+  status: "PENDING" | "PROCESSING" | "PROCESSED" | "APPLIED" | "FAILED";
 };
 
 type PurchaseItemDraft = {
@@ -434,7 +435,7 @@ export function ProcurementOpsPanel() {
     setMessage("");
     setErrorMessage("");
     try {
-      const receiptJob = await createOcrJobAdmin("RECEIPT", receiptImageFile);
+      const receiptJob = await createOcrJobAndWaitAdmin("RECEIPT", receiptImageFile);
       if (receiptJob.status === "FAILED") {
         throw new Error(receiptJob.error_message || "OCR do comprovante falhou.");
       }
@@ -516,7 +517,7 @@ export function ProcurementOpsPanel() {
 
     try {
       for (const imageEntry of images) {
-        const job = await createOcrJobAdmin(imageEntry.kind, imageEntry.file as File);
+        const job = await createOcrJobAndWaitAdmin(imageEntry.kind, imageEntry.file as File);
         ocrJobs[imageEntry.type] = {
           jobId: job.id,
           kind: imageEntry.kind,
@@ -694,7 +695,7 @@ export function ProcurementOpsPanel() {
 
       if (applyOcrFromImages && receiptImageFile) {
         try {
-          const receiptJob = await createOcrJobAdmin("RECEIPT", receiptImageFile);
+          const receiptJob = await createOcrJobAndWaitAdmin("RECEIPT", receiptImageFile);
           if (receiptJob.status === "FAILED") {
             warnings.push("OCR do comprovante nao processou.");
           } else {
@@ -757,12 +758,33 @@ export function ProcurementOpsPanel() {
 
           const existingJob = item.ocrJobs[imageEntry.type];
           if (existingJob && existingJob.status !== "FAILED") {
-            jobsQueue.push({ type: imageEntry.type, job: existingJob });
+            try {
+              const settledJob =
+                existingJob.status === "PENDING" || existingJob.status === "PROCESSING"
+                  ? await waitForOcrJobAdmin(existingJob.jobId)
+                  : null;
+              if (settledJob?.status === "FAILED") {
+                warnings.push(
+                  `OCR ${settledJob.kind} do item ${item.ingredientName} falhou.`,
+                );
+                continue;
+              }
+              jobsQueue.push({
+                type: imageEntry.type,
+                job: settledJob
+                  ? { ...existingJob, status: settledJob.status }
+                  : existingJob,
+              });
+            } catch {
+              warnings.push(
+                `Falha ao aguardar OCR ${imageEntry.type} do item ${item.ingredientName}.`,
+              );
+            }
             continue;
           }
 
           try {
-            const generatedJob = await createOcrJobAdmin(
+            const generatedJob = await createOcrJobAndWaitAdmin(
               kindByType[imageEntry.type],
               imageEntry.file,
             );
@@ -24,6 +24,7 @@ import type {
   CreateDishPayload,
   CreateIngredientPayload,
   OcrJobData,
+  OcrJobStatusData,
   OcrKind,
   CreatePurchasePayload,
   CreateStockMovementPayload,
@@ -1385,6 +1386,49 @@ export async function createOcrJobAdmin(
   });
 }
 
+const OCR_STATUS_WAIT_SECONDS = 20;
+const OCR_JOB_MAX_WAIT_MS = 3 * 60 * 1000;
+
+function isOcrJobActive(status: OcrJobData["status"]): boolean {
+  return status === "PENDING" || status === "PROCESSING";
+}
+
+export async function waitForOcrJobAdmin(jobId: number): Promise<OcrJobData> {
+  // O OCR roda no worker: long-poll no endpoint de status ate sair de
+  // PENDING/PROCESSING e so entao busca o job completo (com parsed_json).
+  const deadline = Date.now() + OCR_JOB_MAX_WAIT_MS;
+  let current = await requestJson<OcrJobStatusData>(
+    `/api/v1/ocr/jobs/${jobId}/status/`,
+    { method: "GET", auth: true },
+  );
+  while (isOcrJobActive(current.status)) {
+    if (Date.now() >= deadline) {
+      throw new ApiError("OCR ainda em processamento. Tente novamente em instantes.", 408);
+    }
+    current = await requestJson<OcrJobStatusData>(
+      `/api/v1/ocr/jobs/${jobId}/status/?wait=${OCR_STATUS_WAIT_SECONDS}`,
+      { method: "GET", auth: true },
+    );
+  }
+
+  return requestJson<OcrJobData>(`/api/v1/ocr/jobs/${jobId}/`, {
+    method: "GET",
+    auth: true,
+  });
+}
+
+export async function createOcrJobAndWaitAdmin(
+  kind: OcrKind,
+  file: File,
+  rawText?: string,
+): Promise<OcrJobData> {
+  const job = await createOcrJobAdmin(kind, file, rawText);
+  if (!isOcrJobActive(job.status)) {
+    return job;
+  }
+  return waitForOcrJobAdmin(job.id);
+}
+
 export async function applyOcrJobAdmin(
   jobId: number,
   payload: ApplyOcrPayload,
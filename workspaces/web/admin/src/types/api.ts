@@ -868,7 +868,12 @@ export type OcrKind =
   | "PRICE_TAG"
   | "RECEIPT";
 
-export type OcrJobStatus = "PENDING" | "PROCESSED" | "APPLIED" | "FAILED";
+export type OcrJobStatus =
+  | "PENDING"
+  | "PROCESSING"
+  | "PROCESSED"
+  | "APPLIED"
+  | "FAILED";
 
 export type OcrJobData = {
   id: number;
@@ -882,6 +887,14 @@ export type OcrJobData = {
   updated_at: string;
 };
 
+export type OcrJobStatusData = {
+  id: number;
+  kind: OcrKind;
+  status: OcrJobStatus;
+  error_message: string | null;
+  updated_at: string;
+};
+
 export type ApplyOcrPayload = {
   target_type: "INGREDIENT" | "PURCHASE_ITEM" | "PURCHASE";
   target_id: number;